@@ -3,15 +3,21 @@
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Iterator, Tuple
+from contextlib import contextmanager
 import jwt
 from jwt.exceptions import InvalidTokenError
 import os
 from datetime import datetime, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from modules.user_profile import UserProfileService, UserProfileRepository
-from modules.twitter_api import TwitterAPIClient
+from modules.user_profile import UserProfileService, UserProfileRepository, get_token_manager
+from modules.trend_analysis.ingestion import TrendIngestionService
+from database import TrendRepository
+from modules.twitter_api import (
+    TwitterAPIClient, AsyncTwitterAPIClient, TwitterRateLimiter, ResponseCache, CircuitBreaker,
+    rate_limit_backend_from_url
+)
 import logging
 import random
 
@@ -187,66 +193,30 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             should_reauth = False
             
             try:
-                logger.info(f"开始获取用户 {user_id} 的Twitter凭证...")
-                twitter_creds = service.repository.get_twitter_credentials(user_id)
+                # Tokens are kept fresh by the token manager; read them from
+                # memory and only fall back to the stored credentials
+                token_manager = get_token_manager()
+                access_token = token_manager.get_access_token(user_id) if token_manager else None
                 
-                if not twitter_creds:
-                    logger.info(f"用户 {user_id} 没有Twitter凭证记录")
-                    access_token = None
-                    should_reauth = True  # 没有凭证，需要授权
-                elif not hasattr(twitter_creds, 'access_token') or not twitter_creds.access_token:
-                    logger.info(f"用户 {user_id} 的Twitter凭证中没有access_token")
-                    access_token = None
-                    should_reauth = True  # 没有token，需要授权
-                else:
-                    access_token = twitter_creds.access_token
-                    logger.info(f"用户 {user_id} 找到Twitter access_token，长度: {len(access_token)}")
+                if not access_token:
+                    logger.info(f"开始获取用户 {user_id} 的Twitter凭证...")
+                    twitter_creds = service.repository.get_twitter_credentials(user_id)
                     
-                    # 优化的Twitter令牌验证 - 使用缓存和时间间隔
-                    if access_token:
-                        # 检查令牌是否过期（数据库中的过期时间）
+                    if not twitter_creds or not twitter_creds.access_token:
+                        logger.info(f"用户 {user_id} 没有Twitter凭证记录")
+                        should_reauth = True  # 没有凭证，需要授权
+                    else:
+                        if token_manager:
+                            token_manager.track(twitter_creds)
+                        
                         if twitter_creds.is_expired():
                             logger.info(f"用户 {user_id} 的Twitter令牌已过期，过期时间: {twitter_creds.expires_at}")
-                            access_token = None
-                            # 标记需要重新授权
-                            should_reauth = True
-                        elif should_validate_twitter_token(user_id):
-                            # 只在必要时进行API验证
-                            try:
-                                logger.info(f"执行用户 {user_id} 的Twitter令牌API验证 (缓存过期)")
-                                twitter_client = TwitterAPIClient(
-                                    client_id=os.getenv('TWITTER_CLIENT_ID'),
-                                    client_secret=os.getenv('TWITTER_CLIENT_SECRET')
-                                )
-                                is_valid = twitter_client.auth.validate_user_token(access_token)
-                                cache_token_validation(user_id, is_valid)
-                                
-                                if not is_valid:
-                                    logger.error(f"用户 {user_id} 的Twitter令牌验证失败")
-                                    access_token = None
-                                    # 标记需要重新授权
-                                    should_reauth = True
-                                else:
-                                    logger.info(f"用户 {user_id} 的Twitter令牌验证成功")
-                                    should_reauth = False
-                                    
-                            except Exception as e:
-                                logger.error(f"验证用户 {user_id} 的Twitter令牌时发生错误: {e}")
-                                cache_token_validation(user_id, False)
-                                access_token = None
-                                should_reauth = True
+                            # 有refresh token时当场刷新，刷新失败才需要重新授权
+                            if token_manager and twitter_creds.refresh_token:
+                                access_token = await token_manager.refresh(user_id)
+                            should_reauth = not access_token
                         else:
-                            # 使用缓存的验证结果
-                            cached_valid, cached_time = _token_validation_cache.get(user_id, (False, datetime.min))
-                            if not cached_valid:
-                                access_token = None
-                                should_reauth = True
-                                logger.info(f"用户 {user_id} 使用缓存的Twitter令牌验证结果: 无效 (缓存时间: {cached_time})")
-                            else:
-                                should_reauth = False
-                                logger.info(f"用户 {user_id} 使用缓存的Twitter令牌验证结果: 有效 (缓存时间: {cached_time})")
-                    else:
-                        should_reauth = False
+                            access_token = twitter_creds.access_token
             except Exception as e:
                 logger.error(f"获取用户 {user_id} 的Twitter凭证失败: {e}")
                 access_token = None
@@ -306,6 +276,15 @@ def get_user_service() -> UserProfileService:
     data_flow_manager = DataFlowManager(db_session)
     return UserProfileService(repository, data_flow_manager)
 
+@contextmanager
+def user_profile_repository() -> Iterator[UserProfileRepository]:
+    """UserProfileRepository on its own session, closed on exit (for background tasks)"""
+    db_session = SessionLocal()
+    try:
+        yield UserProfileRepository(db_session)
+    finally:
+        db_session.close()
+
 def generate_jwt_token(user_id: str) -> str:
     payload = {
         'user_id': user_id,
@@ -333,10 +312,115 @@ def require_auth(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+# One limiter per process; its backend decides whether budgets are shared across workers
+_twitter_rate_limiter: Optional[TwitterRateLimiter] = None
+
+def get_twitter_rate_limiter() -> TwitterRateLimiter:
+    """
+    Get the process-wide Twitter rate limiter
+    
+    TWITTER_RATE_LIMIT_BACKEND selects where bucket state lives: "memory"
+    (default, per process), "sqlite:///path" (all workers on this host) or a
+    redis:// URL (all workers everywhere).
+    """
+    global _twitter_rate_limiter
+    if _twitter_rate_limiter is None:
+        backend_url = os.getenv('TWITTER_RATE_LIMIT_BACKEND', 'memory')
+        _twitter_rate_limiter = TwitterRateLimiter(backend=rate_limit_backend_from_url(backend_url))
+    return _twitter_rate_limiter
+
+# One response cache per process, shared by the per-request sync clients and the async client
+_twitter_response_cache: Optional[ResponseCache] = None
+
+def get_twitter_response_cache() -> ResponseCache:
+    """Get the process-wide cache for read-only Twitter lookups"""
+    global _twitter_response_cache
+    if _twitter_response_cache is None:
+        _twitter_response_cache = ResponseCache(
+            max_entries=int(os.getenv('TWITTER_RESPONSE_CACHE_MAX_ENTRIES', '5000'))
+        )
+    return _twitter_response_cache
+
+# One circuit breaker per process, so every client stops calling an endpoint that is down
+_twitter_circuit_breaker: Optional[CircuitBreaker] = None
+
+def get_twitter_circuit_breaker() -> CircuitBreaker:
+    """Get the process-wide per-endpoint circuit breaker for Twitter API requests"""
+    global _twitter_circuit_breaker
+    if _twitter_circuit_breaker is None:
+        _twitter_circuit_breaker = CircuitBreaker(
+            open_seconds=float(os.getenv('TWITTER_CIRCUIT_OPEN_SECONDS', '30')),
+            slow_call_seconds=float(os.getenv('TWITTER_SLOW_CALL_SECONDS', '5'))
+        )
+    return _twitter_circuit_breaker
+
 def get_twitter_client() -> TwitterAPIClient:
     """Get configured Twitter API client"""
     client_id = os.getenv('TWITTER_CLIENT_ID')
     client_secret = os.getenv('TWITTER_CLIENT_SECRET')
     if not client_id or not client_secret:
         raise ValueError("Twitter API credentials not configured")
-    return TwitterAPIClient(client_id, client_secret) 
\ No newline at end of file
+    return TwitterAPIClient(client_id, client_secret, rate_limiter=get_twitter_rate_limiter(),
+                            response_cache=get_twitter_response_cache(),
+                            circuit_breaker=get_twitter_circuit_breaker())
+
+# Process-wide async client so every request and the publisher share one connection pool
+_async_twitter_client: Optional[AsyncTwitterAPIClient] = None
+
+def get_async_twitter_client() -> AsyncTwitterAPIClient:
+    """Get the shared async Twitter API client (created on first use)"""
+    global _async_twitter_client
+    if _async_twitter_client is None:
+        client_id = os.getenv('TWITTER_CLIENT_ID')
+        client_secret = os.getenv('TWITTER_CLIENT_SECRET')
+        if not client_id or not client_secret:
+            raise ValueError("Twitter API credentials not configured")
+        _async_twitter_client = AsyncTwitterAPIClient(
+            client_id,
+            client_secret,
+            rate_limiter=get_twitter_rate_limiter(),
+            response_cache=get_twitter_response_cache(),
+            circuit_breaker=get_twitter_circuit_breaker(),
+            max_connections=int(os.getenv('TWITTER_MAX_CONNECTIONS', '100')),
+            max_keepalive_connections=int(os.getenv('TWITTER_MAX_KEEPALIVE_CONNECTIONS', '20'))
+        )
+    return _async_twitter_client
+
+async def close_async_twitter_client() -> None:
+    """Close the shared async Twitter client's connection pool"""
+    global _async_twitter_client
+    if _async_twitter_client is not None:
+        await _async_twitter_client.aclose()
+        _async_twitter_client = None
+
+@contextmanager
+def trend_repository() -> Iterator[TrendRepository]:
+    """TrendRepository on its own session, closed on exit (for background tasks)"""
+    db_session = SessionLocal()
+    try:
+        yield TrendRepository(db_session)
+    finally:
+        db_session.close()
+
+# Process-wide trend snapshots, so founders in the same location share one fetch per window
+_trend_ingestion_service: Optional[TrendIngestionService] = None
+
+def get_trend_ingestion_service() -> TrendIngestionService:
+    """Get the shared trend ingestion service (created on first use)"""
+    global _trend_ingestion_service
+    if _trend_ingestion_service is None:
+        _trend_ingestion_service = TrendIngestionService(
+            get_async_twitter_client(),
+            trend_repository,
+            window_seconds=int(os.getenv('TREND_SNAPSHOT_WINDOW_SECONDS', '300')),
+            retention_seconds=int(os.getenv('TREND_RAW_RETENTION_HOURS', '168')) * 3600,
+            personalized_enabled=os.getenv('TREND_PERSONALIZED_ENABLED', 'false').lower() == 'true'
+        )
+    return _trend_ingestion_service
+
+async def close_trend_ingestion_service() -> None:
+    """Stop the shared trend ingestion service's refresh loop"""
+    global _trend_ingestion_service
+    if _trend_ingestion_service is not None:
+        await _trend_ingestion_service.stop()
+        _trend_ingestion_service = None
@@ -7,19 +7,21 @@ from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, status, BackgroundTasks
 from fastapi.responses import JSONResponse
 from datetime import datetime
+from contextlib import contextmanager
 import logging
 
-from database import get_data_flow_manager, DataFlowManager
-from modules.twitter_api import TwitterAPIClient
+from database import get_data_flow_manager, get_db_session, DataFlowManager
+from modules.twitter_api import AsyncTwitterAPIClient
 from modules.user_profile.service import UserProfileService
-from api.middleware import get_twitter_client
+from modules.user_profile.repository import UserProfileRepository
+from api.middleware import get_async_twitter_client
 from api.middleware import get_user_service
 from api.middleware import get_current_user, User
 
 from modules.scheduling_posting.service import SchedulingPostingService
 from modules.scheduling_posting.models import (
     ScheduleRequest, BatchScheduleRequest, PublishRequest, BatchPublishRequest,
-    StatusUpdateRequest, RuleCheckRequest, PublishStatus
+    StatusUpdateRequest, RuleCheckRequest, PublishStatus, DeadLetterRedriveRequest
 )
 
 logger = logging.getLogger(__name__)
@@ -30,7 +32,7 @@ router = APIRouter(prefix="/api/scheduling", tags=["scheduling-posting"])
 # Dependency to get scheduling service
 async def get_scheduling_service(
     data_flow_manager: DataFlowManager = Depends(get_data_flow_manager),
-    twitter_client: TwitterAPIClient = Depends(get_twitter_client),
+    twitter_client: AsyncTwitterAPIClient = Depends(get_async_twitter_client),
     user_service: UserProfileService = Depends(get_user_service),
     current_user: User = Depends(get_current_user)
 ) -> SchedulingPostingService:
@@ -49,6 +51,25 @@ async def get_scheduling_service(
             detail="Failed to initialize scheduling service"
         )
 
+@contextmanager
+def background_scheduling_service():
+    """
+    Build a scheduling service outside a request, for the resident publisher.
+    
+    Each call gets its own database session, closed when the block exits.
+    """
+    db_session = get_db_session()
+    try:
+        data_flow_manager = DataFlowManager(db_session)
+        yield SchedulingPostingService(
+            data_flow_manager=data_flow_manager,
+            twitter_client=get_async_twitter_client(),
+            user_profile_service=UserProfileService(UserProfileRepository(db_session), data_flow_manager),
+            analytics_collector=None
+        )
+    finally:
+        db_session.close()
+
 @router.get("/pending")
 async def get_pending_content(
     user_id: str = Query(..., description="User ID"),
@@ -335,8 +356,9 @@ async def batch_publish_content(
     """
     Batch publish or schedule multiple content items
     
-    Publishes or schedules multiple content items with optional staggering.
-    Useful for bulk content management operations.
+    Queues the items as individually scheduled entries, staggered by
+    stagger_minutes, and returns immediately with a batch job ID. Progress
+    is available from GET /api/scheduling/batch/{job_id}.
     """
     try:
         # Validate batch size
@@ -346,21 +368,26 @@ async def batch_publish_content(
                 detail="Batch size cannot exceed 50 items"
             )
         
-        # Process batch operation
+        # Queue batch operation
         result = await service.batch_publish_content(current_user.id, batch_request)
         
-        logger.info(f"Batch publish completed for user {current_user.id}: "
-                   f"{result.successful_items}/{result.total_items} successful")
+        logger.info(f"Batch publish job {result.job_id} queued for user {current_user.id}: "
+                   f"{result.successful_items}/{result.total_items} items")
         
         return JSONResponse(
-            status_code=status.HTTP_200_OK,
+            status_code=status.HTTP_202_ACCEPTED,
             content={
                 "message": result.message,
+                "job_id": result.job_id,
                 "total_items": result.total_items,
                 "successful_items": result.successful_items,
                 "failed_items": result.failed_items,
-                "results": result.results,
-                "batch_completed_at": datetime.utcnow().isoformat()
+                "results": {
+                    content_id: item.model_dump(mode="json")
+                    for content_id, item in result.results.items()
+                },
+                "status_url": f"/api/scheduling/batch/{result.job_id}",
+                "queued_at": datetime.utcnow().isoformat()
             }
         )
         
@@ -373,6 +400,40 @@ async def batch_publish_content(
             detail="Batch publish operation failed"
         )
 
+@router.get("/batch/{job_id}")
+async def get_batch_job_status(
+    job_id: str = Path(..., description="Batch job ID"),
+    current_user: User = Depends(get_current_user),
+    service: SchedulingPostingService = Depends(get_scheduling_service)
+):
+    """
+    Get batch publishing job progress
+    
+    Reports the current status of every item queued by a batch publish job.
+    """
+    try:
+        job_status = await service.get_batch_job_status(current_user.id, job_id)
+        
+        if not job_status:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Batch job not found"
+            )
+        
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=job_status.model_dump(mode="json")
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get batch job status: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get batch job status"
+        )
+
 @router.post("/schedule/batch")
 async def batch_schedule_content(
     batch_request: BatchScheduleRequest,
@@ -425,15 +486,16 @@ async def batch_schedule_content(
 async def get_publishing_history(
     user_id: str = Query(..., description="User ID"),
     limit: int = Query(20, ge=1, le=100, description="Maximum number of items"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: User = Depends(get_current_user),
     service: SchedulingPostingService = Depends(get_scheduling_service)
 ):
     """
     Get publishing history for a user
     
-    Returns a paginated list of previously scheduled and published content
-    with status information and timestamps.
+    Returns published content, newest first, with status information and
+    timestamps. Pages are keyset-paginated: pass next_cursor back as cursor
+    to get the following page.
     """
     try:
         # Validate user access
@@ -444,7 +506,13 @@ async def get_publishing_history(
             )
         
         # Get publishing history
-        history = await service.get_publishing_history(user_id, limit, offset)
+        try:
+            history = await service.get_publishing_history(user_id, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         
         # Convert to dict format for JSON response
         history_data = []
@@ -472,7 +540,7 @@ async def get_publishing_history(
                 "history": history_data,
                 "total_count": len(history_data),
                 "limit": limit,
-                "offset": offset
+                "next_cursor": history[-1].cursor if len(history) == limit else None
             }
         )
         
@@ -629,6 +697,99 @@ async def trigger_queue_processing(
             detail="Failed to trigger queue processing"
         )
 
+@router.get("/queue/metrics")
+async def get_queue_metrics(
+    current_user: User = Depends(get_current_user),
+    service: SchedulingPostingService = Depends(get_scheduling_service)
+):
+    """
+    Get publishing queue metrics
+    
+    Returns queue depth, in-flight publishes and per-founder wait times
+    for this process, along with the configured concurrency limits.
+    """
+    try:
+        if not current_user.is_admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Admin access required"
+            )
+        
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=service.get_queue_metrics()
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get queue metrics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get queue metrics"
+        )
+
+@router.get("/dead-letter")
+async def get_dead_letter_content(
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of items"),
+    current_user: User = Depends(get_current_user),
+    service: SchedulingPostingService = Depends(get_scheduling_service)
+):
+    """
+    Get dead-lettered content
+    
+    Lists content that exhausted its publishing retries, with the error of
+    the last attempt, and content parked in needs_reauth because the
+    founder's Twitter credentials were missing or expired.
+    """
+    try:
+        items = await service.get_dead_letter_content(current_user.id, limit)
+        
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "items": [item.model_dump(mode="json") for item in items],
+                "total_count": len(items)
+            }
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to get dead-letter content: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve dead-letter content"
+        )
+
+@router.post("/dead-letter/redrive")
+async def redrive_dead_letter_content(
+    redrive_request: DeadLetterRedriveRequest,
+    current_user: User = Depends(get_current_user),
+    service: SchedulingPostingService = Depends(get_scheduling_service)
+):
+    """
+    Re-drive dead-lettered content
+    
+    Puts the given dead-lettered items (or all of them) back in the
+    publishing queue with a fresh retry budget. Re-drive needs_reauth items
+    after the founder has reconnected Twitter.
+    """
+    try:
+        result = await service.redrive_dead_letter_content(current_user.id, redrive_request)
+        
+        logger.info(f"Re-drove {result.redriven_count} dead-lettered items for user {current_user.id}")
+        
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=result.model_dump(mode="json")
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to re-drive dead-letter content: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to re-drive dead-letter content"
+        )
+
 @router.get("/health")
 async def health_check():
     """
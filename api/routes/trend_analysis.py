@@ -13,7 +13,8 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
 from fastapi.responses import JSONResponse
 
 from database import get_data_flow_manager, DataFlowManager, get_db_session
-from api.middleware import get_current_user, User
+from api.middleware import get_current_user, get_trend_ingestion_service, User
+from modules.trend_analysis.ingestion import match_trends_by_keywords
 from modules.trend_analysis.repository import TrendAnalysisRepository
 from modules.twitter_api import TwitterAPIClient
 from modules.user_profile import UserProfileService
@@ -78,20 +79,13 @@ async def fetch_and_store_trending_topics(
         # 1. 获取Twitter凭证
         credentials = await get_twitter_credentials(current_user)
         
-        # 2. 初始化Twitter客户端
-        twitter_client = TwitterAPIClient(
-            client_id=os.getenv('TWITTER_CLIENT_ID'),
-            client_secret=os.getenv('TWITTER_CLIENT_SECRET')
-        )
-        
-        # 3. 从Twitter获取trending topics（优先使用个性化趋势）
-        logger.info(f"Fetching personalized trending topics (fallback location: {location_id})")
-        raw_trends = twitter_client.get_trends(
-            user_token=credentials.access_token, 
-            location_id=location_id, 
-            prefer_personalized=True,
-            max_results=max_topics
-        )
+        # 2. 读取共享的地区trend快照（每个地区每个窗口只抓取一次），个性化趋势仅在开启时按用户抓取
+        ingestion = get_trend_ingestion_service()
+        snapshot = None
+        raw_trends = await ingestion.get_personalized_trends(credentials.access_token, max_topics)
+        if not raw_trends:
+            snapshot = await ingestion.get_snapshot(location_id, current_user.id, credentials.access_token)
+            raw_trends = snapshot.trends
         
         if not raw_trends:
             return JSONResponse(
@@ -102,7 +96,7 @@ async def fetch_and_store_trending_topics(
                 }
             )
         
-        # 4. 获取数据库中的keywords (如果没有提供的话)
+        # 3. 获取数据库中的keywords (如果没有提供的话)
         if not keywords:
             # 从数据库获取用户的keywords或者系统默认keywords
             try:
@@ -113,7 +107,7 @@ async def fetch_and_store_trending_topics(
                 logger.warning(f"Failed to get keywords from database: {e}")
                 keywords = ["AI", "technology", "innovation"]
         
-        # 5. 使用LLM匹配相关topics
+        # 4. 使用LLM匹配相关topics
         matched_topics = []
         try:
             from modules.trend_analysis.llm_matcher import create_llm_trend_matcher
@@ -153,38 +147,9 @@ async def fetch_and_store_trending_topics(
             logger.warning(f"LLM matching failed, using traditional matching: {e}")
             
             # 传统关键词匹配作为fallback
-            for trend in raw_trends:
-                trend_name = trend.get('name', '').lower()
-                trend_url = trend.get('url', '').lower()
-                
-                matching_keywords = []
-                matching_reasons = []
-                
-                for keyword in keywords:
-                    keyword_lower = keyword.lower()
-                    if (keyword_lower in trend_name or 
-                        keyword_lower in trend_url or
-                        trend_name in keyword_lower):
-                        matching_keywords.append(keyword)
-                        matching_reasons.append(f"关键词 '{keyword}' 在话题名称中匹配")
-                
-                if matching_keywords:
-                    matched_topics.append({
-                        "topic_name": trend.get('name', ''),
-                        "tweet_volume": trend.get('tweet_volume', 0),
-                        "url": trend.get('url', ''),
-                        "matching_keywords": matching_keywords,
-                        "matching_reasons": matching_reasons,
-                        "relevance_score": 0.6,  # 传统匹配的默认分数
-                        "confidence_score": 0.6,
-                        "location_id": location_id,
-                        "source": "twitter_traditional_matched"
-                    })
-                
-                if len(matched_topics) >= max_topics:
-                    break
+            matched_topics = match_trends_by_keywords(raw_trends, keywords, max_topics, location_id)
         
-        # 6. 存储匹配的topics到数据库
+        # 5. 存储匹配的topics到数据库
         stored_topics = []
         for topic_data in matched_topics:
             try:
@@ -228,6 +193,7 @@ async def fetch_and_store_trending_topics(
                 "stored_topics": len(stored_topics),
                 "keywords_used": keywords,
                 "location_id": location_id,
+                "trends_fetched_at": snapshot.fetched_at.isoformat() if snapshot else None,
                 "topics": stored_topics
             }
         )
@@ -630,6 +596,11 @@ async def get_trending_status(
             user_id=current_user.id
         )
         
+        try:
+            ingestion_status = get_trend_ingestion_service().status()
+        except ValueError:
+            ingestion_status = None
+        
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
@@ -644,6 +615,7 @@ async def get_trending_status(
                     }
                     for topic in sample_topics
                 ],
+                "trend_snapshots": ingestion_status,
                 "last_updated": datetime.now().isoformat()
             }
         )
@@ -6,11 +6,11 @@ handling tweet operations, user interactions and rate limits.
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
 from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 import logging
-import os
 
 from database import get_data_flow_manager, DataFlowManager
-from api.middleware import get_current_user, User
+from api.middleware import get_current_user, User, get_twitter_client as get_shared_twitter_client
 
 from modules.twitter_api import TwitterAPIClient
 from modules.twitter_api.models import (
@@ -29,24 +29,16 @@ async def get_twitter_client(
 ) -> TwitterAPIClient:
     """Get Twitter client for current user"""
     try:
-        client_id = os.getenv('TWITTER_CLIENT_ID')
-        client_secret = os.getenv('TWITTER_CLIENT_SECRET')
-        if not client_id or not client_secret:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Twitter API credentials not configured"
-            )
         # 检查用户是否有Twitter访问令牌
         if not hasattr(current_user, 'access_token') or not current_user.access_token:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User has not authorized Twitter access. Please complete Twitter OAuth flow first."
             )
-        logger.info(f"Creating Twitter client for user: {current_user.id}")
-        return TwitterAPIClient(
-            client_id=client_id,
-            client_secret=client_secret
-        )
+        # 共用进程级的限流器、响应缓存和熔断器，/rate-limits 才能反映真实状态
+        return get_shared_twitter_client()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to create Twitter client: {e}")
         raise HTTPException(
@@ -354,15 +346,17 @@ async def get_rate_limits(
     current_user: User = Depends(get_current_user),
     twitter_client: TwitterAPIClient = Depends(get_twitter_client)
 ):
-    """Get Twitter API rate limits"""
+    """Get Twitter API rate limits, response cache counters and circuit breaker states"""
     try:
-        limits = await twitter_client.get_rate_limits()
+        limits = twitter_client.get_rate_limit_status(current_user.access_token)
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={
+            content=jsonable_encoder({
                 "message": "Rate limits retrieved successfully",
-                "limits": limits
-            }
+                "limits": limits,
+                "cache": twitter_client.response_cache.stats(),
+                "circuit_breakers": twitter_client.circuit_breaker.status()
+            })
         )
     except Exception as e:
         logger.error(f"Failed to get rate limits: {e}")
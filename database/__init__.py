@@ -13,7 +13,8 @@ from .repositories.content_repository import ContentRepository
 from .dataflow_manager import DataFlowManager
 from .models import (
     Base, Founder, Product, AnalyzedTrend, TwitterCredential, 
-    TrackedTrendRaw, AutomationRule, PostAnalytic, GeneratedContentDraft
+    TrackedTrendRaw, AutomationRule, PostAnalytic, GeneratedContentDraft,
+    ContentSignature, PublishingDailyRollup
 )
 
 # 移除循环导入 - UserProfileTable 在 user_profile.repository 中定义
@@ -184,6 +185,8 @@ __all__ = [
     'AutomationRule',
     'PostAnalytic',
     'GeneratedContentDraft',
+    'ContentSignature',
+    'PublishingDailyRollup',
     'init_database',
     'get_db_context',
     'get_db_session',
@@ -1,5 +1,5 @@
 from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 import logging
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, text
@@ -25,6 +25,101 @@ logger = logging.getLogger(__name__)
 
 UTC = timezone.utc
 
+# Statuses the publisher picks up once scheduled_post_time has passed
+PUBLISHABLE_STATUSES = ('scheduled', 'retry_pending')
+
+# Drafts that exhausted their publishing retries; only an explicit re-drive requeues them
+DEAD_LETTER_STATUS = 'dead_letter'
+
+# Drafts whose founder must reconnect Twitter; parked like dead letters, without spending a retry
+NEEDS_REAUTH_STATUS = 'needs_reauth'
+
+# Parked statuses listed and re-queued by the dead-letter endpoints
+REDRIVABLE_STATUSES = (DEAD_LETTER_STATUS, NEEDS_REAUTH_STATUS)
+
+# Draft columns holding scheduling timestamps, stored as naive UTC
+SCHEDULING_TIME_FIELDS = ('scheduled_post_time', 'posted_at')
+
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC; naive values are assumed to be UTC already"""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+# Statuses counted as failures in publishing_daily_rollup
+ROLLUP_FAILED_STATUSES = ('failed', 'error', DEAD_LETTER_STATUS)
+
+# Counter columns of publishing_daily_rollup
+ROLLUP_COUNTERS = (
+    'scheduled_count', 'posted_count', 'failed_count', 'retried_count',
+    'delay_seconds_sum', 'delay_count'
+)
+
+# Drafts still waiting in the publishing queue
+QUEUED_STATUSES = PUBLISHABLE_STATUSES + ('publishing',)
+
+# Characters of draft text returned as a publishing history preview
+HISTORY_PREVIEW_LENGTH = 100
+
+
+def encode_history_cursor(posted_at: datetime, draft_id: Any) -> str:
+    """Encode a publishing history position as an opaque (posted_at, id) cursor token"""
+    raw = f"{posted_at.isoformat()}|{draft_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor token from encode_history_cursor; raises ValueError when malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        posted_at, draft_id = raw.split('|', 1)
+        return datetime.fromisoformat(posted_at), str(uuid.UUID(draft_id))
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid history cursor: {cursor}") from e
+
+
+def _rollup_deltas(old_status: Optional[str], new_status: Optional[str],
+                   scheduled_time: Optional[datetime], posted_at: Optional[datetime],
+                   now: datetime) -> List[Tuple[date, Dict[str, float]]]:
+    """
+    Map one draft status transition to (day, counter deltas) for publishing_daily_rollup.
+
+    Scheduling counts on the day of the slot and posting on the day it went
+    out, so rows rebuilt by backfill_publishing_rollup match incremental
+    ones. Retries and failures count on the day they happen. Cancelling a
+    queued draft takes back its scheduled count.
+    """
+    if old_status == new_status:
+        return []
+
+    if new_status == 'scheduled':
+        if old_status in ROLLUP_FAILED_STATUSES or old_status in ('retry_pending', NEEDS_REAUTH_STATUS):
+            return [(now.date(), {'retried_count': 1})]
+        return [((scheduled_time or now).date(), {'scheduled_count': 1})]
+
+    if new_status == 'retry_pending':
+        return [(now.date(), {'retried_count': 1})]
+
+    if new_status == 'posted':
+        posted_at = posted_at or now
+        counters = {'posted_count': 1}
+        if scheduled_time:
+            counters['delay_seconds_sum'] = max((posted_at - scheduled_time).total_seconds(), 0.0)
+            counters['delay_count'] = 1
+        return [(posted_at.date(), counters)]
+
+    if new_status in ROLLUP_FAILED_STATUSES:
+        if old_status in ROLLUP_FAILED_STATUSES:
+            return []
+        return [(now.date(), {'failed_count': 1})]
+
+    if new_status in ('approved', 'cancelled') and old_status in QUEUED_STATUSES and scheduled_time:
+        return [(scheduled_time.date(), {'scheduled_count': -1})]
+
+    return []
+
 class DataFlowManager:
     """
     Manages data flow between modules according to DFD specifications
@@ -617,6 +712,12 @@ class DataFlowManager:
             True if successful, False otherwise
         """
         try:
+            draft = self.content_repo.get_by_id(draft_id)
+            if draft:
+                # Flushed by the status update's commit
+                self._record_status_transition(draft, draft.status, 'posted',
+                                               posted_at=_to_naive_utc(posted_at))
+            
             success = self.content_repo.update_status(
                 draft_id,
                 status='posted',
@@ -651,6 +752,7 @@ class DataFlowManager:
         try:
             draft = self.content_repo.get_by_id(draft_id)
             if draft:
+                self._record_status_transition(draft, draft.status, 'error')
                 draft.status = 'error'
                 if not draft.ai_generation_metadata:
                     draft.ai_generation_metadata = {}
@@ -663,6 +765,7 @@ class DataFlowManager:
             return False
         except Exception as e:
             logger.error(f"Failed to record publication error: {e}")
+            self.db_session.rollback()
             return False
     # ====================
     # Automation Rules Flow
@@ -1391,6 +1494,22 @@ class DataFlowManager:
             logger.error(f"Failed to get founder settings: {e}")
             return None
     
+    def get_auto_schedule_founder_ids(self) -> List[str]:
+        """Get IDs of founders whose scheduling preferences enable auto-scheduling"""
+        try:
+            rows = self.db_session.query(Founder.id, Founder.settings).filter(
+                Founder.settings.isnot(None)
+            ).all()
+            
+            return [
+                str(founder_id) for founder_id, settings in rows
+                if isinstance(settings, dict)
+                and (settings.get('scheduling_preferences') or {}).get('auto_schedule_enabled')
+            ]
+        except Exception as e:
+            logger.error(f"Failed to get auto-schedule founders: {e}")
+            return []
+    
     def add_to_scheduling_queue(self, queue_data: Dict[str, Any]) -> bool:
         """Add content to scheduling queue"""
         try:
@@ -1448,19 +1567,29 @@ class DataFlowManager:
         """
         try:
             content_draft_id = scheduled_content_data['content_draft_id']
+            scheduled_time = _to_naive_utc(scheduled_content_data['scheduled_time'])
+            
+            draft = self.content_repo.get_by_id(content_draft_id)
+            if draft:
+                # Flushed by the update's commit below
+                self._record_status_transition(
+                    draft, draft.status, 'scheduled', scheduled_time=scheduled_time,
+                    platform=scheduled_content_data.get('platform', 'twitter')
+                )
             
             # Update the content draft with scheduling information
             # This replaces the old separate scheduled_content table
             success = self.content_repo.update(
                 content_draft_id,
                 status='scheduled',
-                scheduled_post_time=scheduled_content_data['scheduled_time'],
+                scheduled_post_time=scheduled_time,
                 platform=scheduled_content_data.get('platform', 'twitter'),
                 priority=scheduled_content_data.get('priority', 5),
                 retry_count=scheduled_content_data.get('retry_count', 0),
                 max_retries=scheduled_content_data.get('max_retries', 3),
                 tags=scheduled_content_data.get('tags', []),
-                created_by=scheduled_content_data.get('created_by')
+                created_by=scheduled_content_data.get('created_by'),
+                batch_job_id=scheduled_content_data.get('batch_job_id')
             )
             
             if success:
@@ -1471,6 +1600,7 @@ class DataFlowManager:
             
         except Exception as e:
             logger.error(f"Failed to schedule content: {e}")
+            self.db_session.rollback()
             return None
     
     def get_content_drafts_by_status(self, founder_id: str, status_list: List[str], 
@@ -1523,13 +1653,24 @@ class DataFlowManager:
                 logger.error(f"Content draft not found: {content_id}")
                 return False
             
+            old_status = draft.status
+            old_scheduled_time = draft.scheduled_post_time
+            
             # Update fields
             for field, value in updates.items():
                 if hasattr(draft, field):
+                    if field in SCHEDULING_TIME_FIELDS:
+                        value = _to_naive_utc(value)
                     setattr(draft, field, value)
             
             # Always update the updated_at timestamp
-            draft.updated_at = datetime.now(UTC)
+            draft.updated_at = datetime.utcnow()
+            
+            self._record_status_transition(
+                draft, old_status, draft.status,
+                scheduled_time=draft.scheduled_post_time if draft.status == 'scheduled' else old_scheduled_time,
+                posted_at=draft.posted_at
+            )
             
             self.db_session.commit()
             logger.info(f"Content draft updated: {content_id}")
@@ -1573,11 +1714,7 @@ class DataFlowManager:
         Note: scheduled_content table removed. This now updates the GeneratedContentDraft
         table directly since scheduled_id is the same as content_draft_id.
         """
-        try:
-            return self.content_repo.update(scheduled_id, **updates) is not None
-        except Exception as e:
-            logger.error(f"Failed to update scheduled content {scheduled_id}: {e}")
-            return False
+        return self.update_content_draft(scheduled_id, updates)
 
     def create_content_draft(self, draft_data: Dict[str, Any]) -> Optional[str]:
         """Create a new content draft - wrapper for store_generated_content_draft"""
@@ -1852,132 +1989,796 @@ class DataFlowManager:
             logger.error(f"Failed to get recent posts: {e}")
             return []
 
-    def get_ready_for_publishing(self, limit: int = 50) -> List[Any]:
-        """Get content ready for publishing (scheduled content that is due)"""
+    def get_ready_for_publishing(self, limit: int = 50, now: Optional[datetime] = None) -> List[Any]:
+        """Get content ready for publishing (scheduled or retry-pending content that is due)
+
+        Filtering, ordering and the limit are all applied in SQL and served by
+        ``idx_content_drafts_due``, so a tick only touches due rows instead of
+        the whole queue. Stored times are naive UTC (see ``_to_naive_utc``).
+        """
         try:
             from modules.scheduling_posting.models import ContentQueueItem
             
-            current_time = datetime.utcnow()
-            logger.info(f"Checking for content due before: {current_time}")
+            current_time = _to_naive_utc(now) if now else datetime.utcnow()
             
-            # Get all scheduled content first, then filter in Python due to SQLite datetime issues
-            all_scheduled = self.db_session.query(GeneratedContentDraft).filter(
-                GeneratedContentDraft.status == 'scheduled'
-            ).all()
+            due_rows = self.db_session.query(
+                GeneratedContentDraft.id,
+                GeneratedContentDraft.founder_id,
+                GeneratedContentDraft.scheduled_post_time,
+                GeneratedContentDraft.priority,
+                GeneratedContentDraft.status,
+                GeneratedContentDraft.platform,
+                GeneratedContentDraft.retry_count
+            ).filter(
+                GeneratedContentDraft.status.in_(PUBLISHABLE_STATUSES),
+                GeneratedContentDraft.scheduled_post_time <= current_time
+            ).order_by(
+                GeneratedContentDraft.priority.desc(),
+                GeneratedContentDraft.scheduled_post_time.asc()
+            ).limit(limit).all()
+            
+            queue_items = [
+                ContentQueueItem(
+                    id=str(row.id),
+                    content_draft_id=str(row.id),
+                    founder_id=str(row.founder_id),
+                    scheduled_time=row.scheduled_post_time,
+                    priority=row.priority if row.priority is not None else 5,
+                    status=row.status,
+                    platform=row.platform or 'twitter',
+                    retry_count=row.retry_count or 0
+                )
+                for row in due_rows
+            ]
             
-            logger.info(f"Found {len(all_scheduled)} total scheduled content items")
+            logger.debug(f"Found {len(queue_items)} items ready for publishing")
+            return queue_items
             
-            # Filter due content in Python to handle datetime comparison properly
-            due_content = []
-            for content in all_scheduled:
+        except Exception as e:
+            logger.error(f"Failed to get ready for publishing: {e}")
+            return []
+
+    def get_batch_job_items(self, job_id: str, founder_id: Optional[str] = None) -> List[Any]:
+        """Get the progress columns of every draft queued by a batch publishing job"""
+        try:
+            query = self.db_session.query(
+                GeneratedContentDraft.id,
+                GeneratedContentDraft.status,
+                GeneratedContentDraft.scheduled_post_time,
+                GeneratedContentDraft.posted_at,
+                GeneratedContentDraft.posted_tweet_id,
+                GeneratedContentDraft.error_message,
+                GeneratedContentDraft.retry_count
+            ).filter(GeneratedContentDraft.batch_job_id == job_id)
+            
+            if founder_id:
+                query = query.filter(GeneratedContentDraft.founder_id == founder_id)
+            
+            return query.order_by(GeneratedContentDraft.scheduled_post_time.asc()).all()
+            
+        except Exception as e:
+            logger.error(f"Failed to get batch job items for {job_id}: {e}")
+            return []
+
+    def get_dead_letter_content(self, founder_id: str, limit: int = 100) -> List[GeneratedContentDraft]:
+        """Get a founder's dead-lettered and needs-reauth drafts, most recently parked first"""
+        try:
+            return self.db_session.query(GeneratedContentDraft).filter(
+                GeneratedContentDraft.founder_id == founder_id,
+                GeneratedContentDraft.status.in_(REDRIVABLE_STATUSES)
+            ).order_by(GeneratedContentDraft.updated_at.desc()).limit(limit).all()
+
+        except Exception as e:
+            logger.error(f"Failed to get dead-letter content for {founder_id}: {e}")
+            return []
+
+    def redrive_dead_letter_content(self, founder_id: str, content_ids: Optional[List[str]] = None,
+                                    scheduled_time: Optional[datetime] = None) -> List[str]:
+        """
+        Put dead-lettered drafts back in the publishing queue with a fresh retry budget.
+
+        All of the founder's dead-lettered drafts are re-driven when content_ids
+        is omitted. Drafts parked in 'needs_reauth' are re-driven the same way
+        once the founder has reconnected Twitter. One UPDATE covers every
+        draft; only drafts still parked are touched, so concurrent re-drives
+        cannot double-queue.
+
+        Returns:
+            IDs of the re-driven drafts
+        """
+        try:
+            scheduled_time = _to_naive_utc(scheduled_time) or datetime.utcnow()
+            filters = [
+                GeneratedContentDraft.founder_id == founder_id,
+                GeneratedContentDraft.status.in_(REDRIVABLE_STATUSES)
+            ]
+            if content_ids is not None:
+                valid_ids = []
+                for content_id in content_ids:
+                    try:
+                        valid_ids.append(str(uuid.UUID(str(content_id))))
+                    except (ValueError, TypeError):
+                        logger.warning(f"Invalid UUID format: {content_id}")
+                if not valid_ids:
+                    return []
+                filters.append(GeneratedContentDraft.id.in_(valid_ids))
+
+            rows = self.db_session.query(
+                GeneratedContentDraft.id, GeneratedContentDraft.platform, GeneratedContentDraft.status
+            ).filter(*filters).all()
+            draft_ids = [str(row.id) for row in rows]
+            if not draft_ids:
+                return []
+
+            self.db_session.query(GeneratedContentDraft).filter(
+                GeneratedContentDraft.id.in_(draft_ids),
+                GeneratedContentDraft.status.in_(REDRIVABLE_STATUSES)
+            ).update({
+                GeneratedContentDraft.status: 'scheduled',
+                GeneratedContentDraft.scheduled_post_time: scheduled_time,
+                GeneratedContentDraft.retry_count: 0,
+                GeneratedContentDraft.error_message: None,
+                GeneratedContentDraft.error_code: None,
+                GeneratedContentDraft.updated_at: datetime.utcnow()
+            }, synchronize_session=False)
+            now = datetime.utcnow()
+            self._apply_publishing_rollup([
+                (founder_id, row.platform, day, counters)
+                for row in rows
+                for day, counters in _rollup_deltas(row.status, 'scheduled', scheduled_time, None, now)
+            ])
+            self.db_session.commit()
+
+            logger.info(f"Re-drove {len(draft_ids)} dead-lettered drafts for {founder_id}")
+            return draft_ids
+
+        except Exception as e:
+            logger.error(f"Failed to re-drive dead-letter content for {founder_id}: {e}")
+            self.db_session.rollback()
+            return []
+
+    def get_content_drafts_by_ids(self, content_ids: List[str]) -> Dict[str, Any]:
+        """Load several content drafts in one query, keyed by draft ID (malformed IDs are skipped)"""
+        try:
+            valid_ids = []
+            for content_id in content_ids:
                 try:
-                    logger.info(f"Processing content {content.id}:")
-                    logger.info(f"  Raw scheduled_post_time: {content.scheduled_post_time} (type: {type(content.scheduled_post_time)})")
-                    
-                    # Handle both datetime objects and string representations
-                    if isinstance(content.scheduled_post_time, str):
-                        # Parse string to datetime
-                        try:
-                            from dateutil import parser
-                            scheduled_dt = parser.parse(content.scheduled_post_time)
-                            logger.info(f"  Parsed string to datetime: {scheduled_dt}")
-                        except ImportError:
-                            # Fallback to manual parsing if dateutil not available
-                            import datetime as dt_module
-                            # Try common formats
-                            for fmt in ['%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S']:
-                                try:
-                                    scheduled_dt = dt_module.datetime.strptime(content.scheduled_post_time, fmt)
-                                    logger.info(f"  Parsed with format {fmt}: {scheduled_dt}")
-                                    break
-                                except ValueError:
-                                    continue
-                            else:
-                                logger.error(f"  Could not parse datetime string: {content.scheduled_post_time}")
-                                continue
-                    else:
-                        scheduled_dt = content.scheduled_post_time
-                        logger.info(f"  Using datetime object: {scheduled_dt}")
-                    
-                    # Remove timezone info for comparison if present
-                    if scheduled_dt.tzinfo is not None:
-                        scheduled_dt = scheduled_dt.replace(tzinfo=None)
-                        logger.info(f"  Removed timezone: {scheduled_dt}")
-                    
-                    logger.info(f"  Current time: {current_time}")
-                    logger.info(f"  Comparison: {scheduled_dt} <= {current_time} = {scheduled_dt <= current_time}")
-                    
-                    if scheduled_dt <= current_time:
-                        due_content.append(content)
-                        logger.info(f"✅ Content {content.id} is due: {scheduled_dt} <= {current_time}")
-                    else:
-                        logger.info(f"❌ Content {content.id} not due yet: {scheduled_dt} > {current_time}")
-                        time_diff = (scheduled_dt - current_time).total_seconds()
-                        logger.info(f"  Time until due: {time_diff:.2f} seconds")
-                        
-                except Exception as parse_error:
-                    logger.warning(f"Failed to parse scheduled_post_time for content {content.id}: {parse_error}")
-                    import traceback
-                    logger.warning(f"Stack trace: {traceback.format_exc()}")
-                    continue
+                    valid_ids.append(str(uuid.UUID(str(content_id))))
+                except (ValueError, TypeError):
+                    logger.warning(f"Invalid UUID format: {content_id}")
+
+            if not valid_ids:
+                return {}
+
+            drafts = self.db_session.query(GeneratedContentDraft).filter(
+                GeneratedContentDraft.id.in_(valid_ids)
+            ).all()
+
+            return {str(draft.id): draft for draft in drafts}
+
+        except Exception as e:
+            logger.error(f"Failed to get content drafts by IDs: {e}")
+            return {}
+
+    def get_schedule_timestamps(self, user_id: str, start_time: datetime, end_time: datetime,
+                                exclude_content_id: Optional[str] = None) -> List[datetime]:
+        """
+        Get a founder's publish times within [start_time, end_time], sorted.
+
+        Posted drafts contribute posted_at; drafts still in the publishing
+        queue contribute scheduled_post_time. Used to build the rules engine's
+        in-memory schedule snapshot with a single query. exclude_content_id
+        leaves out the draft being (re)validated so it does not collide with
+        its own slot.
+        """
+        try:
+            from sqlalchemy import case
+
+            publish_time = case(
+                (GeneratedContentDraft.status == 'posted', GeneratedContentDraft.posted_at),
+                else_=GeneratedContentDraft.scheduled_post_time
+            )
+
+            query = self.db_session.query(publish_time.label('publish_time')).filter(
+                GeneratedContentDraft.founder_id == user_id,
+                GeneratedContentDraft.status.in_(('posted',) + QUEUED_STATUSES),
+                publish_time >= _to_naive_utc(start_time),
+                publish_time <= _to_naive_utc(end_time)
+            )
+            if exclude_content_id:
+                try:
+                    query = query.filter(GeneratedContentDraft.id != str(uuid.UUID(str(exclude_content_id))))
+                except ValueError:
+                    logger.warning(f"Invalid UUID format: {exclude_content_id}")
+
+            rows = query.order_by(publish_time.asc()).all()
+
+            return [row.publish_time for row in rows]
+
+        except Exception as e:
+            logger.error(f"Failed to get schedule timestamps for {user_id}: {e}")
+            return []
+
+    def bulk_schedule_content(self, entries: List[Dict[str, Any]]) -> List[str]:
+        """
+        Schedule several approved drafts in one transaction.
+
+        Each entry carries the same keys as ``create_scheduled_content``. All
+        rows are written with a single executemany UPDATE and one commit; a row
+        is only updated while it is still 'approved', so drafts changed by a
+        concurrent request are left alone and omitted from the returned IDs.
+        """
+        if not entries:
+            return []
+
+        try:
+            from sqlalchemy import bindparam
+
+            table = GeneratedContentDraft.__table__
+
+            statement = table.update().where(
+                table.c.id == bindparam('b_id'),
+                table.c.status == 'approved'
+            ).values(
+                status='scheduled',
+                scheduled_post_time=bindparam('b_scheduled_post_time'),
+                platform=bindparam('b_platform'),
+                priority=bindparam('b_priority'),
+                retry_count=bindparam('b_retry_count'),
+                max_retries=bindparam('b_max_retries'),
+                tags=bindparam('b_tags'),
+                created_by=bindparam('b_created_by'),
+                batch_job_id=bindparam('b_batch_job_id')
+            )
+
+            params = [
+                {
+                    'b_id': str(entry['content_draft_id']),
+                    'b_scheduled_post_time': _to_naive_utc(entry['scheduled_time']),
+                    'b_platform': entry.get('platform', 'twitter'),
+                    'b_priority': entry.get('priority', 5),
+                    'b_retry_count': entry.get('retry_count', 0),
+                    'b_max_retries': entry.get('max_retries', 3),
+                    'b_tags': entry.get('tags', []),
+                    'b_created_by': entry.get('created_by'),
+                    'b_batch_job_id': entry.get('batch_job_id')
+                }
+                for entry in entries
+            ]
+
+            self.db_session.execute(statement, params)
+
+            requested_ids = [param['b_id'] for param in params]
+            unchanged_ids = {
+                str(row.id) for row in self.db_session.query(GeneratedContentDraft.id).filter(
+                    GeneratedContentDraft.id.in_(requested_ids),
+                    GeneratedContentDraft.status == 'approved'
+                )
+            }
+            scheduled_ids = [draft_id for draft_id in requested_ids if draft_id not in unchanged_ids]
+
+            scheduled_set = set(scheduled_ids)
+            now = datetime.utcnow()
+            self._apply_publishing_rollup([
+                (entry['founder_id'], param['b_platform'], day, counters)
+                for entry, param in zip(entries, params)
+                if param['b_id'] in scheduled_set
+                for day, counters in _rollup_deltas('approved', 'scheduled',
+                                                    param['b_scheduled_post_time'], None, now)
+            ])
+            self.db_session.commit()
+
+            logger.info(f"Bulk scheduled {len(scheduled_ids)} of {len(entries)} content drafts")
+            return scheduled_ids
+
+        except Exception as e:
+            logger.error(f"Failed to bulk schedule content: {e}")
+            self.db_session.rollback()
+            return []
+
+    def claim_due_content(self, worker_id: str, limit: int = 50, lease_seconds: int = 300,
+                          now: Optional[datetime] = None,
+                          per_founder_limit: Optional[int] = None) -> List[Any]:
+        """
+        Atomically claim due content for one publisher worker.
+        
+        Claimable rows are due scheduled/retry_pending drafts plus 'publishing'
+        drafts whose lease has expired (their worker died mid-publish). Claimed
+        rows move to 'publishing' with this worker's lease. The conditional
+        UPDATE re-checks claimability, so when several workers race for the same
+        candidates each row is claimed by exactly one of them; on PostgreSQL the
+        candidate SELECT also uses FOR UPDATE SKIP LOCKED so workers don't block
+        on each other's rows.
+        
+        per_founder_limit caps how many items one founder contributes to a
+        batch, so a founder with a large backlog cannot fill every claim.
+        """
+        try:
+            from modules.scheduling_posting.models import ContentQueueItem
             
-            # Sort by priority and scheduled time
-            due_content.sort(key=lambda x: (
-                -(x.priority if x.priority is not None else 5),  # Higher priority first
-                x.scheduled_post_time  # Earlier time first
-            ))
+            current_time = _to_naive_utc(now) if now else datetime.utcnow()
+            lease_expires_at = current_time + timedelta(seconds=lease_seconds)
             
-            # Limit results
-            due_content = due_content[:limit]
+            claimable = or_(
+                and_(
+                    GeneratedContentDraft.status.in_(PUBLISHABLE_STATUSES),
+                    GeneratedContentDraft.scheduled_post_time <= current_time
+                ),
+                and_(
+                    GeneratedContentDraft.status == 'publishing',
+                    GeneratedContentDraft.lease_expires_at < current_time
+                )
+            )
             
-            logger.info(f"Found {len(due_content)} due content items after filtering")
+            candidate_query = self.db_session.query(GeneratedContentDraft.id)
+            if per_founder_limit:
+                ranked = self.db_session.query(
+                    GeneratedContentDraft.id.label('id'),
+                    func.row_number().over(
+                        partition_by=GeneratedContentDraft.founder_id,
+                        order_by=(
+                            GeneratedContentDraft.priority.desc(),
+                            GeneratedContentDraft.scheduled_post_time.asc()
+                        )
+                    ).label('founder_rank')
+                ).filter(claimable).subquery()
+                candidate_query = candidate_query.join(
+                    ranked, ranked.c.id == GeneratedContentDraft.id
+                ).filter(ranked.c.founder_rank <= per_founder_limit)
+            else:
+                candidate_query = candidate_query.filter(claimable)
+            
+            candidate_ids = [
+                row.id for row in candidate_query.order_by(
+                    GeneratedContentDraft.priority.desc(),
+                    GeneratedContentDraft.scheduled_post_time.asc()
+                ).limit(limit).with_for_update(
+                    of=GeneratedContentDraft, skip_locked=True
+                ).all()
+            ]
             
-            # Convert to ContentQueueItem objects
-            queue_items = []
-            for content in due_content:
-                try:
-                    queue_item = ContentQueueItem(
-                        id=str(content.id),
-                        content_draft_id=str(content.id),
-                        founder_id=str(content.founder_id),
-                        scheduled_time=content.scheduled_post_time,
-                        priority=content.priority if content.priority is not None else 5,
-                        status=content.status,
-                        platform=content.platform if content.platform else 'twitter',
-                        retry_count=content.retry_count if content.retry_count is not None else 0
-                    )
-                    queue_items.append(queue_item)
-                    logger.info(f"Successfully converted content {content.id} to queue item")
-                except Exception as item_error:
-                    logger.warning(f"Failed to convert scheduled content {content.id} to queue item: {item_error}")
-                    continue
+            if not candidate_ids:
+                self.db_session.rollback()
+                return []
+            
+            self.db_session.query(GeneratedContentDraft).filter(
+                GeneratedContentDraft.id.in_(candidate_ids),
+                claimable
+            ).update({
+                GeneratedContentDraft.status: 'publishing',
+                GeneratedContentDraft.lease_owner: worker_id,
+                GeneratedContentDraft.lease_expires_at: lease_expires_at
+            }, synchronize_session=False)
+            self.db_session.commit()
             
-            logger.info(f"Found {len(queue_items)} items ready for publishing")
+            claimed_rows = self.db_session.query(
+                GeneratedContentDraft.id,
+                GeneratedContentDraft.founder_id,
+                GeneratedContentDraft.scheduled_post_time,
+                GeneratedContentDraft.priority,
+                GeneratedContentDraft.platform,
+                GeneratedContentDraft.retry_count
+            ).filter(
+                GeneratedContentDraft.id.in_(candidate_ids),
+                GeneratedContentDraft.status == 'publishing',
+                GeneratedContentDraft.lease_owner == worker_id,
+                GeneratedContentDraft.lease_expires_at == lease_expires_at
+            ).order_by(
+                GeneratedContentDraft.priority.desc(),
+                GeneratedContentDraft.scheduled_post_time.asc()
+            ).all()
+            
+            queue_items = [
+                ContentQueueItem(
+                    id=str(row.id),
+                    content_draft_id=str(row.id),
+                    founder_id=str(row.founder_id),
+                    scheduled_time=row.scheduled_post_time,
+                    priority=row.priority if row.priority is not None else 5,
+                    status='publishing',
+                    platform=row.platform or 'twitter',
+                    retry_count=row.retry_count or 0,
+                    lock_acquired_at=current_time,
+                    lock_acquired_by=worker_id
+                )
+                for row in claimed_rows
+            ]
+            
+            logger.debug(f"Worker {worker_id} claimed {len(queue_items)} of {len(candidate_ids)} candidates")
             return queue_items
             
         except Exception as e:
-            logger.error(f"Failed to get ready for publishing: {e}")
-            import traceback
-            logger.error(f"Stack trace: {traceback.format_exc()}")
+            logger.error(f"Failed to claim due content for {worker_id}: {e}")
+            self.db_session.rollback()
             return []
 
-    def _calculate_similarity(self, text1: str, text2: str) -> float:
-        """Calculate text similarity (simple word overlap for now)"""
+    def get_upcoming_publish_times(self, limit: int = 500) -> List[Tuple[str, datetime]]:
+        """
+        Get (content_id, wake-up time) for the earliest publishable drafts, overdue ones included.
+        
+        Drafts held under a publishing lease are reported at their lease expiry,
+        when they become reclaimable.
+        """
         try:
-            words1 = set(text1.lower().split())
-            words2 = set(text2.lower().split())
+            scheduled_rows = self.db_session.query(
+                GeneratedContentDraft.id,
+                GeneratedContentDraft.scheduled_post_time
+            ).filter(
+                GeneratedContentDraft.status.in_(PUBLISHABLE_STATUSES),
+                GeneratedContentDraft.scheduled_post_time.isnot(None)
+            ).order_by(
+                GeneratedContentDraft.scheduled_post_time.asc()
+            ).limit(limit).all()
+            
+            leased_rows = self.db_session.query(
+                GeneratedContentDraft.id,
+                GeneratedContentDraft.lease_expires_at
+            ).filter(
+                GeneratedContentDraft.status == 'publishing',
+                GeneratedContentDraft.lease_expires_at.isnot(None)
+            ).order_by(
+                GeneratedContentDraft.lease_expires_at.asc()
+            ).limit(limit).all()
             
-            if not words1 or not words2:
-                return 0.0
+            upcoming = [(str(row_id), due_time) for row_id, due_time in scheduled_rows + leased_rows]
+            upcoming.sort(key=lambda item: item[1])
+            return upcoming[:limit]
             
-            intersection = words1.intersection(words2)
-            union = words1.union(words2)
+        except Exception as e:
+            logger.error(f"Failed to get upcoming publish times: {e}")
+            return []
+
+    def get_publishing_history(self, founder_id: str, limit: int = 20,
+                               cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get a page of a founder's posted content, newest first.
+
+        One query projects only the history columns, with the preview cut in
+        SQL, and pages by (posted_at, id) keyset on
+        ``idx_content_drafts_founder_posted``: deep pages cost the same as the
+        first. Pass the last item's ``cursor`` to get the next page.
+
+        Raises:
+            ValueError: If cursor is not a token from encode_history_cursor
+        """
+        position = decode_history_cursor(cursor) if cursor else None
+
+        try:
+            draft_text = func.coalesce(func.nullif(GeneratedContentDraft.edited_text, ''),
+                                       GeneratedContentDraft.generated_text)
+
+            query = self.db_session.query(
+                GeneratedContentDraft.id,
+                GeneratedContentDraft.scheduled_post_time,
+                GeneratedContentDraft.posted_at,
+                GeneratedContentDraft.status,
+                GeneratedContentDraft.posted_tweet_id,
+                GeneratedContentDraft.platform,
+                GeneratedContentDraft.error_message,
+                GeneratedContentDraft.retry_count,
+                GeneratedContentDraft.tags,
+                # One character past the preview tells whether the text was cut
+                func.substr(draft_text, 1, HISTORY_PREVIEW_LENGTH + 1).label('preview')
+            ).filter(
+                GeneratedContentDraft.founder_id == founder_id,
+                GeneratedContentDraft.status == 'posted',
+                GeneratedContentDraft.posted_at.isnot(None)
+            )
+
+            if position:
+                posted_at, draft_id = position
+                query = query.filter(or_(
+                    GeneratedContentDraft.posted_at < posted_at,
+                    and_(GeneratedContentDraft.posted_at == posted_at,
+                         GeneratedContentDraft.id < draft_id)
+                ))
+
+            rows = query.order_by(
+                GeneratedContentDraft.posted_at.desc(),
+                GeneratedContentDraft.id.desc()
+            ).limit(limit).all()
+
+            history = []
+            for row in rows:
+                preview = row.preview or ""
+                if len(preview) > HISTORY_PREVIEW_LENGTH:
+                    preview = preview[:HISTORY_PREVIEW_LENGTH] + "..."
+                history.append({
+                    'content_id': str(row.id),
+                    'content_preview': preview,
+                    'scheduled_time': row.scheduled_post_time or row.posted_at,
+                    'posted_at': row.posted_at,
+                    'status': row.status,
+                    'posted_tweet_id': row.posted_tweet_id,
+                    'platform': row.platform or 'twitter',
+                    'error_message': row.error_message,
+                    'retry_count': row.retry_count or 0,
+                    'tags': row.tags or [],
+                    'cursor': encode_history_cursor(row.posted_at, row.id)
+                })
+            return history
+
+        except Exception as e:
+            logger.error(f"Failed to get publishing history for {founder_id}: {e}")
+            return []
+
+    # ====================
+    # Publishing Analytics Rollups
+    # ====================
+
+    def _record_status_transition(self, draft: GeneratedContentDraft, old_status: Optional[str],
+                                  new_status: Optional[str], scheduled_time: Optional[datetime] = None,
+                                  posted_at: Optional[datetime] = None,
+                                  platform: Optional[str] = None) -> None:
+        """Add a draft's status change to the daily rollup inside the caller's transaction (no commit)"""
+        deltas = _rollup_deltas(
+            old_status, new_status,
+            scheduled_time if scheduled_time is not None else draft.scheduled_post_time,
+            posted_at, datetime.utcnow()
+        )
+        self._apply_publishing_rollup([
+            (draft.founder_id, platform or draft.platform, day, counters)
+            for day, counters in deltas
+        ])
+
+    def _apply_publishing_rollup(self, changes: List[Tuple[Any, Optional[str], date, Dict[str, float]]]) -> None:
+        """
+        Upsert (founder_id, platform, day, counter deltas) into publishing_daily_rollup.
+
+        Deltas for the same row are merged first, so a bulk transition issues
+        one statement per (founder, day, platform). Nothing is committed; the
+        caller commits together with the status change.
+        """
+        merged: Dict[Tuple[str, date, str], Dict[str, float]] = {}
+        for founder_id, platform, day, counters in changes:
+            key = (str(founder_id), day, platform or 'twitter')
+            totals = merged.setdefault(key, {})
+            for column, delta in counters.items():
+                totals[column] = totals.get(column, 0) + delta
+
+        if not merged:
+            return
+
+        dialect = self.db_session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+
+        table = PublishingDailyRollup.__table__
+        now = datetime.utcnow()
+
+        for (founder_id, day, platform), totals in merged.items():
+            if insert is None:
+                row = self.db_session.get(PublishingDailyRollup, (founder_id, day, platform))
+                if row is None:
+                    row = PublishingDailyRollup(founder_id=founder_id, day=day, platform=platform,
+                                                **{column: 0 for column in ROLLUP_COUNTERS})
+                    self.db_session.add(row)
+                for column, delta in totals.items():
+                    setattr(row, column, (getattr(row, column) or 0) + delta)
+                row.updated_at = now
+                continue
+
+            values = {column: totals.get(column, 0) for column in ROLLUP_COUNTERS}
+            statement = insert(table).values(
+                founder_id=founder_id, day=day, platform=platform, updated_at=now, **values
+            )
+            update_values = {column: table.c[column] + statement.excluded[column] for column in totals}
+            update_values['updated_at'] = statement.excluded.updated_at
+            self.db_session.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.founder_id, table.c.day, table.c.platform],
+                set_=update_values
+            ))
+
+    def get_publishing_analytics(self, founder_id: str, days: int = 30) -> Dict[str, Any]:
+        """
+        Sum a founder's daily publishing rollups over the last ``days`` days.
+
+        Reads at most ``days`` rows per platform from the rollup's primary key,
+        however long the founder's publishing history is.
+        """
+        try:
+            today = datetime.utcnow().date()
+            since = today - timedelta(days=max(days, 1) - 1)
+
+            rows = self.db_session.query(PublishingDailyRollup).filter(
+                PublishingDailyRollup.founder_id == founder_id,
+                PublishingDailyRollup.day >= since,
+                PublishingDailyRollup.day <= today
+            ).all()
+
+            analytics = {column: 0 for column in ROLLUP_COUNTERS}
+            platform_breakdown: Dict[str, int] = {}
+            for row in rows:
+                for column in ROLLUP_COUNTERS:
+                    analytics[column] += getattr(row, column) or 0
+                platform_breakdown[row.platform] = platform_breakdown.get(row.platform, 0) + (row.posted_count or 0)
+
+            return {
+                'total_scheduled': analytics['scheduled_count'],
+                'total_published': analytics['posted_count'],
+                'total_failed': analytics['failed_count'],
+                'total_retried': analytics['retried_count'],
+                'delay_seconds_sum': analytics['delay_seconds_sum'],
+                'delay_count': analytics['delay_count'],
+                'platform_breakdown': platform_breakdown or {'twitter': 0}
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to get publishing analytics for {founder_id}: {e}")
+            return {}
+
+    def get_queue_statistics(self, founder_id: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Count a founder's drafts still in the publishing queue.
+
+        Only queued statuses are read (``idx_content_drafts_founder_status``),
+        so posted and failed history does not add to the cost.
+        """
+        try:
+            from sqlalchemy import case
+
+            current_time = _to_naive_utc(now) if now else datetime.utcnow()
+            due_time = GeneratedContentDraft.scheduled_post_time
+
+            rows = self.db_session.query(
+                GeneratedContentDraft.status,
+                func.count().label('total'),
+                func.sum(case((and_(due_time > current_time,
+                                    due_time <= current_time + timedelta(hours=24)), 1), else_=0)).label('upcoming'),
+                func.sum(case((due_time < current_time - timedelta(minutes=5), 1), else_=0)).label('overdue')
+            ).filter(
+                GeneratedContentDraft.founder_id == founder_id,
+                GeneratedContentDraft.status.in_(QUEUED_STATUSES)
+            ).group_by(GeneratedContentDraft.status).all()
+
+            status_breakdown = {row.status: row.total for row in rows}
+            return {
+                'pending_count': sum(status_breakdown.values()),
+                'scheduled_count': status_breakdown.get('scheduled', 0),
+                'retry_pending_count': status_breakdown.get('retry_pending', 0),
+                'upcoming_24h': sum(row.upcoming or 0 for row in rows),
+                'overdue_count': sum(row.overdue or 0 for row in rows if row.status in PUBLISHABLE_STATUSES),
+                'status_breakdown': status_breakdown
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to get queue statistics for {founder_id}: {e}")
+            return {}
+
+    def get_next_scheduled_time(self, founder_id: str) -> Optional[datetime]:
+        """Get the earliest publish time among a founder's queued drafts"""
+        try:
+            return self.db_session.query(func.min(GeneratedContentDraft.scheduled_post_time)).filter(
+                GeneratedContentDraft.founder_id == founder_id,
+                GeneratedContentDraft.status.in_(PUBLISHABLE_STATUSES)
+            ).scalar()
+        except Exception as e:
+            logger.error(f"Failed to get next scheduled time for {founder_id}: {e}")
+            return None
+
+    def backfill_publishing_rollup(self, founder_id: Optional[str] = None) -> int:
+        """
+        Rebuild publishing_daily_rollup from existing drafts.
+
+        Existing rollup rows for the founder (or every founder) are replaced in
+        one transaction. Status history is not stored, so each draft counts as
+        its current status implies: scheduled on its slot day, posted on its
+        posted day, failed and retried (retry_count) on its last update day.
+
+        Returns:
+            Number of rollup rows written
+        """
+        try:
+            query = self.db_session.query(
+                GeneratedContentDraft.founder_id,
+                GeneratedContentDraft.platform,
+                GeneratedContentDraft.status,
+                GeneratedContentDraft.scheduled_post_time,
+                GeneratedContentDraft.posted_at,
+                GeneratedContentDraft.updated_at,
+                GeneratedContentDraft.retry_count
+            ).filter(
+                GeneratedContentDraft.status.in_(('posted',) + QUEUED_STATUSES + ROLLUP_FAILED_STATUSES)
+            )
+            delete_query = self.db_session.query(PublishingDailyRollup)
+            if founder_id:
+                query = query.filter(GeneratedContentDraft.founder_id == founder_id)
+                delete_query = delete_query.filter(PublishingDailyRollup.founder_id == founder_id)
+
+            changes = []
+            for row in query.yield_per(1000):
+                last_update = row.updated_at or datetime.utcnow()
+                if row.scheduled_post_time:
+                    changes.append((row.founder_id, row.platform, row.scheduled_post_time.date(),
+                                    {'scheduled_count': 1}))
+                if row.status == 'posted':
+                    for day, counters in _rollup_deltas('publishing', 'posted', row.scheduled_post_time,
+                                                        row.posted_at or last_update, last_update):
+                        changes.append((row.founder_id, row.platform, day, counters))
+                elif row.status in ROLLUP_FAILED_STATUSES:
+                    changes.append((row.founder_id, row.platform, last_update.date(), {'failed_count': 1}))
+                if row.retry_count:
+                    changes.append((row.founder_id, row.platform, last_update.date(),
+                                    {'retried_count': row.retry_count}))
+
+            delete_query.delete(synchronize_session=False)
+            self._apply_publishing_rollup(changes)
+            self.db_session.commit()
+
+            written = len({(str(change[0]), change[2], change[1] or 'twitter') for change in changes})
+            logger.info(f"Backfilled {written} publishing rollup rows")
+            return written
+
+        except Exception as e:
+            logger.error(f"Failed to backfill publishing rollup: {e}")
+            self.db_session.rollback()
+            return 0
+
+    def _calculate_similarity(self, text1: str, text2: str) -> float:
+        """Calculate text similarity (exact word-set Jaccard)"""
+        try:
+            from modules.scheduling_posting.similarity_index import text_similarity
             
-            return len(intersection) / len(union) if union else 0.0
+            return text_similarity(text1, text2)
         except Exception as e:
             logger.error(f"Failed to calculate text similarity: {e}")
             return 0.0
 
+    def get_content_signatures(self, founder_id: str,
+                               since: Optional[datetime] = None) -> List[Tuple[str, bytes, datetime]]:
+        """Get a founder's persisted MinHash signatures as (content_id, signature, reference_time)"""
+        try:
+            query = self.db_session.query(
+                ContentSignature.content_draft_id,
+                ContentSignature.signature,
+                ContentSignature.reference_time
+            ).filter(ContentSignature.founder_id == founder_id)
+            
+            if since:
+                query = query.filter(ContentSignature.reference_time >= _to_naive_utc(since))
+            
+            return [
+                (str(row.content_draft_id), row.signature, row.reference_time)
+                for row in query.all()
+            ]
+        except Exception as e:
+            logger.error(f"Failed to get content signatures for {founder_id}: {e}")
+            return []
+
+    def store_content_signatures(self, signatures: List[Tuple[str, str, bytes, datetime]]) -> bool:
+        """Insert or replace (content_id, founder_id, signature, reference_time) rows in one commit"""
+        try:
+            for content_id, founder_id, signature, reference_time in signatures:
+                self.db_session.merge(ContentSignature(
+                    content_draft_id=str(content_id),
+                    founder_id=str(founder_id),
+                    signature=signature,
+                    reference_time=_to_naive_utc(reference_time)
+                ))
+            self.db_session.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to store content signatures: {e}")
+            self.db_session.rollback()
+            return False
+
+    def delete_content_signature(self, content_id: str) -> bool:
+        """Delete the persisted signature of a content draft"""
+        try:
+            self.db_session.query(ContentSignature).filter(
+                ContentSignature.content_draft_id == str(content_id)
+            ).delete(synchronize_session=False)
+            self.db_session.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete content signature for {content_id}: {e}")
+            self.db_session.rollback()
+            return False
+
     def create_user_scheduling_rule(self, rule_data: Dict[str, Any]) -> bool:
         """Create a user-specific scheduling rule"""
         try:
@@ -1997,6 +2798,17 @@ class DataFlowManager:
         except Exception as e:
             logger.error(f"Failed to update user scheduling rule: {e}")
             return False
+
+    def delete_user_scheduling_rule(self, user_id: str, rule_id: str) -> bool:
+        """
+        Delete a user-specific scheduling rule
+        
+        get_user_scheduling_rules serves built-in rules with no backing
+        store, so there is nothing to delete yet; reporting success would let
+        callers believe a rule is gone while it is still enforced.
+        """
+        logger.warning(f"Cannot delete scheduling rule {rule_id} for user {user_id}: rules are not stored yet")
+        return False
         
     def delete_content_draft(self, draft_id: str) -> bool:
         """
@@ -2009,6 +2821,11 @@ class DataFlowManager:
             是否删除成功
         """
         try:
+            # 签名表在SQLite上没有级联删除，先删除签名
+            self.db_session.query(ContentSignature).filter(
+                ContentSignature.content_draft_id == str(draft_id)
+            ).delete(synchronize_session=False)
+            
             # 使用内容仓库删除草稿
             success = self.content_repo.delete(draft_id)
             if success:
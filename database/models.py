@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, String, Integer, Float, Boolean, DateTime, Text, 
+    Column, String, Integer, Float, Boolean, Date, DateTime, Text, 
     ForeignKey, Index, JSON, LargeBinary, TIMESTAMP
 )
 # from sqlalchemy.ext.declarative import declarative_base
@@ -166,6 +166,7 @@ class TwitterCredential(Base):
     scope = Column(String(255))
     twitter_user_id = Column(String(50))
     twitter_username = Column(String(50))
+    refresh_lease_expires_at = Column(DateTime, comment="Until when one process holds the token refresh")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -189,10 +190,15 @@ class TrackedTrendRaw(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     trend_source_id = Column(String(100), index=True, comment="Twitter trend ID")
     name = Column(String(200), nullable=False, comment="Trend name/hashtag")
-    location_woeid = Column(String(20), index=True, comment="Yahoo WOEID location")
+    location_woeid = Column(String(20), comment="Yahoo WOEID location")
     volume = Column(Integer, comment="Tweet volume if available")
     fetched_at = Column(TIMESTAMP(timezone=True), default=func.now())
     
+    # Latest fetch per location and retention pruning both seek on (location, time)
+    __table_args__ = (
+        Index('idx_tracked_trends_location_time', 'location_woeid', 'fetched_at'),
+    )
+    
     def __repr__(self):
         return f"<TrackedTrendRaw(id={self.id}, name={self.name})>"
 
@@ -277,7 +283,8 @@ class GeneratedContentDraft(Base):
     seo_suggestions = Column(JSONType, comment="SEO keywords and hashtag suggestions")
     edited_text = Column(Text, comment="Founder-edited version")
     status = Column(String(20), nullable=False, default='pending_review', index=True,
-                   comment="pending_review, approved, rejected, scheduled, posted, error")
+                   comment="pending_review, approved, rejected, scheduled, publishing, retry_pending, "
+                           "dead_letter, needs_reauth, posted, failed, cancelled, error")
     ai_generation_metadata = Column(JSONType, comment="AI reasoning for content generation")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -290,14 +297,19 @@ class GeneratedContentDraft(Base):
     
     # Error handling fields
     retry_count = Column(Integer, default=0, comment="Current retry count")
-    max_retries = Column(Integer, default=1, comment="Maximum retry attempts")
+    max_retries = Column(Integer, default=3, comment="Maximum retry attempts")
     error_message = Column(Text, comment="Error message if failed")
     error_code = Column(String(50), comment="Error code if failed")
     
     # Publishing details
     posted_at = Column(DateTime, comment="Actual posting time")
     tags = Column(JSONType, default=list, comment="Content tags")
+    
+    # Publisher lease (set while a worker holds the item in 'publishing')
+    lease_owner = Column(String(100), comment="Publisher worker holding the item")
+    lease_expires_at = Column(DateTime, comment="When the publishing lease can be reclaimed")
     created_by = Column(UUID(), ForeignKey('founders.id'), comment="User who created/scheduled the content")
+    batch_job_id = Column(String(36), index=True, comment="Batch publishing job that queued the content")
     
     # Relationships
     founder = relationship("Founder", back_populates="generated_content_drafts", foreign_keys=[founder_id])
@@ -310,6 +322,12 @@ class GeneratedContentDraft(Base):
         Index('idx_content_drafts_status_created', 'status', 'created_at'),
         Index('idx_content_drafts_scheduled_time', 'scheduled_post_time'),
         Index('idx_content_drafts_founder_status', 'founder_id', 'status'),
+        # Serves the publisher's due-content query (status filter, time range, priority order)
+        Index('idx_content_drafts_due', 'status', 'scheduled_post_time', 'priority'),
+        # Serves reclaiming of expired publishing leases
+        Index('idx_content_drafts_lease', 'status', 'lease_expires_at'),
+        # Serves keyset pagination of a founder's publishing history
+        Index('idx_content_drafts_founder_posted', 'founder_id', 'posted_at', 'id'),
     )
     
     def __repr__(self):
@@ -352,9 +370,9 @@ class GeneratedContentDraft(Base):
     
     @property
     def should_retry(self) -> bool:
-        """Check if content should be retried"""
-        return (self.status == 'error' and 
-                self.retry_count < self.max_retries)
+        """Check if content has retry attempts left"""
+        return (self.status in ('failed', 'retry_pending') and
+                (self.retry_count or 0) < (self.max_retries or 0))
     
     @property
     def tags_list(self) -> List[str]:
@@ -368,6 +386,25 @@ class GeneratedContentDraft(Base):
         """Set tags from a list"""
         self.tags = values
 
+class ContentSignature(Base):
+    """MinHash signatures of scheduled and posted drafts for near-duplicate detection"""
+    __tablename__ = 'content_signatures'
+    
+    content_draft_id = Column(UUID(), ForeignKey('generated_content_drafts.id', ondelete='CASCADE'),
+                              primary_key=True, nullable=False)
+    founder_id = Column(UUID(), ForeignKey('founders.id', ondelete='CASCADE'), nullable=False)
+    signature = Column(LargeBinary, nullable=False, comment="Packed MinHash signature")
+    reference_time = Column(DateTime, nullable=False, comment="Scheduled or posted time (naive UTC)")
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Serves warming a founder's index with the signatures inside the retention window
+        Index('idx_content_signatures_founder_time', 'founder_id', 'reference_time'),
+    )
+    
+    def __repr__(self):
+        return f"<ContentSignature(content_draft_id={self.content_draft_id})>"
+
 # ====================
 # Automation Models
 # ====================
@@ -442,6 +479,24 @@ class PostAnalytic(Base):
             return 0.0
         return (self.total_engagements / self.impressions) * 100
 
+class PublishingDailyRollup(Base):
+    """Per-day publishing counters, updated in the same transaction as each draft status change"""
+    __tablename__ = 'publishing_daily_rollup'
+    
+    founder_id = Column(UUID(), ForeignKey('founders.id', ondelete='CASCADE'), primary_key=True, nullable=False)
+    day = Column(Date, primary_key=True, nullable=False, comment="UTC day the counted events fall on")
+    platform = Column(String(20), primary_key=True, nullable=False, default='twitter')
+    scheduled_count = Column(Integer, nullable=False, default=0, comment="Drafts scheduled for this day")
+    posted_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0, comment="Terminal failures, dead letters included")
+    retried_count = Column(Integer, nullable=False, default=0, comment="Retries queued, re-drives included")
+    delay_seconds_sum = Column(Float, nullable=False, default=0.0, comment="Sum of posted_at - scheduled_post_time")
+    delay_count = Column(Integer, nullable=False, default=0, comment="Posts contributing to delay_seconds_sum")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<PublishingDailyRollup(founder_id={self.founder_id}, day={self.day}, platform={self.platform})>"
+
 # ====================
 # Scheduling and Publishing Models  
 # Note: ScheduledContent functionality has been merged into GeneratedContentDraft
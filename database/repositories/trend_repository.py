@@ -1,8 +1,9 @@
-from database.models import AnalyzedTrend
+from database.models import AnalyzedTrend, TrackedTrendRaw
 from database.repositories.base_repository import BaseRepository
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import Optional, List
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
@@ -59,4 +60,70 @@ class TrendRepository(BaseRepository):
             founder_id=founder_id,
             topic_name=topic_name,
             **kwargs
-        )
\ No newline at end of file
+        )
+
+    def save_raw_trends(self, location_woeid: str, trends: List[Dict[str, Any]],
+                        fetched_at: datetime) -> int:
+        """Store one location trend fetch in tracked_trends_raw (all rows share fetched_at)"""
+        try:
+            fetched_at = _to_aware_utc(fetched_at)
+            rows = [
+                TrackedTrendRaw(
+                    trend_source_id=(trend.get('query') or trend['name'])[:100],
+                    name=trend['name'][:200],
+                    location_woeid=str(location_woeid),
+                    volume=trend.get('tweet_volume'),
+                    fetched_at=fetched_at
+                )
+                for trend in trends if trend.get('name')
+            ]
+            self.db_session.add_all(rows)
+            self.db_session.commit()
+            return len(rows)
+        except SQLAlchemyError as e:
+            self.db_session.rollback()
+            logger.error(f"Database error saving raw trends for {location_woeid}: {e}")
+            return 0
+
+    def get_latest_raw_trends(self, location_woeid: str,
+                              fetched_after: Optional[datetime] = None) -> List[TrackedTrendRaw]:
+        """Rows of the most recent fetch for a location, optionally only if newer than fetched_after"""
+        try:
+            latest_query = self.db_session.query(func.max(TrackedTrendRaw.fetched_at)).filter(
+                TrackedTrendRaw.location_woeid == str(location_woeid)
+            )
+            if fetched_after is not None:
+                latest_query = latest_query.filter(TrackedTrendRaw.fetched_at > _to_aware_utc(fetched_after))
+            latest = latest_query.scalar()
+            if latest is None:
+                return []
+
+            return self.db_session.query(TrackedTrendRaw).filter(
+                TrackedTrendRaw.location_woeid == str(location_woeid),
+                TrackedTrendRaw.fetched_at == latest
+            ).order_by(TrackedTrendRaw.id).all()
+
+        except SQLAlchemyError as e:
+            logger.error(f"Database error getting raw trends for {location_woeid}: {e}")
+            return []
+
+    def prune_raw_trends(self, location_woeid: str, fetched_before: datetime) -> int:
+        """Delete a location's tracked_trends_raw fetches older than fetched_before"""
+        try:
+            deleted = self.db_session.query(TrackedTrendRaw).filter(
+                TrackedTrendRaw.location_woeid == str(location_woeid),
+                TrackedTrendRaw.fetched_at < _to_aware_utc(fetched_before)
+            ).delete(synchronize_session=False)
+            self.db_session.commit()
+            return deleted
+        except SQLAlchemyError as e:
+            self.db_session.rollback()
+            logger.error(f"Database error pruning raw trends for {location_woeid}: {e}")
+            return 0
+
+
+def _to_aware_utc(value: datetime) -> datetime:
+    """tracked_trends_raw.fetched_at is TIMESTAMP WITH TIME ZONE; naive values are taken as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
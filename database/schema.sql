@@ -41,6 +41,7 @@ CREATE TABLE twitter_credentials (
     encrypted_access_token TEXT NOT NULL,
     encrypted_refresh_token TEXT,
     token_expires_at TIMESTAMP WITH TIME ZONE,
+    refresh_lease_expires_at TIMESTAMP,
     last_validated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
@@ -59,7 +60,7 @@ CREATE TABLE tracked_trends_raw (
 );
 
 CREATE INDEX idx_tracked_trends_source_id ON tracked_trends_raw(trend_source_id);
-CREATE INDEX idx_tracked_trends_location ON tracked_trends_raw(location_woeid);
+CREATE INDEX idx_tracked_trends_location_time ON tracked_trends_raw(location_woeid, fetched_at);
 
 -- Analyzed trends table
 CREATE TABLE analyzed_trends (
@@ -97,13 +98,14 @@ CREATE TABLE generated_content_drafts (
     seo_suggestions JSONB,
     edited_text TEXT,
     status VARCHAR(20) NOT NULL DEFAULT 'pending_review' 
-        CHECK (status IN ('pending_review', 'approved', 'rejected', 'scheduled', 'posted', 'error')),
+        CHECK (status IN ('pending_review', 'approved', 'rejected', 'scheduled', 'publishing',
+                          'retry_pending', 'dead_letter', 'needs_reauth', 'posted', 'failed', 'cancelled', 'error')),
     ai_generation_metadata JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
-    -- Scheduling fields (merged from scheduled_content)
-    scheduled_post_time TIMESTAMP WITH TIME ZONE,
+    -- Scheduling fields (merged from scheduled_content), stored as naive UTC
+    scheduled_post_time TIMESTAMP,
     posted_tweet_id VARCHAR(50),
     platform VARCHAR(20) DEFAULT 'twitter',
     priority INTEGER DEFAULT 5,
@@ -115,9 +117,14 @@ CREATE TABLE generated_content_drafts (
     error_code VARCHAR(50),
     
     -- Publishing details
-    posted_at TIMESTAMP WITH TIME ZONE,
+    posted_at TIMESTAMP,
     tags JSONB DEFAULT '[]'::jsonb,
-    created_by UUID REFERENCES founders(id)
+    created_by UUID REFERENCES founders(id),
+    batch_job_id VARCHAR(36),
+    
+    -- Publisher lease
+    lease_owner VARCHAR(100),
+    lease_expires_at TIMESTAMP
 );
 
 CREATE INDEX idx_content_drafts_founder_id ON generated_content_drafts(founder_id);
@@ -126,6 +133,36 @@ CREATE INDEX idx_content_drafts_status_created ON generated_content_drafts(statu
 CREATE INDEX idx_content_drafts_scheduled_time ON generated_content_drafts(scheduled_post_time);
 CREATE INDEX idx_content_drafts_posted_tweet_id ON generated_content_drafts(posted_tweet_id);
 CREATE INDEX idx_content_drafts_founder_status ON generated_content_drafts(founder_id, status);
+CREATE INDEX idx_content_drafts_due ON generated_content_drafts(status, scheduled_post_time, priority);
+CREATE INDEX idx_content_drafts_lease ON generated_content_drafts(status, lease_expires_at);
+CREATE INDEX idx_content_drafts_batch_job_id ON generated_content_drafts(batch_job_id);
+CREATE INDEX idx_content_drafts_founder_posted ON generated_content_drafts(founder_id, posted_at, id);
+
+-- MinHash signatures for the duplicate-content scheduling rule
+CREATE TABLE content_signatures (
+    content_draft_id UUID PRIMARY KEY REFERENCES generated_content_drafts(id) ON DELETE CASCADE,
+    founder_id UUID NOT NULL REFERENCES founders(id) ON DELETE CASCADE,
+    signature BYTEA NOT NULL,
+    reference_time TIMESTAMP NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX idx_content_signatures_founder_time ON content_signatures(founder_id, reference_time);
+
+-- Per-day publishing counters read by the analytics endpoints
+CREATE TABLE publishing_daily_rollup (
+    founder_id UUID NOT NULL REFERENCES founders(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    platform VARCHAR(20) NOT NULL DEFAULT 'twitter',
+    scheduled_count INTEGER NOT NULL DEFAULT 0,
+    posted_count INTEGER NOT NULL DEFAULT 0,
+    failed_count INTEGER NOT NULL DEFAULT 0,
+    retried_count INTEGER NOT NULL DEFAULT 0,
+    delay_seconds_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    delay_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP,
+    PRIMARY KEY (founder_id, day, platform)
+);
 
 -- Automation rules table
 CREATE TABLE automation_rules (
@@ -2,6 +2,7 @@
 import logging
 
 import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes import user_profile, twitter_api, trend_analysis, seo, content_generation, scheduling_posting, review_optimization
@@ -54,7 +55,57 @@ except Exception as e:
     import traceback
     traceback.print_exc()
 
-app = FastAPI(title="SEO Tool API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动/停止常驻发布守护进程"""
+    from modules.scheduling_posting.queue_processor import PublishingDaemon, set_publishing_daemon
+    from modules.user_profile import TwitterTokenManager, set_token_manager
+    from api.middleware import (
+        close_async_twitter_client, close_trend_ingestion_service, get_async_twitter_client,
+        get_trend_ingestion_service, user_profile_repository
+    )
+    
+    token_manager = None
+    try:
+        token_manager = TwitterTokenManager(
+            user_profile_repository,
+            get_async_twitter_client().auth,
+            refresh_margin_seconds=int(os.getenv('TWITTER_TOKEN_REFRESH_MARGIN_SECONDS', '600'))
+        )
+        set_token_manager(token_manager)
+        # 刷新循环默认关闭，多个worker时只在一个进程中开启；其余进程只把它当作内存token缓存，
+        # 按需刷新通过数据库租约保证同一refresh token只被一个进程使用
+        if os.getenv('TWITTER_TOKEN_REFRESH_ENABLED', 'false').lower() == 'true':
+            await token_manager.start()
+    except ValueError as e:
+        logger.warning(f"Twitter token manager not started: {e}")
+    
+    # 后台按地区提前刷新trend快照，请求只读快照
+    if os.getenv('TREND_INGESTION_ENABLED', 'true').lower() == 'true':
+        try:
+            await get_trend_ingestion_service().start()
+        except ValueError as e:
+            logger.warning(f"Trend ingestion not started: {e}")
+    
+    daemon = None
+    if os.getenv('PUBLISHER_ENABLED', 'true').lower() == 'true':
+        daemon = PublishingDaemon(scheduling_posting.background_scheduling_service)
+        set_publishing_daemon(daemon)
+        await daemon.start()
+    
+    try:
+        yield
+    finally:
+        if daemon:
+            await daemon.stop()
+            set_publishing_daemon(None)
+        if token_manager:
+            await token_manager.stop()
+            set_token_manager(None)
+        await close_trend_ingestion_service()
+        await close_async_twitter_client()
+
+app = FastAPI(title="SEO Tool API", lifespan=lifespan)
 
 # CORS配置
 app.add_middleware(
@@ -14,7 +14,11 @@ Main Components:
 - models.py: Data models for scheduling and publishing
 - service.py: Business logic and workflow management
 - routes.py: FastAPI endpoints for API access
-- queue_processor.py: Background queue processing (would be implemented)
+- queue_processor.py: Resident publishing daemon driven by a timer heap
+- fair_scheduler.py: Founder-fair, bounded dispatch of claimed queue items
+- retry_policy.py: Error classification and jittered exponential backoff for failed publishes
+- slot_optimizer.py: One-pass slot assignment for batch auto-scheduling
+- similarity_index.py: MinHash/LSH near-duplicate index for the duplicate-content rule
 - database_operations.py: Database interaction layer (would be implemented)
 
 Key Features:
@@ -59,6 +63,7 @@ from .models import (
     BatchPublishRequest,
     StatusUpdateRequest,
     RuleCheckRequest,
+    DeadLetterRedriveRequest,
     
     # Analytics and reporting models
     PublishingHistoryItem,
@@ -70,11 +75,25 @@ from .models import (
     ScheduleResponse,
     PublishResponse,
     BatchOperationResponse,
+    BatchJobStatus,
+    BatchJobItemStatus,
+    DeadLetterItem,
+    DeadLetterRedriveResponse,
     RuleCheckResult
 )
 
 from .service import SchedulingPostingService
-from .rules_engine import InternalRulesEngine, RuleSeverity, RuleViolation
+from .queue_processor import PublishingDaemon, get_publishing_daemon, set_publishing_daemon
+from .fair_scheduler import FairPublishScheduler, PublishingQueueMetrics, publishing_queue_metrics
+from .retry_policy import RetryPolicy
+from .slot_optimizer import SlotOptimizer
+from .rules_engine import (
+    InternalRulesEngine, RuleSeverity, RuleViolation, ScheduleSnapshot,
+    CompiledRulesCache, compiled_rules_cache
+)
+from .similarity_index import (
+    MinHasher, LSHIndex, SimilarityIndexRegistry, similarity_index_registry
+)
 
 __all__ = [
     # Enums
@@ -101,11 +120,16 @@ __all__ = [
     'BatchPublishRequest',
     'StatusUpdateRequest',
     'RuleCheckRequest',
+    'DeadLetterRedriveRequest',
     
     # Response models
     'ScheduleResponse',
     'PublishResponse',
     'BatchOperationResponse',
+    'BatchJobStatus',
+    'BatchJobItemStatus',
+    'DeadLetterItem',
+    'DeadLetterRedriveResponse',
     'RuleCheckResult',
     
     # Analytics models
@@ -117,10 +141,29 @@ __all__ = [
     # Service
     'SchedulingPostingService',
     
+    # Background queue processing
+    'PublishingDaemon',
+    'get_publishing_daemon',
+    'set_publishing_daemon',
+    'FairPublishScheduler',
+    'PublishingQueueMetrics',
+    'publishing_queue_metrics',
+    'RetryPolicy',
+    'SlotOptimizer',
+    
     # Internal Rules Engine
     'InternalRulesEngine',
     'RuleSeverity', 
-    'RuleViolation'
+    'RuleViolation',
+    'ScheduleSnapshot',
+    'CompiledRulesCache',
+    'compiled_rules_cache',
+    
+    # Near-duplicate content index
+    'MinHasher',
+    'LSHIndex',
+    'SimilarityIndexRegistry',
+    'similarity_index_registry'
 ]
 
 # Module version and metadata
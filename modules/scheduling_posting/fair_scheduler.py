@@ -0,0 +1,179 @@
+"""Scheduling and Posting Module - Founder-Fair Publish Scheduling
+
+Dispatches claimed queue items with a global concurrency limit, a per-founder
+in-flight cap and round-robin draining across founders, so one founder with a
+large backlog cannot starve the others or open unbounded concurrent requests
+against the Twitter client.
+"""
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from .models import ContentQueueItem
+
+
+class PublishingQueueMetrics:
+    """
+    Process-wide publishing queue metrics for tuning concurrency limits.
+
+    Wait time is measured from an item's scheduled time to the moment it is
+    dispatched, so starvation across several queue passes shows up too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.queue_depth = 0
+            self.in_flight = 0
+            self.max_queue_depth = 0
+            self.total_dispatched = 0
+            self._founders: Dict[str, Dict[str, Any]] = {}
+
+    def record_enqueued(self, count: int) -> None:
+        with self._lock:
+            self.queue_depth += count
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def record_dispatched(self, founder_id: str, wait_seconds: float) -> None:
+        with self._lock:
+            self.queue_depth = max(self.queue_depth - 1, 0)
+            self.in_flight += 1
+            self.total_dispatched += 1
+
+            stats = self._founders.setdefault(founder_id, {
+                'dispatched': 0,
+                'in_flight': 0,
+                'total_wait_seconds': 0.0,
+                'max_wait_seconds': 0.0,
+            })
+            stats['dispatched'] += 1
+            stats['in_flight'] += 1
+            stats['total_wait_seconds'] += wait_seconds
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], wait_seconds)
+
+    def record_completed(self, founder_id: str) -> None:
+        with self._lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+            stats = self._founders.get(founder_id)
+            if stats:
+                stats['in_flight'] = max(stats['in_flight'] - 1, 0)
+
+    def record_dropped(self, count: int) -> None:
+        """Items enqueued but never dispatched (e.g. the pass was cancelled)"""
+        with self._lock:
+            self.queue_depth = max(self.queue_depth - count, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            founders = {
+                founder_id: {
+                    'dispatched': stats['dispatched'],
+                    'in_flight': stats['in_flight'],
+                    'avg_wait_seconds': round(stats['total_wait_seconds'] / max(stats['dispatched'], 1), 3),
+                    'max_wait_seconds': round(stats['max_wait_seconds'], 3),
+                }
+                for founder_id, stats in self._founders.items()
+            }
+            return {
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'in_flight': self.in_flight,
+                'total_dispatched': self.total_dispatched,
+                'founders': founders,
+            }
+
+
+# Shared by every service instance in the process
+publishing_queue_metrics = PublishingQueueMetrics()
+
+
+class FairPublishScheduler:
+    """
+    Round-robin dispatcher over founders with global and per-founder limits
+    """
+
+    def __init__(self, max_concurrency: int, per_founder_limit: int,
+                 metrics: Optional[PublishingQueueMetrics] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_founder_limit = max(1, per_founder_limit)
+        self.metrics = metrics or publishing_queue_metrics
+
+    async def run(self, items: List[ContentQueueItem],
+                  handler: Callable[[ContentQueueItem], Awaitable[Any]]) -> List[Any]:
+        """
+        Run handler over items and return the results (exceptions included) in dispatch order.
+
+        Items keep their relative order within a founder; founders take turns.
+        """
+        pending: "OrderedDict[str, Deque[ContentQueueItem]]" = OrderedDict()
+        for item in items:
+            pending.setdefault(item.founder_id, deque()).append(item)
+
+        rotation: Deque[str] = deque(pending.keys())
+        in_flight: Dict[str, int] = {founder_id: 0 for founder_id in pending}
+        remaining = len(items)
+        condition = asyncio.Condition()
+        # Keyed by dispatch index so results come back in dispatch order, not completion order
+        results: Dict[int, Any] = {}
+        dispatched = 0
+
+        self.metrics.record_enqueued(remaining)
+
+        def next_item() -> Optional[ContentQueueItem]:
+            # One full turn over founders that still have work, skipping those at their cap
+            for _ in range(len(rotation)):
+                founder_id = rotation[0]
+                rotation.rotate(-1)
+                if in_flight[founder_id] < self.per_founder_limit:
+                    item = pending[founder_id].popleft()
+                    if not pending[founder_id]:
+                        rotation.remove(founder_id)
+                    in_flight[founder_id] += 1
+                    return item
+            return None
+
+        async def worker() -> None:
+            nonlocal remaining, dispatched
+            while True:
+                async with condition:
+                    item = None
+                    while remaining > 0:
+                        item = next_item()
+                        if item:
+                            remaining -= 1
+                            index = dispatched
+                            dispatched += 1
+                            break
+                        await condition.wait()
+                    if item is None:
+                        return
+
+                wait_seconds = max((datetime.utcnow() - item.scheduled_time).total_seconds(), 0.0)
+                self.metrics.record_dispatched(item.founder_id, wait_seconds)
+                try:
+                    result = await handler(item)
+                except Exception as e:
+                    result = e
+                finally:
+                    self.metrics.record_completed(item.founder_id)
+
+                results[index] = result
+                async with condition:
+                    in_flight[item.founder_id] -= 1
+                    condition.notify_all()
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_concurrency, len(items)))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            if remaining:
+                self.metrics.record_dropped(remaining)
+
+        return [results[index] for index in sorted(results)]
@@ -17,6 +17,8 @@ class PublishStatus(str, Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
     RETRY_PENDING = "retry_pending"
+    DEAD_LETTER = "dead_letter"
+    NEEDS_REAUTH = "needs_reauth"
 
 class ScheduleFrequency(str, Enum):
     """Frequency options for automated scheduling"""
@@ -127,7 +129,9 @@ class ScheduleRequest(BaseModel):
     @field_validator('scheduled_time')
     @classmethod
     def validate_future_time(cls, v):
-        """Ensure scheduled time is in the future"""
+        """Ensure scheduled time is in the future (normalized to naive UTC)"""
+        if v.tzinfo is not None:
+            v = v.astimezone(timezone.utc).replace(tzinfo=None)
         if v <= datetime.utcnow():
             raise ValueError('Scheduled time must be in the future')
         return v
@@ -139,6 +143,8 @@ class BatchScheduleRequest(BaseModel):
     schedule_pattern: Optional[Dict[str, Any]] = Field(None, description="Scheduling pattern")
     timezone: str = Field(default="UTC", description="Timezone for scheduling")
     stagger_minutes: int = Field(default=0, description="Minutes to stagger between posts")
+    skip_rules_check: bool = Field(default=False, description="Skip publishing rules validation")
+    weight_by_priority: bool = Field(default=True, description="When auto-scheduling, give higher-priority drafts earlier slots")
     
     @field_validator('content_ids')
     @classmethod
@@ -170,6 +176,7 @@ class StatusUpdateRequest(BaseModel):
     error_code: Optional[str] = Field(None, description="Error code if failed")
     technical_details: Dict[str, Any] = Field(default={}, description="Technical details")
     retry_scheduled: bool = Field(default=False, description="Whether retry is scheduled")
+    retry_after_seconds: Optional[int] = Field(None, description="Earliest retry delay requested by the platform")
 
 class PublishingHistoryItem(BaseModel):
     """Item in publishing history"""
@@ -184,6 +191,7 @@ class PublishingHistoryItem(BaseModel):
     error_message: Optional[str] = Field(None, description="Error message if failed")
     retry_count: int = Field(default=0, description="Number of retries")
     tags: List[str] = Field(default=[], description="Content tags")
+    cursor: Optional[str] = Field(None, description="Pagination cursor; pass it to get the items after this one")
 
 class PublishingAnalytics(BaseModel):
     """Publishing analytics data"""
@@ -237,10 +245,19 @@ class AutoScheduleSettings(BaseModel):
 class PublishingConfiguration(BaseModel):
     """Configuration for the publishing system"""
     max_concurrent_publishes: int = Field(default=5, description="Max concurrent publishing operations")
-    retry_delays_minutes: List[int] = Field(default=[5, 15, 60], description="Retry delay intervals")
+    max_in_flight_per_founder: int = Field(default=2, description="Max concurrent publishing operations per founder")
+    queue_batch_size: int = Field(default=50, description="Max items claimed per queue pass")
+    max_claimed_per_founder: int = Field(default=10, description="Max items one founder contributes to a queue pass")
+    retry_delays_minutes: List[int] = Field(default=[5, 15, 60], description="Deprecated: retries use exponential backoff from retry_base_delay_seconds")
+    retry_base_delay_seconds: int = Field(default=60, ge=1, description="Backoff window before the first retry")
+    retry_max_delay_seconds: int = Field(default=3600, ge=1, description="Upper bound of the retry backoff window")
     default_max_retries: int = Field(default=3, description="Default maximum retry attempts")
     publish_timeout_seconds: int = Field(default=30, description="Publishing timeout")
     queue_check_interval_seconds: int = Field(default=60, description="Queue processing interval")
+    publish_lease_seconds: int = Field(default=300, description="How long a worker holds claimed items before they can be reclaimed")
+    slot_search_horizon_hours: int = Field(default=48, ge=1, description="How far ahead the rules engine searches for the next available slot")
+    auto_schedule_horizon_days: int = Field(default=14, ge=1, description="How many days ahead batch auto-scheduling assigns slots")
+    auto_schedule_slot_step_minutes: int = Field(default=15, ge=1, description="Candidate slot spacing when preferred posting times run out")
     enable_rule_validation: bool = Field(default=True, description="Enable publishing rule validation")
     enable_analytics_tracking: bool = Field(default=True, description="Enable analytics tracking")
     platform_configs: Dict[str, Dict[str, Any]] = Field(default={}, description="Platform-specific configurations")
@@ -278,6 +295,7 @@ class ContentQueueItem(BaseModel):
     status: PublishStatus = Field(default=PublishStatus.PENDING)
     platform: str = Field(default="twitter", description="Target platform")
     retry_count: int = Field(default=0, description="Current retry count")
+    max_retries: int = Field(default=3, description="Maximum retry attempts")
     last_attempt_at: Optional[datetime] = Field(None, description="Last attempt timestamp")
     lock_acquired_at: Optional[datetime] = Field(None, description="Lock acquisition time")
     lock_acquired_by: Optional[str] = Field(None, description="Worker that acquired lock")
@@ -294,11 +312,9 @@ class ContentQueueItem(BaseModel):
     
     @property
     def should_retry(self) -> bool:
-        """Check if item should be retried"""
-        return (self.status == PublishStatus.FAILED and 
-                self.retry_count < 3 and
-                self.last_attempt_at and
-                self.last_attempt_at < datetime.utcnow() - timedelta(minutes=5))
+        """Check if item has retry attempts left (the retry policy decides when)"""
+        return (self.status in (PublishStatus.FAILED, PublishStatus.RETRY_PENDING) and
+                self.retry_count < self.max_retries)
 
 # Response Models
 class ScheduleResponse(BaseModel):
@@ -316,6 +332,8 @@ class PublishResponse(BaseModel):
     posted_at: Optional[datetime] = Field(None, description="Posting timestamp")
     message: str = Field(..., description="Response message")
     error_code: Optional[str] = Field(None, description="Error code if failed")
+    retryable: bool = Field(default=False, description="Whether the failure is worth retrying")
+    retry_after_seconds: Optional[int] = Field(None, description="Earliest retry delay requested by the platform")
 
 class BatchOperationResponse(BaseModel):
     """Response for batch operations"""
@@ -323,4 +341,47 @@ class BatchOperationResponse(BaseModel):
     successful_items: int = Field(..., description="Successfully processed items")
     failed_items: int = Field(..., description="Failed items")
     results: Dict[str, Union[ScheduleResponse, PublishResponse]] = Field(..., description="Individual results")
-    message: str = Field(..., description="Overall operation message")
\ No newline at end of file
+    message: str = Field(..., description="Overall operation message")
+    job_id: Optional[str] = Field(None, description="Batch job ID for tracking queued items")
+
+class BatchJobItemStatus(BaseModel):
+    """Progress of one item in a batch publishing job"""
+    content_id: str = Field(..., description="Content draft ID")
+    status: str = Field(..., description="Current publishing status")
+    scheduled_time: Optional[datetime] = Field(None, description="Scheduled publishing time")
+    posted_at: Optional[datetime] = Field(None, description="Actual posting time")
+    posted_tweet_id: Optional[str] = Field(None, description="Posted tweet ID")
+    error_message: Optional[str] = Field(None, description="Error message if failed")
+    retry_count: int = Field(default=0, description="Number of retries")
+
+class BatchJobStatus(BaseModel):
+    """Progress of a batch publishing job"""
+    job_id: str = Field(..., description="Batch job ID")
+    total_items: int = Field(..., description="Items queued by the job")
+    status_counts: Dict[str, int] = Field(default={}, description="Item count per status")
+    completed: bool = Field(..., description="Whether every item reached a final status")
+    next_publish_time: Optional[datetime] = Field(None, description="Next scheduled item time")
+    items: List[BatchJobItemStatus] = Field(default=[], description="Per-item progress")
+
+class DeadLetterItem(BaseModel):
+    """Content that exhausted its publishing retries or is waiting for Twitter re-authorization"""
+    content_id: str = Field(..., description="Content draft ID")
+    content_preview: str = Field(default="", description="Content preview")
+    scheduled_time: Optional[datetime] = Field(None, description="Time of the last publishing attempt")
+    error_code: Optional[str] = Field(None, description="Error code of the last attempt")
+    error_message: Optional[str] = Field(None, description="Error message of the last attempt")
+    retry_count: int = Field(default=0, description="Number of failed attempts")
+    status: PublishStatus = Field(default=PublishStatus.DEAD_LETTER, description="dead_letter or needs_reauth")
+    updated_at: Optional[datetime] = Field(None, description="When the item was dead-lettered")
+
+class DeadLetterRedriveRequest(BaseModel):
+    """Request to put dead-lettered content back in the publishing queue"""
+    content_ids: Optional[List[str]] = Field(None, description="Content IDs to re-drive; all dead-lettered content when omitted")
+    scheduled_time: Optional[datetime] = Field(None, description="When to publish re-driven content; now when omitted")
+
+class DeadLetterRedriveResponse(BaseModel):
+    """Result of a dead-letter re-drive"""
+    redriven_count: int = Field(..., description="Number of items queued again")
+    content_ids: List[str] = Field(default=[], description="Re-driven content IDs")
+    scheduled_time: Optional[datetime] = Field(None, description="Scheduled publishing time")
+    message: str = Field(..., description="Response message")
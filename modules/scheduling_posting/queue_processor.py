@@ -0,0 +1,247 @@
+"""Scheduling and Posting Module - Background Queue Processing
+
+Resident publisher that runs for the lifetime of the application. It keeps a
+min-heap of upcoming ``scheduled_post_time`` values and sleeps until the
+earliest one instead of polling the database, so due content is published
+within a second of its scheduled time.
+
+The heap is only a wake-up hint: the database stays the source of truth.
+Each wake-up runs ``SchedulingPostingService.process_publishing_queue``, and
+the heap is rebuilt from the database every ``queue_check_interval_seconds``
+to pick up changes made by other processes.
+"""
+import asyncio
+import heapq
+import logging
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .models import PublishingConfiguration
+
+logger = logging.getLogger(__name__)
+
+ServiceFactory = Callable[[], AbstractContextManager]
+
+# Daemon registered by the application lifespan; services notify it on queue changes
+_publishing_daemon: Optional["PublishingDaemon"] = None
+
+
+def get_publishing_daemon() -> Optional["PublishingDaemon"]:
+    """Get the running publishing daemon, if any"""
+    return _publishing_daemon
+
+
+def set_publishing_daemon(daemon: Optional["PublishingDaemon"]) -> None:
+    """Register (or clear) the process-wide publishing daemon"""
+    global _publishing_daemon
+    _publishing_daemon = daemon
+
+
+class PublishingDaemon:
+    """
+    Long-running publisher driven by an in-memory timer heap
+    """
+
+    def __init__(self, service_factory: ServiceFactory,
+                 config: Optional[PublishingConfiguration] = None,
+                 heap_size: int = 500):
+        """
+        Args:
+            service_factory: Returns a context manager yielding a SchedulingPostingService
+                bound to a fresh database session (closed on exit)
+            config: Publishing configuration
+            heap_size: Maximum number of upcoming items loaded into the heap on resync
+        """
+        self.service_factory = service_factory
+        self.config = config or PublishingConfiguration()
+        self.heap_size = heap_size
+
+        # Heap of (scheduled_time, content_id); entries not matching _due_times are stale
+        self._heap: List[Tuple[datetime, str]] = []
+        self._due_times: Dict[str, datetime] = {}
+
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = False
+        self._last_resync: Optional[datetime] = None
+        self._resync_updates: Optional[Dict[str, Optional[datetime]]] = None
+
+    # ==================== Lifecycle ====================
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    async def start(self) -> None:
+        """Start the publishing loop in the current event loop"""
+        if self._running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        await self._resync()
+        self._running = True
+        self._task = asyncio.create_task(self._run(), name="publishing-daemon")
+        logger.info("Publishing daemon started")
+
+    async def stop(self) -> None:
+        """Stop the publishing loop and wait for the current tick to finish"""
+        if not self._running:
+            return
+
+        self._running = False
+        self._wakeup.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=self.config.publish_timeout_seconds)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            self._task = None
+        logger.info("Publishing daemon stopped")
+
+    # ==================== Incremental Heap Updates ====================
+
+    def notify_scheduled(self, content_id: str, scheduled_time: datetime) -> None:
+        """Record a new or changed scheduled time (naive UTC)"""
+        self._call_in_loop(self._push, str(content_id), scheduled_time)
+
+    def notify_removed(self, content_id: str) -> None:
+        """Forget a content item that was cancelled, posted or failed terminally"""
+        self._call_in_loop(self._remove, str(content_id))
+
+    def next_due_time(self) -> Optional[datetime]:
+        """Earliest live scheduled time in the heap"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def _call_in_loop(self, func: Callable, *args) -> None:
+        """Apply a heap update on the daemon's loop, whichever thread the caller is on"""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if self._loop is None or running_loop is self._loop:
+            func(*args)
+        else:
+            self._loop.call_soon_threadsafe(func, *args)
+
+    def _push(self, content_id: str, scheduled_time: datetime) -> None:
+        if scheduled_time.tzinfo is not None:
+            scheduled_time = scheduled_time.replace(tzinfo=None) - scheduled_time.utcoffset()
+
+        previous_next = self.next_due_time()
+        self._due_times[content_id] = scheduled_time
+        if self._resync_updates is not None:
+            self._resync_updates[content_id] = scheduled_time
+        heapq.heappush(self._heap, (scheduled_time, content_id))
+
+        # Only interrupt the sleep when the new entry moves the next wake-up earlier
+        if previous_next is None or scheduled_time < previous_next:
+            self._wakeup.set()
+
+    def _remove(self, content_id: str) -> None:
+        # Lazy deletion: the heap entry is skipped once it no longer matches _due_times
+        self._due_times.pop(content_id, None)
+        if self._resync_updates is not None:
+            self._resync_updates[content_id] = None
+
+    def _discard_stale(self) -> None:
+        while self._heap and self._due_times.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now: datetime) -> int:
+        """Drop every entry due at or before now; returns how many were live"""
+        popped = 0
+        while self._heap and self._heap[0][0] <= now:
+            scheduled_time, content_id = heapq.heappop(self._heap)
+            if self._due_times.get(content_id) == scheduled_time:
+                del self._due_times[content_id]
+                popped += 1
+        return popped
+
+    # ==================== Publishing Loop ====================
+
+    async def _run(self) -> None:
+        backlog = False
+
+        while self._running:
+            try:
+                now = datetime.utcnow()
+                if self._resync_due(now):
+                    await self._resync()
+
+                next_due = self.next_due_time()
+                if backlog or (next_due is not None and next_due <= now):
+                    backlog = await self._publish_due(now)
+                    continue
+
+                await self._sleep_until(next_due, now)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Publishing daemon tick failed: {e}")
+                await asyncio.sleep(1)
+
+    async def _sleep_until(self, next_due: Optional[datetime], now: datetime) -> None:
+        """Sleep until the next due time, the next resync or an earlier notification"""
+        timeout = float(self.config.queue_check_interval_seconds)
+        if self._last_resync is not None:
+            elapsed = (now - self._last_resync).total_seconds()
+            timeout = max(timeout - elapsed, 0.0)
+        if next_due is not None:
+            timeout = min(timeout, (next_due - now).total_seconds())
+
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0.0))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _publish_due(self, now: datetime) -> bool:
+        """Run one queue pass and drop the heap entries it covered; True if a backlog remains"""
+        due_count = self._pop_due(now)
+
+        with self.service_factory() as service:
+            result = await service.process_publishing_queue()
+
+        processed = result.get('processed_count', 0)
+        logger.debug(f"Publishing daemon tick: {due_count} due in heap, {processed} processed")
+
+        # A full batch means more due items may be waiting in the database
+        return processed >= self.config.queue_batch_size
+
+    def _resync_due(self, now: datetime) -> bool:
+        if self._last_resync is None:
+            return True
+        return (now - self._last_resync).total_seconds() >= self.config.queue_check_interval_seconds
+
+    async def _resync(self) -> None:
+        """Rebuild the heap from the database"""
+        # Notifications arriving while the query runs in a worker thread are replayed on top of its snapshot
+        self._resync_updates = {}
+        try:
+            upcoming = await asyncio.to_thread(self._load_upcoming)
+
+            self._due_times = {content_id: scheduled_time for content_id, scheduled_time in upcoming}
+            for content_id, scheduled_time in self._resync_updates.items():
+                if scheduled_time is None:
+                    self._due_times.pop(content_id, None)
+                else:
+                    self._due_times[content_id] = scheduled_time
+            self._heap = [(scheduled_time, content_id) for content_id, scheduled_time in self._due_times.items()]
+            heapq.heapify(self._heap)
+            logger.debug(f"Publishing daemon resynced {len(self._heap)} upcoming items")
+
+        except Exception as e:
+            logger.error(f"Publishing daemon resync failed: {e}")
+        finally:
+            self._resync_updates = None
+            self._last_resync = datetime.utcnow()
+
+    def _load_upcoming(self) -> List[Tuple[str, datetime]]:
+        with self.service_factory() as service:
+            return service.data_flow_manager.get_upcoming_publish_times(limit=self.heap_size)
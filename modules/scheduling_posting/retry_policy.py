@@ -0,0 +1,75 @@
+"""Scheduling and Posting Module - Publish Retry Policy
+
+Decides whether a failed publish is worth retrying and when. Rate limits
+(429), Twitter server errors (5xx) and network failures are retryable;
+everything else (bad request, auth, content problems) is terminal.
+
+Retries back off exponentially with jitter so that items failing
+together during a Twitter incident do not all come back at the same
+moment. A Retry-After (or rate limit reset) hint from Twitter is honoured
+as the earliest retry time, with jitter added on top.
+"""
+import random
+import time
+from typing import Optional, Tuple
+
+from modules.twitter_api import (
+    TwitterAPIError, RateLimitError, TwitterAPIServerError, TwitterAPINetworkError
+)
+
+# Error codes recorded on drafts for each failure class
+RATE_LIMITED = "RATE_LIMITED"
+SERVER_ERROR = "TWITTER_SERVER_ERROR"
+NETWORK_ERROR = "NETWORK_ERROR"
+TWITTER_API_ERROR = "TWITTER_API_ERROR"
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with equal jitter, bounded by a maximum delay
+    """
+
+    def __init__(self, base_delay_seconds: float = 60, max_delay_seconds: float = 3600,
+                 rng: Optional[random.Random] = None):
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._rng = rng or random.Random()
+
+    def classify(self, error: Exception) -> Tuple[str, bool, Optional[int]]:
+        """
+        Classify a publishing error
+
+        Returns:
+            (error_code, retryable, retry_after_seconds)
+        """
+        if isinstance(error, RateLimitError):
+            retry_after = error.retry_after
+            if retry_after is None and error.reset_time:
+                retry_after = max(int(error.reset_time - time.time()), 0)
+            return RATE_LIMITED, True, retry_after
+
+        if isinstance(error, TwitterAPIServerError) or (
+            isinstance(error, TwitterAPIError) and (error.status_code or 0) >= 500
+        ):
+            return SERVER_ERROR, True, getattr(error, 'retry_after', None)
+
+        if isinstance(error, TwitterAPINetworkError):
+            return NETWORK_ERROR, True, None
+
+        return TWITTER_API_ERROR, False, None
+
+    def next_delay(self, retry_count: int, retry_after: Optional[int] = None) -> float:
+        """
+        Seconds to wait before retry number retry_count + 1
+
+        The backoff window doubles with every attempt up to max_delay_seconds
+        and the delay is drawn uniformly from its upper half. A Retry-After
+        hint, plus up to one base delay of jitter, is the minimum delay.
+        """
+        window = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** max(retry_count, 0)))
+        delay = self._rng.uniform(window / 2, window)
+
+        if retry_after is not None:
+            delay = max(delay, retry_after + self._rng.uniform(0, self.base_delay_seconds))
+
+        return delay
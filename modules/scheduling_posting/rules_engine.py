@@ -2,15 +2,21 @@
 
 This module provides internal rules engine functionality for content publishing validation.
 """
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime, timedelta, time
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Callable
+from datetime import datetime, timedelta, time, date
+from bisect import bisect_left, bisect_right, insort
 import logging
+import threading
 from enum import Enum
 
 from .models import (
     SchedulingPreferences, PublishingRule, RuleCheckResult,
     SchedulingRule, PublishStatus
 )
+from .similarity_index import (
+    LSHIndex, Signature, SimilarityIndexRegistry,
+    similarity_index_registry, text_similarity
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,14 +37,162 @@ class RuleViolation:
         self.blocking = blocking
         self.suggestion = suggestion
 
+class ScheduleSnapshot:
+    """
+    Sorted publish times (posted and queued) of one founder, loaded once.
+
+    Frequency and spacing checks run against it in memory with bisect, and
+    accepted times can be added so later checks in the same pass see them.
+    """
+    def __init__(self, timestamps: Iterable[datetime]):
+        self._times: List[datetime] = sorted(timestamps)
+    
+    def __len__(self) -> int:
+        return len(self._times)
+    
+    def add(self, publish_time: datetime) -> None:
+        insort(self._times, publish_time)
+    
+    def count_on_day(self, day: date) -> int:
+        """Number of publish times on a calendar day"""
+        start = datetime.combine(day, time.min)
+        end = start + timedelta(days=1)
+        return bisect_left(self._times, end) - bisect_left(self._times, start)
+    
+    def last_before(self, publish_time: datetime) -> Optional[datetime]:
+        """Latest publish time at or before the given time"""
+        index = bisect_right(self._times, publish_time)
+        return self._times[index - 1] if index else None
+    
+    def first_after(self, publish_time: datetime) -> Optional[datetime]:
+        """Earliest publish time strictly after the given time"""
+        index = bisect_right(self._times, publish_time)
+        return self._times[index] if index < len(self._times) else None
+
+class RuleCheckContext:
+    """Per-call inputs handed to compiled rule checks"""
+    __slots__ = ('user_id', 'content_id', 'proposed_time', 'snapshot', 'signature', 'batch_index')
+    
+    def __init__(self, user_id: str, content_id: Optional[str], proposed_time: Optional[datetime],
+                 snapshot: ScheduleSnapshot, signature: Optional[Signature] = None,
+                 batch_index: Optional[LSHIndex] = None):
+        self.user_id = user_id
+        self.content_id = content_id
+        self.proposed_time = proposed_time
+        self.snapshot = snapshot
+        self.signature = signature
+        self.batch_index = batch_index
+
+RuleCheck = Callable[[RuleCheckContext], Optional[RuleViolation]]
+
+def _parse_clock_time(value: str) -> time:
+    return datetime.strptime(value, "%H:%M").time()
+
+def _in_time_window(publish_time: time, start_time: time, end_time: time) -> bool:
+    """Whether a time of day falls in a window, handling overnight windows (e.g. 22:00 to 08:00)"""
+    if start_time > end_time:
+        return publish_time >= start_time or publish_time <= end_time
+    return start_time <= publish_time <= end_time
+
+class CompiledRuleSet:
+    """
+    A founder's enabled rules compiled against their preferences.
+    
+    Each rule becomes a closure with its thresholds and times already parsed,
+    so validating a proposed time is pure in-memory work.
+    """
+    def __init__(self, preferences: SchedulingPreferences, checks: List[Tuple[str, RuleCheck]],
+                 rules: List[SchedulingRule], version: int):
+        self.preferences = preferences
+        self.checks = checks
+        self.rules = rules
+        self.version = version
+        self.compiled_at = datetime.utcnow()
+        
+        self.quiet_hours: Optional[Tuple[time, time]] = None
+        self.preferred_times: List[time] = []
+        try:
+            if preferences.quiet_hours_start and preferences.quiet_hours_end:
+                self.quiet_hours = (
+                    _parse_clock_time(preferences.quiet_hours_start),
+                    _parse_clock_time(preferences.quiet_hours_end)
+                )
+            self.preferred_times = [_parse_clock_time(t) for t in preferences.preferred_posting_times]
+        except ValueError as e:
+            logger.warning(f"Invalid time in scheduling preferences for {preferences.founder_id}: {e}")
+
+class CompiledRulesCache:
+    """
+    Process-wide cache of compiled rule sets per founder.
+    
+    Entries are keyed by an in-process rules version that rule changes bump,
+    and expire after ttl_seconds to pick up changes made elsewhere (founder
+    settings, other processes).
+    """
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CompiledRuleSet] = {}
+        self._versions: Dict[str, int] = {}
+    
+    def version(self, user_id: str) -> int:
+        with self._lock:
+            return self._versions.get(str(user_id), 0)
+    
+    def bump(self, user_id: str) -> int:
+        """Invalidate a founder's compiled rules after a rule change"""
+        with self._lock:
+            version = self._versions.get(str(user_id), 0) + 1
+            self._versions[str(user_id)] = version
+            self._entries.pop(str(user_id), None)
+            return version
+    
+    def get(self, user_id: str) -> Optional[CompiledRuleSet]:
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is None:
+                return None
+            if entry.version != self._versions.get(str(user_id), 0):
+                return None
+            if (datetime.utcnow() - entry.compiled_at).total_seconds() >= self.ttl_seconds:
+                return None
+            return entry
+    
+    def put(self, user_id: str, rule_set: CompiledRuleSet) -> None:
+        # A set compiled before a concurrent bump keeps its old version and is never served
+        with self._lock:
+            self._entries[str(user_id)] = rule_set
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+# Shared by every rules engine instance in the process
+compiled_rules_cache = CompiledRulesCache()
+
 class InternalRulesEngine:
     """
     Internal rules engine for scheduling and publishing validation
     """
     
-    def __init__(self, data_flow_manager):
+    def __init__(self, data_flow_manager, slot_search_horizon_hours: int = 48,
+                 similarity_index: Optional[SimilarityIndexRegistry] = None,
+                 rules_cache: Optional[CompiledRulesCache] = None):
         self.data_flow_manager = data_flow_manager
+        self.slot_search_horizon_hours = slot_search_horizon_hours
+        self.similarity_index = similarity_index or similarity_index_registry
+        self.rules_cache = rules_cache or compiled_rules_cache
         self.default_rules = self._initialize_default_rules()
+        
+        # Compiler per conditions["type"]; unknown types compile to no check
+        self._rule_compilers: Dict[str, Callable[[SchedulingRule, SchedulingPreferences], Optional[RuleCheck]]] = {
+            "daily_limit": self._compile_daily_limit_rule,
+            "min_interval": self._compile_min_interval_rule,
+            "time_window": self._compile_time_window_rule,
+            "weekend_restriction": self._compile_weekend_rule,
+            "duplicate_check": self._compile_duplicate_content_rule,
+        }
     
     def _initialize_default_rules(self) -> List[SchedulingRule]:
         """Initialize default publishing rules"""
@@ -135,40 +289,34 @@ class InternalRulesEngine:
         try:
             logger.info(f"Validating publishing rules for user {user_id}")
             
-            violations = []
-            recommendations = []
-            can_publish = True
+            # Compiled rules and preferences come from the cache when warm
+            rule_set = await self._get_compiled_rules(user_id, preferences)
+            preferences = rule_set.preferences
             
-            # Get user preferences if not provided
-            if not preferences:
-                preferences = await self._get_user_preferences(user_id)
+            # One query covers the proposed time and the whole slot search horizon
+            now = datetime.utcnow()
+            snapshot = await self.load_schedule_snapshot(
+                user_id,
+                *self._snapshot_window(now, now + timedelta(hours=self.slot_search_horizon_hours), proposed_time),
+                exclude_content_id=content_id
+            )
             
-            # Get user-specific rules
-            user_rules = await self._get_user_rules(user_id)
-            active_rules = [rule for rule in user_rules if rule.enabled]
-            
-            # Validate against each rule
-            for rule in active_rules:
-                violation = await self._check_rule(rule, user_id, content_id, proposed_time, preferences)
-                if violation:
-                    violations.append(violation.message)
-                    if violation.blocking:
-                        can_publish = False
-                    if violation.suggestion:
-                        recommendations.append(violation.suggestion)
+            can_publish, violations, recommendations = self._run_checks(
+                rule_set, RuleCheckContext(user_id, content_id, proposed_time, snapshot)
+            )
             
             # Generate suggested optimal times
-            suggested_times = await self._generate_optimal_times(user_id, preferences)
+            suggested_times = await self._generate_optimal_times(user_id, preferences, rule_set.preferred_times)
             
             # Find next available slot
-            next_slot = await self._find_next_available_slot(user_id, preferences)
+            next_slot = await self._find_next_available_slot(
+                user_id, preferences, snapshot, quiet_hours=rule_set.quiet_hours
+            )
             
             # Get current daily count
             current_daily_count = 0
             if proposed_time:
-                current_daily_count = self.data_flow_manager.get_daily_post_count(
-                    user_id, proposed_time.date()
-                )
+                current_daily_count = snapshot.count_on_day(proposed_time.date())
             
             return RuleCheckResult(
                 can_publish=can_publish,
@@ -188,191 +336,298 @@ class InternalRulesEngine:
                 recommendations=["Please try again later"]
             )
     
-    async def _check_rule(self, rule: SchedulingRule, user_id: str, content_id: Optional[str],
-                         proposed_time: Optional[datetime], 
-                         preferences: SchedulingPreferences) -> Optional[RuleViolation]:
-        """Check a specific rule"""
-        try:
-            rule_type = rule.conditions.get("type")
-            
-            if rule_type == "daily_limit":
-                return await self._check_daily_limit_rule(rule, user_id, proposed_time, preferences)
+    async def load_schedule_snapshot(self, user_id: str, start_time: datetime, end_time: datetime,
+                                     exclude_content_id: Optional[str] = None) -> ScheduleSnapshot:
+        """Load a founder's posted and queued publish times for a time range"""
+        timestamps = self.data_flow_manager.get_schedule_timestamps(
+            user_id, start_time, end_time, exclude_content_id=exclude_content_id
+        )
+        return ScheduleSnapshot(timestamps)
+    
+    async def get_scheduling_preferences(self, user_id: str) -> SchedulingPreferences:
+        """Founder scheduling preferences the rules are compiled against (cached)"""
+        rule_set = await self._get_compiled_rules(user_id)
+        return rule_set.preferences
+    
+    def _snapshot_window(self, *times: Optional[datetime]) -> Tuple[datetime, datetime]:
+        """Whole-day range around the given times, padded by a day for interval checks"""
+        known = [t for t in times if t is not None]
+        start = datetime.combine(min(known).date(), time.min) - timedelta(days=1)
+        end = datetime.combine(max(known).date(), time.min) + timedelta(days=2)
+        return start, end
+    
+    async def validate_batch_schedule(self, user_id: str,
+                                      items: List[Tuple[str, datetime, str]],
+                                      preferences: Optional[SchedulingPreferences] = None
+                                      ) -> Dict[str, RuleCheckResult]:
+        """
+        Validate a batch of proposed publish times against one schedule snapshot
+        
+        Compiled rules and the founder's schedule are loaded once for the
+        whole batch. Items are checked in order and every
+        item that passes is added to the snapshot, so posts inside the batch
+        count against each other's daily limit and minimum interval.
+        
+        Args:
+            user_id: User ID
+            items: (content_id, proposed_time, content_text) tuples
+            preferences: User scheduling preferences
             
-            elif rule_type == "min_interval":
-                return await self._check_min_interval_rule(rule, user_id, proposed_time, preferences)
+        Returns:
+            Rule check result per content ID
+        """
+        if not items:
+            return {}
+        
+        try:
+            rule_set = await self._get_compiled_rules(user_id, preferences)
             
-            elif rule_type == "time_window":
-                return await self._check_time_window_rule(rule, user_id, proposed_time, preferences)
+            snapshot = await self.load_schedule_snapshot(
+                user_id, *self._snapshot_window(*[proposed_time for _, proposed_time, _ in items])
+            )
             
-            elif rule_type == "weekend_restriction":
-                return await self._check_weekend_rule(rule, user_id, proposed_time, preferences)
+            # Accepted batch items, so they are duplicate-checked against each other too
+            batch_index = LSHIndex()
             
-            elif rule_type == "duplicate_check":
-                return await self._check_duplicate_content_rule(rule, user_id, content_id)
+            results = {}
+            for content_id, proposed_time, content_text in items:
+                signature = self.similarity_index.signature(content_text)
+                can_publish, violations, recommendations = self._run_checks(
+                    rule_set,
+                    RuleCheckContext(user_id, content_id, proposed_time, snapshot, signature, batch_index)
+                )
+                
+                if can_publish:
+                    snapshot.add(proposed_time)
+                    batch_index.add(str(content_id), signature, proposed_time)
+                
+                results[content_id] = RuleCheckResult(
+                    can_publish=can_publish,
+                    violations=violations,
+                    recommendations=recommendations,
+                    current_daily_count=snapshot.count_on_day(proposed_time.date()),
+                    daily_limit=rule_set.preferences.max_posts_per_day
+                )
             
-            return None
+            return results
             
         except Exception as e:
-            logger.warning(f"Failed to check rule {rule.name}: {e}")
-            return None
+            logger.error(f"Failed to validate batch schedule: {e}")
+            return {
+                content_id: RuleCheckResult(
+                    can_publish=False,
+                    violations=[f"Rule validation failed: {str(e)}"],
+                    recommendations=["Please try again later"]
+                )
+                for content_id, _, _ in items
+            }
     
-    async def _check_daily_limit_rule(self, rule: SchedulingRule, user_id: str,
-                                    proposed_time: Optional[datetime],
-                                    preferences: SchedulingPreferences) -> Optional[RuleViolation]:
-        """Check daily posting limit rule"""
-        if not proposed_time:
-            return None
-        
-        max_posts = rule.conditions.get("max_posts_per_day", preferences.max_posts_per_day)
-        daily_count = self.data_flow_manager.get_daily_post_count(user_id, proposed_time.date())
+    # ==================== Compiled Rules ====================
+    
+    async def _get_compiled_rules(self, user_id: str,
+                                  preferences: Optional[SchedulingPreferences] = None) -> CompiledRuleSet:
+        """
+        Compiled rules for a founder, loading and compiling them on a cache miss
         
-        if daily_count >= max_posts:
-            return RuleViolation(
-                rule_name=rule.name,
-                severity=RuleSeverity.ERROR,
-                message=f"Daily posting limit ({max_posts}) would be exceeded (current: {daily_count})",
-                blocking=True,
-                suggestion="Consider scheduling for tomorrow"
-            )
+        Explicit preferences that differ from the founder's stored ones get a
+        one-off compilation so the cache only ever holds stored preferences.
+        """
+        rule_set = self.rules_cache.get(user_id)
+        if rule_set is None:
+            version = self.rules_cache.version(user_id)
+            stored_preferences = await self._get_user_preferences(user_id)
+            user_rules = await self._get_user_rules(user_id)
+            rule_set = self._compile_rules(user_rules, stored_preferences, version)
+            self.rules_cache.put(user_id, rule_set)
         
-        return None
+        if preferences is not None and preferences != rule_set.preferences:
+            return self._compile_rules(rule_set.rules, preferences, rule_set.version)
+        return rule_set
     
-    async def _check_min_interval_rule(self, rule: SchedulingRule, user_id: str,
-                                     proposed_time: Optional[datetime],
-                                     preferences: SchedulingPreferences) -> Optional[RuleViolation]:
-        """Check minimum interval rule"""
-        if not proposed_time:
-            return None
+    def _compile_rules(self, rules: List[SchedulingRule], preferences: SchedulingPreferences,
+                       version: int) -> CompiledRuleSet:
+        """Compile enabled rules into checks, in rule order"""
+        checks = []
+        for rule in rules:
+            if not rule.enabled:
+                continue
+            compiler = self._rule_compilers.get(rule.conditions.get("type"))
+            if compiler is None:
+                continue
+            try:
+                check = compiler(rule, preferences)
+            except Exception as e:
+                logger.warning(f"Failed to compile rule {rule.name}: {e}")
+                continue
+            if check is not None:
+                checks.append((rule.name, check))
+        return CompiledRuleSet(preferences, checks, rules, version)
+    
+    def _run_checks(self, rule_set: CompiledRuleSet,
+                    context: RuleCheckContext) -> Tuple[bool, List[str], List[str]]:
+        """Run compiled checks; returns (can_publish, violations, recommendations)"""
+        violations = []
+        recommendations = []
+        can_publish = True
         
-        min_interval = rule.conditions.get("min_minutes", preferences.min_interval_minutes)
-        last_post_time = self.data_flow_manager.get_last_post_time(user_id)
+        for rule_name, check in rule_set.checks:
+            try:
+                violation = check(context)
+            except Exception as e:
+                logger.warning(f"Failed to check rule {rule_name}: {e}")
+                continue
+            if violation:
+                violations.append(violation.message)
+                if violation.blocking:
+                    can_publish = False
+                if violation.suggestion:
+                    recommendations.append(violation.suggestion)
+        
+        return can_publish, violations, recommendations
+    
+    def _compile_daily_limit_rule(self, rule: SchedulingRule,
+                                  preferences: SchedulingPreferences) -> Optional[RuleCheck]:
+        max_posts = rule.conditions.get("max_posts_per_day", preferences.max_posts_per_day)
         
-        if last_post_time:
-            time_diff = (proposed_time - last_post_time).total_seconds() / 60
-            if time_diff < min_interval:
-                remaining_minutes = int(min_interval - time_diff)
+        def check(context: RuleCheckContext) -> Optional[RuleViolation]:
+            if not context.proposed_time:
+                return None
+            daily_count = context.snapshot.count_on_day(context.proposed_time.date())
+            if daily_count >= max_posts:
                 return RuleViolation(
                     rule_name=rule.name,
                     severity=RuleSeverity.ERROR,
-                    message=f"Minimum interval ({min_interval} minutes) not met. {remaining_minutes} minutes remaining.",
+                    message=f"Daily posting limit ({max_posts}) would be exceeded (current: {daily_count})",
                     blocking=True,
-                    suggestion=f"Schedule for {last_post_time + timedelta(minutes=min_interval)}"
+                    suggestion="Consider scheduling for tomorrow"
                 )
+            return None
         
-        return None
+        return check
     
-    async def _check_time_window_rule(self, rule: SchedulingRule, user_id: str,
-                                    proposed_time: Optional[datetime],
-                                    preferences: SchedulingPreferences) -> Optional[RuleViolation]:
-        """Check time window restrictions (quiet hours)"""
-        if not proposed_time:
+    def _compile_min_interval_rule(self, rule: SchedulingRule,
+                                   preferences: SchedulingPreferences) -> Optional[RuleCheck]:
+        min_interval = rule.conditions.get("min_minutes", preferences.min_interval_minutes)
+        min_seconds = min_interval * 60
+        
+        def check(context: RuleCheckContext) -> Optional[RuleViolation]:
+            proposed_time = context.proposed_time
+            if not proposed_time:
+                return None
+            # Checked against both neighbouring posts
+            for neighbour in (context.snapshot.last_before(proposed_time),
+                              context.snapshot.first_after(proposed_time)):
+                if neighbour is None:
+                    continue
+                gap_seconds = abs((proposed_time - neighbour).total_seconds())
+                if gap_seconds < min_seconds:
+                    return RuleViolation(
+                        rule_name=rule.name,
+                        severity=RuleSeverity.ERROR,
+                        message=f"Minimum interval ({min_interval} minutes) not met. "
+                                f"Another post is {int(gap_seconds / 60)} minutes away.",
+                        blocking=True,
+                        suggestion=f"Schedule at least {min_interval} minutes apart from {neighbour}"
+                    )
             return None
         
+        return check
+    
+    def _compile_time_window_rule(self, rule: SchedulingRule,
+                                  preferences: SchedulingPreferences) -> Optional[RuleCheck]:
         # Use rule-specific times or fall back to preferences
         start_time_str = rule.conditions.get("start_time", preferences.quiet_hours_start)
         end_time_str = rule.conditions.get("end_time", preferences.quiet_hours_end)
-        
         if not start_time_str or not end_time_str:
             return None
         
-        publish_time = proposed_time.time()
-        start_time = datetime.strptime(start_time_str, "%H:%M").time()
-        end_time = datetime.strptime(end_time_str, "%H:%M").time()
+        start_time = _parse_clock_time(start_time_str)
+        end_time = _parse_clock_time(end_time_str)
+        blocking = rule.actions.get("type") == "block"
         
-        # Handle overnight quiet hours (e.g., 22:00 to 08:00)
-        if start_time > end_time:
-            if publish_time >= start_time or publish_time <= end_time:
+        def check(context: RuleCheckContext) -> Optional[RuleViolation]:
+            if not context.proposed_time:
+                return None
+            if _in_time_window(context.proposed_time.time(), start_time, end_time):
                 return RuleViolation(
                     rule_name=rule.name,
                     severity=RuleSeverity.WARNING,
                     message=f"Posting during quiet hours ({start_time_str} - {end_time_str})",
-                    blocking=rule.actions.get("type") == "block",
+                    blocking=blocking,
                     suggestion="Consider scheduling during active hours"
                 )
-        else:
-            if start_time <= publish_time <= end_time:
+            return None
+        
+        return check
+    
+    def _compile_weekend_rule(self, rule: SchedulingRule,
+                              preferences: SchedulingPreferences) -> Optional[RuleCheck]:
+        allow_weekends = rule.conditions.get("allow_weekends", not preferences.avoid_weekends)
+        if allow_weekends:
+            return None
+        
+        def check(context: RuleCheckContext) -> Optional[RuleViolation]:
+            if context.proposed_time and context.proposed_time.weekday() >= 5:  # Saturday=5, Sunday=6
                 return RuleViolation(
                     rule_name=rule.name,
-                    severity=RuleSeverity.WARNING,
-                    message=f"Posting during quiet hours ({start_time_str} - {end_time_str})",
-                    blocking=rule.actions.get("type") == "block",
-                    suggestion="Consider scheduling during active hours"
+                    severity=RuleSeverity.ERROR,
+                    message="Weekend posting is disabled",
+                    blocking=True,
+                    suggestion="Schedule for a weekday"
                 )
-        
-        return None
-    
-    async def _check_weekend_rule(self, rule: SchedulingRule, user_id: str,
-                                proposed_time: Optional[datetime],
-                                preferences: SchedulingPreferences) -> Optional[RuleViolation]:
-        """Check weekend posting restrictions"""
-        if not proposed_time:
             return None
         
-        allow_weekends = rule.conditions.get("allow_weekends", not preferences.avoid_weekends)
+        return check
+    
+    def _compile_duplicate_content_rule(self, rule: SchedulingRule,
+                                        preferences: SchedulingPreferences) -> Optional[RuleCheck]:
+        similarity_threshold = rule.conditions.get("similarity_threshold", 0.8)
         
-        if not allow_weekends and proposed_time.weekday() >= 5:  # Saturday=5, Sunday=6
-            return RuleViolation(
-                rule_name=rule.name,
-                severity=RuleSeverity.ERROR,
-                message="Weekend posting is disabled",
-                blocking=True,
-                suggestion="Schedule for a weekday"
-            )
+        def check(context: RuleCheckContext) -> Optional[RuleViolation]:
+            signature = context.signature
+            if signature is None:
+                if not context.content_id:
+                    return None
+                content_draft = self.data_flow_manager.get_content_draft_by_id(context.content_id)
+                if not content_draft:
+                    return None
+                signature = self.similarity_index.signature(content_draft.final_text)
+            
+            if context.batch_index is not None and context.batch_index.query(signature, similarity_threshold):
+                return self._duplicate_content_violation(rule)
+            return self._find_duplicate(rule, context.user_id, context.content_id, signature)
         
-        return None
+        return check
     
-    async def _check_duplicate_content_rule(self, rule: SchedulingRule, user_id: str,
-                                          content_id: Optional[str]) -> Optional[RuleViolation]:
-        """Check for duplicate content"""
-        if not content_id:
-            return None
+    # ==================== Duplicate Content ====================
+    
+    def _find_duplicate(self, rule: SchedulingRule, user_id: str, content_id: Optional[str],
+                        signature: Signature) -> Optional[RuleViolation]:
+        """Look up near-duplicates among the founder's recently posted and scheduled content"""
+        check_period = rule.conditions.get("check_period_days", 7)
+        similarity_threshold = rule.conditions.get("similarity_threshold", 0.8)
         
-        try:
-            # Get content text
-            content_draft = self.data_flow_manager.get_content_draft_by_id(content_id)
-            if not content_draft:
-                return None
-            
-            content_text = content_draft.final_text
-            
-            # Check for similar content in the past week
-            check_period = rule.conditions.get("check_period_days", 7)
-            similarity_threshold = rule.conditions.get("similarity_threshold", 0.8)
-            
-            # Simple similarity check (would be more sophisticated in production)
-            recent_posts = self.data_flow_manager.get_recent_posts(user_id, check_period)
-            
-            for post in recent_posts:
-                if self._calculate_similarity(content_text, post.final_text) > similarity_threshold:
-                    return RuleViolation(
-                        rule_name=rule.name,
-                        severity=RuleSeverity.WARNING,
-                        message="Similar content was posted recently",
-                        blocking=False,
-                        suggestion="Consider modifying the content to make it more unique"
-                    )
-            
-            return None
-            
-        except Exception as e:
-            logger.warning(f"Failed to check duplicate content: {e}")
-            return None
+        matches = self.similarity_index.find_similar(
+            user_id, signature, similarity_threshold, self.data_flow_manager,
+            since=datetime.utcnow() - timedelta(days=check_period),
+            exclude_content_id=content_id
+        )
+        
+        return self._duplicate_content_violation(rule) if matches else None
+    
+    def _duplicate_content_violation(self, rule: SchedulingRule) -> RuleViolation:
+        return RuleViolation(
+            rule_name=rule.name,
+            severity=RuleSeverity.WARNING,
+            message="Similar content was posted recently",
+            blocking=False,
+            suggestion="Consider modifying the content to make it more unique"
+        )
     
     def _calculate_similarity(self, text1: str, text2: str) -> float:
-        """Simple text similarity calculation"""
+        """Text similarity (exact word-set Jaccard)"""
         try:
-            # Simple word-based similarity
-            words1 = set(text1.lower().split())
-            words2 = set(text2.lower().split())
-            
-            if not words1 or not words2:
-                return 0.0
-            
-            intersection = len(words1.intersection(words2))
-            union = len(words1.union(words2))
-            
-            return intersection / union if union > 0 else 0.0
-            
+            return text_similarity(text1, text2)
         except Exception:
             return 0.0
     
@@ -453,12 +708,16 @@ class InternalRulesEngine:
             logger.warning(f"Failed to get user rules, using defaults: {e}")
             return self.default_rules
     
-    async def _generate_optimal_times(self, user_id: str, preferences: SchedulingPreferences) -> List[datetime]:
-        """Generate suggested optimal posting times"""
+    async def _generate_optimal_times(self, user_id: str, preferences: SchedulingPreferences,
+                                      preferred_times: Optional[List[time]] = None) -> List[datetime]:
+        """Generate suggested optimal posting times (preferred_times: pre-parsed preferred posting times)"""
         try:
             suggested_times = []
             base_time = datetime.utcnow()
             
+            if preferred_times is None:
+                preferred_times = [_parse_clock_time(t) for t in preferences.preferred_posting_times]
+            
             # Generate suggestions for next 7 days
             for day_offset in range(7):
                 day = base_time + timedelta(days=day_offset)
@@ -468,9 +727,8 @@ class InternalRulesEngine:
                     continue
                 
                 # Use preferred times if available
-                if preferences.preferred_posting_times:
-                    for time_str in preferences.preferred_posting_times:
-                        time_obj = datetime.strptime(time_str, "%H:%M").time()
+                if preferred_times:
+                    for time_obj in preferred_times:
                         suggested_time = day.replace(
                             hour=time_obj.hour,
                             minute=time_obj.minute,
@@ -494,50 +752,60 @@ class InternalRulesEngine:
             logger.warning(f"Failed to generate optimal times: {e}")
             return []
     
-    async def _find_next_available_slot(self, user_id: str, preferences: SchedulingPreferences) -> Optional[datetime]:
-        """Find the next available publishing slot"""
+    async def _find_next_available_slot(self, user_id: str, preferences: SchedulingPreferences,
+                                        snapshot: Optional[ScheduleSnapshot] = None,
+                                        quiet_hours: Optional[Tuple[time, time]] = None) -> Optional[datetime]:
+        """
+        Find the next available publishing slot
+        
+        Hourly candidates over slot_search_horizon_hours are checked in memory
+        against a schedule snapshot; the snapshot is loaded with one query when
+        the caller does not pass one. quiet_hours takes pre-parsed quiet hours
+        and is parsed from preferences when omitted.
+        """
         try:
             current_time = datetime.utcnow()
             
             # Start checking from next hour
             check_time = current_time.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            horizon_end = check_time + timedelta(hours=self.slot_search_horizon_hours)
+            
+            if snapshot is None:
+                snapshot = await self.load_schedule_snapshot(
+                    user_id, *self._snapshot_window(current_time, horizon_end)
+                )
+            
+            if quiet_hours is None and preferences.quiet_hours_start and preferences.quiet_hours_end:
+                quiet_hours = (
+                    _parse_clock_time(preferences.quiet_hours_start),
+                    _parse_clock_time(preferences.quiet_hours_end)
+                )
+            min_interval = timedelta(minutes=preferences.min_interval_minutes)
             
-            # Check next 48 hours
-            for _ in range(48):
-                # Check rules individually to avoid infinite recursion
+            while check_time < horizon_end:
                 can_publish = True
                 
-                # Check daily limit
-                daily_count = self.data_flow_manager.get_daily_post_count(user_id, check_time.date())
-                if daily_count >= preferences.max_posts_per_day:
+                # Check weekend restriction
+                if preferences.avoid_weekends and check_time.weekday() >= 5:
                     can_publish = False
                 
-                # Check minimum interval
-                if can_publish:
-                    last_post_time = self.data_flow_manager.get_last_post_time(user_id)
-                    if last_post_time:
-                        time_diff = (check_time - last_post_time).total_seconds() / 60
-                        if time_diff < preferences.min_interval_minutes:
-                            can_publish = False
-                
-                # Check quiet hours
-                if can_publish and preferences.quiet_hours_start and preferences.quiet_hours_end:
-                    publish_time = check_time.time()
-                    start_time = datetime.strptime(preferences.quiet_hours_start, "%H:%M").time()
-                    end_time = datetime.strptime(preferences.quiet_hours_end, "%H:%M").time()
-                    
-                    # Handle overnight quiet hours
-                    if start_time > end_time:
-                        if publish_time >= start_time or publish_time <= end_time:
-                            can_publish = False
-                    else:
-                        if start_time <= publish_time <= end_time:
-                            can_publish = False
+                # Check quiet hours (handles overnight ranges)
+                if can_publish and quiet_hours is not None and _in_time_window(check_time.time(), *quiet_hours):
+                    can_publish = False
                 
-                # Check weekend restriction
-                if can_publish and preferences.avoid_weekends and check_time.weekday() >= 5:
+                # Check daily limit
+                if can_publish and snapshot.count_on_day(check_time.date()) >= preferences.max_posts_per_day:
                     can_publish = False
                 
+                # Check minimum interval against the neighbouring posts
+                if can_publish:
+                    previous_post = snapshot.last_before(check_time)
+                    next_post = snapshot.first_after(check_time)
+                    if previous_post and check_time - previous_post < min_interval:
+                        can_publish = False
+                    elif next_post and next_post - check_time < min_interval:
+                        can_publish = False
+                
                 if can_publish:
                     return check_time
                 
@@ -557,7 +825,10 @@ class InternalRulesEngine:
             rule_data = rule.dict()
             rule_data['user_id'] = user_id
             
-            return self.data_flow_manager.create_user_scheduling_rule(rule_data)
+            created = self.data_flow_manager.create_user_scheduling_rule(rule_data)
+            if created:
+                self.rules_cache.bump(user_id)
+            return created
             
         except Exception as e:
             logger.error(f"Failed to create custom rule: {e}")
@@ -566,7 +837,10 @@ class InternalRulesEngine:
     async def update_rule(self, user_id: str, rule_id: str, updates: Dict[str, Any]) -> bool:
         """Update an existing rule"""
         try:
-            return self.data_flow_manager.update_user_scheduling_rule(user_id, rule_id, updates)
+            updated = self.data_flow_manager.update_user_scheduling_rule(user_id, rule_id, updates)
+            if updated:
+                self.rules_cache.bump(user_id)
+            return updated
             
         except Exception as e:
             logger.error(f"Failed to update rule: {e}")
@@ -575,7 +849,10 @@ class InternalRulesEngine:
     async def delete_rule(self, user_id: str, rule_id: str) -> bool:
         """Delete a user rule"""
         try:
-            return self.data_flow_manager.delete_user_scheduling_rule(user_id, rule_id)
+            deleted = self.data_flow_manager.delete_user_scheduling_rule(user_id, rule_id)
+            if deleted:
+                self.rules_cache.bump(user_id)
+            return deleted
             
         except Exception as e:
             logger.error(f"Failed to delete rule: {e}")
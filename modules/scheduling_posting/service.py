@@ -4,18 +4,26 @@ This service handles the business logic for content scheduling and publishing,
 integrating with Twitter API, Rules Engine, and Data Flow Manager.
 """
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+import inspect
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta, timezone
 import logging
 import json
 from concurrent.futures import ThreadPoolExecutor
 import time
+import os
+import socket
+import uuid
 
 from database import DataFlowManager
-from modules.twitter_api import TwitterAPIClient, TwitterAPIError
+from modules.twitter_api import TwitterAPIClient, AsyncTwitterAPIClient, TwitterAPIError
 from modules.user_profile import UserProfileService
 
 from .rules_engine import InternalRulesEngine
+from .queue_processor import PublishingDaemon, get_publishing_daemon
+from .fair_scheduler import FairPublishScheduler, publishing_queue_metrics
+from .retry_policy import RetryPolicy
+from .slot_optimizer import SlotOptimizer
 from .models import (
     ScheduledContent, PublishStatus, ScheduleRequest, BatchScheduleRequest,
     PublishRequest, BatchPublishRequest, StatusUpdateRequest,
@@ -23,11 +31,20 @@ from .models import (
     RuleCheckResult, SchedulingQueueInfo, AutoScheduleSettings,
     PublishingConfiguration, PublishingMetrics, SchedulingRule,
     ContentQueueItem, ScheduleResponse, PublishResponse,
-    BatchOperationResponse, PublishingError, SchedulingPreferences
+    BatchOperationResponse, PublishingError, SchedulingPreferences,
+    BatchJobStatus, BatchJobItemStatus, DeadLetterItem,
+    DeadLetterRedriveRequest, DeadLetterRedriveResponse
 )
 
 logger = logging.getLogger(__name__)
 
+# Statuses of items still waiting in (or moving through) the publishing queue
+ACTIVE_QUEUE_STATUSES = (
+    PublishStatus.SCHEDULED.value,
+    PublishStatus.PUBLISHING.value,
+    PublishStatus.RETRY_PENDING.value
+)
+
 class SchedulingPostingService:
     """
     Service for handling content scheduling and publishing workflows
@@ -35,27 +52,50 @@ class SchedulingPostingService:
     
     def __init__(self, 
                  data_flow_manager: DataFlowManager,
-                 twitter_client: TwitterAPIClient,
+                 twitter_client: Union[TwitterAPIClient, AsyncTwitterAPIClient],
                  user_profile_service: UserProfileService,
-                 analytics_collector=None):
+                 analytics_collector=None,
+                 publisher: Optional[PublishingDaemon] = None):
         
         self.data_flow_manager = data_flow_manager
         self.twitter_client = twitter_client
         self.user_profile_service = user_profile_service
         self.analytics_collector = analytics_collector
         
-        # Initialize internal rules engine
-        self.rules_engine = InternalRulesEngine(data_flow_manager)
+        # Resident publisher to notify about queue changes (defaults to the app-wide daemon)
+        self._publisher = publisher
         
         # Configuration
         self.config = PublishingConfiguration()
         
+        # Initialize internal rules engine
+        self.rules_engine = InternalRulesEngine(
+            data_flow_manager,
+            slot_search_horizon_hours=self.config.slot_search_horizon_hours
+        )
+        
         # Thread pool for concurrent publishing
         self.executor = ThreadPoolExecutor(max_workers=self.config.max_concurrent_publishes)
         
         # Queue processing state
         self._queue_processing = False
         self._queue_lock = asyncio.Lock()
+        
+        # Founder-fair dispatcher for claimed queue items
+        self.fair_scheduler = FairPublishScheduler(
+            max_concurrency=self.config.max_concurrent_publishes,
+            per_founder_limit=self.config.max_in_flight_per_founder,
+            metrics=publishing_queue_metrics
+        )
+        
+        # Backoff and error classification for failed publishes
+        self.retry_policy = RetryPolicy(
+            base_delay_seconds=self.config.retry_base_delay_seconds,
+            max_delay_seconds=self.config.retry_max_delay_seconds
+        )
+        
+        # Lease owner for items this instance claims from the shared queue
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
     
     # ==================== Content Scheduling ====================
     
@@ -183,6 +223,9 @@ class SchedulingPostingService:
             saved_id = self.data_flow_manager.create_scheduled_content(scheduled_content_data)
             
             if saved_id:
+                self._notify_publisher_scheduled(saved_id, schedule_request.scheduled_time)
+                self._index_content(user_id, [(saved_id, content_draft.final_text, schedule_request.scheduled_time)])
+                
                 # Record analytics
                 await self._record_scheduling_analytics(user_id, 'content_scheduled')
                 
@@ -234,6 +277,8 @@ class SchedulingPostingService:
                     content_id,
                     {'status': 'approved', 'scheduled_post_time': None}
                 )
+                self._notify_publisher_removed(content_id)
+                self._unindex_content(user_id, content_id)
                 
                 # Record analytics
                 await self._record_scheduling_analytics(user_id, 'content_cancelled')
@@ -246,65 +291,199 @@ class SchedulingPostingService:
     
     async def batch_schedule_content(self, user_id: str, 
                                    batch_request: BatchScheduleRequest) -> BatchOperationResponse:
-        """Schedule multiple content items"""
+        """
+        Schedule multiple content items
+        
+        Drafts are loaded in one query and validated together against a single
+        snapshot of the founder's schedule, so items in the batch count against
+        each other's limits. Accepted items are written in one transaction.
+        
+        Without a schedule_time, SlotOptimizer assigns every draft a free slot
+        from the founder's preferences in one pass.
+        """
+        total_items = len(batch_request.content_ids)
+        
         try:
-            logger.info(f"Batch scheduling {len(batch_request.content_ids)} items for user {user_id}")
+            logger.info(f"Batch scheduling {total_items} items for user {user_id}")
             
             results = {}
-            successful_items = 0
+            drafts = self.data_flow_manager.get_content_drafts_by_ids(batch_request.content_ids)
             
+            # (position, content_id, draft) for drafts that may be scheduled
+            eligible = []
             for i, content_id in enumerate(batch_request.content_ids):
-                try:
-                    # Calculate staggered time
-                    if batch_request.schedule_time:
-                        scheduled_time = batch_request.schedule_time + timedelta(
-                            minutes=i * batch_request.stagger_minutes
-                        )
+                draft = drafts.get(str(content_id))
+                if not draft or str(draft.founder_id) != str(user_id):
+                    results[content_id] = ScheduleResponse(
+                        success=False,
+                        message="Content not found or access denied"
+                    )
+                    continue
+                
+                if draft.status not in ['approved']:
+                    results[content_id] = ScheduleResponse(
+                        success=False,
+                        message=f"Content status '{draft.status}' is not valid for scheduling"
+                    )
+                    continue
+                
+                eligible.append((i, content_id, draft))
+            
+            if batch_request.schedule_time:
+                base_time = batch_request.schedule_time
+                if base_time.tzinfo is not None:
+                    base_time = base_time.astimezone(timezone.utc).replace(tzinfo=None)
+                slot_times = {
+                    content_id: base_time + timedelta(minutes=i * batch_request.stagger_minutes)
+                    for i, content_id, _ in eligible
+                }
+            else:
+                # Auto-schedule: pack every draft into free slots in one pass
+                slot_times = await self._assign_optimal_slots(
+                    user_id,
+                    [(content_id, getattr(draft, 'priority', None) or 5) for _, content_id, draft in eligible],
+                    weight_by_priority=batch_request.weight_by_priority
+                )
+            
+            # (content_id, scheduled_time, content_text) for drafts that may be scheduled
+            candidates = []
+            for _, content_id, draft in eligible:
+                scheduled_time = slot_times.get(content_id)
+                if scheduled_time is None:
+                    results[content_id] = ScheduleResponse(
+                        success=False,
+                        message=f"No free publishing slot in the next {self.config.auto_schedule_horizon_days} days"
+                    )
+                    continue
+                candidates.append((content_id, scheduled_time, draft.final_text))
+            
+            if candidates and not batch_request.skip_rules_check:
+                rule_checks = await self.rules_engine.validate_batch_schedule(user_id, candidates)
+                
+                accepted = []
+                for candidate in candidates:
+                    rule_check = rule_checks[candidate[0]]
+                    if rule_check.can_publish:
+                        accepted.append(candidate)
                     else:
-                        # Auto-schedule based on preferences
-                        scheduled_time = await self._calculate_optimal_schedule_time(
-                            user_id, content_id
+                        results[candidate[0]] = ScheduleResponse(
+                            success=False,
+                            message="Scheduling violates publishing rules",
+                            rule_violations=rule_check.violations
                         )
-                    
-                    # Create individual schedule request
-                    schedule_request = ScheduleRequest(
-                        content_id=content_id,
-                        scheduled_time=scheduled_time,
-                        timezone=batch_request.timezone
-                    )
-                    
-                    # Schedule individual item
-                    result = await self.schedule_content(user_id, schedule_request)
-                    results[content_id] = result
-                    
-                    if result.success:
-                        successful_items += 1
-                        
-                except Exception as e:
-                    logger.error(f"Failed to schedule content {content_id}: {e}")
+                candidates = accepted
+            
+            scheduled_ids = set(self.data_flow_manager.bulk_schedule_content([
+                {
+                    'content_draft_id': content_id,
+                    'founder_id': user_id,
+                    'scheduled_time': scheduled_time,
+                    'status': 'scheduled',
+                    'platform': 'twitter',
+                    'created_by': user_id
+                }
+                for content_id, scheduled_time, _ in candidates
+            ]))
+            
+            self._index_content(user_id, [
+                candidate for candidate in candidates if str(candidate[0]) in scheduled_ids
+            ])
+            
+            successful_items = 0
+            for content_id, scheduled_time, _ in candidates:
+                if str(content_id) not in scheduled_ids:
                     results[content_id] = ScheduleResponse(
                         success=False,
-                        message=f"Scheduling failed: {str(e)}"
+                        message="Failed to save scheduled content"
                     )
+                    continue
+                
+                successful_items += 1
+                self._notify_publisher_scheduled(content_id, scheduled_time)
+                await self._record_scheduling_analytics(user_id, 'content_scheduled')
+                results[content_id] = ScheduleResponse(
+                    success=True,
+                    scheduled_content_id=str(content_id),
+                    scheduled_time=scheduled_time,
+                    message="Content scheduled successfully"
+                )
             
             return BatchOperationResponse(
-                total_items=len(batch_request.content_ids),
+                total_items=total_items,
                 successful_items=successful_items,
-                failed_items=len(batch_request.content_ids) - successful_items,
+                failed_items=total_items - successful_items,
                 results=results,
-                message=f"Batch scheduling completed: {successful_items}/{len(batch_request.content_ids)} successful"
+                message=f"Batch scheduling completed: {successful_items}/{total_items} successful"
             )
             
         except Exception as e:
             logger.error(f"Batch scheduling failed: {e}")
             return BatchOperationResponse(
-                total_items=len(batch_request.content_ids),
+                total_items=total_items,
                 successful_items=0,
-                failed_items=len(batch_request.content_ids),
+                failed_items=total_items,
                 results={},
                 message=f"Batch scheduling failed: {str(e)}"
             )
     
+    async def _assign_optimal_slots(self, user_id: str, requests: List[Tuple[str, int]],
+                                    weight_by_priority: bool = True,
+                                    preferences: Optional[SchedulingPreferences] = None) -> Dict[str, datetime]:
+        """Assign free slots to (content_id, priority) requests against one schedule snapshot"""
+        if not requests:
+            return {}
+        
+        preferences = preferences or await self.rules_engine.get_scheduling_preferences(user_id)
+        now = datetime.utcnow()
+        horizon_days = self.config.auto_schedule_horizon_days
+        snapshot = await self.rules_engine.load_schedule_snapshot(
+            user_id, now - timedelta(days=1), now + timedelta(days=horizon_days + 1)
+        )
+        
+        optimizer = SlotOptimizer(
+            preferences,
+            slot_step_minutes=self.config.auto_schedule_slot_step_minutes,
+            horizon_days=horizon_days
+        )
+        return optimizer.assign(requests, snapshot, earliest=now, weight_by_priority=weight_by_priority)
+    
+    async def auto_schedule_all_founders(self, limit_per_founder: int = 50) -> Dict[str, int]:
+        """
+        Nightly auto-scheduling across founders
+        
+        Every founder with auto_schedule_enabled gets up to limit_per_founder
+        approved drafts packed into free slots and scheduled.
+        
+        Returns:
+            Number of drafts scheduled per founder ID
+        """
+        summary = {}
+        
+        for founder_id in self.data_flow_manager.get_auto_schedule_founder_ids():
+            try:
+                drafts = self.data_flow_manager.get_content_drafts_by_status(
+                    founder_id, ['approved'], limit=limit_per_founder
+                )
+                if not drafts:
+                    continue
+                
+                # Batches are capped at 50 items; later chunks see earlier chunks' slots
+                content_ids = [str(draft.id) for draft in drafts]
+                scheduled = 0
+                for start in range(0, len(content_ids), 50):
+                    result = await self.batch_schedule_content(
+                        founder_id,
+                        BatchScheduleRequest(content_ids=content_ids[start:start + 50])
+                    )
+                    scheduled += result.successful_items
+                summary[founder_id] = scheduled
+                
+            except Exception as e:
+                logger.error(f"Auto-scheduling failed for founder {founder_id}: {e}")
+        
+        logger.info(f"Auto-scheduled {sum(summary.values())} drafts for {len(summary)} founders")
+        return summary
+    
     # ==================== Content Publishing ====================
     
     async def publish_content_immediately(self, user_id: str, 
@@ -357,51 +536,42 @@ class SchedulingPostingService:
     
     async def batch_publish_content(self, user_id: str,
                                   batch_request: BatchPublishRequest) -> BatchOperationResponse:
-        """Publish multiple content items"""
+        """
+        Queue multiple content items for publishing as one batch job
+        
+        Items become individually scheduled queue entries, staggered from
+        schedule_time (or now) by stagger_minutes, and the resident publisher
+        works through them. Returns at once with a job ID whose progress is
+        reported by get_batch_job_status.
+        """
+        job_id = str(uuid.uuid4())
+        
         try:
-            logger.info(f"Batch publishing {len(batch_request.content_ids)} items for user {user_id}")
+            logger.info(f"Queueing batch publish job {job_id} with {len(batch_request.content_ids)} items for user {user_id}")
+            
+            base_time = batch_request.schedule_time or datetime.utcnow()
+            if base_time.tzinfo is not None:
+                base_time = base_time.astimezone(timezone.utc).replace(tzinfo=None)
             
             results = {}
             successful_items = 0
             
             for i, content_id in enumerate(batch_request.content_ids):
                 try:
-                    # Add stagger delay for batch operations
-                    if i > 0:
-                        await asyncio.sleep(batch_request.stagger_minutes * 60)
-                    
-                    # Create individual publish request
-                    publish_request = PublishRequest(
-                        content_id=content_id,
-                        force_publish=batch_request.force_publish
+                    scheduled_time = base_time + timedelta(minutes=i * batch_request.stagger_minutes)
+                    result = await self._queue_batch_item(
+                        user_id, content_id, scheduled_time, job_id, batch_request.force_publish
                     )
-                    
-                    # Publish individual item
-                    if batch_request.schedule_time:
-                        # Schedule for later
-                        scheduled_time = batch_request.schedule_time + timedelta(
-                            minutes=i * batch_request.stagger_minutes
-                        )
-                        schedule_request = ScheduleRequest(
-                            content_id=content_id,
-                            scheduled_time=scheduled_time
-                        )
-                        result = await self.schedule_content(user_id, schedule_request)
-                    else:
-                        # Publish immediately
-                        result = await self.publish_content_immediately(user_id, publish_request)
-                    
                     results[content_id] = result
                     
                     if result.success:
                         successful_items += 1
                         
                 except Exception as e:
-                    logger.error(f"Failed to publish content {content_id}: {e}")
-                    results[content_id] = PublishResponse(
+                    logger.error(f"Failed to queue content {content_id}: {e}")
+                    results[content_id] = ScheduleResponse(
                         success=False,
-                        message=f"Publishing failed: {str(e)}",
-                        error_code="BATCH_PUBLISH_ERROR"
+                        message=f"Queueing failed: {str(e)}"
                     )
             
             return BatchOperationResponse(
@@ -409,7 +579,8 @@ class SchedulingPostingService:
                 successful_items=successful_items,
                 failed_items=len(batch_request.content_ids) - successful_items,
                 results=results,
-                message=f"Batch publishing completed: {successful_items}/{len(batch_request.content_ids)} successful"
+                message=f"Batch publishing queued: {successful_items}/{len(batch_request.content_ids)} items",
+                job_id=job_id
             )
             
         except Exception as e:
@@ -419,9 +590,102 @@ class SchedulingPostingService:
                 successful_items=0,
                 failed_items=len(batch_request.content_ids),
                 results={},
-                message=f"Batch publishing failed: {str(e)}"
+                message=f"Batch publishing failed: {str(e)}",
+                job_id=job_id
             )
     
+    async def _queue_batch_item(self, user_id: str, content_id: str, scheduled_time: datetime,
+                                job_id: str, force_publish: bool) -> ScheduleResponse:
+        """Validate one batch item and add it to the publishing queue"""
+        content_draft = self.data_flow_manager.get_content_draft_by_id(content_id)
+        if not content_draft or str(content_draft.founder_id) != str(user_id):
+            return ScheduleResponse(
+                success=False,
+                message="Content not found or access denied"
+            )
+        
+        if content_draft.status not in ['approved']:
+            return ScheduleResponse(
+                success=False,
+                message=f"Content status '{content_draft.status}' is not valid for publishing"
+            )
+        
+        if not force_publish:
+            rule_check = await self.check_publishing_rules(user_id, content_id, scheduled_time)
+            if not rule_check.can_publish:
+                return ScheduleResponse(
+                    success=False,
+                    message="Publishing violates rules. Use force_publish to override.",
+                    rule_violations=rule_check.violations
+                )
+        
+        saved_id = self.data_flow_manager.create_scheduled_content({
+            'content_draft_id': content_id,
+            'founder_id': user_id,
+            'scheduled_time': scheduled_time,
+            'status': 'scheduled',
+            'platform': 'twitter',
+            'created_by': user_id,
+            'batch_job_id': job_id
+        })
+        
+        if not saved_id:
+            return ScheduleResponse(
+                success=False,
+                message="Failed to queue content"
+            )
+        
+        self._notify_publisher_scheduled(saved_id, scheduled_time)
+        self._index_content(user_id, [(saved_id, content_draft.final_text, scheduled_time)])
+        return ScheduleResponse(
+            success=True,
+            scheduled_content_id=saved_id,
+            scheduled_time=scheduled_time,
+            message="Content queued for publishing"
+        )
+    
+    async def get_batch_job_status(self, user_id: str, job_id: str) -> Optional[BatchJobStatus]:
+        """Get per-item progress of a batch publishing job, or None if unknown"""
+        try:
+            rows = self.data_flow_manager.get_batch_job_items(job_id, founder_id=user_id)
+            if not rows:
+                return None
+            
+            items = [
+                BatchJobItemStatus(
+                    content_id=str(row.id),
+                    status=row.status,
+                    scheduled_time=row.scheduled_post_time,
+                    posted_at=row.posted_at,
+                    posted_tweet_id=row.posted_tweet_id,
+                    error_message=row.error_message,
+                    retry_count=row.retry_count or 0
+                )
+                for row in rows
+            ]
+            
+            status_counts: Dict[str, int] = {}
+            for item in items:
+                status_counts[item.status] = status_counts.get(item.status, 0) + 1
+            
+            pending_times = [
+                item.scheduled_time for item in items
+                if item.status in ACTIVE_QUEUE_STATUSES and item.scheduled_time
+            ]
+            
+            return BatchJobStatus(
+                job_id=job_id,
+                total_items=len(items),
+                status_counts=status_counts,
+                completed=not any(item.status in ACTIVE_QUEUE_STATUSES for item in items),
+                next_publish_time=min(pending_times) if pending_times else None,
+                items=items
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to get batch job status for {job_id}: {e}")
+            return None
+    
     async def update_publishing_status(self, user_id: str, content_id: str,
                                      status_request: StatusUpdateRequest) -> bool:
         """
@@ -443,10 +707,12 @@ class SchedulingPostingService:
                 logger.warning(f"Content draft not found for {content_id}")
                 return False
             
-            # Prepare update data
+            # Prepare update data (any status change ends the publishing lease)
             update_data = {
                 'status': status_request.status.value,
-                'updated_at': datetime.utcnow()
+                'updated_at': datetime.utcnow(),
+                'lease_owner': None,
+                'lease_expires_at': None
             }
             
             # Handle successful posting
@@ -470,17 +736,24 @@ class SchedulingPostingService:
                 # Update error fields directly (GeneratedContentDraft has error_message and error_code)
                 update_data['error_message'] = status_request.error_message or "Publishing failed"
                 update_data['error_code'] = status_request.error_code or "UNKNOWN_ERROR"
-                update_data['retry_count'] = (scheduled_content.retry_count or 0) + 1
+                retry_count = scheduled_content.retry_count or 0
+                max_retries = scheduled_content.max_retries or self.config.default_max_retries
+                update_data['retry_count'] = retry_count + 1
                 
-                # Schedule retry if appropriate
-                if (scheduled_content.retry_count < scheduled_content.max_retries and 
-                    status_request.retry_scheduled):
-                    update_data['status'] = PublishStatus.RETRY_PENDING.value
-                    
-                    # Calculate retry time
-                    retry_delay = self._calculate_retry_delay(scheduled_content.retry_count or 0)
-                    retry_time = datetime.utcnow() + timedelta(minutes=retry_delay)
-                    update_data['scheduled_post_time'] = retry_time
+                # Retryable failures back off until the retry budget runs out, then dead-letter
+                if status_request.retry_scheduled:
+                    if retry_count < max_retries:
+                        update_data['status'] = PublishStatus.RETRY_PENDING.value
+                        retry_delay = self.retry_policy.next_delay(retry_count, status_request.retry_after_seconds)
+                        update_data['scheduled_post_time'] = datetime.utcnow() + timedelta(seconds=retry_delay)
+                    else:
+                        update_data['status'] = PublishStatus.DEAD_LETTER.value
+                        logger.warning(f"Content {content_id} dead-lettered after {retry_count + 1} attempts")
+            
+            # Parked until the founder reconnects Twitter; no attempt was made, so no retry is spent
+            elif status_request.status == PublishStatus.NEEDS_REAUTH:
+                update_data['error_message'] = status_request.error_message or "Twitter re-authorization required"
+                update_data['error_code'] = status_request.error_code or "NEEDS_REAUTH"
             
             # Update content draft (consolidated table)
             success = self.data_flow_manager.update_content_draft(
@@ -488,6 +761,14 @@ class SchedulingPostingService:
             )
             
             if success:
+                if update_data['status'] == PublishStatus.RETRY_PENDING.value:
+                    self._notify_publisher_scheduled(content_id, update_data['scheduled_post_time'])
+                else:
+                    self._notify_publisher_removed(content_id)
+                
+                if update_data['status'] in (PublishStatus.FAILED.value, PublishStatus.CANCELLED.value):
+                    self._unindex_content(user_id, content_id)
+                
                 # Record analytics
                 await self._record_publishing_analytics(
                     user_id, status_request.status.value, content_id
@@ -499,41 +780,101 @@ class SchedulingPostingService:
             logger.error(f"Failed to update publishing status: {e}")
             return False
     
+    # ==================== Dead Letter ====================
+    
+    async def get_dead_letter_content(self, user_id: str, limit: int = 100) -> List[DeadLetterItem]:
+        """Get content that exhausted its publishing retries"""
+        try:
+            drafts = self.data_flow_manager.get_dead_letter_content(user_id, limit)
+            
+            items = []
+            for draft in drafts:
+                content_text = draft.final_text or ""
+                items.append(DeadLetterItem(
+                    content_id=str(draft.id),
+                    content_preview=content_text[:100] + "..." if len(content_text) > 100 else content_text,
+                    scheduled_time=draft.scheduled_post_time,
+                    error_code=draft.error_code,
+                    error_message=draft.error_message,
+                    retry_count=draft.retry_count or 0,
+                    status=PublishStatus(draft.status),
+                    updated_at=draft.updated_at
+                ))
+            return items
+            
+        except Exception as e:
+            logger.error(f"Failed to get dead-letter content: {e}")
+            return []
+    
+    async def redrive_dead_letter_content(self, user_id: str,
+                                          redrive_request: DeadLetterRedriveRequest) -> DeadLetterRedriveResponse:
+        """
+        Re-queue dead-lettered content in bulk
+        
+        Re-driven items get a fresh retry budget and are published at the
+        requested time (now by default).
+        """
+        try:
+            scheduled_time = redrive_request.scheduled_time or datetime.utcnow()
+            if scheduled_time.tzinfo is not None:
+                scheduled_time = scheduled_time.astimezone(timezone.utc).replace(tzinfo=None)
+            
+            content_ids = self.data_flow_manager.redrive_dead_letter_content(
+                user_id, redrive_request.content_ids, scheduled_time
+            )
+            
+            for content_id in content_ids:
+                self._notify_publisher_scheduled(content_id, scheduled_time)
+            
+            if content_ids:
+                await self._record_scheduling_analytics(user_id, 'dead_letter_redriven')
+            
+            return DeadLetterRedriveResponse(
+                redriven_count=len(content_ids),
+                content_ids=content_ids,
+                scheduled_time=scheduled_time if content_ids else None,
+                message=f"Re-queued {len(content_ids)} dead-lettered items"
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to re-drive dead-letter content: {e}")
+            return DeadLetterRedriveResponse(
+                redriven_count=0,
+                message=f"Re-drive failed: {str(e)}"
+            )
+    
     # ==================== Publishing History and Analytics ====================
     
-    async def get_publishing_history(self, user_id: str, limit: int = 20, 
-                                   offset: int = 0) -> List[PublishingHistoryItem]:
-        """Get publishing history for a user"""
+    async def get_publishing_history(self, user_id: str, limit: int = 20,
+                                   cursor: Optional[str] = None) -> List[PublishingHistoryItem]:
+        """
+        Get a page of publishing history for a user, newest first
+        
+        Pass the last item's cursor to get the next page.
+        
+        Raises:
+            ValueError: If cursor is malformed
+        """
         try:
-            # Get scheduled content with associated draft information
-            history_data = self.data_flow_manager.get_publishing_history(user_id, limit, offset)
+            history_data = self.data_flow_manager.get_publishing_history(user_id, limit, cursor)
             
             history_items = []
             for item in history_data:
                 try:
-                    # Get content preview
-                    content_draft = self.data_flow_manager.get_content_draft_by_id(
-                        item.content_draft_id
-                    )
-                    content_preview = ""
-                    if content_draft:
-                        content_text = content_draft.final_text
-                        content_preview = content_text[:100] + "..." if len(content_text) > 100 else content_text
-                    
-                    history_item = PublishingHistoryItem(
-                        content_id=item.content_draft_id,
-                        scheduled_content_id=str(item.id),
-                        content_preview=content_preview,
-                        scheduled_time=item.scheduled_time,
-                        posted_at=item.posted_at,
-                        status=PublishStatus(item.status),
-                        posted_tweet_id=item.posted_tweet_id,
-                        platform=getattr(item, 'platform', 'twitter'),
-                        error_message=item.error_info.get('error_message') if item.error_info else None,
-                        retry_count=getattr(item, 'retry_count', 0),
-                        tags=getattr(item, 'tags', []) or []
-                    )
-                    history_items.append(history_item)
+                    history_items.append(PublishingHistoryItem(
+                        content_id=item['content_id'],
+                        scheduled_content_id=item['content_id'],
+                        content_preview=item['content_preview'],
+                        scheduled_time=item['scheduled_time'],
+                        posted_at=item['posted_at'],
+                        status=PublishStatus(item['status']),
+                        posted_tweet_id=item['posted_tweet_id'],
+                        platform=item['platform'],
+                        error_message=item['error_message'],
+                        retry_count=item['retry_count'],
+                        tags=item['tags'],
+                        cursor=item['cursor']
+                    ))
                     
                 except Exception as e:
                     logger.warning(f"Failed to convert history item: {e}")
@@ -541,6 +882,8 @@ class SchedulingPostingService:
             
             return history_items
             
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get publishing history: {e}")
             return []
@@ -548,7 +891,7 @@ class SchedulingPostingService:
     async def get_publishing_analytics(self, user_id: str, days: int = 30) -> PublishingAnalytics:
         """Get publishing analytics for a user"""
         try:
-            # Get analytics data from database
+            # Summed from the founder's daily rollups, at most `days` rows per platform
             analytics_data = self.data_flow_manager.get_publishing_analytics(user_id, days)
             
             total_scheduled = analytics_data.get('total_scheduled', 0)
@@ -557,9 +900,9 @@ class SchedulingPostingService:
             
             success_rate = (total_published / max(total_scheduled, 1)) * 100
             
-            # Calculate average delay
-            publish_delays = analytics_data.get('publish_delays', [])
-            avg_delay = sum(publish_delays) / max(len(publish_delays), 1)
+            # Average delay from the rolled-up delay sum (seconds)
+            delay_seconds_sum = analytics_data.get('delay_seconds_sum', 0.0)
+            avg_delay = delay_seconds_sum / 60 / max(analytics_data.get('delay_count', 0), 1)
             
             # Get error breakdown
             error_counts = analytics_data.get('error_breakdown', {})
@@ -678,57 +1021,125 @@ class SchedulingPostingService:
             self._queue_processing = True
             
             try:
-                logger.info("Starting queue processing")
+                logger.debug("Starting queue processing")
                 
                 processed_count = 0
                 success_count = 0
                 error_count = 0
                 
-                # Get items ready for publishing
-                ready_items = self.data_flow_manager.get_ready_for_publishing(
-                    limit=self.config.max_concurrent_publishes
+                # Claim due items under a lease so other workers skip them
+                ready_items = self.data_flow_manager.claim_due_content(
+                    worker_id=self.worker_id,
+                    limit=self.config.queue_batch_size,
+                    lease_seconds=self.config.publish_lease_seconds,
+                    per_founder_limit=self.config.max_claimed_per_founder
                 )
                 
-                # Process items concurrently
-                tasks = []
-                for item in ready_items:
-                    task = self._process_queue_item(item)
-                    tasks.append(task)
+                # One credentials query for every founder in the tick
+                access_tokens = await self._prefetch_access_tokens(ready_items)
                 
-                if tasks:
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-                    
-                    for result in results:
-                        processed_count += 1
-                        if isinstance(result, Exception):
-                            error_count += 1
-                            logger.error(f"Queue processing error: {result}")
-                        elif result.get('success', False):
-                            success_count += 1
-                        else:
-                            error_count += 1
+                # Founders known to lack a valid token are parked before any Twitter call
+                needs_reauth_items = [
+                    item for item in ready_items
+                    if item.founder_id in access_tokens and not access_tokens[item.founder_id]
+                ]
+                for item in needs_reauth_items:
+                    await self.update_publishing_status(
+                        item.founder_id,
+                        item.content_draft_id,
+                        StatusUpdateRequest(
+                            status=PublishStatus.NEEDS_REAUTH,
+                            error_message="Twitter account not connected or token expired",
+                            error_code="NEEDS_REAUTH"
+                        )
+                    )
+                
+                parked_ids = {item.content_draft_id for item in needs_reauth_items}
+                publishable_items = [item for item in ready_items if item.content_draft_id not in parked_ids]
+                
+                # Dispatch with global/per-founder limits, round-robin across founders
+                results = await self.fair_scheduler.run(
+                    publishable_items,
+                    lambda item: self._process_queue_item(item, access_tokens.get(item.founder_id))
+                )
+                
+                for result in results:
+                    processed_count += 1
+                    if isinstance(result, Exception):
+                        error_count += 1
+                        logger.error(f"Queue processing error: {result}")
+                    elif result.get('success', False):
+                        success_count += 1
+                    else:
+                        error_count += 1
                 
                 logger.info(f"Queue processing completed: {processed_count} processed, "
-                           f"{success_count} successful, {error_count} errors")
+                           f"{success_count} successful, {error_count} errors, "
+                           f"{len(needs_reauth_items)} need re-authorization")
                 
                 return {
                     'status': 'completed',
                     'processed_count': processed_count,
                     'success_count': success_count,
-                    'error_count': error_count
+                    'error_count': error_count,
+                    'needs_reauth_count': len(needs_reauth_items)
                 }
                 
             finally:
                 self._queue_processing = False
     
+    def get_queue_metrics(self) -> Dict[str, Any]:
+        """Get process-wide queue depth, in-flight and per-founder wait metrics"""
+        metrics = self.fair_scheduler.metrics.snapshot()
+        metrics['limits'] = {
+            'max_concurrent_publishes': self.config.max_concurrent_publishes,
+            'max_in_flight_per_founder': self.config.max_in_flight_per_founder,
+            'queue_batch_size': self.config.queue_batch_size,
+            'max_claimed_per_founder': self.config.max_claimed_per_founder
+        }
+        return metrics
+    
     # ==================== Helper Methods ====================
     
+    @property
+    def publisher(self) -> Optional[PublishingDaemon]:
+        """Publishing daemon to notify, if one is running"""
+        return self._publisher or get_publishing_daemon()
+    
+    def _notify_publisher_scheduled(self, content_id: str, scheduled_time: datetime) -> None:
+        """Tell the resident publisher about a new or changed due time"""
+        publisher = self.publisher
+        if publisher and scheduled_time:
+            publisher.notify_scheduled(content_id, scheduled_time)
+    
+    def _notify_publisher_removed(self, content_id: str) -> None:
+        """Tell the resident publisher an item no longer needs publishing"""
+        publisher = self.publisher
+        if publisher:
+            publisher.notify_removed(content_id)
+    
+    def _index_content(self, user_id: str, entries: List[Tuple[str, str, datetime]]) -> None:
+        """Add scheduled or posted (content_id, text, time) entries to the near-duplicate index"""
+        try:
+            self.rules_engine.similarity_index.record_many(user_id, entries, self.data_flow_manager)
+        except Exception as e:
+            logger.warning(f"Failed to index content signatures: {e}")
+    
+    def _unindex_content(self, user_id: str, content_id: str) -> None:
+        """Remove content that will no longer be published from the near-duplicate index"""
+        try:
+            self.rules_engine.similarity_index.discard(user_id, content_id, self.data_flow_manager)
+        except Exception as e:
+            logger.warning(f"Failed to remove content signature for {content_id}: {e}")
+    
     async def _publish_to_twitter(self, user_id: str, content_draft, 
-                                publish_request: PublishRequest) -> PublishResponse:
-        """Perform actual Twitter publishing"""
+                                publish_request: PublishRequest,
+                                access_token: Optional[str] = None) -> PublishResponse:
+        """Perform actual Twitter publishing (access_token is looked up when not prefetched)"""
         try:
             # Get user's Twitter access token
-            access_token = self.user_profile_service.get_twitter_access_token(user_id)
+            if not access_token:
+                access_token = self.user_profile_service.get_twitter_access_token(user_id)
             if not access_token:
                 return PublishResponse(
                     success=False,
@@ -753,6 +1164,9 @@ class SchedulingPostingService:
                     user_token=access_token,
                     text=tweet_text
                 )
+                # AsyncTwitterAPIClient returns a coroutine so concurrent publishes overlap
+                if inspect.isawaitable(tweet_result):
+                    tweet_result = await tweet_result
                 
                 if tweet_result and 'data' in tweet_result:
                     tweet_id = tweet_result['data']['id']
@@ -767,6 +1181,7 @@ class SchedulingPostingService:
                         }
                     )
                     logger.info(f"Content posted to twitter successfully: {tweet_id}")
+                    self._index_content(user_id, [(publish_request.content_id, tweet_text, datetime.utcnow())])
                     
                     # Record analytics
                     await self._record_publishing_analytics(user_id, 'posted', publish_request.content_id)
@@ -786,6 +1201,7 @@ class SchedulingPostingService:
                     
             except TwitterAPIError as e:
                 logger.error(f"Twitter API error: {e}")
+                error_code, retryable, retry_after = self.retry_policy.classify(e)
                 # # 发布失败时清理草稿和相关数据
                 # try:
                 #     await self._cleanup_failed_draft(user_id, content_draft.id)
@@ -795,7 +1211,9 @@ class SchedulingPostingService:
                 return PublishResponse(
                     success=False,
                     message=f"Twitter API error: {str(e)}",
-                    error_code="TWITTER_API_ERROR"
+                    error_code=error_code,
+                    retryable=retryable,
+                    retry_after_seconds=retry_after
                 )
                 
         except Exception as e:
@@ -814,7 +1232,25 @@ class SchedulingPostingService:
                 error_code="PUBLISH_ERROR"
             )
     
-    async def _process_queue_item(self, queue_item: ContentQueueItem) -> Dict[str, Any]:
+    async def _prefetch_access_tokens(self, queue_items: List[ContentQueueItem]) -> Dict[str, Optional[str]]:
+        """
+        Load and decrypt the Twitter tokens of every founder in a tick at once
+        
+        Founders missing from the result could not be looked up; their items
+        fall back to a per-item lookup instead of being parked.
+        """
+        founder_ids = list(dict.fromkeys(item.founder_id for item in queue_items))
+        if not founder_ids:
+            return {}
+        
+        try:
+            return await self.user_profile_service.get_twitter_access_tokens(founder_ids)
+        except Exception as e:
+            logger.warning(f"Failed to prefetch access tokens for {len(founder_ids)} founders: {e}")
+            return {}
+    
+    async def _process_queue_item(self, queue_item: ContentQueueItem,
+                                  access_token: Optional[str] = None) -> Dict[str, Any]:
         """Process a single queue item"""
         try:
             # Get content draft
@@ -829,7 +1265,8 @@ class SchedulingPostingService:
             )
             
             # Perform publishing
-            result = await self._publish_to_twitter(queue_item.founder_id, content_draft, publish_request)
+            result = await self._publish_to_twitter(queue_item.founder_id, content_draft, publish_request,
+                                                    access_token=access_token)
             
             # Update scheduled content status
             if result.success:
@@ -841,6 +1278,17 @@ class SchedulingPostingService:
                         posted_tweet_id=result.posted_tweet_id
                     )
                 )
+            elif result.error_code == "NO_ACCESS_TOKEN":
+                # Parked like the prefetch path so both are re-driven the same way
+                await self.update_publishing_status(
+                    queue_item.founder_id,
+                    queue_item.content_draft_id,
+                    StatusUpdateRequest(
+                        status=PublishStatus.NEEDS_REAUTH,
+                        error_message="Twitter account not connected or token expired",
+                        error_code="NEEDS_REAUTH"
+                    )
+                )
             else:
                 await self.update_publishing_status(
                     queue_item.founder_id,
@@ -849,7 +1297,8 @@ class SchedulingPostingService:
                         status=PublishStatus.FAILED,
                         error_message=result.message,
                         error_code=result.error_code,
-                        retry_scheduled=queue_item.should_retry
+                        retry_scheduled=result.retryable,
+                        retry_after_seconds=result.retry_after_seconds
                     )
                 )
             
@@ -937,14 +1386,6 @@ class SchedulingPostingService:
         """Get summary of rule violations for analytics"""
         return await self.rules_engine.get_rule_violations_summary(user_id, days)
     
-    def _calculate_retry_delay(self, retry_count: int) -> int:
-        """Calculate retry delay in minutes"""
-        if retry_count < len(self.config.retry_delays_minutes):
-            return self.config.retry_delays_minutes[retry_count]
-        else:
-            # Exponential backoff for additional retries
-            return min(self.config.retry_delays_minutes[-1] * (2 ** (retry_count - len(self.config.retry_delays_minutes))), 1440)  # Max 24 hours
-    
     async def _record_scheduling_analytics(self, user_id: str, event_type: str) -> None:
         """Record scheduling analytics"""
         try:
@@ -996,8 +1437,9 @@ class SchedulingPostingService:
                 except Exception as e:
                     logger.warning(f"Failed to delete scheduled content for draft {draft_id}: {e}")
             
-            # 2. 删除内容草稿
+            # 2. 删除内容草稿（连同近似重复索引中的签名）
             try:
+                self._unindex_content(user_id, str(draft_id))
                 self.data_flow_manager.delete_content_draft(draft_id)
                 logger.info(f"Deleted content draft {draft_id}")
             except Exception as e:
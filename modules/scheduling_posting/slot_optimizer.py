@@ -0,0 +1,133 @@
+"""Scheduling and Posting Module - Batch Slot Optimizer
+
+Assigns publishing slots to many drafts in one pass. Free slots are packed
+greedily day by day against a snapshot of the founder's existing schedule,
+honouring the founder's preferences: posts per day, minimum interval, quiet
+hours, preferred posting times and weekends. Each accepted slot is added to
+the snapshot, so later drafts in the same pass see it.
+"""
+import logging
+from datetime import datetime, timedelta, time, date
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .models import SchedulingPreferences
+from .rules_engine import ScheduleSnapshot, _in_time_window, _parse_clock_time
+
+logger = logging.getLogger(__name__)
+
+# (content_id, priority) pairs; a higher priority gets an earlier slot
+SlotRequest = Tuple[str, int]
+
+
+class SlotOptimizer:
+    """
+    Greedy interval packing of drafts into a founder's free publishing slots
+    """
+
+    def __init__(self, preferences: SchedulingPreferences, slot_step_minutes: int = 15,
+                 horizon_days: int = 14):
+        """
+        Args:
+            preferences: Founder scheduling preferences (times are naive UTC)
+            slot_step_minutes: Spacing of the fallback candidate grid when
+                preferred posting times run out for a day
+            horizon_days: How many days ahead slots may be assigned
+        """
+        self.preferences = preferences
+        self.slot_step = timedelta(minutes=slot_step_minutes)
+        self.horizon_days = horizon_days
+        self.min_interval = timedelta(minutes=preferences.min_interval_minutes)
+        self.max_per_day = preferences.max_posts_per_day
+
+        self.preferred_times = sorted({self._parse_time(t) for t in preferences.preferred_posting_times} - {None})
+        quiet_start = self._parse_time(preferences.quiet_hours_start)
+        quiet_end = self._parse_time(preferences.quiet_hours_end)
+        self.quiet_hours = (quiet_start, quiet_end) if quiet_start and quiet_end else None
+
+    @staticmethod
+    def _parse_time(value: Optional[str]) -> Optional[time]:
+        if not value:
+            return None
+        try:
+            return _parse_clock_time(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid time in scheduling preferences: {value!r}")
+            return None
+
+    def _in_quiet_hours(self, candidate: time) -> bool:
+        if not self.quiet_hours:
+            return False
+        return _in_time_window(candidate, *self.quiet_hours)
+
+    def _candidate_times(self, day: date, earliest: datetime) -> Iterator[datetime]:
+        """Preferred times of a day first, then the rest of the grid in time order"""
+        day_start = datetime.combine(day, time.min)
+        preferred = [datetime.combine(day, t) for t in self.preferred_times]
+
+        grid = []
+        candidate = day_start
+        while candidate.date() == day:
+            grid.append(candidate)
+            candidate += self.slot_step
+
+        seen = set()
+        for candidate in preferred + grid:
+            if candidate in seen or candidate < earliest or self._in_quiet_hours(candidate.time()):
+                continue
+            seen.add(candidate)
+            yield candidate
+
+    def _fits(self, snapshot: ScheduleSnapshot, candidate: datetime) -> bool:
+        if snapshot.count_on_day(candidate.date()) >= self.max_per_day:
+            return False
+        previous_post = snapshot.last_before(candidate)
+        if previous_post and candidate - previous_post < self.min_interval:
+            return False
+        next_post = snapshot.first_after(candidate)
+        if next_post and next_post - candidate < self.min_interval:
+            return False
+        return True
+
+    def assign(self, requests: Sequence[SlotRequest], snapshot: ScheduleSnapshot,
+               earliest: Optional[datetime] = None,
+               weight_by_priority: bool = True) -> Dict[str, datetime]:
+        """
+        Assign a slot to every request that fits within the horizon
+
+        Args:
+            requests: (content_id, priority) pairs in request order
+            snapshot: Founder's existing schedule; assigned slots are added to it
+            earliest: No slot before this time (defaults to now)
+            weight_by_priority: Give higher-priority drafts the earlier slots;
+                otherwise slots follow request order
+
+        Returns:
+            Scheduled time per content ID; requests without a free slot are omitted
+        """
+        if not requests:
+            return {}
+
+        earliest = earliest or datetime.utcnow()
+        ordered = list(requests)
+        if weight_by_priority:
+            ordered.sort(key=lambda request: request[1] or 0, reverse=True)
+
+        slots: List[datetime] = []
+        day = earliest.date()
+        for _ in range(self.horizon_days):
+            if len(slots) >= len(ordered):
+                break
+
+            if not (self.preferences.avoid_weekends and day.weekday() >= 5):
+                day_slots = []
+                for candidate in self._candidate_times(day, earliest):
+                    if len(slots) + len(day_slots) >= len(ordered):
+                        break
+                    if self._fits(snapshot, candidate):
+                        snapshot.add(candidate)
+                        day_slots.append(candidate)
+                slots.extend(sorted(day_slots))
+
+            day += timedelta(days=1)
+
+        return {content_id: slot for (content_id, _), slot in zip(ordered, slots)}
@@ -13,6 +13,7 @@ Main Components:
 - gemini_analyzer.py: Gemini LLM integration for trend analysis
 - web_search_tool.py: Google Custom Search API integration
 - repository.py: Data persistence layer (legacy)
+- ingestion.py: Shared per-location Twitter trend snapshots
 - llm_matcher.py: LLM-powered trend matching (legacy)
 - models.py: Data models and structures
 """
@@ -24,6 +25,7 @@ from .models import (
 
 from .repository import TrendAnalysisRepository
 from .llm_matcher import LLMTrendMatcher, create_llm_trend_matcher
+from .ingestion import TrendIngestionService, TrendSnapshot, match_trends_by_keywords
 
 # New Gemini-powered components
 from .gemini_analyzer import (
@@ -46,6 +48,9 @@ __all__ = [
     'TrendAnalysisRepository',
     'LLMTrendMatcher',
     'create_llm_trend_matcher',
+    'TrendIngestionService',
+    'TrendSnapshot',
+    'match_trends_by_keywords',
     
     # New Gemini-powered components
     'GeminiTrendAnalyzer',
@@ -0,0 +1,309 @@
+"""Trend Analysis Module - Shared Trend Ingestion
+
+Location trends are the same for every founder, so they are fetched from
+Twitter once per location per ``window_seconds`` and stored in
+tracked_trends_raw. Founder requests read that snapshot and only the
+keyword/LLM matching runs per founder.
+
+A snapshot is looked up in memory first, then in tracked_trends_raw (a fetch
+made by another process within the window), and only then fetched from
+Twitter. Concurrent misses for the same location wait on one fetch. If the
+fetch fails, the last snapshot is served however old it is.
+
+Locations requested in the last ``track_seconds`` are refreshed by a
+background loop ``refresh_ahead_seconds`` before their snapshot expires, so
+requests normally never wait on Twitter. The loop remembers which founder
+last requested a location, not their token, and asks the token manager for
+that founder's current token when it refreshes.
+
+Personalized trends differ per user and are only fetched when
+``personalized_enabled`` is set; they go through the client's response cache.
+"""
+import asyncio
+import logging
+from contextlib import AbstractContextManager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from modules.user_profile.token_manager import get_token_manager
+
+logger = logging.getLogger(__name__)
+
+RepositoryFactory = Callable[[], AbstractContextManager]
+
+LOCATION_TREND_SOURCE = 'location_trends_v1.1'
+
+
+class TrendSnapshot:
+    """Trends of one location as fetched at one point in time"""
+
+    __slots__ = ('location_id', 'trends', 'fetched_at')
+
+    def __init__(self, location_id: str, trends: List[Dict[str, Any]], fetched_at: datetime):
+        self.location_id = location_id
+        self.trends = trends
+        self.fetched_at = fetched_at
+
+    def age_seconds(self, now: datetime) -> float:
+        return (now - self.fetched_at).total_seconds()
+
+
+def match_trends_by_keywords(trends: List[Dict[str, Any]], keywords: List[str],
+                             max_matches: int = 20, location_id: str = "1") -> List[Dict[str, Any]]:
+    """Keyword match of a founder's keywords against trend names and URLs"""
+    matched_topics = []
+    for trend in trends:
+        trend_name = (trend.get('name') or '').lower()
+        trend_url = (trend.get('url') or '').lower()
+
+        matching_keywords = []
+        matching_reasons = []
+        for keyword in keywords:
+            keyword_lower = keyword.lower()
+            if (keyword_lower in trend_name or
+                keyword_lower in trend_url or
+                trend_name in keyword_lower):
+                matching_keywords.append(keyword)
+                matching_reasons.append(f"关键词 '{keyword}' 在话题名称中匹配")
+
+        if matching_keywords:
+            matched_topics.append({
+                "topic_name": trend.get('name', ''),
+                "tweet_volume": trend.get('tweet_volume') or 0,
+                "url": trend.get('url', ''),
+                "matching_keywords": matching_keywords,
+                "matching_reasons": matching_reasons,
+                "relevance_score": 0.6,  # 传统匹配的默认分数
+                "confidence_score": 0.6,
+                "location_id": location_id,
+                "source": "twitter_traditional_matched"
+            })
+
+        if len(matched_topics) >= max_matches:
+            break
+
+    return matched_topics
+
+
+class TrendIngestionService:
+    """Fetches each location's trends once per window and serves them to every founder"""
+
+    def __init__(self, client: Any, repository_factory: RepositoryFactory,
+                 window_seconds: int = 300,
+                 refresh_ahead_seconds: int = 30,
+                 track_seconds: int = 3600,
+                 poll_interval_seconds: float = 15,
+                 retention_seconds: int = 7 * 86400,
+                 personalized_enabled: bool = False,
+                 clock: Callable[[], datetime] = datetime.utcnow):
+        """
+        Args:
+            client: AsyncTwitterAPIClient used for the fetches
+            repository_factory: Returns a context manager yielding a TrendRepository
+                bound to a fresh database session (closed on exit)
+            window_seconds: How long a location snapshot is served before it is refetched
+            refresh_ahead_seconds: The background loop refreshes snapshots this long before they expire
+            track_seconds: Locations not requested for this long are no longer refreshed
+            poll_interval_seconds: How often the background loop looks for snapshots to refresh
+            retention_seconds: Stored fetches older than this are pruned when a location is refetched
+            personalized_enabled: Fetch per-user personalized trends before the location snapshot
+            clock: Naive-UTC clock (the repository stores it as aware UTC)
+        """
+        self.client = client
+        self.repository_factory = repository_factory
+        self.window = timedelta(seconds=window_seconds)
+        self.refresh_ahead = timedelta(seconds=min(refresh_ahead_seconds, window_seconds))
+        self.track = timedelta(seconds=track_seconds)
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retention = timedelta(seconds=retention_seconds)
+        self.personalized_enabled = personalized_enabled
+        self._clock = clock
+
+        self._snapshots: Dict[str, TrendSnapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # location -> (last requested at, founder who requested it)
+        self._tracked: Dict[str, Tuple[datetime, str]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.fetch_count = 0
+        self.fetch_failures = 0
+        self.snapshot_hits = 0
+
+    # ==================== Snapshot Reads ====================
+
+    async def get_snapshot(self, location_id: str, founder_id: str, user_token: str) -> TrendSnapshot:
+        """
+        Current trends for a location, fetching them only if no snapshot is within the window
+
+        Args:
+            location_id: WOEID ("1" = Global)
+            founder_id: Requesting founder, whose token the background refresh will use
+            user_token: Access token used if a fetch is needed (location trends are not per user)
+        """
+        location_id = str(location_id)
+        now = self._clock()
+        self._tracked[location_id] = (now, str(founder_id))
+
+        snapshot = self._snapshots.get(location_id)
+        if snapshot is not None and snapshot.age_seconds(now) < self.window.total_seconds():
+            self.snapshot_hits += 1
+            return snapshot
+
+        return await self._refresh(location_id, user_token, self.window)
+
+    async def get_personalized_trends(self, user_token: str, max_results: int = 20) -> List[Dict[str, Any]]:
+        """A user's personalized trends, or [] when disabled or unavailable"""
+        if not self.personalized_enabled:
+            return []
+        try:
+            return await self.client.get_personalized_trends(user_token, max_results)
+        except Exception as e:
+            logger.warning(f"Personalized trends failed, using the location snapshot: {e}")
+            return []
+
+    # ==================== Refresh ====================
+
+    async def _refresh(self, location_id: str, user_token: str, max_age: timedelta) -> TrendSnapshot:
+        """Replace the location's snapshot unless one younger than max_age turns up (one fetch at a time)"""
+        lock = self._locks.setdefault(location_id, asyncio.Lock())
+        async with lock:
+            now = self._clock()
+            snapshot = self._snapshots.get(location_id)
+            if snapshot is not None and snapshot.age_seconds(now) < max_age.total_seconds():
+                # Fetched by the caller we waited for
+                self.snapshot_hits += 1
+                return snapshot
+
+            # Repository calls are blocking; keep them off the event loop
+            stored = await asyncio.to_thread(self._load_stored, location_id, now - max_age)
+            if stored is not None:
+                self._snapshots[location_id] = stored
+                return stored
+
+            try:
+                trends = await self.client.get_trends_for_location(user_token, location_id)
+            except Exception as e:
+                self.fetch_failures += 1
+                if snapshot is None:
+                    raise
+                logger.warning(f"Trend fetch for location {location_id} failed, serving the "
+                               f"snapshot from {snapshot.fetched_at.isoformat()}: {e}")
+                return snapshot
+
+            self.fetch_count += 1
+            snapshot = TrendSnapshot(location_id, trends, self._clock())
+            self._snapshots[location_id] = snapshot
+            await asyncio.to_thread(self._store, snapshot)
+            return snapshot
+
+    def _load_stored(self, location_id: str, fetched_after: datetime) -> Optional[TrendSnapshot]:
+        """Snapshot from the latest tracked_trends_raw fetch, if newer than fetched_after"""
+        try:
+            with self.repository_factory() as repository:
+                rows = repository.get_latest_raw_trends(location_id, fetched_after)
+                if not rows:
+                    return None
+                fetched_at = rows[0].fetched_at
+                trends = [{
+                    'name': row.name,
+                    'query': row.trend_source_id,
+                    'url': f"http://twitter.com/search?q={quote(row.trend_source_id or row.name)}",
+                    'tweet_volume': row.volume,
+                    'source': LOCATION_TREND_SOURCE
+                } for row in rows]
+        except Exception as e:
+            logger.warning(f"Failed to load stored trends for location {location_id}: {e}")
+            return None
+
+        if fetched_at.tzinfo is not None:
+            fetched_at = fetched_at.astimezone(timezone.utc).replace(tzinfo=None)
+        return TrendSnapshot(location_id, trends, fetched_at)
+
+    def _store(self, snapshot: TrendSnapshot) -> None:
+        try:
+            with self.repository_factory() as repository:
+                repository.save_raw_trends(snapshot.location_id, snapshot.trends, snapshot.fetched_at)
+                repository.prune_raw_trends(snapshot.location_id, snapshot.fetched_at - self.retention)
+        except Exception as e:
+            # The in-memory snapshot still serves this process
+            logger.warning(f"Failed to store trends for location {snapshot.location_id}: {e}")
+
+    async def refresh_tracked(self) -> int:
+        """Refresh recently requested locations whose snapshot is about to expire; returns how many"""
+        now = self._clock()
+        max_age = self.window - self.refresh_ahead
+
+        due = []
+        for location_id, (requested_at, founder_id) in list(self._tracked.items()):
+            if now - requested_at > self.track:
+                del self._tracked[location_id]
+                continue
+            snapshot = self._snapshots.get(location_id)
+            if snapshot is None or snapshot.age_seconds(now) >= max_age.total_seconds():
+                due.append((location_id, founder_id))
+
+        results = await asyncio.gather(
+            *(self._refresh_for(location_id, founder_id, max_age) for location_id, founder_id in due),
+            return_exceptions=True
+        )
+        for (location_id, _), result in zip(due, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Background trend refresh for location {location_id} failed: {result}")
+        return len(due)
+
+    async def _refresh_for(self, location_id: str, founder_id: str, max_age: timedelta) -> TrendSnapshot:
+        """Background refresh with the requesting founder's current token"""
+        token_manager = get_token_manager()
+        if token_manager is None:
+            raise RuntimeError("no token manager to look up a current access token")
+        user_token = token_manager.get_access_token(founder_id) or await token_manager.refresh(founder_id)
+        if not user_token:
+            raise RuntimeError(f"founder {founder_id} has no valid access token")
+        return await self._refresh(location_id, user_token, max_age)
+
+    # ==================== Lifecycle ====================
+
+    async def start(self) -> None:
+        """Start the background refresh loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Trend ingestion started")
+
+    async def stop(self) -> None:
+        """Stop the background refresh loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Trend ingestion stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh_tracked()
+            except Exception as e:
+                logger.error(f"Trend refresh loop error: {e}")
+            await asyncio.sleep(self.poll_interval_seconds)
+
+    def status(self) -> Dict[str, Any]:
+        """Snapshot ages and fetch counters"""
+        now = self._clock()
+        return {
+            'locations': {
+                location_id: {
+                    'trends': len(snapshot.trends),
+                    'fetched_at': snapshot.fetched_at.isoformat(),
+                    'age_seconds': round(snapshot.age_seconds(now), 1)
+                }
+                for location_id, snapshot in self._snapshots.items()
+            },
+            'tracked_locations': len(self._tracked),
+            'fetches': self.fetch_count,
+            'fetch_failures': self.fetch_failures,
+            'snapshot_hits': self.snapshot_hits,
+            'running': self._task is not None
+        }
@@ -11,36 +11,70 @@ This module provides a comprehensive interface to Twitter API v2 with:
 
 Main Components:
 - client.py: Main API client with all operations
+- async_client.py: Asyncio client with the same operations over pooled httpx connections
 - auth.py: Authentication handling
 - endpoints.py: API endpoint configurations
 - rate_limiter.py: Rate limiting management
+- rate_limit_backends.py: In-memory, SQLite and Redis storage for shared rate limit state
+- response_cache.py: TTL/LRU cache with single-flight for read-only lookups
+- lookup_batcher.py: Micro-batching of single tweet/user lookups into 100-ID requests
+- circuit_breaker.py: Per-endpoint circuit breaker (closed/open/half-open)
+- retry_policy.py: Bounded retries of transient failures with decorrelated jitter
+- fake_server.py: Local in-memory stand-in for the API, for load tests (not imported here)
 - exceptions.py: Custom exception classes
 """
 
 from .client import TwitterAPIClient
-from .auth import TwitterAuth
+from .async_client import AsyncTwitterAPIClient
+from .auth import TwitterAuth, AsyncTwitterAuth
 from .endpoints import TwitterAPIEndpoints, APIEndpoint
 from .rate_limiter import TwitterRateLimiter, RateLimitInfo
+from .rate_limit_backends import (
+    RateLimitBackend,
+    InMemoryRateLimitBackend,
+    SQLiteRateLimitBackend,
+    RedisRateLimitBackend,
+    rate_limit_backend_from_url
+)
+from .response_cache import ResponseCache
+from .lookup_batcher import LookupBatcher
+from .circuit_breaker import CircuitBreaker
+from .retry_policy import RetryPolicy
 from .exceptions import (
     TwitterAPIError,
     RateLimitError,
     AuthenticationError,
     TwitterAPINotFoundError,
     TwitterAPIBadRequestError,
-    TwitterAPIServerError
+    TwitterAPIServerError,
+    TwitterAPINetworkError,
+    CircuitOpenError
 )
 
 __all__ = [
     'TwitterAPIClient',
+    'AsyncTwitterAPIClient',
     'TwitterAuth',
+    'AsyncTwitterAuth',
     'TwitterAPIEndpoints',
     'APIEndpoint',
     'TwitterRateLimiter',
     'RateLimitInfo',
+    'RateLimitBackend',
+    'InMemoryRateLimitBackend',
+    'SQLiteRateLimitBackend',
+    'RedisRateLimitBackend',
+    'rate_limit_backend_from_url',
+    'ResponseCache',
+    'LookupBatcher',
+    'CircuitBreaker',
+    'RetryPolicy',
     'TwitterAPIError',
     'RateLimitError',
     'AuthenticationError',
     'TwitterAPINotFoundError',
     'TwitterAPIBadRequestError',
-    'TwitterAPIServerError'
+    'TwitterAPIServerError',
+    'TwitterAPINetworkError',
+    'CircuitOpenError'
 ]
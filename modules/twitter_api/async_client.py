@@ -0,0 +1,454 @@
+"""Asynchronous Twitter API Client
+
+Same method surface as TwitterAPIClient, built on a shared httpx.AsyncClient
+so that API calls made from async handlers and the publishing queue overlap
+their network I/O instead of blocking the event loop. Connections are kept
+alive and pooled per client, and HTTP/2 is used when the ``h2`` package is
+installed (``pip install httpx[http2]``).
+
+One client is meant to be shared by the whole process and closed with
+``aclose()`` on shutdown.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from .client import BaseTwitterAPIClient, USER_AGENT, REQUEST_TIMEOUT_SECONDS
+from .endpoints import APIEndpoint
+from .rate_limiter import TwitterRateLimiter
+from .response_cache import ResponseCache
+from .circuit_breaker import CircuitBreaker
+from .retry_policy import RetryPolicy
+from .auth import AsyncTwitterAuth
+from .exceptions import TwitterAPIError, TwitterAPINetworkError
+
+try:
+    import h2  # noqa: F401  (HTTP/2 support for httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Recent search returns 10-100 tweets per page
+SEARCH_PAGE_MIN = 10
+SEARCH_PAGE_MAX = 100
+
+
+class AsyncTwitterAPIClient(BaseTwitterAPIClient):
+    """Asyncio Twitter API v2 client with keep-alive connection pooling"""
+
+    def __init__(self, client_id: str, client_secret: str,
+                 rate_limiter: Optional[TwitterRateLimiter] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 http2: bool = True,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 timeout: float = REQUEST_TIMEOUT_SECONDS,
+                 rate_limit_max_wait: Optional[float] = 5.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Args:
+            client_id: Twitter OAuth client ID
+            client_secret: Twitter OAuth client secret
+            rate_limiter: Shared rate limiter (a new one by default)
+            response_cache: Shared cache for read-only lookups (a new one by default)
+            circuit_breaker: Shared per-endpoint circuit breaker (a new one by default)
+            retry_policy: Retries of transient failures (3 attempts by default)
+            http2: Negotiate HTTP/2 when h2 is installed
+            max_connections: Maximum open connections in the pool
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept open
+            timeout: Default request timeout in seconds
+            rate_limit_max_wait: Longest wait for rate limit budget before failing fast
+                with RateLimitError (None waits as long as needed)
+            transport: Custom httpx transport (e.g. httpx.MockTransport in tests)
+        """
+        super().__init__(rate_limiter, response_cache, circuit_breaker, retry_policy)
+        self.rate_limit_max_wait = rate_limit_max_wait
+
+        if http2 and not HTTP2_AVAILABLE and transport is None:
+            logger.warning("h2 is not installed; AsyncTwitterAPIClient falls back to HTTP/1.1")
+
+        self.http_client = httpx.AsyncClient(
+            http2=http2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=timeout,
+            headers={'User-Agent': USER_AGENT},
+            transport=transport
+        )
+        self.auth = AsyncTwitterAuth(client_id, client_secret, self.http_client)
+
+    async def __aenter__(self) -> "AsyncTwitterAPIClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def _make_request(self, endpoint: APIEndpoint, user_token: str,
+                            params: Optional[Dict] = None, json_body: Optional[Dict] = None,
+                            **path_params) -> Dict[str, Any]:
+        """
+        Core method for making API requests with rate limiting and error handling
+
+        Transient failures are retried according to the retry policy. While
+        the endpoint's circuit is open, CircuitOpenError is raised without
+        making a request.
+        """
+        endpoint_key, url, request_kwargs = self._prepare_request(
+            endpoint, user_token, params=params, json_body=json_body, **path_params
+        )
+
+        attempt = 0
+        delay = None
+        while True:
+            attempt += 1
+            self.circuit_breaker.before_request(endpoint_key)
+            try:
+                await self.rate_limiter.acquire(endpoint, user_token, max_wait=self.rate_limit_max_wait)
+            except BaseException:
+                self.circuit_breaker.release(endpoint_key)
+                raise
+
+            started = time.monotonic()
+            try:
+                response = await self.http_client.request(endpoint.method, url, **request_kwargs)
+
+                await self.rate_limiter.update_rate_limit_async(endpoint_key, response.headers, user_token)
+
+                result = self._handle_response(response, endpoint_key)
+
+            except httpx.HTTPError as e:
+                logger.error(f"Network error during API request: {e}")
+                error = TwitterAPINetworkError(f"Network error: {str(e)}")
+            except TwitterAPIError as e:
+                error = e
+            except BaseException:
+                self.circuit_breaker.release(endpoint_key)
+                raise
+            else:
+                self.circuit_breaker.record_success(endpoint_key, time.monotonic() - started)
+                return result
+
+            delay = self._after_failed_attempt(endpoint_key, endpoint, error, time.monotonic() - started,
+                                               attempt, delay)
+            if delay is None:
+                raise error
+            await asyncio.sleep(delay)
+
+    # ==================== Tweet Operations ====================
+
+    async def create_tweet(self, user_token: str, text: str,
+                           reply_settings: Optional[str] = None,
+                           in_reply_to_tweet_id: Optional[str] = None,
+                           quote_tweet_id: Optional[str] = None,
+                           media_ids: Optional[List[str]] = None,
+                           poll_options: Optional[List[str]] = None,
+                           poll_duration_minutes: Optional[int] = None) -> Dict[str, Any]:
+        """Create a new tweet (see TwitterAPIClient.create_tweet)"""
+        tweet_data = self._build_tweet_body(
+            text, reply_settings, in_reply_to_tweet_id, quote_tweet_id,
+            media_ids, poll_options, poll_duration_minutes
+        )
+
+        return await self._make_request(
+            self.endpoints.CREATE_TWEET,
+            user_token,
+            json_body=tweet_data
+        )
+
+    async def delete_tweet(self, user_token: str, tweet_id: str) -> Dict[str, Any]:
+        """Delete a tweet"""
+        result = await self._make_request(
+            self.endpoints.DELETE_TWEET,
+            user_token,
+            tweet_id=tweet_id
+        )
+        self.response_cache.invalidate(self._endpoint_key(self.endpoints.GET_TWEET), (tweet_id,))
+        return result
+
+    async def fetch_tweet_by_id(self, user_token: str, tweet_id: str,
+                                fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Fetch a tweet by ID"""
+        return await self.response_cache.get_or_fetch_async(
+            self._endpoint_key(self.endpoints.GET_TWEET), user_token, (tweet_id, tuple(fields or ())),
+            lambda: self._make_request(
+                self.endpoints.GET_TWEET,
+                user_token,
+                params=self._build_tweet_lookup_params(fields),
+                tweet_id=tweet_id
+            )
+        )
+
+    async def fetch_tweets_by_ids(self, user_token: str, tweet_ids: List[str],
+                                  fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Fetch up to 100 tweets in one request (see TwitterAPIClient.fetch_tweets_by_ids)"""
+        return await self._make_request(
+            self.endpoints.GET_TWEETS,
+            user_token,
+            params=self._with_lookup_ids(self._build_tweet_lookup_params(fields), tweet_ids)
+        )
+
+    async def search_tweets(self, user_token: str, query: str,
+                            start_time: Optional[str] = None,
+                            end_time: Optional[str] = None,
+                            since_id: Optional[str] = None,
+                            until_id: Optional[str] = None,
+                            max_results: int = 100,
+                            next_token: Optional[str] = None,
+                            tweet_fields: Optional[List[str]] = None,
+                            user_fields: Optional[List[str]] = None,
+                            expansions: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Search for recent tweets (see TwitterAPIClient.search_tweets)"""
+        params = self._build_search_params(
+            query, start_time, end_time, since_id, until_id, max_results,
+            next_token, tweet_fields, user_fields, expansions
+        )
+
+        return await self._make_request(
+            self.endpoints.SEARCH_RECENT_TWEETS,
+            user_token,
+            params=params
+        )
+
+    async def iter_search(self, user_token: str, query: str,
+                          max_items: Optional[int] = None,
+                          page_size: int = SEARCH_PAGE_MAX,
+                          dedup_window: int = 10 * SEARCH_PAGE_MAX,
+                          **search_params) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream recent-search tweets across pages
+
+        The next page is requested as soon as the current one arrives, so the
+        round-trip overlaps with the consumer's work on the current page. Every
+        page goes through _make_request and therefore the rate limiter. Tweets
+        are yielded one at a time; only the current page, one prefetched page
+        and the IDs of the last ``dedup_window`` tweets are held in memory.
+
+        Args:
+            user_token: User's access token
+            query: Search query
+            max_items: Stop after this many unique tweets (None follows next_token to the end)
+            page_size: Tweets per request (clamped to 10-100)
+            dedup_window: Recent tweet IDs remembered to drop repeats across pages
+            **search_params: Other search_tweets arguments (start_time, tweet_fields, ...)
+
+        Yields:
+            Tweet objects from the ``data`` array of each page
+        """
+        if max_items is not None and max_items <= 0:
+            return
+        page_size = min(max(page_size, SEARCH_PAGE_MIN), SEARCH_PAGE_MAX)
+
+        def fetch(next_token: Optional[str], yielded: int) -> "asyncio.Task":
+            size = page_size
+            if max_items is not None:
+                size = max(min(size, max_items - yielded), SEARCH_PAGE_MIN)
+            return asyncio.create_task(self.search_tweets(
+                user_token, query, max_results=size, next_token=next_token, **search_params
+            ))
+
+        seen: "OrderedDict[str, None]" = OrderedDict()
+        yielded = 0
+        pending = fetch(None, yielded)
+
+        try:
+            while pending is not None:
+                page = await pending
+                pending = None
+
+                tweets = page.get('data') or []
+                next_token = (page.get('meta') or {}).get('next_token')
+                if next_token and (max_items is None or yielded + len(tweets) < max_items):
+                    pending = fetch(next_token, yielded + len(tweets))
+
+                for tweet in tweets:
+                    tweet_id = tweet.get('id')
+                    if tweet_id is not None:
+                        if tweet_id in seen:
+                            continue
+                        seen[tweet_id] = None
+                        if len(seen) > dedup_window:
+                            seen.popitem(last=False)
+
+                    yield tweet
+                    yielded += 1
+                    if max_items is not None and yielded >= max_items:
+                        return
+
+                # Repeats left this page short of max_items without a prefetch
+                if pending is None and next_token:
+                    pending = fetch(next_token, yielded)
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+            if pending is not None:
+                # Retrieve the outcome so an abandoned prefetch never logs
+                # "exception was never retrieved"
+                await asyncio.gather(pending, return_exceptions=True)
+
+    # ==================== Retweet Operations ====================
+
+    async def create_retweet(self, user_token: str, authenticating_user_id: str,
+                             target_tweet_id: str) -> Dict[str, Any]:
+        """Create a retweet"""
+        return await self._make_request(
+            self.endpoints.CREATE_RETWEET,
+            user_token,
+            json_body={'tweet_id': target_tweet_id},
+            user_id=authenticating_user_id
+        )
+
+    async def delete_retweet(self, user_token: str, authenticating_user_id: str,
+                             source_tweet_id: str) -> Dict[str, Any]:
+        """Delete a retweet"""
+        return await self._make_request(
+            self.endpoints.DELETE_RETWEET,
+            user_token,
+            user_id=authenticating_user_id,
+            source_tweet_id=source_tweet_id
+        )
+
+    # ==================== Like Operations ====================
+
+    async def like_tweet(self, user_token: str, user_id: str, tweet_id: str) -> Dict[str, Any]:
+        """Like a tweet"""
+        return await self._make_request(
+            self.endpoints.LIKE_TWEET,
+            user_token,
+            json_body={'tweet_id': tweet_id},
+            user_id=user_id
+        )
+
+    async def unlike_tweet(self, user_token: str, user_id: str, tweet_id: str) -> Dict[str, Any]:
+        """Unlike a tweet"""
+        return await self._make_request(
+            self.endpoints.UNLIKE_TWEET,
+            user_token,
+            user_id=user_id,
+            tweet_id=tweet_id
+        )
+
+    # ==================== User Operations ====================
+
+    async def get_user_by_id(self, user_token: str, user_id: str,
+                             user_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get user information by user ID"""
+        return await self.response_cache.get_or_fetch_async(
+            self._endpoint_key(self.endpoints.GET_USER_BY_ID), user_token, (user_id, tuple(user_fields or ())),
+            lambda: self._make_request(
+                self.endpoints.GET_USER_BY_ID,
+                user_token,
+                params=self._build_user_lookup_params(user_fields),
+                user_id=user_id
+            )
+        )
+
+    async def get_users_by_ids(self, user_token: str, user_ids: List[str],
+                               user_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get up to 100 users in one request"""
+        return await self._make_request(
+            self.endpoints.GET_USERS,
+            user_token,
+            params=self._with_lookup_ids(self._build_user_lookup_params(user_fields), user_ids)
+        )
+
+    async def get_user_by_username(self, user_token: str, username: str,
+                                   user_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get user information by username"""
+        return await self.response_cache.get_or_fetch_async(
+            self._endpoint_key(self.endpoints.GET_USER_BY_USERNAME), user_token,
+            (username.lower(), tuple(user_fields or ())),
+            lambda: self._make_request(
+                self.endpoints.GET_USER_BY_USERNAME,
+                user_token,
+                params=self._build_user_lookup_params(user_fields),
+                username=username
+            )
+        )
+
+    async def get_me(self, user_token: str) -> Dict[str, Any]:
+        """Get current authenticated user information"""
+        return await self._make_request(
+            self.endpoints.GET_ME,
+            user_token,
+            params={'user.fields': 'id,name,username,verified,public_metrics,description'}
+        )
+
+    # ==================== Trends Operations ====================
+
+    async def get_personalized_trends(self, user_token: str, max_results: int = 20) -> List[Dict[str, Any]]:
+        """Get personalized trending topics for the authenticated user"""
+        params = {
+            'personalized_trend.fields': 'trend_name,category,post_count,trending_since'
+        }
+
+        try:
+            response_data = await self.response_cache.get_or_fetch_async(
+                self._endpoint_key(self.endpoints.GET_PERSONALIZED_TRENDS), user_token, (),
+                lambda: self._make_request(
+                    self.endpoints.GET_PERSONALIZED_TRENDS,
+                    user_token,
+                    params=params
+                )
+            )
+            return self._parse_personalized_trends(response_data, max_results)
+
+        except TwitterAPIError as e:
+            logger.error(f"Failed to get personalized trends: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error getting personalized trends: {e}")
+            raise TwitterAPIError(f"Unexpected error: {str(e)}")
+
+    async def get_trends_for_location(self, user_token: str, location_id: str = "1") -> List[Dict[str, Any]]:
+        """Get trending topics for a location (WOEID, "1" = Global)"""
+        endpoint = self.endpoints.GET_TRENDS
+        endpoint_key = self._endpoint_key(endpoint)
+
+        async def fetch() -> List[Dict[str, Any]]:
+            data = await self._make_request(endpoint, user_token, params={'id': location_id})
+            return self._parse_location_trends(data)
+
+        return await self.response_cache.get_or_fetch_async(endpoint_key, user_token, (str(location_id),), fetch)
+
+    async def get_trends(self, user_token: str, location_id: str = "1",
+                         prefer_personalized: bool = True, max_results: int = 20) -> List[Dict[str, Any]]:
+        """Get trending topics, falling back from personalized to location trends"""
+        trends = []
+
+        if prefer_personalized:
+            try:
+                trends = await self.get_personalized_trends(user_token, max_results)
+                if trends:
+                    return trends
+            except Exception as e:
+                logger.warning(f"Personalized trends failed: {e}")
+                logger.info("Falling back to location-based trends...")
+
+        try:
+            trends = await self.get_trends_for_location(user_token, location_id)
+            if trends:
+                return trends[:max_results]
+        except TwitterAPIError as e:
+            logger.error(f"Location trends also failed: {e}")
+            raise
+
+        return trends
+
+    # ==================== Utility Methods ====================
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        await self.http_client.aclose()
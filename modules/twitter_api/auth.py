@@ -2,14 +2,24 @@
 from typing import Dict, Optional, Tuple
 import requests
 from requests.auth import HTTPBasicAuth
+import httpx
 import logging
 import secrets
 import base64
 import hashlib
 from urllib.parse import urlencode
 
+from .endpoints import TwitterAPIEndpoints
+
 logger = logging.getLogger(__name__)
 
+TOKEN_URL = f'{TwitterAPIEndpoints.BASE_URL_V2}/oauth2/token'
+REVOKE_URL = f'{TwitterAPIEndpoints.BASE_URL_V2}/oauth2/revoke'
+VALIDATE_URL = f'{TwitterAPIEndpoints.BASE_URL_V2}/users/me'
+FORM_HEADERS = {
+    'Content-Type': 'application/x-www-form-urlencoded'
+}
+
 class TwitterAuth:
     """Handles Twitter API authentication"""
     
@@ -47,25 +57,11 @@ class TwitterAuth:
     
     def exchange_code_for_token(self, code: str, code_verifier: str, redirect_uri: str) -> Optional[Dict]:
         """Exchange authorization code for access token"""
-        url = 'https://api.x.com/2/oauth2/token'
-        
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
-        
-        data = {
-            'grant_type': 'authorization_code',
-            'client_id': self.client_id,
-            'code': code,
-            'redirect_uri': redirect_uri,
-            'code_verifier': code_verifier
-        }
-        
         try:
             response = requests.post(
-                url,
-                headers=headers,
-                data=data,
+                TOKEN_URL,
+                headers=FORM_HEADERS,
+                data=self._code_exchange_data(code, code_verifier, redirect_uri),
                 auth=HTTPBasicAuth(self.client_id, self.client_secret)
             )
             
@@ -81,23 +77,11 @@ class TwitterAuth:
     
     def refresh_token(self, refresh_token: str) -> Optional[Dict]:
         """Refresh access token using refresh token"""
-        url = 'https://api.x.com/2/oauth2/token'
-        
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
-        
-        data = {
-            'grant_type': 'refresh_token',
-            'refresh_token': refresh_token,
-            'client_id': self.client_id
-        }
-        
         try:
             response = requests.post(
-                url,
-                headers=headers,
-                data=data,
+                TOKEN_URL,
+                headers=FORM_HEADERS,
+                data=self._refresh_data(refresh_token),
                 auth=HTTPBasicAuth(self.client_id, self.client_secret)
             )
             
@@ -113,23 +97,11 @@ class TwitterAuth:
     
     def revoke_token(self, token: str, token_type_hint: str = 'access_token') -> bool:
         """Revoke access token or refresh token"""
-        url = 'https://api.x.com/2/oauth2/revoke'
-        
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
-        
-        data = {
-            'token': token,
-            'token_type_hint': token_type_hint,
-            'client_id': self.client_id
-        }
-        
         try:
             response = requests.post(
-                url,
-                headers=headers,
-                data=data,
+                REVOKE_URL,
+                headers=FORM_HEADERS,
+                data=self._revoke_data(token, token_type_hint),
                 auth=HTTPBasicAuth(self.client_id, self.client_secret)
             )
             
@@ -145,32 +117,13 @@ class TwitterAuth:
     
     def validate_user_token(self, user_access_token: str) -> bool:
         """Validate a user access token"""
-        url = "https://api.x.com/2/users/me"
-        
         headers = {
             'Authorization': f'Bearer {user_access_token}'
         }
         
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                logger.debug("Twitter token validation successful")
-                return True
-            elif response.status_code == 401:
-                logger.warning(f"Twitter token validation failed: Invalid or expired token (401)")
-                return False
-            elif response.status_code == 429:
-                logger.warning(f"Twitter token validation failed: Rate limit exceeded (429)")
-                # For rate limits, we'll assume the token is valid to avoid unnecessary re-auth
-                return True
-            elif response.status_code in [403, 404]:
-                logger.warning(f"Twitter token validation failed: Access denied or user not found ({response.status_code})")
-                return False
-            else:
-                logger.warning(f"Twitter token validation failed: Unexpected status code {response.status_code}")
-                logger.debug(f"Response content: {response.text[:200]}...")
-                return False
+            response = requests.get(VALIDATE_URL, headers=headers, timeout=10)
+            return self._validation_result(response)
                 
         except requests.Timeout:
             logger.warning("Twitter token validation failed: Request timeout")
@@ -184,10 +137,134 @@ class TwitterAuth:
             logger.error(f"Twitter token validation failed: Request exception - {e}")
             return False
     
+    # ==================== Request Helpers ====================
+    
+    def _code_exchange_data(self, code: str, code_verifier: str, redirect_uri: str) -> Dict[str, str]:
+        return {
+            'grant_type': 'authorization_code',
+            'client_id': self.client_id,
+            'code': code,
+            'redirect_uri': redirect_uri,
+            'code_verifier': code_verifier
+        }
+    
+    def _refresh_data(self, refresh_token: str) -> Dict[str, str]:
+        return {
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token,
+            'client_id': self.client_id
+        }
+    
+    def _revoke_data(self, token: str, token_type_hint: str) -> Dict[str, str]:
+        return {
+            'token': token,
+            'token_type_hint': token_type_hint,
+            'client_id': self.client_id
+        }
+    
+    @staticmethod
+    def _validation_result(response) -> bool:
+        """Map a users/me response (requests or httpx) to token validity"""
+        if response.status_code == 200:
+            logger.debug("Twitter token validation successful")
+            return True
+        elif response.status_code == 401:
+            logger.warning(f"Twitter token validation failed: Invalid or expired token (401)")
+            return False
+        elif response.status_code == 429:
+            logger.warning(f"Twitter token validation failed: Rate limit exceeded (429)")
+            # For rate limits, we'll assume the token is valid to avoid unnecessary re-auth
+            return True
+        elif response.status_code in [403, 404]:
+            logger.warning(f"Twitter token validation failed: Access denied or user not found ({response.status_code})")
+            return False
+        else:
+            logger.warning(f"Twitter token validation failed: Unexpected status code {response.status_code}")
+            logger.debug(f"Response content: {response.text[:200]}...")
+            return False
+    
     @staticmethod
     def create_auth_headers(access_token: str) -> Dict[str, str]:
         """Create authorization headers for API requests"""
         return {
             'Authorization': f'Bearer {access_token}',
             'Content-Type': 'application/json'
-        }
\ No newline at end of file
+        }
+
+
+class AsyncTwitterAuth(TwitterAuth):
+    """
+    TwitterAuth whose token exchange, refresh, revoke and validation calls run
+    on a shared httpx.AsyncClient instead of blocking the event loop
+    """
+    
+    def __init__(self, client_id: str, client_secret: str, http_client: httpx.AsyncClient):
+        super().__init__(client_id, client_secret)
+        self.http_client = http_client
+    
+    async def _post_form(self, url: str, data: Dict[str, str]) -> httpx.Response:
+        response = await self.http_client.post(
+            url,
+            headers=FORM_HEADERS,
+            data=data,
+            auth=(self.client_id, self.client_secret)
+        )
+        response.raise_for_status()
+        return response
+    
+    @staticmethod
+    def _log_http_error(action: str, error: httpx.HTTPError) -> None:
+        logger.error(f"Failed to {action}: {error}")
+        response = getattr(error, 'response', None)
+        if response is not None:
+            logger.error(f"Response status: {response.status_code}")
+            logger.error(f"Response content: {response.text}")
+    
+    async def exchange_code_for_token(self, code: str, code_verifier: str, redirect_uri: str) -> Optional[Dict]:
+        """Exchange authorization code for access token"""
+        try:
+            response = await self._post_form(TOKEN_URL, self._code_exchange_data(code, code_verifier, redirect_uri))
+            return response.json()
+        except httpx.HTTPError as e:
+            self._log_http_error("exchange code for token", e)
+            return None
+    
+    async def refresh_token(self, refresh_token: str) -> Optional[Dict]:
+        """Refresh access token using refresh token"""
+        try:
+            response = await self._post_form(TOKEN_URL, self._refresh_data(refresh_token))
+            return response.json()
+        except httpx.HTTPError as e:
+            self._log_http_error("refresh token", e)
+            return None
+    
+    async def revoke_token(self, token: str, token_type_hint: str = 'access_token') -> bool:
+        """Revoke access token or refresh token"""
+        try:
+            await self._post_form(REVOKE_URL, self._revoke_data(token, token_type_hint))
+            return True
+        except httpx.HTTPError as e:
+            self._log_http_error("revoke token", e)
+            return False
+    
+    async def validate_user_token(self, user_access_token: str) -> bool:
+        """Validate a user access token"""
+        headers = {
+            'Authorization': f'Bearer {user_access_token}'
+        }
+        
+        try:
+            response = await self.http_client.get(VALIDATE_URL, headers=headers, timeout=10)
+            return self._validation_result(response)
+        
+        except httpx.TimeoutException:
+            logger.warning("Twitter token validation failed: Request timeout")
+            # On timeout, assume token is valid to avoid unnecessary re-auth
+            return True
+        except httpx.TransportError:
+            logger.warning("Twitter token validation failed: Connection error")
+            # On connection error, assume token is valid to avoid unnecessary re-auth
+            return True
+        except httpx.HTTPError as e:
+            logger.error(f"Twitter token validation failed: Request exception - {e}")
+            return False
@@ -0,0 +1,212 @@
+"""Per-endpoint circuit breaker for Twitter API requests
+
+During a Twitter outage every request to the failing endpoint would wait
+out the full request timeout before failing, holding a connection (and a
+publish slot) the whole time. The breaker watches the outcome of the last
+``window_size`` requests of each endpoint and, once enough of them failed
+or were slow, stops sending requests to it for a while:
+
+- closed: requests go through; outcomes are recorded in the window
+- open: requests fail at once with CircuitOpenError until ``open_seconds``
+  (or a longer Retry-After from the tripping response) has passed
+- half-open: up to ``half_open_max_calls`` probe requests go through; a
+  healthy probe closes the circuit, a failed or slow one opens it again
+  for twice as long (up to ``max_open_seconds``)
+
+Only server errors (5xx) and network errors count as failures. Client
+errors (4xx) mean the endpoint is up; 429s are the rate limiter's business
+and are not counted either way.
+
+State is per process, like the in-memory rate limit backend.
+"""
+import math
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class _Circuit:
+    """Breaker state of one endpoint"""
+
+    __slots__ = ('state', 'outcomes', 'open_until', 'probes', 'trips')
+
+    def __init__(self, window_size: int):
+        self.state = CLOSED
+        self.outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)  # (failed, slow)
+        self.open_until = 0.0
+        self.probes = 0
+        self.trips = 0  # Consecutive openings without a successful probe
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker keyed by endpoint, driven by error rate and latency"""
+
+    def __init__(self, failure_rate_threshold: float = 0.5,
+                 slow_call_rate_threshold: float = 0.8,
+                 slow_call_seconds: float = 5.0,
+                 window_size: int = 20,
+                 minimum_calls: int = 10,
+                 open_seconds: float = 30.0,
+                 max_open_seconds: float = 300.0,
+                 half_open_max_calls: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            failure_rate_threshold: Share of failed requests in the window that opens the circuit
+            slow_call_rate_threshold: Share of requests slower than slow_call_seconds that opens it
+            slow_call_seconds: Requests taking at least this long count as slow
+            window_size: Number of most recent requests the rates are computed over
+            minimum_calls: Requests needed in the window before the rates are acted on
+            open_seconds: How long the circuit stays open the first time it opens
+            max_open_seconds: Upper bound for the doubling open time
+            half_open_max_calls: Probe requests let through while half-open
+            clock: Monotonic clock
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.window_size = window_size
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+        self.rejected = 0
+
+    def _circuit(self, endpoint_key: str) -> _Circuit:
+        circuit = self._circuits.get(endpoint_key)
+        if circuit is None:
+            circuit = self._circuits[endpoint_key] = _Circuit(self.window_size)
+        return circuit
+
+    def before_request(self, endpoint_key: str) -> None:
+        """
+        Let a request through or reject it
+
+        A request let through while half-open holds a probe slot and must be
+        followed by record_success, record_failure or release.
+
+        Raises:
+            CircuitOpenError: The circuit is open, or half-open with every probe slot taken
+        """
+        with self._lock:
+            circuit = self._circuit(endpoint_key)
+            if circuit.state == CLOSED:
+                return
+
+            now = self._clock()
+            if circuit.state == OPEN:
+                if now < circuit.open_until:
+                    self.rejected += 1
+                    raise CircuitOpenError(endpoint_key, retry_after=math.ceil(circuit.open_until - now))
+                circuit.state = HALF_OPEN
+                circuit.probes = 0
+                logger.info(f"Circuit for {endpoint_key} half-open, probing")
+
+            if circuit.probes >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(endpoint_key, retry_after=1)
+            circuit.probes += 1
+
+    def record_success(self, endpoint_key: str, elapsed: float) -> None:
+        """Record a request that got a non-5xx response after ``elapsed`` seconds"""
+        slow = elapsed >= self.slow_call_seconds
+        with self._lock:
+            circuit = self._circuit(endpoint_key)
+            if circuit.state == HALF_OPEN:
+                circuit.probes = max(circuit.probes - 1, 0)
+                if slow:
+                    self._open(endpoint_key, circuit, None)
+                else:
+                    circuit.state = CLOSED
+                    circuit.outcomes.clear()
+                    circuit.trips = 0
+                    logger.info(f"Circuit for {endpoint_key} closed")
+                return
+            if circuit.state == CLOSED:
+                circuit.outcomes.append((False, slow))
+                self._evaluate(endpoint_key, circuit, None)
+
+    def record_failure(self, endpoint_key: str, elapsed: float,
+                       retry_after: Optional[float] = None) -> None:
+        """Record a request that failed with a 5xx or a network error"""
+        slow = elapsed >= self.slow_call_seconds
+        with self._lock:
+            circuit = self._circuit(endpoint_key)
+            if circuit.state == HALF_OPEN:
+                circuit.probes = max(circuit.probes - 1, 0)
+                self._open(endpoint_key, circuit, retry_after)
+                return
+            if circuit.state == CLOSED:
+                circuit.outcomes.append((True, slow))
+                self._evaluate(endpoint_key, circuit, retry_after)
+
+    def release(self, endpoint_key: str) -> None:
+        """Give back a probe slot for a request that ended without a countable outcome"""
+        with self._lock:
+            circuit = self._circuits.get(endpoint_key)
+            if circuit is not None and circuit.state == HALF_OPEN:
+                circuit.probes = max(circuit.probes - 1, 0)
+
+    def _evaluate(self, endpoint_key: str, circuit: _Circuit, retry_after: Optional[float]) -> None:
+        calls = len(circuit.outcomes)
+        if calls < self.minimum_calls:
+            return
+        failure_rate = sum(failed for failed, _ in circuit.outcomes) / calls
+        slow_rate = sum(slow for _, slow in circuit.outcomes) / calls
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+            self._open(endpoint_key, circuit, retry_after)
+
+    def _open(self, endpoint_key: str, circuit: _Circuit, retry_after: Optional[float]) -> None:
+        circuit.trips += 1
+        open_for = min(self.open_seconds * (2 ** (circuit.trips - 1)), self.max_open_seconds)
+        if retry_after:
+            open_for = max(open_for, retry_after)
+        circuit.state = OPEN
+        circuit.open_until = self._clock() + open_for
+        circuit.outcomes.clear()
+        logger.warning(f"Circuit for {endpoint_key} opened for {open_for:.0f}s")
+
+    def state(self, endpoint_key: str) -> str:
+        """Current state of an endpoint's circuit"""
+        with self._lock:
+            circuit = self._circuits.get(endpoint_key)
+            return circuit.state if circuit else CLOSED
+
+    def reset(self, endpoint_key: Optional[str] = None) -> None:
+        """Close one endpoint's circuit, or every circuit"""
+        with self._lock:
+            if endpoint_key is None:
+                self._circuits.clear()
+            else:
+                self._circuits.pop(endpoint_key, None)
+
+    def status(self) -> Dict[str, Any]:
+        """State, recent failure/slow rates and time until the next probe, per endpoint"""
+        now = self._clock()
+        endpoints = {}
+        with self._lock:
+            for endpoint_key, circuit in self._circuits.items():
+                calls = len(circuit.outcomes)
+                endpoints[endpoint_key] = {
+                    'state': circuit.state,
+                    'calls': calls,
+                    'failure_rate': sum(f for f, _ in circuit.outcomes) / calls if calls else 0.0,
+                    'slow_call_rate': sum(s for _, s in circuit.outcomes) / calls if calls else 0.0,
+                    'retry_in': max(circuit.open_until - now, 0.0) if circuit.state == OPEN else 0.0,
+                    'trips': circuit.trips
+                }
+        return {'endpoints': endpoints, 'rejected': self.rejected}
@@ -2,84 +2,93 @@
 import requests
 import json
 import time
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 import logging
 from urllib.parse import urlencode
+from email.utils import parsedate_to_datetime
 
 from .endpoints import TwitterAPIEndpoints, APIEndpoint
 from .rate_limiter import TwitterRateLimiter
+from .response_cache import ResponseCache
+from .circuit_breaker import CircuitBreaker
+from .retry_policy import RetryPolicy
 from .auth import TwitterAuth
 from .exceptions import (
     TwitterAPIError, RateLimitError, AuthenticationError,
-    TwitterAPINotFoundError, TwitterAPIBadRequestError, TwitterAPIServerError
+    TwitterAPINotFoundError, TwitterAPIBadRequestError, TwitterAPIServerError,
+    TwitterAPINetworkError
 )
 
 logger = logging.getLogger(__name__)
 
-class TwitterAPIClient:
-    """Main Twitter API client for interacting with Twitter API v2"""
+USER_AGENT = 'Ideation-Twitter-Client/1.0'
+REQUEST_TIMEOUT_SECONDS = 30
+
+# Most IDs accepted by one /tweets?ids= or /users?ids= lookup
+MAX_LOOKUP_IDS = 100
+
+
+class BaseTwitterAPIClient:
+    """
+    Transport-independent parts of the Twitter API v2 client
     
-    def __init__(self, client_id: str, client_secret: str, 
-                 rate_limiter: Optional[TwitterRateLimiter] = None):
-        self.auth = TwitterAuth(client_id, client_secret)
+    Builds request URLs, parameters and bodies, and maps responses to data or
+    exceptions. Subclasses only perform the HTTP round-trip, so the blocking
+    and the asyncio client share one request/response contract.
+    """
+    
+    def __init__(self, rate_limiter: Optional[TwitterRateLimiter] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
         self.rate_limiter = rate_limiter or TwitterRateLimiter()
+        self.response_cache = response_cache or ResponseCache()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.retry_policy = retry_policy or RetryPolicy()
         self.endpoints = TwitterAPIEndpoints()
+    
+    @staticmethod
+    def _endpoint_key(endpoint: APIEndpoint) -> str:
+        return f"{endpoint.method}:{endpoint.path}"
+    
+    def _after_failed_attempt(self, endpoint_key: str, endpoint: APIEndpoint, error: TwitterAPIError,
+                              elapsed: float, attempt: int, previous_delay: Optional[float]) -> Optional[float]:
+        """Record a failed attempt with the circuit breaker; seconds until the retry, or None to raise"""
+        if isinstance(error, RateLimitError):
+            self.circuit_breaker.release(endpoint_key)
+        elif isinstance(error, (TwitterAPIServerError, TwitterAPINetworkError)):
+            self.circuit_breaker.record_failure(endpoint_key, elapsed, getattr(error, 'retry_after', None))
+        else:
+            # A 4xx is an answer from a healthy endpoint
+            self.circuit_breaker.record_success(endpoint_key, elapsed)
         
-        # Configure session for connection pooling
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Ideation-Twitter-Client/1.0'
-        })
+        delay = self.retry_policy.next_delay(attempt, error, endpoint.method, previous_delay)
+        if delay is not None:
+            logger.warning(f"Retrying {endpoint_key} in {delay:.2f}s after attempt {attempt} failed: {error}")
+        return delay
     
-    def _make_request(self, endpoint: APIEndpoint, user_token: str, 
-                     params: Optional[Dict] = None, json_body: Optional[Dict] = None,
-                     **path_params) -> Dict[str, Any]:
-        """
-        Core method for making API requests with rate limiting and error handling
-        """
+    def _prepare_request(self, endpoint: APIEndpoint, user_token: str,
+                         params: Optional[Dict] = None, json_body: Optional[Dict] = None,
+                         **path_params) -> Tuple[str, str, Dict[str, Any]]:
+        """Build (endpoint_key, url, request kwargs) for an API call"""
         endpoint_key = f"{endpoint.method}:{endpoint.path}"
-        
-        # Check rate limit before making request
-        self.rate_limiter.wait_if_needed(endpoint_key, endpoint)
-        
-        # Build URL
         url = self.endpoints.get_full_url(endpoint, **path_params)
         
-        # Prepare headers
-        headers = TwitterAuth.create_auth_headers(user_token)
-        
-        # Prepare request parameters
         request_kwargs = {
-            'headers': headers,
-            'timeout': 30
+            'headers': TwitterAuth.create_auth_headers(user_token)
         }
-        
         if params:
             request_kwargs['params'] = params
-        
         if json_body:
             request_kwargs['json'] = json_body
         
-        # Log request details
         logger.info(f"Making {endpoint.method} request to {url}")
         logger.debug(f"Request params: {params}, body: {json_body}")
         
-        try:
-            # Make the request
-            response = self.session.request(endpoint.method, url, **request_kwargs)
-            
-            # Update rate limit info
-            self.rate_limiter.update_rate_limit(endpoint_key, response.headers)
-            
-            # Handle response
-            return self._handle_response(response, endpoint_key)
-            
-        except requests.RequestException as e:
-            logger.error(f"Network error during API request: {e}")
-            raise TwitterAPIError(f"Network error: {str(e)}")
+        return endpoint_key, url, request_kwargs
     
-    def _handle_response(self, response: requests.Response, endpoint_key: str) -> Dict[str, Any]:
-        """Handle API response and raise appropriate exceptions"""
+    def _handle_response(self, response, endpoint_key: str) -> Dict[str, Any]:
+        """Handle API response (requests or httpx) and raise appropriate exceptions"""
         
         # Log response details
         logger.debug(f"Response status: {response.status_code}")
@@ -113,9 +122,11 @@ class TwitterAPIClient:
         elif response.status_code == 429:
             reset_time = int(response.headers.get('x-rate-limit-reset', 0))
             remaining = int(response.headers.get('x-rate-limit-remaining', 0))
-            raise RateLimitError(error_message, reset_time, remaining)
+            raise RateLimitError(error_message, reset_time, remaining,
+                                 retry_after=self._parse_retry_after(response.headers))
         elif response.status_code >= 500:
-            raise TwitterAPIServerError(error_message)
+            raise TwitterAPIServerError(error_message, status_code=response.status_code,
+                                        retry_after=self._parse_retry_after(response.headers))
         else:
             raise TwitterAPIError(
                 error_message, 
@@ -123,6 +134,21 @@ class TwitterAPIClient:
                 response_data=error_data
             )
     
+    def _parse_retry_after(self, headers) -> Optional[int]:
+        """Retry-After header in seconds (delta-seconds or HTTP date), if present"""
+        value = headers.get('retry-after')
+        if not value:
+            return None
+        try:
+            return max(int(value), 0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(int(retry_at.timestamp() - time.time()), 0)
+        except (TypeError, ValueError):
+            return None
+    
     def _extract_error_message(self, error_data: Dict, status_code: int) -> str:
         """Extract error message from API response"""
         if 'detail' in error_data:
@@ -151,28 +177,17 @@ class TwitterAPIClient:
         
         return validation_errors
     
-    # ==================== Tweet Operations ====================
+    # ==================== Request Builders ====================
     
-    def create_tweet(self, user_token: str, text: str, 
-                    reply_settings: Optional[str] = None,
-                    in_reply_to_tweet_id: Optional[str] = None,
-                    quote_tweet_id: Optional[str] = None,
-                    media_ids: Optional[List[str]] = None,
-                    poll_options: Optional[List[str]] = None,
-                    poll_duration_minutes: Optional[int] = None) -> Dict[str, Any]:
-        """
-        Create a new tweet
-        
-        Args:
-            user_token: User's access token
-            text: Tweet text content
-            reply_settings: Who can reply ('everyone', 'mentionedUsers', 'followers')
-            in_reply_to_tweet_id: ID of tweet being replied to
-            quote_tweet_id: ID of tweet being quoted
-            media_ids: List of media IDs to attach
-            poll_options: List of poll options (2-4 options)
-            poll_duration_minutes: Poll duration in minutes (5-10080)
-        """
+    @staticmethod
+    def _build_tweet_body(text: str,
+                          reply_settings: Optional[str] = None,
+                          in_reply_to_tweet_id: Optional[str] = None,
+                          quote_tweet_id: Optional[str] = None,
+                          media_ids: Optional[List[str]] = None,
+                          poll_options: Optional[List[str]] = None,
+                          poll_duration_minutes: Optional[int] = None) -> Dict[str, Any]:
+        """Validate tweet text and build the create-tweet request body"""
         if not text or len(text) > 280:
             raise TwitterAPIBadRequestError("Tweet text must be 1-280 characters")
         
@@ -212,30 +227,10 @@ class TwitterAPIClient:
         if reply_settings and reply_settings in ['everyone', 'mentionedUsers', 'followers']:
             tweet_data['reply_settings'] = reply_settings
         
-        return self._make_request(
-            self.endpoints.CREATE_TWEET,
-            user_token,
-            json_body=tweet_data
-        )
-    
-    def delete_tweet(self, user_token: str, tweet_id: str) -> Dict[str, Any]:
-        """Delete a tweet"""
-        return self._make_request(
-            self.endpoints.DELETE_TWEET,
-            user_token,
-            tweet_id=tweet_id
-        )
+        return tweet_data
     
-    def fetch_tweet_by_id(self, user_token: str, tweet_id: str, 
-                         fields: Optional[List[str]] = None) -> Dict[str, Any]:
-        """
-        Fetch a tweet by ID
-        
-        Args:
-            user_token: User's access token
-            tweet_id: Tweet ID to fetch
-            fields: List of tweet fields to include
-        """
+    @staticmethod
+    def _build_tweet_lookup_params(fields: Optional[List[str]] = None) -> Dict[str, Any]:
         params = {}
         
         if fields:
@@ -246,39 +241,20 @@ class TwitterAPIClient:
             params['expansions'] = 'author_id'
             params['user.fields'] = 'id,name,username,verified'
         
-        return self._make_request(
-            self.endpoints.GET_TWEET,
-            user_token,
-            params=params,
-            tweet_id=tweet_id
-        )
+        return params
     
-    def search_tweets(self, user_token: str, query: str, 
-                     start_time: Optional[str] = None,
-                     end_time: Optional[str] = None,
-                     since_id: Optional[str] = None,
-                     until_id: Optional[str] = None,
-                     max_results: int = 100,
-                     next_token: Optional[str] = None,
-                     tweet_fields: Optional[List[str]] = None,
-                     user_fields: Optional[List[str]] = None,
-                     expansions: Optional[List[str]] = None) -> Dict[str, Any]:
-        """
-        Search for tweets
-        
-        Args:
-            user_token: User's access token
-            query: Search query using Twitter search operators
-            start_time: Earliest tweet creation time (ISO 8601)
-            end_time: Latest tweet creation time (ISO 8601)
-            since_id: Return tweets after this tweet ID
-            until_id: Return tweets before this tweet ID
-            max_results: Maximum number of results (10-100)
-            next_token: Pagination token
-            tweet_fields: List of tweet fields to include
-            user_fields: List of user fields to include
-            expansions: List of expansion fields
-        """
+    @staticmethod
+    def _build_search_params(query: str,
+                             start_time: Optional[str] = None,
+                             end_time: Optional[str] = None,
+                             since_id: Optional[str] = None,
+                             until_id: Optional[str] = None,
+                             max_results: int = 100,
+                             next_token: Optional[str] = None,
+                             tweet_fields: Optional[List[str]] = None,
+                             user_fields: Optional[List[str]] = None,
+                             expansions: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Validate a recent-search query and build its request parameters"""
         if not query:
             raise TwitterAPIBadRequestError("Query parameter is required")
         
@@ -323,6 +299,299 @@ class TwitterAPIClient:
             expansions = default_expansions
         params['expansions'] = ','.join(expansions)
         
+        return params
+    
+    @staticmethod
+    def _with_lookup_ids(params: Dict[str, Any], ids: List[str]) -> Dict[str, Any]:
+        """Add the ids parameter of a batch lookup, validating its size"""
+        if not ids:
+            raise TwitterAPIBadRequestError("At least one ID is required")
+        if len(ids) > MAX_LOOKUP_IDS:
+            raise TwitterAPIBadRequestError(f"At most {MAX_LOOKUP_IDS} IDs can be looked up per request")
+        
+        params['ids'] = ','.join(str(item_id) for item_id in ids)
+        return params
+    
+    @staticmethod
+    def _build_user_lookup_params(user_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        params = {}
+        
+        if user_fields:
+            default_fields = ['id', 'name', 'username', 'verified', 'public_metrics']
+            user_fields = list(set(default_fields + user_fields))
+            params['user.fields'] = ','.join(user_fields)
+        
+        return params
+    
+    @staticmethod
+    def _parse_personalized_trends(response_data: Dict[str, Any], max_results: int) -> List[Dict[str, Any]]:
+        """Convert a personalized trends response to the standardized trend format"""
+        # Check for API errors in response
+        if 'errors' in response_data:
+            error_messages = []
+            for error in response_data['errors']:
+                error_msg = f"{error.get('title', 'API Error')}: {error.get('detail', 'Unknown error')}"
+                error_messages.append(error_msg)
+            raise TwitterAPIError(f"Personalized trends API errors: {'; '.join(error_messages)}")
+        
+        # Extract trends from response
+        trends = response_data.get('data', [])
+        
+        if not trends:
+            logger.warning("No personalized trends data returned from API")
+            return []
+        
+        # Convert to standardized format for compatibility
+        standardized_trends = []
+        for trend in trends:
+            # Skip trends with missing essential data
+            trend_name = trend.get('trend_name', '').strip()
+            if not trend_name:
+                logger.warning(f"Skipping trend with missing name: {trend}")
+                continue
+                
+            standardized_trend = {
+                'name': trend_name,
+                'category': trend.get('category', 'General'),
+                'tweet_volume': trend.get('post_count', 0),
+                'trending_since': trend.get('trending_since'),
+                'url': f"https://x.com/search?q={trend_name.replace('#', '%23')}",
+                'source': 'personalized_trends_v2'
+            }
+            standardized_trends.append(standardized_trend)
+            
+            # Limit results to max_results
+            if len(standardized_trends) >= max_results:
+                break
+        
+        logger.info(f"Retrieved {len(standardized_trends)} personalized trends")
+        return standardized_trends
+    
+    def _parse_location_trends(self, data) -> List[Dict[str, Any]]:
+        """Extract trends from a v1.1 trends/place response"""
+        # Twitter trends API returns array of locations, get first one
+        if data and len(data) > 0:
+            trends = data[0].get('trends', [])
+            # Add source information
+            for trend in trends:
+                trend['source'] = 'location_trends_v1.1'
+            return trends
+        return []
+    
+    # ==================== Utility Methods ====================
+    
+    def get_rate_limit_status(self, user_token: Optional[str] = None) -> Dict[str, Any]:
+        """Get current rate limit status for all endpoints (for one access token, if given)"""
+        status = {}
+        
+        # Common endpoint keys
+        endpoint_keys = [
+            "POST:/tweets",
+            "GET:/tweets/search/recent", 
+            "GET:/users/me",
+            "POST:/users/{user_id}/retweets",
+            "GET:/trends/place.json"
+        ]
+        
+        for key in endpoint_keys:
+            limit_info = self.rate_limiter.get_rate_limit_status(key, user_token)
+            if limit_info:
+                status[key] = limit_info
+        
+        return status
+
+
+class TwitterAPIClient(BaseTwitterAPIClient):
+    """Main Twitter API client for interacting with Twitter API v2"""
+    
+    def __init__(self, client_id: str, client_secret: str, 
+                 rate_limiter: Optional[TwitterRateLimiter] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
+        super().__init__(rate_limiter, response_cache, circuit_breaker, retry_policy)
+        self.auth = TwitterAuth(client_id, client_secret)
+        
+        # Configure session for connection pooling
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT
+        })
+    
+    def _make_request(self, endpoint: APIEndpoint, user_token: str, 
+                     params: Optional[Dict] = None, json_body: Optional[Dict] = None,
+                     **path_params) -> Dict[str, Any]:
+        """
+        Core method for making API requests with rate limiting and error handling
+        
+        Transient failures are retried according to the retry policy. While
+        the endpoint's circuit is open, CircuitOpenError is raised without
+        making a request.
+        """
+        endpoint_key, url, request_kwargs = self._prepare_request(
+            endpoint, user_token, params=params, json_body=json_body, **path_params
+        )
+        
+        attempt = 0
+        delay = None
+        while True:
+            attempt += 1
+            self.circuit_breaker.before_request(endpoint_key)
+            try:
+                # Check rate limit before making request
+                self.rate_limiter.wait_if_needed(endpoint_key, endpoint, user_token)
+            except BaseException:
+                self.circuit_breaker.release(endpoint_key)
+                raise
+            
+            started = time.monotonic()
+            try:
+                # Make the request
+                response = self.session.request(endpoint.method, url, timeout=REQUEST_TIMEOUT_SECONDS,
+                                                **request_kwargs)
+                
+                # Update rate limit info
+                self.rate_limiter.update_rate_limit(endpoint_key, response.headers, user_token)
+                
+                # Handle response
+                result = self._handle_response(response, endpoint_key)
+                
+            except requests.RequestException as e:
+                logger.error(f"Network error during API request: {e}")
+                error = TwitterAPINetworkError(f"Network error: {str(e)}")
+            except TwitterAPIError as e:
+                error = e
+            except BaseException:
+                self.circuit_breaker.release(endpoint_key)
+                raise
+            else:
+                self.circuit_breaker.record_success(endpoint_key, time.monotonic() - started)
+                return result
+            
+            delay = self._after_failed_attempt(endpoint_key, endpoint, error, time.monotonic() - started,
+                                               attempt, delay)
+            if delay is None:
+                raise error
+            time.sleep(delay)
+    
+    # ==================== Tweet Operations ====================
+    
+    def create_tweet(self, user_token: str, text: str, 
+                    reply_settings: Optional[str] = None,
+                    in_reply_to_tweet_id: Optional[str] = None,
+                    quote_tweet_id: Optional[str] = None,
+                    media_ids: Optional[List[str]] = None,
+                    poll_options: Optional[List[str]] = None,
+                    poll_duration_minutes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Create a new tweet
+        
+        Args:
+            user_token: User's access token
+            text: Tweet text content
+            reply_settings: Who can reply ('everyone', 'mentionedUsers', 'followers')
+            in_reply_to_tweet_id: ID of tweet being replied to
+            quote_tweet_id: ID of tweet being quoted
+            media_ids: List of media IDs to attach
+            poll_options: List of poll options (2-4 options)
+            poll_duration_minutes: Poll duration in minutes (5-10080)
+        """
+        tweet_data = self._build_tweet_body(
+            text, reply_settings, in_reply_to_tweet_id, quote_tweet_id,
+            media_ids, poll_options, poll_duration_minutes
+        )
+        
+        return self._make_request(
+            self.endpoints.CREATE_TWEET,
+            user_token,
+            json_body=tweet_data
+        )
+    
+    def delete_tweet(self, user_token: str, tweet_id: str) -> Dict[str, Any]:
+        """Delete a tweet"""
+        result = self._make_request(
+            self.endpoints.DELETE_TWEET,
+            user_token,
+            tweet_id=tweet_id
+        )
+        self.response_cache.invalidate(self._endpoint_key(self.endpoints.GET_TWEET), (tweet_id,))
+        return result
+    
+    def fetch_tweet_by_id(self, user_token: str, tweet_id: str, 
+                         fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch a tweet by ID
+        
+        Args:
+            user_token: User's access token
+            tweet_id: Tweet ID to fetch
+            fields: List of tweet fields to include
+        """
+        params = self._build_tweet_lookup_params(fields)
+        
+        return self.response_cache.get_or_fetch(
+            self._endpoint_key(self.endpoints.GET_TWEET), user_token, (tweet_id, tuple(fields or ())),
+            lambda: self._make_request(
+                self.endpoints.GET_TWEET,
+                user_token,
+                params=params,
+                tweet_id=tweet_id
+            )
+        )
+    
+    def fetch_tweets_by_ids(self, user_token: str, tweet_ids: List[str],
+                            fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch up to 100 tweets in one request
+        
+        Args:
+            user_token: User's access token
+            tweet_ids: Tweet IDs to fetch (1-100)
+            fields: List of tweet fields to include
+            
+        Returns:
+            Response with ``data`` (found tweets) and ``errors`` (IDs not found
+            or not visible), as returned by GET /2/tweets
+        """
+        params = self._with_lookup_ids(self._build_tweet_lookup_params(fields), tweet_ids)
+        
+        return self._make_request(
+            self.endpoints.GET_TWEETS,
+            user_token,
+            params=params
+        )
+    
+    def search_tweets(self, user_token: str, query: str, 
+                     start_time: Optional[str] = None,
+                     end_time: Optional[str] = None,
+                     since_id: Optional[str] = None,
+                     until_id: Optional[str] = None,
+                     max_results: int = 100,
+                     next_token: Optional[str] = None,
+                     tweet_fields: Optional[List[str]] = None,
+                     user_fields: Optional[List[str]] = None,
+                     expansions: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Search for tweets
+        
+        Args:
+            user_token: User's access token
+            query: Search query using Twitter search operators
+            start_time: Earliest tweet creation time (ISO 8601)
+            end_time: Latest tweet creation time (ISO 8601)
+            since_id: Return tweets after this tweet ID
+            until_id: Return tweets before this tweet ID
+            max_results: Maximum number of results (10-100)
+            next_token: Pagination token
+            tweet_fields: List of tweet fields to include
+            user_fields: List of user fields to include
+            expansions: List of expansion fields
+        """
+        params = self._build_search_params(
+            query, start_time, end_time, since_id, until_id, max_results,
+            next_token, tweet_fields, user_fields, expansions
+        )
+        
         return self._make_request(
             self.endpoints.SEARCH_RECENT_TWEETS,
             user_token,
@@ -384,35 +653,43 @@ class TwitterAPIClient:
     def get_user_by_id(self, user_token: str, user_id: str, 
                       user_fields: Optional[List[str]] = None) -> Dict[str, Any]:
         """Get user information by user ID"""
-        params = {}
+        params = self._build_user_lookup_params(user_fields)
         
-        if user_fields:
-            default_fields = ['id', 'name', 'username', 'verified', 'public_metrics']
-            user_fields = list(set(default_fields + user_fields))
-            params['user.fields'] = ','.join(user_fields)
+        return self.response_cache.get_or_fetch(
+            self._endpoint_key(self.endpoints.GET_USER_BY_ID), user_token, (user_id, tuple(user_fields or ())),
+            lambda: self._make_request(
+                self.endpoints.GET_USER_BY_ID,
+                user_token,
+                params=params,
+                user_id=user_id
+            )
+        )
+    
+    def get_users_by_ids(self, user_token: str, user_ids: List[str],
+                         user_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get up to 100 users in one request (``data`` and ``errors`` as for fetch_tweets_by_ids)"""
+        params = self._with_lookup_ids(self._build_user_lookup_params(user_fields), user_ids)
         
         return self._make_request(
-            self.endpoints.GET_USER_BY_ID,
+            self.endpoints.GET_USERS,
             user_token,
-            params=params,
-            user_id=user_id
+            params=params
         )
     
     def get_user_by_username(self, user_token: str, username: str,
                            user_fields: Optional[List[str]] = None) -> Dict[str, Any]:
         """Get user information by username"""
-        params = {}
-        
-        if user_fields:
-            default_fields = ['id', 'name', 'username', 'verified', 'public_metrics']
-            user_fields = list(set(default_fields + user_fields))
-            params['user.fields'] = ','.join(user_fields)
+        params = self._build_user_lookup_params(user_fields)
         
-        return self._make_request(
-            self.endpoints.GET_USER_BY_USERNAME,
-            user_token,
-            params=params,
-            username=username
+        return self.response_cache.get_or_fetch(
+            self._endpoint_key(self.endpoints.GET_USER_BY_USERNAME), user_token,
+            (username.lower(), tuple(user_fields or ())),
+            lambda: self._make_request(
+                self.endpoints.GET_USER_BY_USERNAME,
+                user_token,
+                params=params,
+                username=username
+            )
         )
     
     def get_me(self, user_token: str) -> Dict[str, Any]:
@@ -449,52 +726,16 @@ class TwitterAPIClient:
         }
         
         try:
-            response_data = self._make_request(
-                self.endpoints.GET_PERSONALIZED_TRENDS,
-                user_token,
-                params=params
+            response_data = self.response_cache.get_or_fetch(
+                self._endpoint_key(self.endpoints.GET_PERSONALIZED_TRENDS), user_token, (),
+                lambda: self._make_request(
+                    self.endpoints.GET_PERSONALIZED_TRENDS,
+                    user_token,
+                    params=params
+                )
             )
             
-            # Check for API errors in response
-            if 'errors' in response_data:
-                error_messages = []
-                for error in response_data['errors']:
-                    error_msg = f"{error.get('title', 'API Error')}: {error.get('detail', 'Unknown error')}"
-                    error_messages.append(error_msg)
-                raise TwitterAPIError(f"Personalized trends API errors: {'; '.join(error_messages)}")
-            
-            # Extract trends from response
-            trends = response_data.get('data', [])
-            
-            if not trends:
-                logger.warning("No personalized trends data returned from API")
-                return []
-            
-            # Convert to standardized format for compatibility
-            standardized_trends = []
-            for trend in trends:
-                # Skip trends with missing essential data
-                trend_name = trend.get('trend_name', '').strip()
-                if not trend_name:
-                    logger.warning(f"Skipping trend with missing name: {trend}")
-                    continue
-                    
-                standardized_trend = {
-                    'name': trend_name,
-                    'category': trend.get('category', 'General'),
-                    'tweet_volume': trend.get('post_count', 0),
-                    'trending_since': trend.get('trending_since'),
-                    'url': f"https://x.com/search?q={trend_name.replace('#', '%23')}",
-                    'source': 'personalized_trends_v2'
-                }
-                standardized_trends.append(standardized_trend)
-                
-                # Limit results to max_results
-                if len(standardized_trends) >= max_results:
-                    break
-            
-            logger.info(f"Retrieved {len(standardized_trends)} personalized trends")
-            return standardized_trends
+            return self._parse_personalized_trends(response_data, max_results)
             
         except TwitterAPIError as e:
             # If personalized trends fail, log and re-raise
@@ -514,41 +755,14 @@ class TwitterAPIClient:
         """
         # Use v1.1 API as it's more reliable for trends
         endpoint = self.endpoints.GET_TRENDS
-        url = f"{self.endpoints.BASE_URL_V1_1}{endpoint.path}"
-        
-        params = {
-            'id': location_id
-        }
+        endpoint_key = self._endpoint_key(endpoint)
         
-        headers = TwitterAuth.create_auth_headers(user_token)
+        def fetch() -> List[Dict[str, Any]]:
+            data = self._make_request(endpoint, user_token, params={'id': location_id})
+            return self._parse_location_trends(data)
         
-        endpoint_key = f"{endpoint.method}:{endpoint.path}"
-        self.rate_limiter.wait_if_needed(endpoint_key, endpoint)
-        
-        try:
-            response = self.session.get(url, headers=headers, params=params, timeout=30)
-            
-            # Update rate limit info
-            self.rate_limiter.update_rate_limit(endpoint_key, response.headers)
-            
-            if response.status_code == 200:
-                data = response.json()
-                # Twitter trends API returns array of locations, get first one
-                if data and len(data) > 0:
-                    trends = data[0].get('trends', [])
-                    # Add source information
-                    for trend in trends:
-                        trend['source'] = 'location_trends_v1.1'
-                    return trends
-                return []
-            else:
-                error_data = response.json() if response.content else {}
-                error_message = self._extract_error_message(error_data, response.status_code)
-                raise TwitterAPIError(error_message, response.status_code, response_data=error_data)
-                
-        except requests.RequestException as e:
-            logger.error(f"Network error getting trends: {e}")
-            raise TwitterAPIError(f"Network error: {str(e)}")
+        # Location trends are the same for every caller, so one fetch serves all founders
+        return self.response_cache.get_or_fetch(endpoint_key, user_token, (str(location_id),), fetch)
     
     def get_trends(self, user_token: str, location_id: str = "1", 
                    prefer_personalized: bool = True, max_results: int = 20) -> List[Dict[str, Any]]:
@@ -596,26 +810,6 @@ class TwitterAPIClient:
     
     # ==================== Utility Methods ====================
     
-    def get_rate_limit_status(self) -> Dict[str, Any]:
-        """Get current rate limit status for all endpoints"""
-        status = {}
-        
-        # Common endpoint keys
-        endpoint_keys = [
-            "POST:/tweets",
-            "GET:/tweets/search/recent", 
-            "GET:/users/me",
-            "POST:/users/{user_id}/retweets",
-            "GET:/trends/place.json"
-        ]
-        
-        for key in endpoint_keys:
-            limit_info = self.rate_limiter.get_rate_limit_status(key)
-            if limit_info:
-                status[key] = limit_info
-        
-        return status
-    
     def close(self):
         """Close the HTTP session"""
         self.session.close()
\ No newline at end of file
@@ -1,6 +1,17 @@
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Optional
 from dataclasses import dataclass
 
+# Point the clients at another server (e.g. the local fake in fake_server.py)
+# with TWITTER_API_BASE_URL=http://127.0.0.1:8081/2; the v1.1 base follows it
+# unless TWITTER_API_V1_1_BASE_URL is set as well.
+DEFAULT_BASE_URL_V2 = "https://api.x.com/2"
+
+
+def _base_url_v1_1(base_url_v2: str) -> str:
+    root = base_url_v2[:-len("/2")] if base_url_v2.endswith("/2") else base_url_v2
+    return f"{root}/1.1"
+
 @dataclass
 class APIEndpoint:
     """Configuration for a Twitter API endpoint"""
@@ -8,20 +19,27 @@ class APIEndpoint:
     method: str
     version: str = "2"
     rate_limit_window: int = 900  # 15 minutes in seconds
-    rate_limit_requests: int = 300  # Default rate limit per window
+    rate_limit_requests: int = 300  # Default rate limit per window (per access token)
+    app_rate_limit_requests: Optional[int] = None  # App-wide cap shared by all tokens, if any
+    app_rate_limit_window: int = 86400  # 24 hours in seconds
     requires_auth: bool = True
 
 class TwitterAPIEndpoints:
-    """Twitter API v2 endpoint configurations"""
+    """Twitter API v2 endpoint configurations
+
+    App-wide caps are the per-app limits of the X API Pro tier; they bound
+    the sum of all founders' requests however many access tokens are used.
+    """
     
-    BASE_URL_V2 = "https://api.x.com/2"
-    BASE_URL_V1_1 = "https://api.x.com/1.1"
+    BASE_URL_V2 = os.getenv('TWITTER_API_BASE_URL', DEFAULT_BASE_URL_V2).rstrip('/')
+    BASE_URL_V1_1 = os.getenv('TWITTER_API_V1_1_BASE_URL', _base_url_v1_1(BASE_URL_V2)).rstrip('/')
     
     # Tweet endpoints
     CREATE_TWEET = APIEndpoint(
         path="/tweets",
         method="POST",
-        rate_limit_requests=300
+        rate_limit_requests=300,
+        app_rate_limit_requests=10000  # per 24 hours
     )
     
     DELETE_TWEET = APIEndpoint(
@@ -33,26 +51,52 @@ class TwitterAPIEndpoints:
     GET_TWEET = APIEndpoint(
         path="/tweets/{tweet_id}",
         method="GET",
-        rate_limit_requests=300
+        rate_limit_requests=300,
+        app_rate_limit_requests=450,
+        app_rate_limit_window=900
+    )
+    
+    # Up to 100 comma-separated IDs per request (?ids=)
+    GET_TWEETS = APIEndpoint(
+        path="/tweets",
+        method="GET",
+        rate_limit_requests=900,
+        app_rate_limit_requests=450,
+        app_rate_limit_window=900
     )
     
     SEARCH_RECENT_TWEETS = APIEndpoint(
         path="/tweets/search/recent",
         method="GET",
-        rate_limit_requests=300
+        rate_limit_requests=300,
+        app_rate_limit_requests=450,
+        app_rate_limit_window=900
     )
     
     # User endpoints
     GET_USER_BY_ID = APIEndpoint(
         path="/users/{user_id}",
         method="GET",
-        rate_limit_requests=300
+        rate_limit_requests=300,
+        app_rate_limit_requests=300,
+        app_rate_limit_window=900
+    )
+    
+    # Up to 100 comma-separated IDs per request (?ids=)
+    GET_USERS = APIEndpoint(
+        path="/users",
+        method="GET",
+        rate_limit_requests=900,
+        app_rate_limit_requests=300,
+        app_rate_limit_window=900
     )
     
     GET_USER_BY_USERNAME = APIEndpoint(
         path="/users/by/username/{username}",
         method="GET",
-        rate_limit_requests=300
+        rate_limit_requests=300,
+        app_rate_limit_requests=300,
+        app_rate_limit_window=900
     )
     
     GET_ME = APIEndpoint(
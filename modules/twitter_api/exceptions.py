@@ -25,10 +25,12 @@ class RateLimitError(TwitterAPIError):
     """Raised when API rate limit is exceeded"""
     
     def __init__(self, message: str = "Rate limit exceeded", 
-                 reset_time: Optional[int] = None, remaining: int = 0):
+                 reset_time: Optional[int] = None, remaining: int = 0,
+                 retry_after: Optional[int] = None):
         super().__init__(message, status_code=429)
         self.reset_time = reset_time
         self.remaining = remaining
+        self.retry_after = retry_after  # Seconds from the Retry-After header, if sent
     
     def __str__(self):
         import time
@@ -90,5 +92,20 @@ class TwitterAPIBadRequestError(TwitterAPIError):
 class TwitterAPIServerError(TwitterAPIError):
     """Raised when Twitter API returns server error"""
     
-    def __init__(self, message: str = "Twitter API server error"):
-        super().__init__(message, status_code=500)
\ No newline at end of file
+    def __init__(self, message: str = "Twitter API server error", status_code: int = 500,
+                 retry_after: Optional[int] = None):
+        super().__init__(message, status_code=status_code)
+        self.retry_after = retry_after  # Seconds from the Retry-After header, if sent
+
+class TwitterAPINetworkError(TwitterAPIError):
+    """Raised when the request fails before a response is received"""
+    
+    def __init__(self, message: str = "Network error"):
+        super().__init__(message)
+
+class CircuitOpenError(TwitterAPIServerError):
+    """Raised without a request while an endpoint's circuit breaker is open"""
+    
+    def __init__(self, endpoint_key: str, retry_after: Optional[int] = None):
+        super().__init__(f"Circuit open for {endpoint_key}", status_code=503, retry_after=retry_after)
+        self.endpoint_key = endpoint_key
@@ -0,0 +1,564 @@
+"""Local stand-in for the Twitter API, for load and integration testing
+
+FakeTwitterAPI is an ASGI app that serves the v2 endpoints this project uses,
+plus v1.1 location trends and the OAuth 2.0 token endpoint, from in-memory
+state:
+
+- tweets: create, delete, lookup (single and ``?ids=``), recent search
+- users: by ID, ``?ids=``, by username, ``/users/me``
+- likes and retweets of the authenticated user
+- personalized trends and ``/1.1/trends/place.json``
+- ``/2/oauth2/token`` (authorization code and refresh token grants)
+
+Every bearer token is a user (created on first use). Responses carry
+``x-rate-limit-limit/remaining/reset`` headers computed from the same
+TwitterAPIEndpoints limits the client enforces, and a request over the limit
+gets a 429. Latency and 5xx errors can be injected at random or on demand.
+
+In-process, with no sockets:
+
+    fake = FakeTwitterAPI(latency_ms=20, error_rate=0.01)
+    client = AsyncTwitterAPIClient(client_id, client_secret,
+                                   transport=httpx.ASGITransport(app=fake.app))
+
+As a server for the whole application (any client, sync or async):
+
+    uvicorn modules.twitter_api.fake_server:create_app --factory --port 8081
+    TWITTER_API_BASE_URL=http://127.0.0.1:8081/2 uvicorn main:app
+
+Search is a plain case-insensitive match of every query word; operators
+(``-term``, ``from:``, ``lang:`` ...) and the OR keyword are ignored.
+"""
+import asyncio
+import hashlib
+import itertools
+import os
+import random
+import re
+import secrets
+import time
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from .endpoints import APIEndpoint, TwitterAPIEndpoints
+
+logger = logging.getLogger(__name__)
+
+MAX_TWEET_LENGTH = 280
+FIRST_TWEET_ID = 1800000000000000000
+FIRST_USER_ID = 1000000
+ACCESS_TOKEN_LIFETIME_SECONDS = 7200
+
+# Endpoint config for the OAuth token exchange (not part of TwitterAPIEndpoints)
+OAUTH_TOKEN = APIEndpoint(path="/oauth2/token", method="POST", rate_limit_requests=1000000,
+                          requires_auth=False)
+
+DEFAULT_TRENDS = [
+    '#AI', '#buildinpublic', '#SaaS', '#startups', '#indiehackers', '#Python',
+    '#MachineLearning', '#SEO', '#growth', '#productivity'
+]
+
+Handler = Callable[..., Awaitable[Tuple[int, Any]]]
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def _problem(status_code: int, title: str, detail: str) -> Dict[str, Any]:
+    """RFC 7807 style error body as returned by v2"""
+    return {'title': title, 'detail': detail, 'type': 'about:blank', 'status': status_code}
+
+
+def _not_found(kind: str, item_id: str, parameter: str = 'id') -> Dict[str, Any]:
+    return {
+        'value': item_id,
+        'detail': f"Could not find {kind} with {parameter}: [{item_id}].",
+        'title': 'Not Found Error',
+        'resource_type': kind,
+        'parameter': parameter,
+        'resource_id': item_id,
+        'type': 'https://api.twitter.com/2/problems/resource-not-found'
+    }
+
+
+class FakeTwitterAPI:
+    """In-memory Twitter API with rate limit headers and latency/error injection"""
+
+    def __init__(self, latency_ms: float = 0.0, latency_jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503,
+                 enforce_rate_limits: bool = True,
+                 clock: Callable[[], float] = time.time,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            latency_ms: Delay added to every response
+            latency_jitter_ms: Random extra delay, uniform in [0, latency_jitter_ms]
+            error_rate: Share of requests answered with error_status instead of being served
+            error_status: Status code of injected errors
+            enforce_rate_limits: Answer requests over an endpoint's limit with 429
+            clock: Epoch-seconds clock for rate limit windows and timestamps
+            seed: Seed for latency jitter, error injection and generated content
+        """
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.enforce_rate_limits = enforce_rate_limits
+        self._clock = clock
+        self._rng = random.Random(seed)
+
+        self.reset()
+        self.app = self._build_app()
+
+    def reset(self) -> None:
+        """Drop all state: tweets, users, tokens, likes, retweets, rate limit counters"""
+        self.tweets: Dict[str, Dict[str, Any]] = {}
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self._users_by_username: Dict[str, str] = {}
+        self._users_by_token: Dict[str, str] = {}
+        self._refresh_tokens: Dict[str, str] = {}
+        self.likes: set = set()  # (user_id, tweet_id)
+        self.retweets: set = set()  # (user_id, tweet_id)
+        self._tweet_ids = itertools.count(FIRST_TWEET_ID)
+        self._user_ids = itertools.count(FIRST_USER_ID)
+        self._windows: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._scripted_errors: List[Tuple[Optional[str], int, Optional[int]]] = []
+        self.requests: Counter = Counter()
+        self.responses: Counter = Counter()
+
+    # ==================== State Setup ====================
+
+    def add_user(self, access_token: Optional[str] = None, username: Optional[str] = None,
+                 name: Optional[str] = None) -> Dict[str, Any]:
+        """Create a user, optionally bound to an access token"""
+        user_id = str(next(self._user_ids))
+        username = username or f"user{user_id}"
+        user = {
+            'id': user_id,
+            'name': name or username.title(),
+            'username': username,
+            'created_at': _iso(self._clock()),
+            'verified': False,
+            'protected': False,
+            'description': '',
+            'public_metrics': {'followers_count': 0, 'following_count': 0, 'tweet_count': 0, 'listed_count': 0}
+        }
+        self.users[user_id] = user
+        self._users_by_username[username.lower()] = user_id
+        if access_token:
+            self._users_by_token[access_token] = user_id
+        return user
+
+    def seed_tweets(self, count: int, words: Optional[List[str]] = None,
+                    author_id: Optional[str] = None) -> List[str]:
+        """Add ``count`` generated tweets (for search and trend load tests); returns their IDs"""
+        words = words or ['python', 'startup', 'seo', 'growth', 'ai', 'marketing', 'saas', 'launch']
+        if author_id is None:
+            author_id = self.add_user(username='seed_author')['id']
+        ids = []
+        for _ in range(count):
+            text = ' '.join(self._rng.choice(words) for _ in range(8))
+            text += ' ' + self._rng.choice(DEFAULT_TRENDS)
+            ids.append(self._store_tweet(author_id, text)['id'])
+        return ids
+
+    def fail_next(self, count: int = 1, status_code: int = 503, path: Optional[str] = None,
+                  retry_after: Optional[int] = None) -> None:
+        """Answer the next ``count`` requests (to ``path`` only, if given) with ``status_code``"""
+        for _ in range(count):
+            self._scripted_errors.append((path, status_code, retry_after))
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests served per endpoint and responses per status code"""
+        return {
+            'requests': dict(self.requests),
+            'responses': dict(self.responses),
+            'tweets': len(self.tweets),
+            'users': len(self.users)
+        }
+
+    # ==================== Request Pipeline ====================
+
+    def _user_for_token(self, token: str) -> str:
+        user_id = self._users_by_token.get(token)
+        if user_id is None:
+            user_id = self.add_user(access_token=token)['id']
+        return user_id
+
+    def _authenticate(self, request: Request) -> Optional[str]:
+        header = request.headers.get('authorization', '')
+        if not header.startswith('Bearer ') or not header[len('Bearer '):].strip():
+            return None
+        return self._user_for_token(header[len('Bearer '):].strip())
+
+    def _scripted_error(self, path: str) -> Optional[Tuple[int, Optional[int]]]:
+        for i, (error_path, status_code, retry_after) in enumerate(self._scripted_errors):
+            if error_path is None or error_path == path:
+                del self._scripted_errors[i]
+                return status_code, retry_after
+        return None
+
+    def _consume(self, scope: str, endpoint_key: str, limit: int, window: int) -> Tuple[bool, Dict[str, str]]:
+        """Count one request in a fixed window; returns (allowed, rate limit headers)"""
+        now = self._clock()
+        key = (scope, endpoint_key)
+        window_start, used = self._windows.get(key, (now, 0))
+        if now >= window_start + window:
+            window_start, used = now, 0
+
+        allowed = used < limit or not self.enforce_rate_limits
+        if allowed:
+            used += 1
+        self._windows[key] = (window_start, used)
+
+        return allowed, {
+            'x-rate-limit-limit': str(limit),
+            'x-rate-limit-remaining': str(max(limit - used, 0)),
+            'x-rate-limit-reset': str(int(window_start + window))
+        }
+
+    async def _serve(self, request: Request, endpoint: APIEndpoint, handler: Handler,
+                     **path_params) -> JSONResponse:
+        endpoint_key = f"{endpoint.method}:{endpoint.path}"
+        self.requests[endpoint_key] += 1
+
+        delay = self.latency_ms + (self._rng.uniform(0, self.latency_jitter_ms) if self.latency_jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        response = await self._dispatch(request, endpoint, endpoint_key, handler, path_params)
+        self.responses[response.status_code] += 1
+        return response
+
+    async def _dispatch(self, request: Request, endpoint: APIEndpoint, endpoint_key: str,
+                        handler: Handler, path_params: Dict[str, str]) -> JSONResponse:
+        scripted = self._scripted_error(request.url.path)
+        if scripted is not None or (self.error_rate and self._rng.random() < self.error_rate):
+            status_code, retry_after = scripted or (self.error_status, None)
+            headers = {'retry-after': str(retry_after)} if retry_after is not None else None
+            return JSONResponse(_problem(status_code, 'Service Unavailable', 'Service Unavailable'),
+                                status_code=status_code, headers=headers)
+
+        user_id = None
+        if endpoint.requires_auth:
+            user_id = self._authenticate(request)
+            if user_id is None:
+                return JSONResponse(_problem(401, 'Unauthorized', 'Unauthorized'), status_code=401)
+
+        scope = hashlib.sha256(request.headers.get('authorization', '').encode()).hexdigest()[:16]
+        allowed, headers = self._consume(scope, endpoint_key, endpoint.rate_limit_requests,
+                                         endpoint.rate_limit_window)
+        if allowed and endpoint.app_rate_limit_requests:
+            allowed, app_headers = self._consume('app', endpoint_key, endpoint.app_rate_limit_requests,
+                                                 endpoint.app_rate_limit_window)
+            if not allowed:
+                headers = app_headers
+        if not allowed:
+            return JSONResponse(_problem(429, 'Too Many Requests', 'Too Many Requests'),
+                                status_code=429, headers=headers)
+
+        status_code, body = await handler(request, user_id, **path_params)
+        return JSONResponse(body, status_code=status_code, headers=headers)
+
+    # ==================== Tweets ====================
+
+    def _store_tweet(self, author_id: str, text: str, **extra) -> Dict[str, Any]:
+        tweet_id = str(next(self._tweet_ids))
+        tweet = {
+            'id': tweet_id,
+            'text': text,
+            'author_id': author_id,
+            'created_at': _iso(self._clock()),
+            'lang': 'en',
+            'edit_history_tweet_ids': [tweet_id],
+            'public_metrics': {'retweet_count': 0, 'reply_count': 0, 'like_count': 0, 'quote_count': 0},
+            **extra
+        }
+        self.tweets[tweet_id] = tweet
+        self.users[author_id]['public_metrics']['tweet_count'] += 1
+        return tweet
+
+    async def _create_tweet(self, request: Request, user_id: str) -> Tuple[int, Any]:
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            return 400, _problem(400, 'Invalid Request', 'Request body must be a JSON object.')
+
+        text = body.get('text') or ''
+        if not text and not body.get('media'):
+            return 400, _problem(400, 'Invalid Request', 'One or more parameters to your request was invalid.')
+        if len(text) > MAX_TWEET_LENGTH:
+            return 400, _problem(400, 'Invalid Request', f'Tweet text is longer than {MAX_TWEET_LENGTH} characters.')
+        if any(t['author_id'] == user_id and t['text'] == text for t in self.tweets.values()):
+            return 403, _problem(403, 'Forbidden', 'You are not allowed to create a Tweet with duplicate content.')
+
+        extra = {}
+        reply = body.get('reply') or {}
+        if reply.get('in_reply_to_tweet_id'):
+            extra['in_reply_to_tweet_id'] = reply['in_reply_to_tweet_id']
+        if body.get('quote_tweet_id'):
+            extra['quote_tweet_id'] = body['quote_tweet_id']
+        tweet = self._store_tweet(user_id, text, **extra)
+        return 201, {'data': {'id': tweet['id'], 'text': tweet['text'],
+                              'edit_history_tweet_ids': tweet['edit_history_tweet_ids']}}
+
+    async def _delete_tweet(self, request: Request, user_id: str, tweet_id: str) -> Tuple[int, Any]:
+        tweet = self.tweets.get(tweet_id)
+        if tweet is None:
+            return 200, {'data': {'deleted': False}}
+        if tweet['author_id'] != user_id:
+            return 403, _problem(403, 'Forbidden', 'You are not authorized to delete this Tweet.')
+        del self.tweets[tweet_id]
+        self.users[user_id]['public_metrics']['tweet_count'] -= 1
+        return 200, {'data': {'deleted': True}}
+
+    async def _get_tweet(self, request: Request, user_id: str, tweet_id: str) -> Tuple[int, Any]:
+        tweet = self.tweets.get(tweet_id)
+        if tweet is None:
+            return 200, {'errors': [_not_found('tweet', tweet_id)]}
+        return 200, {'data': tweet}
+
+    async def _get_tweets(self, request: Request, user_id: str) -> Tuple[int, Any]:
+        return self._lookup(request, self.tweets, 'tweet')
+
+    def _lookup(self, request: Request, items: Dict[str, Dict[str, Any]], kind: str) -> Tuple[int, Any]:
+        ids = [item_id for item_id in request.query_params.get('ids', '').split(',') if item_id]
+        if not 1 <= len(ids) <= 100:
+            return 400, _problem(400, 'Invalid Request', 'The `ids` query parameter must hold 1 to 100 IDs.')
+        body: Dict[str, Any] = {}
+        found = [items[item_id] for item_id in ids if item_id in items]
+        if found:
+            body['data'] = found
+        missing = [_not_found(kind, item_id) for item_id in ids if item_id not in items]
+        if missing:
+            body['errors'] = missing
+        return 200, body
+
+    async def _search_recent(self, request: Request, user_id: str) -> Tuple[int, Any]:
+        params = request.query_params
+        query = params.get('query', '')
+        try:
+            max_results = int(params.get('max_results', 10))
+            offset = int(params.get('next_token') or 0)
+        except ValueError:
+            return 400, _problem(400, 'Invalid Request', 'One or more parameters to your request was invalid.')
+        if not query or not 10 <= max_results <= 100:
+            return 400, _problem(400, 'Invalid Request', 'One or more parameters to your request was invalid.')
+
+        words = [word.lower() for word in re.split(r'[\s()]+', query)
+                 if word and word != 'OR' and not word.startswith('-') and ':' not in word]
+        matches = [tweet for tweet in sorted(self.tweets.values(), key=lambda t: int(t['id']), reverse=True)
+                   if all(word in tweet['text'].lower() for word in words)]
+
+        page = matches[offset:offset + max_results]
+        meta: Dict[str, Any] = {'result_count': len(page)}
+        if page:
+            meta['newest_id'] = page[0]['id']
+            meta['oldest_id'] = page[-1]['id']
+        if offset + max_results < len(matches):
+            meta['next_token'] = str(offset + max_results)
+
+        body: Dict[str, Any] = {'meta': meta}
+        if page:
+            body['data'] = page
+            if 'author_id' in params.get('expansions', ''):
+                author_ids = dict.fromkeys(tweet['author_id'] for tweet in page)
+                body['includes'] = {'users': [self.users[author_id] for author_id in author_ids]}
+        return 200, body
+
+    # ==================== Users ====================
+
+    async def _get_me(self, request: Request, user_id: str) -> Tuple[int, Any]:
+        return 200, {'data': self.users[user_id]}
+
+    async def _get_user(self, request: Request, user_id: str, target_id: str) -> Tuple[int, Any]:
+        user = self.users.get(target_id)
+        if user is None:
+            return 200, {'errors': [_not_found('user', target_id)]}
+        return 200, {'data': user}
+
+    async def _get_users(self, request: Request, user_id: str) -> Tuple[int, Any]:
+        return self._lookup(request, self.users, 'user')
+
+    async def _get_user_by_username(self, request: Request, user_id: str, username: str) -> Tuple[int, Any]:
+        target_id = self._users_by_username.get(username.lower())
+        if target_id is None:
+            return 200, {'errors': [_not_found('user', username, parameter='username')]}
+        return 200, {'data': self.users[target_id]}
+
+    # ==================== Likes and Retweets ====================
+
+    async def _tweet_id_from_body(self, request: Request) -> Optional[str]:
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        return str(body.get('tweet_id')) if isinstance(body, dict) and body.get('tweet_id') else None
+
+    def _check_acting_user(self, user_id: str, path_user_id: str) -> Optional[Tuple[int, Any]]:
+        if path_user_id != user_id:
+            return 403, _problem(403, 'Forbidden', 'You are not permitted to perform this action.')
+        return None
+
+    async def _like(self, request: Request, user_id: str, path_user_id: str) -> Tuple[int, Any]:
+        return await self._engage(request, user_id, path_user_id, self.likes, 'like_count', 'liked')
+
+    async def _retweet(self, request: Request, user_id: str, path_user_id: str) -> Tuple[int, Any]:
+        return await self._engage(request, user_id, path_user_id, self.retweets, 'retweet_count', 'retweeted')
+
+    async def _engage(self, request: Request, user_id: str, path_user_id: str, edges: set,
+                      metric: str, field: str) -> Tuple[int, Any]:
+        forbidden = self._check_acting_user(user_id, path_user_id)
+        if forbidden:
+            return forbidden
+        tweet_id = await self._tweet_id_from_body(request)
+        if tweet_id is None:
+            return 400, _problem(400, 'Invalid Request', 'The `tweet_id` field is required.')
+        if tweet_id not in self.tweets:
+            return 200, {'errors': [_not_found('tweet', tweet_id)]}
+        if (user_id, tweet_id) not in edges:
+            edges.add((user_id, tweet_id))
+            self.tweets[tweet_id]['public_metrics'][metric] += 1
+        return 200, {'data': {field: True}}
+
+    async def _unlike(self, request: Request, user_id: str, path_user_id: str, tweet_id: str) -> Tuple[int, Any]:
+        return self._disengage(user_id, path_user_id, tweet_id, self.likes, 'like_count', 'liked')
+
+    async def _unretweet(self, request: Request, user_id: str, path_user_id: str,
+                         tweet_id: str) -> Tuple[int, Any]:
+        return self._disengage(user_id, path_user_id, tweet_id, self.retweets, 'retweet_count', 'retweeted')
+
+    def _disengage(self, user_id: str, path_user_id: str, tweet_id: str, edges: set,
+                   metric: str, field: str) -> Tuple[int, Any]:
+        forbidden = self._check_acting_user(user_id, path_user_id)
+        if forbidden:
+            return forbidden
+        if (user_id, tweet_id) in edges:
+            edges.discard((user_id, tweet_id))
+            if tweet_id in self.tweets:
+                self.tweets[tweet_id]['public_metrics'][metric] -= 1
+        return 200, {'data': {field: False}}
+
+    # ==================== Trends ====================
+
+    def _trend_counts(self) -> List[Tuple[str, int]]:
+        """Hashtags of stored tweets by use, padded with the default trends"""
+        counts = Counter(tag for tweet in self.tweets.values() for tag in re.findall(r'#\w+', tweet['text']))
+        for trend in DEFAULT_TRENDS:
+            counts.setdefault(trend, 0)
+        return counts.most_common()
+
+    async def _personalized_trends(self, request: Request, user_id: str) -> Tuple[int, Any]:
+        trends = [
+            {'trend_name': name, 'post_count': count * 1000 + 1000, 'category': 'Technology',
+             'trending_since': _iso(self._clock() - 3600)}
+            for name, count in self._trend_counts()[:30]
+        ]
+        return 200, {'data': trends}
+
+    async def _location_trends(self, request: Request, user_id: str) -> Tuple[int, Any]:
+        woeid = request.query_params.get('id')
+        if not woeid:
+            return 400, {'errors': [{'code': 44, 'message': 'id parameter is invalid.'}]}
+        now = _iso(self._clock())
+        trends = [
+            {'name': name, 'url': f"http://twitter.com/search?q={name.replace('#', '%23')}",
+             'promoted_content': None, 'query': name.replace('#', '%23'),
+             'tweet_volume': count * 1000 + 10000}
+            for name, count in self._trend_counts()[:50]
+        ]
+        return 200, [{'trends': trends, 'as_of': now, 'created_at': now,
+                      'locations': [{'name': 'Worldwide' if woeid == '1' else f'Location {woeid}',
+                                     'woeid': int(woeid) if woeid.isdigit() else woeid}]}]
+
+    # ==================== OAuth ====================
+
+    async def _oauth_token(self, request: Request, user_id: Optional[str]) -> Tuple[int, Any]:
+        form = {key: values[0] for key, values in parse_qs((await request.body()).decode()).items()}
+        grant_type = form.get('grant_type')
+        if grant_type == 'authorization_code' and form.get('code'):
+            user_id = self.add_user()['id']
+        elif grant_type == 'refresh_token' and form.get('refresh_token') in self._refresh_tokens:
+            # Refresh tokens are single use, as on Twitter
+            user_id = self._refresh_tokens.pop(form['refresh_token'])
+        else:
+            return 400, {'error': 'invalid_request',
+                         'error_description': 'Value passed for the token was invalid.'}
+
+        access_token = secrets.token_urlsafe(32)
+        refresh_token = secrets.token_urlsafe(32)
+        self._users_by_token[access_token] = user_id
+        self._refresh_tokens[refresh_token] = user_id
+        return 200, {'token_type': 'bearer', 'expires_in': ACCESS_TOKEN_LIFETIME_SECONDS,
+                     'access_token': access_token, 'refresh_token': refresh_token,
+                     'scope': 'tweet.read tweet.write users.read like.write offline.access'}
+
+    # ==================== Routes ====================
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Twitter API", docs_url=None, redoc_url=None, openapi_url=None)
+        endpoints = TwitterAPIEndpoints
+        v2 = '/2'
+
+        def route(endpoint: APIEndpoint, handler: Handler, version: str = v2):
+            path = f"{version}{endpoint.path}"
+
+            async def serve(request: Request):
+                return await self._serve(request, endpoint, handler, **self._path_args(endpoint, request))
+
+            app.add_api_route(path, serve, methods=[endpoint.method])
+
+        # Static paths first so /tweets/search/recent and /users/me are not taken for IDs
+        route(OAUTH_TOKEN, self._oauth_token)
+        route(endpoints.CREATE_TWEET, self._create_tweet)
+        route(endpoints.GET_TWEETS, self._get_tweets)
+        route(endpoints.SEARCH_RECENT_TWEETS, self._search_recent)
+        route(endpoints.GET_TWEET, self._get_tweet)
+        route(endpoints.DELETE_TWEET, self._delete_tweet)
+        route(endpoints.GET_ME, self._get_me)
+        route(endpoints.GET_PERSONALIZED_TRENDS, self._personalized_trends)
+        route(endpoints.GET_USERS, self._get_users)
+        route(endpoints.GET_USER_BY_USERNAME, self._get_user_by_username)
+        route(endpoints.GET_USER_BY_ID, self._get_user)
+        route(endpoints.LIKE_TWEET, self._like)
+        route(endpoints.UNLIKE_TWEET, self._unlike)
+        route(endpoints.CREATE_RETWEET, self._retweet)
+        route(endpoints.DELETE_RETWEET, self._unretweet)
+        route(endpoints.GET_TRENDS, self._location_trends, version='/1.1')
+        return app
+
+    @staticmethod
+    def _path_args(endpoint: APIEndpoint, request: Request) -> Dict[str, str]:
+        """Path parameters renamed for the handlers (the acting user vs. the looked-up one)"""
+        params = dict(request.path_params)
+        if endpoint is TwitterAPIEndpoints.GET_USER_BY_ID:
+            return {'target_id': params['user_id']}
+        if 'user_id' in params:
+            params['path_user_id'] = params.pop('user_id')
+        if 'source_tweet_id' in params:
+            params['tweet_id'] = params.pop('source_tweet_id')
+        return params
+
+
+def create_app() -> FastAPI:
+    """App factory for uvicorn, configured from FAKE_TWITTER_* environment variables"""
+    fake = FakeTwitterAPI(
+        latency_ms=float(os.getenv('FAKE_TWITTER_LATENCY_MS', '0')),
+        latency_jitter_ms=float(os.getenv('FAKE_TWITTER_LATENCY_JITTER_MS', '0')),
+        error_rate=float(os.getenv('FAKE_TWITTER_ERROR_RATE', '0')),
+        enforce_rate_limits=os.getenv('FAKE_TWITTER_ENFORCE_RATE_LIMITS', 'true').lower() == 'true'
+    )
+    seed_tweets = int(os.getenv('FAKE_TWITTER_SEED_TWEETS', '0'))
+    if seed_tweets:
+        fake.seed_tweets(seed_tweets)
+    fake.app.state.fake = fake
+    return fake.app
@@ -0,0 +1,174 @@
+"""Micro-batching of single tweet and user lookups
+
+Twitter v2 looks up as many as 100 tweets or users per request
+(``GET /2/tweets?ids=`` and ``GET /2/users?ids=``) for the cost of one request
+against the rate limit. LookupBatcher gives callers the one-ID-at-a-time
+interface of fetch_tweet_by_id/get_user_by_id, but holds each lookup for a
+few milliseconds so that lookups made at about the same time with the same
+token and fields go out as one batch request. A batch is sent as soon as it
+holds ``max_batch_size`` IDs or ``max_delay`` has passed since its first
+lookup.
+
+Usage:
+    batcher = LookupBatcher(async_client)
+    tweets = await asyncio.gather(*(batcher.fetch_tweet(token, tweet_id) for tweet_id in ids))
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .async_client import AsyncTwitterAPIClient
+from .client import MAX_LOOKUP_IDS
+from .exceptions import TwitterAPIBadRequestError, TwitterAPINotFoundError
+
+logger = logging.getLogger(__name__)
+
+TWEETS = 'tweets'
+USERS = 'users'
+
+# (kind, user token, requested fields)
+BatchKey = Tuple[str, str, Tuple[str, ...]]
+
+
+class _PendingBatch:
+    """Lookups waiting to be sent together"""
+
+    def __init__(self):
+        self.waiters: Dict[str, List[asyncio.Future]] = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class LookupBatcher:
+    """Coalesces single tweet/user lookups into batch requests of up to 100 IDs"""
+
+    def __init__(self, client: AsyncTwitterAPIClient, max_delay: float = 0.005,
+                 max_batch_size: int = MAX_LOOKUP_IDS):
+        """
+        Args:
+            client: Async client the batch requests are made with
+            max_delay: Seconds a lookup waits for others to share its request
+            max_batch_size: IDs per request (at most 100)
+        """
+        self.client = client
+        self.max_delay = max_delay
+        self.max_batch_size = min(max_batch_size, MAX_LOOKUP_IDS)
+        self._pending: Dict[BatchKey, _PendingBatch] = {}
+        self._in_flight: Set[asyncio.Task] = set()
+
+        self.lookups = 0
+        self.requests = 0
+
+    async def fetch_tweet(self, user_token: str, tweet_id: str,
+                          fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch one tweet through a shared batch request
+
+        Returns:
+            ``{'data': tweet}`` like fetch_tweet_by_id, plus the batch's ``includes``
+
+        Raises:
+            TwitterAPINotFoundError: The tweet does not exist or is not visible
+        """
+        return await self._lookup(TWEETS, user_token, tweet_id, fields)
+
+    async def get_user(self, user_token: str, user_id: str,
+                       user_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get one user through a shared batch request (see fetch_tweet)"""
+        return await self._lookup(USERS, user_token, user_id, user_fields)
+
+    async def _lookup(self, kind: str, user_token: str, item_id: str,
+                      fields: Optional[List[str]]) -> Dict[str, Any]:
+        item_id = str(item_id)
+        # One malformed ID would make Twitter reject the whole batch
+        if not item_id.isdigit():
+            raise TwitterAPIBadRequestError(f"Invalid {kind[:-1]} ID: {item_id!r}")
+
+        loop = asyncio.get_running_loop()
+        key = (kind, user_token, tuple(sorted(fields)) if fields else ())
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch()
+            batch.timer = loop.call_later(self.max_delay, self._dispatch, key)
+
+        future = loop.create_future()
+        batch.waiters.setdefault(item_id, []).append(future)
+        self.lookups += 1
+        if len(batch.waiters) >= self.max_batch_size:
+            self._dispatch(key)
+
+        return await future
+
+    def _dispatch(self, key: BatchKey) -> None:
+        """Send a pending batch now"""
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        task = asyncio.ensure_future(self._send(key, batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, key: BatchKey, batch: _PendingBatch) -> None:
+        kind, user_token, fields = key
+        ids = [item_id for item_id, futures in batch.waiters.items()
+               if not all(future.done() for future in futures)]
+        if not ids:
+            return
+
+        self.requests += 1
+        try:
+            if kind == TWEETS:
+                response = await self.client.fetch_tweets_by_ids(user_token, ids, list(fields) or None)
+            else:
+                response = await self.client.get_users_by_ids(user_token, ids, list(fields) or None)
+        except Exception as e:
+            logger.warning(f"Batch {kind} lookup of {len(ids)} IDs failed: {e}")
+            for futures in batch.waiters.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        found = {str(item.get('id')): item for item in response.get('data') or []}
+        errors = {
+            str(error.get('resource_id') or error.get('value')): error
+            for error in response.get('errors') or []
+        }
+
+        for item_id, futures in batch.waiters.items():
+            if item_id in found:
+                result = {'data': found[item_id]}
+                if 'includes' in response:
+                    result['includes'] = response['includes']
+                outcome, is_error = result, False
+            else:
+                error = errors.get(item_id, {})
+                outcome = TwitterAPINotFoundError(
+                    error.get('detail') or f"Could not find {kind[:-1]} with id: [{item_id}]."
+                )
+                is_error = True
+
+            for future in futures:
+                if future.done():
+                    continue
+                if is_error:
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+    async def flush(self) -> None:
+        """Send every pending batch now and wait for all batch requests to finish"""
+        for key in list(self._pending):
+            self._dispatch(key)
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Lookups served and batch requests made"""
+        return {
+            'lookups': self.lookups,
+            'requests': self.requests,
+            'pending': sum(len(batch.waiters) for batch in self._pending.values())
+        }
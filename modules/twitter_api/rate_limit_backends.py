@@ -0,0 +1,448 @@
+"""Twitter API rate limiting - shared bucket storage
+
+Twitter's budgets belong to the app and to each access token, not to one
+process, so every worker must draw from the same buckets. A backend stores
+the token buckets and performs check-and-decrement atomically across all the
+buckets a request needs:
+
+- InMemoryRateLimitBackend: one process (the default)
+- SQLiteRateLimitBackend: all workers on one host, through a shared SQLite
+  file locked with BEGIN IMMEDIATE
+- RedisRateLimitBackend: any number of hosts, through one Lua script per
+  operation
+
+Select one with ``rate_limit_backend_from_url`` ("memory", "sqlite:///path"
+or "redis://host:port/db").
+
+The async client calls ``acquire_async``/``sync_async`` so that SQLite lock
+waits and Redis round-trips never run on the event loop: SQLite calls go to
+a worker thread and Redis uses its asyncio client.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BucketSpec(NamedTuple):
+    """Identity and seed size of one token bucket"""
+    scope: str
+    endpoint_key: str
+    capacity: int
+    window_seconds: float
+
+
+class TokenBucket:
+    """
+    Request budget refilled continuously at capacity per window
+
+    After a header sync the bucket mirrors Twitter's fixed window instead:
+    the reported remaining requests are all there is until the reset time,
+    when the bucket is full again and continuous refill resumes.
+    """
+
+    def __init__(self, capacity: int, window_seconds: float, now: float):
+        self.capacity = max(capacity, 1)
+        self.window_seconds = max(window_seconds, 1)
+        self.tokens = float(self.capacity)
+        self.updated_at = now
+        self.window_reset_at = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self.window_reset_at:
+            if now < self.window_reset_at:
+                return
+            self.tokens = float(self.capacity)
+            self.updated_at = self.window_reset_at
+            self.window_reset_at = 0.0
+        if now > self.updated_at:
+            rate = self.capacity / self.window_seconds
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * rate)
+            self.updated_at = now
+
+    def wait_time(self, now: float, cost: int = 1) -> float:
+        """Seconds until cost tokens are available (0 if available now)"""
+        self._refill(now)
+        if self.tokens >= cost:
+            return 0.0
+        if self.window_reset_at:
+            return self.window_reset_at - now
+        return (cost - self.tokens) * self.window_seconds / self.capacity
+
+    def consume(self, now: float, cost: int = 1) -> None:
+        self._refill(now)
+        self.tokens -= cost
+
+    def sync(self, limit: int, remaining: int, reset_time: float, now: float) -> None:
+        """Correct the bucket from Twitter's view of the current window"""
+        if limit > 0:
+            self.capacity = limit
+        remaining = float(min(max(remaining, 0), self.capacity))
+        if reset_time > now and reset_time == self.window_reset_at:
+            # Responses to concurrent requests arrive out of order; the lowest count is the latest
+            remaining = min(remaining, self.tokens)
+        self.tokens = remaining
+        self.updated_at = now
+        self.window_reset_at = reset_time if reset_time > now else 0.0
+
+    def is_idle(self, now: float) -> bool:
+        """A full bucket carries no state worth keeping"""
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+def _acquire_buckets(buckets: List[TokenBucket], now: float, consume: bool) -> float:
+    """All-or-nothing take of one request from every bucket; returns the wait if any is empty"""
+    wait_time = max(bucket.wait_time(now) for bucket in buckets)
+    if wait_time <= 0 and consume:
+        for bucket in buckets:
+            bucket.consume(now)
+    return wait_time
+
+
+class RateLimitBackend(ABC):
+    """Token bucket storage; each call is atomic across the buckets it touches"""
+
+    @abstractmethod
+    def acquire(self, specs: List[BucketSpec], now: float) -> float:
+        """Take one request from every bucket; returns 0, or seconds to wait (nothing taken)"""
+        pass
+
+    @abstractmethod
+    def peek(self, specs: List[BucketSpec], now: float) -> float:
+        """Seconds until a request would fit every bucket, without taking anything"""
+        pass
+
+    @abstractmethod
+    def sync(self, spec: BucketSpec, limit: int, remaining: int, reset_time: float, now: float) -> None:
+        """Correct a bucket from x-rate-limit-* response headers"""
+        pass
+
+    async def acquire_async(self, specs: List[BucketSpec], now: float) -> float:
+        """acquire() for event loop callers; storage I/O runs in a worker thread"""
+        return await asyncio.to_thread(self.acquire, specs, now)
+
+    async def sync_async(self, spec: BucketSpec, limit: int, remaining: int, reset_time: float,
+                         now: float) -> None:
+        """sync() for event loop callers; storage I/O runs in a worker thread"""
+        await asyncio.to_thread(self.sync, spec, limit, remaining, reset_time, now)
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Buckets in a dict guarded by a lock; shared by the threads of one process"""
+
+    def __init__(self, max_buckets: int = 10000):
+        self.max_buckets = max_buckets
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, spec: BucketSpec, now: float) -> TokenBucket:
+        key = (spec.scope, spec.endpoint_key)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._prune(now)
+            bucket = TokenBucket(spec.capacity, spec.window_seconds, now)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        for key in [key for key, bucket in self._buckets.items() if bucket.is_idle(now)]:
+            del self._buckets[key]
+
+    def acquire(self, specs: List[BucketSpec], now: float) -> float:
+        with self._lock:
+            return _acquire_buckets([self._bucket(spec, now) for spec in specs], now, consume=True)
+
+    def peek(self, specs: List[BucketSpec], now: float) -> float:
+        with self._lock:
+            return _acquire_buckets([self._bucket(spec, now) for spec in specs], now, consume=False)
+
+    def sync(self, spec: BucketSpec, limit: int, remaining: int, reset_time: float, now: float) -> None:
+        with self._lock:
+            self._bucket(spec, now).sync(limit, remaining, reset_time, now)
+
+    # No I/O and the lock is held for microseconds, so no thread hop is needed
+    async def acquire_async(self, specs: List[BucketSpec], now: float) -> float:
+        return self.acquire(specs, now)
+
+    async def sync_async(self, spec: BucketSpec, limit: int, remaining: int, reset_time: float,
+                         now: float) -> None:
+        self.sync(spec, limit, remaining, reset_time, now)
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Buckets in a SQLite file shared by every worker process on the host
+
+    Each operation reads, updates and writes its buckets inside one
+    ``BEGIN IMMEDIATE`` transaction, which holds SQLite's write lock, so
+    concurrent workers never spend the same request twice.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self._local = threading.local()
+        self._timeout = timeout
+        self._operations = 0
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                scope TEXT NOT NULL,
+                endpoint_key TEXT NOT NULL,
+                capacity INTEGER NOT NULL,
+                window_seconds REAL NOT NULL,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                window_reset_at REAL NOT NULL,
+                PRIMARY KEY (scope, endpoint_key)
+            )
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        # A connection must not be used across fork (e.g. a preloading server
+        # forking workers), so a child opens its own
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self._timeout, isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _load(self, conn: sqlite3.Connection, spec: BucketSpec, now: float) -> TokenBucket:
+        bucket = TokenBucket(spec.capacity, spec.window_seconds, now)
+        row = conn.execute(
+            "SELECT capacity, window_seconds, tokens, updated_at, window_reset_at "
+            "FROM rate_limit_buckets WHERE scope = ? AND endpoint_key = ?",
+            (spec.scope, spec.endpoint_key)
+        ).fetchone()
+        if row:
+            bucket.capacity, bucket.window_seconds, bucket.tokens, bucket.updated_at, bucket.window_reset_at = row
+        return bucket
+
+    def _store(self, conn: sqlite3.Connection, spec: BucketSpec, bucket: TokenBucket) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO rate_limit_buckets "
+            "(scope, endpoint_key, capacity, window_seconds, tokens, updated_at, window_reset_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (spec.scope, spec.endpoint_key, bucket.capacity, bucket.window_seconds,
+             bucket.tokens, bucket.updated_at, bucket.window_reset_at)
+        )
+
+    def _run(self, specs: List[BucketSpec], now: float, consume: bool) -> float:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            buckets = [self._load(conn, spec, now) for spec in specs]
+            wait_time = _acquire_buckets(buckets, now, consume)
+            if wait_time <= 0 and consume:
+                for spec, bucket in zip(specs, buckets):
+                    self._store(conn, spec, bucket)
+                self._operations += 1
+                if self._operations % self.PRUNE_EVERY == 0:
+                    self._prune(conn, now)
+            conn.execute("COMMIT")
+            return wait_time
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        # A bucket untouched for a whole window outside a synced window has refilled
+        conn.execute(
+            "DELETE FROM rate_limit_buckets WHERE window_reset_at <= ? AND updated_at + window_seconds <= ?",
+            (now, now)
+        )
+
+    def acquire(self, specs: List[BucketSpec], now: float) -> float:
+        return self._run(specs, now, consume=True)
+
+    def peek(self, specs: List[BucketSpec], now: float) -> float:
+        return self._run(specs, now, consume=False)
+
+    def sync(self, spec: BucketSpec, limit: int, remaining: int, reset_time: float, now: float) -> None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            bucket = self._load(conn, spec, now)
+            bucket.sync(limit, remaining, reset_time, now)
+            self._store(conn, spec, bucket)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+# Shared by both scripts: refill a bucket hash the way TokenBucket._refill does.
+# Fields: c = capacity, w = window seconds, t = tokens, u = updated_at, r = window reset time
+_LUA_LOAD_BUCKET = """
+local function load_bucket(key, capacity, window, now)
+    local data = redis.call('HMGET', key, 'c', 'w', 't', 'u', 'r')
+    local b = {}
+    if data[1] then
+        b.c = tonumber(data[1]); b.w = tonumber(data[2]); b.t = tonumber(data[3])
+        b.u = tonumber(data[4]); b.r = tonumber(data[5])
+    else
+        b.c = math.max(capacity, 1); b.w = math.max(window, 1); b.t = b.c; b.u = now; b.r = 0
+    end
+    if b.r > 0 and now >= b.r then
+        b.t = b.c; b.u = b.r; b.r = 0
+    end
+    if b.r == 0 and now > b.u then
+        b.t = math.min(b.c, b.t + (now - b.u) * b.c / b.w)
+        b.u = now
+    end
+    return b
+end
+
+local function wait_time(b, now)
+    if b.t >= 1 then return 0 end
+    if b.r > 0 then return b.r - now end
+    return (1 - b.t) * b.w / b.c
+end
+
+local function store_bucket(key, b, now)
+    redis.call('HSET', key, 'c', tostring(b.c), 'w', tostring(b.w), 't', tostring(b.t),
+               'u', tostring(b.u), 'r', tostring(b.r))
+    -- Once a whole window passes without activity the bucket is full and can go
+    local ttl = math.max(b.r - now, 0) + b.w
+    redis.call('EXPIRE', key, math.ceil(ttl) + 1)
+end
+"""
+
+# KEYS: bucket keys; ARGV: now, consume (1/0), then capacity and window per key
+_LUA_ACQUIRE = _LUA_LOAD_BUCKET + """
+local now = tonumber(ARGV[1])
+local consume = ARGV[2] == '1'
+local buckets = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local b = load_bucket(key, tonumber(ARGV[1 + 2 * i]), tonumber(ARGV[2 + 2 * i]), now)
+    buckets[i] = b
+    wait = math.max(wait, wait_time(b, now))
+end
+if wait <= 0 and consume then
+    for i, key in ipairs(KEYS) do
+        buckets[i].t = buckets[i].t - 1
+        store_bucket(key, buckets[i], now)
+    end
+end
+return tostring(wait)
+"""
+
+# KEYS[1]: bucket key; ARGV: now, capacity, window, limit, remaining, reset_time
+_LUA_SYNC = _LUA_LOAD_BUCKET + """
+local now = tonumber(ARGV[1])
+local b = load_bucket(KEYS[1], tonumber(ARGV[2]), tonumber(ARGV[3]), now)
+local limit = tonumber(ARGV[4])
+local remaining = tonumber(ARGV[5])
+local reset_time = tonumber(ARGV[6])
+if limit > 0 then b.c = limit end
+remaining = math.min(math.max(remaining, 0), b.c)
+if reset_time > now and reset_time == b.r then
+    remaining = math.min(remaining, b.t)
+end
+b.t = remaining
+b.u = now
+if reset_time > now then b.r = reset_time else b.r = 0 end
+store_bucket(KEYS[1], b, now)
+return 1
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Buckets in Redis hashes shared by every worker on every host
+
+    Check-and-decrement across a request's buckets runs as one Lua script,
+    so it is atomic however many workers call it. Keys expire once their
+    bucket would have refilled.
+    """
+
+    def __init__(self, redis_client, key_prefix: str = 'twitter:ratelimit', async_redis_client=None):
+        """
+        Args:
+            redis_client: redis.Redis used by synchronous callers
+            key_prefix: Prefix of the bucket keys
+            async_redis_client: redis.asyncio.Redis on the same server, used by the async client
+                (without one, async calls run the synchronous client in a worker thread)
+        """
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self._acquire_script = redis_client.register_script(_LUA_ACQUIRE)
+        self._sync_script = redis_client.register_script(_LUA_SYNC)
+        self.async_redis = async_redis_client
+        if async_redis_client is not None:
+            self._async_acquire_script = async_redis_client.register_script(_LUA_ACQUIRE)
+            self._async_sync_script = async_redis_client.register_script(_LUA_SYNC)
+
+    def _key(self, spec: BucketSpec) -> str:
+        return f"{self.key_prefix}:{spec.scope}:{spec.endpoint_key}"
+
+    def _acquire_args(self, specs: List[BucketSpec], now: float, consume: bool) -> Tuple[List[str], list]:
+        args = [repr(now), '1' if consume else '0']
+        for spec in specs:
+            args += [spec.capacity, repr(float(spec.window_seconds))]
+        return [self._key(spec) for spec in specs], args
+
+    def _sync_args(self, spec: BucketSpec, limit: int, remaining: int, reset_time: float, now: float) -> list:
+        return [repr(now), spec.capacity, repr(float(spec.window_seconds)), limit, remaining, reset_time]
+
+    @staticmethod
+    def _wait_result(result) -> float:
+        return float(result.decode() if isinstance(result, bytes) else result)
+
+    def _run(self, specs: List[BucketSpec], now: float, consume: bool) -> float:
+        keys, args = self._acquire_args(specs, now, consume)
+        return self._wait_result(self._acquire_script(keys=keys, args=args))
+
+    def acquire(self, specs: List[BucketSpec], now: float) -> float:
+        return self._run(specs, now, consume=True)
+
+    def peek(self, specs: List[BucketSpec], now: float) -> float:
+        return self._run(specs, now, consume=False)
+
+    def sync(self, spec: BucketSpec, limit: int, remaining: int, reset_time: float, now: float) -> None:
+        self._sync_script(keys=[self._key(spec)], args=self._sync_args(spec, limit, remaining, reset_time, now))
+
+    async def acquire_async(self, specs: List[BucketSpec], now: float) -> float:
+        if self.async_redis is None:
+            return await super().acquire_async(specs, now)
+        keys, args = self._acquire_args(specs, now, consume=True)
+        return self._wait_result(await self._async_acquire_script(keys=keys, args=args))
+
+    async def sync_async(self, spec: BucketSpec, limit: int, remaining: int, reset_time: float,
+                         now: float) -> None:
+        if self.async_redis is None:
+            await super().sync_async(spec, limit, remaining, reset_time, now)
+            return
+        await self._async_sync_script(keys=[self._key(spec)],
+                                      args=self._sync_args(spec, limit, remaining, reset_time, now))
+
+
+def rate_limit_backend_from_url(url: Optional[str]) -> RateLimitBackend:
+    """
+    Build a backend from a URL
+
+    Args:
+        url: None or "memory" (per process), "sqlite:///path/to/file.db"
+            (per host) or a redis:// / rediss:// URL (shared)
+    """
+    if not url or url == 'memory':
+        return InMemoryRateLimitBackend()
+    if url.startswith('sqlite:///'):
+        return SQLiteRateLimitBackend(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        import redis
+        import redis.asyncio
+        return RedisRateLimitBackend(redis.Redis.from_url(url), async_redis_client=redis.asyncio.Redis.from_url(url))
+    raise ValueError(f"Unsupported rate limit backend URL: {url}")
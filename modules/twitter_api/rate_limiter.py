@@ -1,95 +1,260 @@
+"""Twitter API rate limiting
+
+User-context limits apply per access token, so budgets are token buckets
+keyed by (token scope, endpoint). Buckets start full from the endpoint's
+configured ``rate_limit_requests`` per ``rate_limit_window`` and are corrected
+from the ``x-rate-limit-*`` headers of every response. Endpoints with an
+app-wide cap get one more bucket shared by every token.
+
+Bucket state lives in a RateLimitBackend, in process memory by default or
+in SQLite/Redis so that every worker draws from the same budget (see
+rate_limit_backends.py).
+
+``acquire()`` awaits a free slot without blocking the event loop, or fails
+fast with a RateLimitError carrying the computed retry time when the wait
+would exceed ``max_wait``. It and ``update_rate_limit_async()`` reach the
+backend through its async interface, so shared-storage I/O stays off the
+loop. ``wait_if_needed()`` is the blocking equivalent for the synchronous
+client.
+"""
+import asyncio
+import hashlib
+import math
 import time
-from typing import Dict, Optional, Any
-from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from datetime import datetime
 from threading import Lock
 import logging
 
 from .endpoints import APIEndpoint
+from .exceptions import RateLimitError
+from .rate_limit_backends import BucketSpec, InMemoryRateLimitBackend, RateLimitBackend
 
 logger = logging.getLogger(__name__)
 
+# Scope of requests made without an access token, and of app-wide caps
+SHARED_SCOPE = 'shared'
+APP_SCOPE = 'app'
+
+DEFAULT_WINDOW_SECONDS = 900
+
 class RateLimitInfo:
     """Rate limit information for an endpoint"""
-    
+
     def __init__(self, limit: int, remaining: int, reset_time: int):
         self.limit = limit
         self.remaining = remaining
         self.reset_time = reset_time
         self.last_updated = datetime.utcnow()
-    
+
     def is_exhausted(self) -> bool:
         """Check if rate limit is exhausted"""
         return self.remaining <= 0
-    
+
     def time_until_reset(self) -> int:
         """Get seconds until rate limit resets"""
         current_time = int(time.time())
         return max(0, self.reset_time - current_time)
-    
+
     def should_wait(self, safety_margin: int = 1) -> bool:
         """Check if we should wait before making request"""
         return self.remaining <= safety_margin
 
 class TwitterRateLimiter:
-    """Manages Twitter API rate limiting"""
-    
-    def __init__(self):
+    """Manages Twitter API rate limiting per access token and endpoint"""
+
+    def __init__(self, clock: Callable[[], float] = time.time, max_buckets: int = 10000,
+                 backend: Optional[RateLimitBackend] = None):
+        """
+        Args:
+            clock: Epoch-seconds clock (x-rate-limit-reset is an epoch timestamp)
+            max_buckets: Idle buckets are pruned once more than this many exist (in-memory backend);
+                also bounds the reported statuses kept per token and endpoint
+            backend: Shared bucket storage; defaults to this process's memory
+        """
+        # Least recently updated first, so the oldest status is evicted when full
         self._rate_limits: Dict[str, RateLimitInfo] = {}
+        self.max_status_entries = max_buckets
         self._lock = Lock()
-    
-    def check_rate_limit(self, endpoint_key: str, endpoint: APIEndpoint) -> Optional[int]:
+        self._clock = clock
+        self.backend = backend or InMemoryRateLimitBackend(max_buckets=max_buckets)
+
+    @staticmethod
+    def token_scope(user_token: Optional[str]) -> str:
+        """Bucket scope for an access token (hashed so tokens are not kept in memory)"""
+        if not user_token:
+            return SHARED_SCOPE
+        return 'token:' + hashlib.sha256(user_token.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def _status_key(endpoint_key: str, scope: str) -> str:
+        return endpoint_key if scope == SHARED_SCOPE else f"{scope}|{endpoint_key}"
+
+    def _bucket_specs(self, endpoint_key: str, endpoint: APIEndpoint,
+                      user_token: Optional[str]) -> List[BucketSpec]:
+        specs = [BucketSpec(
+            self.token_scope(user_token), endpoint_key,
+            endpoint.rate_limit_requests, endpoint.rate_limit_window
+        )]
+        if endpoint.app_rate_limit_requests:
+            specs.append(BucketSpec(
+                APP_SCOPE, endpoint_key,
+                endpoint.app_rate_limit_requests, endpoint.app_rate_limit_window
+            ))
+        return specs
+
+    def _wait_time(self, endpoint_key: str, endpoint: APIEndpoint,
+                   user_token: Optional[str], consume: bool) -> float:
+        specs = self._bucket_specs(endpoint_key, endpoint, user_token)
+        try:
+            if consume:
+                return self.backend.acquire(specs, self._clock())
+            return self.backend.peek(specs, self._clock())
+        except Exception as e:
+            # Twitter's own 429s remain the backstop if shared state is unavailable
+            logger.warning(f"Rate limit backend unavailable, allowing {endpoint_key}: {e}")
+            return 0.0
+
+    async def try_acquire_async(self, endpoint_key: str, endpoint: APIEndpoint,
+                                user_token: Optional[str] = None) -> float:
+        """try_acquire() without running backend I/O on the event loop"""
+        specs = self._bucket_specs(endpoint_key, endpoint, user_token)
+        try:
+            return await self.backend.acquire_async(specs, self._clock())
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing {endpoint_key}: {e}")
+            return 0.0
+
+    def try_acquire(self, endpoint_key: str, endpoint: APIEndpoint,
+                    user_token: Optional[str] = None) -> float:
+        """
+        Take one request from every bucket that applies, all or nothing
+
+        Returns:
+            0 if the request may go ahead, otherwise seconds until it could
+        """
+        return self._wait_time(endpoint_key, endpoint, user_token, consume=True)
+
+    async def acquire(self, endpoint: APIEndpoint, user_token: Optional[str] = None,
+                      max_wait: Optional[float] = None) -> None:
+        """
+        Wait for request budget without blocking the event loop
+
+        Args:
+            endpoint: Endpoint about to be called
+            user_token: Access token the request is made with
+            max_wait: Raise instead of waiting longer than this many seconds
+
+        Raises:
+            RateLimitError: With retry_after set, when the wait exceeds max_wait
+        """
+        endpoint_key = f"{endpoint.method}:{endpoint.path}"
+        while True:
+            wait_time = await self.try_acquire_async(endpoint_key, endpoint, user_token)
+            if wait_time <= 0:
+                return
+            if max_wait is not None and wait_time > max_wait:
+                raise RateLimitError(
+                    f"Rate limit reached for {endpoint_key}",
+                    reset_time=int(self._clock() + wait_time),
+                    remaining=0,
+                    retry_after=math.ceil(wait_time)
+                )
+            logger.info(f"Waiting {wait_time:.1f} seconds for rate limit on {endpoint_key}")
+            await asyncio.sleep(wait_time)
+
+    def check_rate_limit(self, endpoint_key: str, endpoint: APIEndpoint,
+                         user_token: Optional[str] = None) -> Optional[int]:
         """
-        Check if request can be made without hitting rate limit
+        Check if request can be made without hitting rate limit (consumes nothing)
         Returns: None if OK, otherwise seconds to wait
         """
-        with self._lock:
-            rate_info = self._rate_limits.get(endpoint_key)
-            
-            if not rate_info:
-                # No rate limit info yet, assume we can proceed
-                return None
-            
-            if rate_info.should_wait():
-                wait_time = rate_info.time_until_reset()
-                logger.warning(f"Rate limit reached for {endpoint_key}. Wait {wait_time} seconds.")
-                return wait_time
-            
+        wait_time = self._wait_time(endpoint_key, endpoint, user_token, consume=False)
+        if wait_time <= 0:
             return None
-    
-    def update_rate_limit(self, endpoint_key: str, response_headers: Dict[str, str]) -> None:
-        """Update rate limit info from response headers"""
+        logger.warning(f"Rate limit reached for {endpoint_key}. Wait {math.ceil(wait_time)} seconds.")
+        return math.ceil(wait_time)
+
+    def _record_headers(self, endpoint_key: str, response_headers: Dict[str, str],
+                        user_token: Optional[str]) -> Optional[Tuple[BucketSpec, int, int, int, float]]:
+        """Store the reported status; returns the backend sync arguments, if the headers carry a count"""
         try:
             # Twitter API v2 rate limit headers
             limit = int(response_headers.get('x-rate-limit-limit', 0))
             remaining = int(response_headers.get('x-rate-limit-remaining', 0))
             reset_time = int(response_headers.get('x-rate-limit-reset', 0))
-            
-            with self._lock:
-                self._rate_limits[endpoint_key] = RateLimitInfo(limit, remaining, reset_time)
-                
-            logger.debug(f"Updated rate limit for {endpoint_key}: {remaining}/{limit} remaining")
-            
         except (ValueError, TypeError) as e:
             logger.warning(f"Failed to parse rate limit headers for {endpoint_key}: {e}")
-    
-    def wait_if_needed(self, endpoint_key: str, endpoint: APIEndpoint) -> None:
-        """Wait if rate limit requires it"""
-        wait_time = self.check_rate_limit(endpoint_key, endpoint)
-        if wait_time and wait_time > 0:
-            logger.info(f"Waiting {wait_time} seconds for rate limit reset on {endpoint_key}")
+            return None
+
+        scope = self.token_scope(user_token)
+        status_key = self._status_key(endpoint_key, scope)
+        now = self._clock()
+        with self._lock:
+            self._rate_limits.pop(status_key, None)
+            if len(self._rate_limits) >= self.max_status_entries:
+                self._prune_statuses(now)
+            self._rate_limits[status_key] = RateLimitInfo(limit, remaining, reset_time)
+        logger.debug(f"Updated rate limit for {endpoint_key}: {remaining}/{limit} remaining")
+
+        if 'x-rate-limit-remaining' not in response_headers:
+            return None
+        # Seed size only matters if the backend has no bucket for this key yet
+        window = reset_time - now if reset_time > now else DEFAULT_WINDOW_SECONDS
+        spec = BucketSpec(scope, endpoint_key, limit or max(remaining, 1), window)
+        return spec, limit, remaining, reset_time, now
+
+    def _prune_statuses(self, now: float) -> None:
+        """Drop statuses whose window has reset, then the least recently updated; caller holds the lock"""
+        for key in [key for key, info in self._rate_limits.items() if info.reset_time <= now]:
+            del self._rate_limits[key]
+        while len(self._rate_limits) >= self.max_status_entries:
+            del self._rate_limits[next(iter(self._rate_limits))]
+
+    def update_rate_limit(self, endpoint_key: str, response_headers: Dict[str, str],
+                          user_token: Optional[str] = None) -> None:
+        """Update rate limit info and correct the token's bucket from response headers"""
+        sync_args = self._record_headers(endpoint_key, response_headers, user_token)
+        if sync_args is None:
+            return
+        try:
+            self.backend.sync(*sync_args)
+        except Exception as e:
+            logger.warning(f"Failed to record rate limit headers for {endpoint_key}: {e}")
+
+    async def update_rate_limit_async(self, endpoint_key: str, response_headers: Dict[str, str],
+                                      user_token: Optional[str] = None) -> None:
+        """update_rate_limit() without running backend I/O on the event loop"""
+        sync_args = self._record_headers(endpoint_key, response_headers, user_token)
+        if sync_args is None:
+            return
+        try:
+            await self.backend.sync_async(*sync_args)
+        except Exception as e:
+            logger.warning(f"Failed to record rate limit headers for {endpoint_key}: {e}")
+
+    def wait_if_needed(self, endpoint_key: str, endpoint: APIEndpoint,
+                       user_token: Optional[str] = None) -> None:
+        """Block until the request fits the budget (synchronous client only)"""
+        while True:
+            wait_time = self.try_acquire(endpoint_key, endpoint, user_token)
+            if wait_time <= 0:
+                return
+            logger.info(f"Waiting {wait_time:.1f} seconds for rate limit reset on {endpoint_key}")
             time.sleep(wait_time)
-    
-    def get_rate_limit_status(self, endpoint_key: str) -> Optional[Dict[str, Any]]:
-        """Get current rate limit status for an endpoint"""
+
+    def get_rate_limit_status(self, endpoint_key: str,
+                              user_token: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get the last reported rate limit status for an endpoint (and token)"""
         with self._lock:
-            rate_info = self._rate_limits.get(endpoint_key)
+            rate_info = self._rate_limits.get(self._status_key(endpoint_key, self.token_scope(user_token)))
             if not rate_info:
                 return None
-            
+
             return {
                 'limit': rate_info.limit,
                 'remaining': rate_info.remaining,
                 'reset_time': rate_info.reset_time,
                 'time_until_reset': rate_info.time_until_reset(),
                 'last_updated': rate_info.last_updated
-            }
\ No newline at end of file
+            }
@@ -0,0 +1,211 @@
+"""Response cache for read-only Twitter API lookups
+
+Tweet, user and trend lookups are cached for a per-endpoint TTL in a bounded
+LRU map. Concurrent identical lookups are coalesced ("single-flight"): the
+first caller makes the HTTP request and everyone else asking for the same key
+meanwhile waits for that response, so a burst of founders asking for the same
+location's trends costs one request and one unit of rate limit.
+
+Entries are keyed by endpoint, arguments and the caller's token scope, since
+what a user can see (protected accounts, personalized trends) depends on the
+token. Location trends are the same for every caller and are shared.
+
+Errors are never cached; coalesced callers all receive the leader's error.
+Callers get their own copy of a cached value and may modify it freely.
+"""
+import asyncio
+import copy
+import functools
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .rate_limiter import SHARED_SCOPE, TwitterRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Seconds each read-only endpoint is cached for (endpoint key -> TTL)
+DEFAULT_TTLS: Dict[str, float] = {
+    'GET:/tweets/{tweet_id}': 60,
+    'GET:/users/{user_id}': 300,
+    'GET:/users/by/username/{username}': 300,
+    'GET:/users/personalized_trends': 120,
+    'GET:/trends/place.json': 300,
+}
+
+# Endpoints whose responses do not depend on the caller
+SHARED_ENDPOINTS = frozenset({'GET:/trends/place.json'})
+
+CacheKey = Tuple[str, str, Tuple[Hashable, ...]]
+
+
+class _Call:
+    """An in-flight synchronous fetch other threads can wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """TTL + LRU cache with single-flight lookups, shared by sync and async clients"""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = 5000,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            ttls: Endpoint key -> seconds to cache (endpoints not listed are not cached)
+            max_entries: Least recently used entries are evicted beyond this size
+            clock: Monotonic clock used for expiry
+        """
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, _Call] = {}
+        self._async_inflight: Dict[CacheKey, "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _key(self, endpoint_key: str, user_token: Optional[str], args: Tuple[Hashable, ...]) -> CacheKey:
+        scope = SHARED_SCOPE if endpoint_key in SHARED_ENDPOINTS else TwitterRateLimiter.token_scope(user_token)
+        return endpoint_key, scope, args
+
+    def _lookup(self, key: CacheKey) -> Tuple[bool, Any]:
+        """Return (found, value) for a fresh entry; caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: CacheKey, value: Any, ttl: float) -> None:
+        """Insert an entry, evicting least recently used ones; caller holds the lock"""
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_fetch(self, endpoint_key: str, user_token: Optional[str],
+                     args: Tuple[Hashable, ...], fetch: Callable[[], Any]) -> Any:
+        """
+        Return a cached response, or call ``fetch()`` once for all concurrent callers
+
+        Args:
+            endpoint_key: "METHOD:/path" of the endpoint being read
+            user_token: Access token the lookup is made with
+            args: Hashable arguments that identify the response
+            fetch: Performs the request when the key is missing
+        """
+        ttl = self.ttls.get(endpoint_key)
+        if not ttl:
+            return fetch()
+
+        key = self._key(endpoint_key, user_token, args)
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return copy.deepcopy(value)
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.value)
+
+        try:
+            call.value = fetch()
+        except BaseException as e:
+            call.error = e
+            raise
+        else:
+            with self._lock:
+                self._store(key, call.value, ttl)
+            return copy.deepcopy(call.value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    async def get_or_fetch_async(self, endpoint_key: str, user_token: Optional[str],
+                                 args: Tuple[Hashable, ...],
+                                 fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Async get_or_fetch; ``fetch`` returns a coroutine"""
+        ttl = self.ttls.get(endpoint_key)
+        if not ttl:
+            return await fetch()
+
+        key = self._key(endpoint_key, user_token, args)
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return copy.deepcopy(value)
+            task = self._async_inflight.get(key)
+            if task is None:
+                self.misses += 1
+                # The fetch runs as its own task so that a cancelled caller
+                # does not cancel it for the others waiting on it
+                task = asyncio.ensure_future(fetch())
+                task.add_done_callback(functools.partial(self._async_fetch_done, key, ttl))
+                self._async_inflight[key] = task
+            else:
+                self.coalesced += 1
+
+        value = await asyncio.shield(task)
+        return copy.deepcopy(value)
+
+    def _async_fetch_done(self, key: CacheKey, ttl: float, task: "asyncio.Future") -> None:
+        with self._lock:
+            self._async_inflight.pop(key, None)
+            if task.cancelled():
+                return
+            # Retrieving the exception also keeps an unawaited failure quiet
+            if task.exception() is None:
+                self._store(key, task.result(), ttl)
+
+    def invalidate(self, endpoint_key: str, args: Tuple[Hashable, ...]) -> int:
+        """Drop cached responses for these arguments under every token scope"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == endpoint_key and key[2][:len(args)] == args]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss and coalesce counters"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,88 @@
+"""Retries for transient Twitter API failures
+
+A request that fails with a server error (5xx), a network error or a 429
+with a known reset time is retried a few times within the same call. Delays
+use decorrelated jitter: each one is drawn between the base delay and three
+times the previous delay, capped at ``max_delay``, so that callers failing
+together spread out instead of retrying in lockstep.
+
+A Retry-After header (or, for 429s, x-rate-limit-reset) is the minimum
+delay. When Twitter asks for longer than ``max_delay`` the error is raised
+at once, leaving the caller (e.g. the publishing queue) to reschedule rather
+than hold a connection slot while it waits.
+
+Only idempotent requests are retried after a 5xx or network error, since a
+POST may have been applied before the failure. A 429 is returned before the
+request is processed, so it is retried whatever the method.
+"""
+import random
+import time
+from typing import Callable, Optional
+
+from .exceptions import (
+    TwitterAPIError, RateLimitError, TwitterAPIServerError, TwitterAPINetworkError, CircuitOpenError
+)
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+class RetryPolicy:
+    """Bounded retries with decorrelated jitter that honour Retry-After"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.25, max_delay: float = 5.0,
+                 rng: Optional[random.Random] = None, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            max_attempts: Requests made per call, including the first (1 disables retries)
+            base_delay: Smallest delay between attempts, in seconds
+            max_delay: Largest delay; longer server-requested waits are not retried
+            rng: Random source for the jitter
+            clock: Epoch-seconds clock (x-rate-limit-reset is an epoch timestamp)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+        self._clock = clock
+
+    def server_wait(self, error: TwitterAPIError) -> Optional[float]:
+        """Seconds Twitter asked the caller to wait, if it said"""
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is not None:
+            return float(retry_after)
+        if isinstance(error, RateLimitError) and error.reset_time:
+            return max(error.reset_time - self._clock(), 0.0)
+        return None
+
+    def next_delay(self, attempt: int, error: TwitterAPIError, method: str,
+                   previous_delay: Optional[float] = None) -> Optional[float]:
+        """
+        Seconds to wait before retrying, or None if the error should be raised
+
+        Args:
+            attempt: Attempts made so far (1 after the first request)
+            error: Error the last attempt failed with
+            method: HTTP method of the request
+            previous_delay: Delay before the last attempt, if it was a retry
+        """
+        if attempt >= self.max_attempts or isinstance(error, CircuitOpenError):
+            return None
+
+        server_wait = self.server_wait(error)
+        if isinstance(error, RateLimitError):
+            if server_wait is None:
+                return None
+        elif isinstance(error, (TwitterAPIServerError, TwitterAPINetworkError)):
+            if method.upper() not in IDEMPOTENT_METHODS:
+                return None
+        else:
+            return None
+
+        if server_wait is not None and server_wait > self.max_delay:
+            return None
+
+        previous = previous_delay or self.base_delay
+        delay = min(self.max_delay, self._rng.uniform(self.base_delay, previous * 3))
+        if server_wait is not None:
+            delay = max(delay, server_wait + self._rng.uniform(0, self.base_delay))
+        return delay
@@ -13,6 +13,7 @@ Main components:
 - models.py: Data model definitions
 - repository.py: Data access layer
 - service.py: Business logic service
+- token_manager.py: In-memory Twitter tokens refreshed ahead of expiry
 - validators.py: Input validation
 """
 
@@ -31,6 +32,7 @@ from .models import (
 
 from .service import UserProfileService, TwitterOAuthError
 from .repository import UserProfileRepository
+from .token_manager import TwitterTokenManager, get_token_manager, set_token_manager
 from .validators import UserProfileValidators
 
 __all__ = [
@@ -47,5 +49,8 @@ __all__ = [
     'UserProfileService',
     'UserProfileRepository', 
     'UserProfileValidators',
-    'TwitterOAuthError'
+    'TwitterOAuthError',
+    'TwitterTokenManager',
+    'get_token_manager',
+    'set_token_manager'
 ]
\ No newline at end of file
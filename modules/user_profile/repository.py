@@ -9,8 +9,9 @@ import hashlib
 import secrets
 import base64
 import bcrypt
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from cryptography.fernet import Fernet
@@ -167,6 +168,7 @@ class UserProfileRepository:
                 existing_cred.scope = credentials.get('scope')
                 existing_cred.twitter_user_id = credentials.get('twitter_user_id')
                 existing_cred.twitter_username = credentials.get('twitter_username')
+                existing_cred.refresh_lease_expires_at = None
                 existing_cred.updated_at = datetime.utcnow()
             else:
                 # Create new credentials
@@ -200,23 +202,87 @@ class UserProfileRepository:
             if not cred:
                 return None
             
-            return TwitterCredentials(
-                founder_id=str(cred.founder_id),
-                access_token=self._decrypt_token(cred.access_token),
-                refresh_token=self._decrypt_token(cred.refresh_token),
-                token_type=cred.token_type,
-                expires_at=cred.expires_at,
-                scope=cred.scope,
-                twitter_user_id=cred.twitter_user_id,
-                twitter_username=cred.twitter_username,
-                created_at=cred.created_at,
-                updated_at=cred.updated_at
-            )
+            return self._to_twitter_credentials(cred)
             
         except Exception as e:
             logger.error(f"Failed to get Twitter credentials: {e}")
             return None
     
+    def get_twitter_credentials_for_users(self, user_ids: List[str]) -> Optional[Dict[str, TwitterCredentials]]:
+        """Get Twitter credentials for several users in one query, keyed by user ID (None if the query fails)"""
+        try:
+            if not user_ids:
+                return {}
+            
+            creds = self.db_session.query(TwitterCredential).filter(
+                TwitterCredential.founder_id.in_(list(user_ids))
+            ).all()
+            
+            return {str(cred.founder_id): self._to_twitter_credentials(cred) for cred in creds}
+            
+        except Exception as e:
+            logger.error(f"Failed to get Twitter credentials for {len(user_ids)} users: {e}")
+            return None
+    
+    def get_refreshable_twitter_credentials(self, expires_before: datetime,
+                                            limit: int = 1000) -> List[TwitterCredentials]:
+        """Get credentials with a refresh token whose access token expires before the given time"""
+        try:
+            creds = self.db_session.query(TwitterCredential).filter(
+                TwitterCredential.refresh_token.isnot(None),
+                TwitterCredential.expires_at.isnot(None),
+                TwitterCredential.expires_at <= expires_before
+            ).order_by(TwitterCredential.expires_at).limit(limit).all()
+
+            return [self._to_twitter_credentials(cred) for cred in creds]
+
+        except Exception as e:
+            logger.error(f"Failed to get refreshable Twitter credentials: {e}")
+            return []
+
+    def claim_twitter_token_refresh(self, user_id: str, lease_seconds: int = 60,
+                                    now: Optional[datetime] = None) -> bool:
+        """
+        Claim the right to refresh a user's token for lease_seconds
+        
+        The conditional UPDATE only succeeds while no other process holds an
+        unexpired lease, so a rotating refresh token is spent by one process
+        only. Saving the refreshed credentials releases the lease.
+        """
+        try:
+            current_time = now or datetime.utcnow()
+            claimed = self.db_session.query(TwitterCredential).filter(
+                TwitterCredential.founder_id == user_id,
+                or_(
+                    TwitterCredential.refresh_lease_expires_at.is_(None),
+                    TwitterCredential.refresh_lease_expires_at < current_time
+                )
+            ).update({
+                TwitterCredential.refresh_lease_expires_at: current_time + timedelta(seconds=lease_seconds)
+            }, synchronize_session=False)
+            self.db_session.commit()
+            return claimed == 1
+            
+        except Exception as e:
+            logger.error(f"Failed to claim Twitter token refresh: {e}")
+            self.db_session.rollback()
+            return False
+    
+    def _to_twitter_credentials(self, cred: TwitterCredential) -> TwitterCredentials:
+        """Decrypt a stored credential row"""
+        return TwitterCredentials(
+            founder_id=str(cred.founder_id),
+            access_token=self._decrypt_token(cred.access_token),
+            refresh_token=self._decrypt_token(cred.refresh_token),
+            token_type=cred.token_type,
+            expires_at=cred.expires_at,
+            scope=cred.scope,
+            twitter_user_id=cred.twitter_user_id,
+            twitter_username=cred.twitter_username,
+            created_at=cred.created_at,
+            updated_at=cred.updated_at
+        )
+    
     def delete_twitter_credentials(self, user_id: str) -> bool:
         """Delete Twitter credentials for user"""
         try:
@@ -1,5 +1,6 @@
 """User profile service logic""" 
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List
+import asyncio
 import requests
 from requests_oauthlib import OAuth2Session
 from urllib.parse import urlencode
@@ -13,6 +14,7 @@ import logging
 
 from .repository import UserProfileRepository
 from .models import UserProfileData, ProductInfoData, TwitterCredentials, UserRegistration, UserLogin
+from .token_manager import get_token_manager
 from database.dataflow_manager import DataFlowManager
 from modules.twitter_api import TwitterAPIClient
 
@@ -66,13 +68,22 @@ class UserProfileService:
         return self.repository.update_product_info(founder_id, product_info)
     
     def get_twitter_access_token(self, founder_id: str) -> Optional[str]:
-        """Get Twitter access token for user"""
+        """Get Twitter access token for user (from the token manager's memory when it has it)"""
         try:
+            token_manager = get_token_manager()
+            if token_manager:
+                access_token = token_manager.get_access_token(founder_id)
+                if access_token:
+                    return access_token
+            
             credentials = self.repository.get_twitter_credentials(founder_id)
             if not credentials:
                 logger.warning(f"No Twitter credentials found for user {founder_id}")
                 return None
             
+            if token_manager:
+                token_manager.track(credentials)
+            
             if credentials.is_expired():
                 logger.warning(f"Twitter credentials expired for user {founder_id}")
                 return None
@@ -82,6 +93,59 @@ class UserProfileService:
             logger.error(f"Failed to get Twitter access token for user {founder_id}: {e}")
             return None
     
+    async def get_twitter_access_tokens(self, founder_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get Twitter access tokens for several users with one credentials query
+        
+        Tokens held by the token manager are served from memory; only the
+        rest are queried. Expired tokens that have a refresh token are
+        refreshed through the token manager. Users without credentials, or
+        whose token has expired and could not be refreshed, map to None.
+        Returns an empty dict when the credentials could not be loaded.
+        """
+        try:
+            founder_ids = list(dict.fromkeys(str(founder_id) for founder_id in founder_ids))
+            token_manager = get_token_manager()
+            tokens = token_manager.get_access_tokens(founder_ids) if token_manager else {}
+            missing = [founder_id for founder_id in founder_ids if founder_id not in tokens]
+            if not missing:
+                return tokens
+            
+            credentials = self.repository.get_twitter_credentials_for_users(missing)
+            if credentials is None:
+                return {}
+            
+            refreshable = []
+            for founder_id in missing:
+                cred = credentials.get(founder_id)
+                if cred and token_manager:
+                    token_manager.track(cred)
+                if not cred:
+                    logger.warning(f"No Twitter credentials found for user {founder_id}")
+                    tokens[founder_id] = None
+                elif cred.is_expired() and cred.refresh_token and token_manager:
+                    refreshable.append(founder_id)
+                elif cred.is_expired():
+                    logger.warning(f"Twitter credentials expired for user {founder_id}")
+                    tokens[founder_id] = None
+                else:
+                    tokens[founder_id] = cred.access_token
+            
+            refreshed = await asyncio.gather(
+                *(token_manager.refresh(founder_id) for founder_id in refreshable),
+                return_exceptions=True
+            )
+            for founder_id, token in zip(refreshable, refreshed):
+                if isinstance(token, Exception) or not token:
+                    logger.warning(f"Twitter credentials expired for user {founder_id} and could not be refreshed")
+                    tokens[founder_id] = None
+                else:
+                    tokens[founder_id] = token
+            return tokens
+        except Exception as e:
+            logger.error(f"Failed to get Twitter access tokens for {len(founder_ids)} users: {e}")
+            return {}
+    
     def get_twitter_auth_url(self, founder_id: str) -> Tuple[str, str]:
         """获取Twitter授权URL"""
         try:
@@ -182,6 +246,10 @@ class UserProfileService:
             
             logger.info(f"Successfully saved Twitter credentials for user {founder_id}")
             
+            token_manager = get_token_manager()
+            if token_manager:
+                token_manager.track(TwitterCredentials(founder_id=founder_id, **credentials_data))
+            
             # 清理code_verifier
             self._remove_code_verifier(state)
             
@@ -226,7 +294,11 @@ class UserProfileService:
             credentials.expires_at = datetime.utcnow() + timedelta(seconds=token_info.get('expires_in', 7200))
             credentials.updated_at = datetime.utcnow()
             
-            self.repository.save_twitter_credentials(founder_id, credentials)
+            self.repository.save_twitter_credentials(founder_id, credentials.model_dump())
+            
+            token_manager = get_token_manager()
+            if token_manager:
+                token_manager.track(credentials)
             
             # 清理token验证缓存，因为有新的token
             try:
@@ -269,6 +341,10 @@ class UserProfileService:
             # 删除凭证
             self.repository.delete_twitter_credentials(founder_id)
             
+            token_manager = get_token_manager()
+            if token_manager:
+                token_manager.forget(founder_id)
+            
             # 清理token验证缓存
             try:
                 from api.middleware import clear_token_cache
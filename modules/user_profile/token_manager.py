@@ -0,0 +1,486 @@
+"""User Profile Module - Proactive Twitter Token Refresh
+
+Keeps every known founder's Twitter access token in memory and refreshes it
+``refresh_margin_seconds`` before it expires, so request handlers and the
+publisher read a fresh token from memory instead of finding out at request
+time that it has expired.
+
+Tokens are ordered in a min-heap by the time they should be refreshed; the
+refresh loop sleeps until the earliest one. The heap is rebuilt from the
+database every ``resync_interval_seconds`` to pick up tokens issued or
+refreshed by other processes.
+
+Twitter rotates refresh tokens on every use, so two refreshes of the same
+token would leave one of them with a revoked refresh token. Refreshes are
+serialized per founder, and the stored credentials are re-read before each
+refresh so that a token another process already refreshed is adopted rather
+than refreshed again. Across processes, a refresh first claims a short lease
+on the founder's credentials row; a process that finds the lease taken waits
+for the holder to save the new token instead of spending the refresh token
+itself. Only one process needs to run the refresh loop; other processes can
+use a manager that is never started as an in-memory token cache backed by
+the database.
+"""
+import asyncio
+import copy
+import heapq
+import inspect
+import logging
+from contextlib import AbstractContextManager
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .models import TwitterCredentials
+
+logger = logging.getLogger(__name__)
+
+RepositoryFactory = Callable[[], AbstractContextManager]
+
+# Manager registered by the application lifespan
+_token_manager: Optional["TwitterTokenManager"] = None
+
+
+def get_token_manager() -> Optional["TwitterTokenManager"]:
+    """Get the process-wide token manager, if any"""
+    return _token_manager
+
+
+def set_token_manager(manager: Optional["TwitterTokenManager"]) -> None:
+    """Register (or clear) the process-wide token manager"""
+    global _token_manager
+    _token_manager = manager
+
+
+class _TokenEntry:
+    """A founder's current token and when to refresh it"""
+
+    __slots__ = ('access_token', 'refresh_token', 'expires_at', 'refresh_at', 'failures')
+
+    def __init__(self, credentials: TwitterCredentials, refresh_at: Optional[datetime]):
+        self.access_token = credentials.access_token
+        self.refresh_token = credentials.refresh_token
+        self.expires_at = credentials.expires_at
+        self.refresh_at = refresh_at
+        self.failures = 0
+
+
+class TwitterTokenManager:
+    """In-memory Twitter tokens with background refresh ahead of expiry"""
+
+    def __init__(self, repository_factory: RepositoryFactory, auth: Any,
+                 refresh_margin_seconds: int = 600,
+                 resync_interval_seconds: int = 300,
+                 retry_delay_seconds: int = 60,
+                 max_refresh_attempts: int = 5,
+                 max_concurrent_refreshes: int = 10,
+                 refresh_lease_seconds: int = 30,
+                 lease_poll_seconds: float = 0.5,
+                 clock: Callable[[], datetime] = datetime.utcnow):
+        """
+        Args:
+            repository_factory: Returns a context manager yielding a UserProfileRepository
+                bound to a fresh database session (closed on exit)
+            auth: TwitterAuth or AsyncTwitterAuth used to refresh tokens
+            refresh_margin_seconds: Refresh this long before a token expires
+            resync_interval_seconds: How often the heap is rebuilt from the database
+            retry_delay_seconds: Wait before retrying a failed refresh
+            max_refresh_attempts: Failed refreshes before a founder is left to re-authorize
+            max_concurrent_refreshes: Refresh requests in flight at once
+            refresh_lease_seconds: How long a refresh lease is held (kept below retry_delay_seconds)
+            lease_poll_seconds: How often to look for the token saved by the lease holder
+            clock: Naive-UTC clock (credentials store naive UTC expiry times)
+        """
+        self.repository_factory = repository_factory
+        self.auth = auth
+        self.refresh_margin = timedelta(seconds=refresh_margin_seconds)
+        self.resync_interval = timedelta(seconds=resync_interval_seconds)
+        self.retry_delay = timedelta(seconds=retry_delay_seconds)
+        self.max_refresh_attempts = max_refresh_attempts
+        self.max_concurrent_refreshes = max_concurrent_refreshes
+        self.refresh_lease_seconds = refresh_lease_seconds
+        self.lease_poll_seconds = lease_poll_seconds
+        self._clock = clock
+
+        # Heap of (refresh_at, founder_id); entries not matching _entries are stale
+        self._entries: Dict[str, _TokenEntry] = {}
+        self._heap: List[Tuple[datetime, str]] = []
+        self._state_lock = Lock()
+        self._refresh_locks: Dict[str, asyncio.Lock] = {}
+        self._refresh_lock_users: Dict[str, int] = {}
+
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = False
+        self._last_resync: Optional[datetime] = None
+
+        self.refresh_count = 0
+        self.refresh_failures = 0
+
+    # ==================== Token Reads ====================
+
+    def get_access_token(self, founder_id: str) -> Optional[str]:
+        """Current access token from memory (None if unknown or expired)"""
+        entry = self._entries.get(str(founder_id))
+        if entry is None or self._is_expired(entry, self._clock()):
+            return None
+        return entry.access_token
+
+    def get_access_tokens(self, founder_ids: List[str]) -> Dict[str, str]:
+        """Current access tokens of the founders known to the manager"""
+        tokens = {}
+        for founder_id in founder_ids:
+            token = self.get_access_token(founder_id)
+            if token is not None:
+                tokens[str(founder_id)] = token
+        return tokens
+
+    @staticmethod
+    def _is_expired(entry: _TokenEntry, now: datetime) -> bool:
+        return entry.expires_at is not None and now >= entry.expires_at
+
+    # ==================== Tracking ====================
+
+    def track(self, credentials: TwitterCredentials) -> None:
+        """
+        Start (or keep) tracking a founder's credentials
+
+        Credentials older than the ones already tracked are ignored, so a
+        stale database read never replaces a token refreshed in memory.
+        """
+        founder_id = str(credentials.founder_id)
+        current = self._entries.get(founder_id)
+        if current is not None and current.access_token == credentials.access_token:
+            return
+        if (current is not None and current.expires_at is not None and credentials.expires_at is not None
+                and credentials.expires_at < current.expires_at):
+            return
+
+        refresh_at = None
+        if credentials.refresh_token and credentials.expires_at is not None:
+            refresh_at = credentials.expires_at - self.refresh_margin
+        self._set_entry(founder_id, _TokenEntry(credentials, refresh_at))
+
+    def forget(self, founder_id: str) -> None:
+        """Stop tracking a founder (credentials revoked or deleted)"""
+        with self._state_lock:
+            self._entries.pop(str(founder_id), None)
+
+    def _set_entry(self, founder_id: str, entry: _TokenEntry) -> None:
+        with self._state_lock:
+            previous_next = self._next_refresh_at()
+            self._entries[founder_id] = entry
+            if entry.refresh_at is not None:
+                heapq.heappush(self._heap, (entry.refresh_at, founder_id))
+
+        # Only interrupt the sleep when this moves the next refresh earlier
+        if entry.refresh_at is not None and (previous_next is None or entry.refresh_at < previous_next):
+            self._wake()
+
+    def _wake(self) -> None:
+        """Wake the refresh loop, whichever thread the caller is on"""
+        if self._loop is None:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _next_refresh_at(self) -> Optional[datetime]:
+        """Earliest live refresh time; caller holds the state lock"""
+        while self._heap:
+            refresh_at, founder_id = self._heap[0]
+            entry = self._entries.get(founder_id)
+            if entry is not None and entry.refresh_at == refresh_at:
+                return refresh_at
+            heapq.heappop(self._heap)
+        return None
+
+    def _pop_due(self, now: datetime) -> List[str]:
+        """Founders whose refresh time has come"""
+        due = []
+        with self._state_lock:
+            while self._next_refresh_at() is not None and self._heap[0][0] <= now:
+                refresh_at, founder_id = heapq.heappop(self._heap)
+                due.append(founder_id)
+        return due
+
+    # ==================== Refresh ====================
+
+    async def refresh(self, founder_id: str, force: bool = False) -> Optional[str]:
+        """
+        Refresh a founder's token unless it is still fresh
+
+        Concurrent calls for one founder share a single refresh.
+
+        Args:
+            founder_id: Founder whose token to refresh
+            force: Refresh even if the token is not yet within the refresh margin
+
+        Returns:
+            The current access token, or None if the founder must re-authorize
+        """
+        founder_id = str(founder_id)
+        lock = self._refresh_locks.setdefault(founder_id, asyncio.Lock())
+        # The lock is dropped once its last user is done, so idle founders hold none
+        self._refresh_lock_users[founder_id] = self._refresh_lock_users.get(founder_id, 0) + 1
+        try:
+            async with lock:
+                return await self._refresh_locked(founder_id, force)
+        finally:
+            users = self._refresh_lock_users.pop(founder_id) - 1
+            if users:
+                self._refresh_lock_users[founder_id] = users
+            else:
+                self._refresh_locks.pop(founder_id, None)
+
+    async def _refresh_locked(self, founder_id: str, force: bool) -> Optional[str]:
+        """refresh() for a caller holding the founder's lock"""
+        now = self._clock()
+        entry = self._entries.get(founder_id)
+        if not force and entry is not None and not self._refresh_due(entry, now):
+            return entry.access_token
+
+        try:
+            credentials = await asyncio.to_thread(self._load_credentials, founder_id)
+        except Exception as e:
+            logger.error(f"Failed to load Twitter credentials for {founder_id}: {e}")
+            self._refresh_failed(founder_id, now)
+            return self.get_access_token(founder_id)
+        if credentials is None:
+            self.forget(founder_id)
+            return None
+
+        # A token refreshed here but not yet saved is newer than the stored one
+        if (entry is not None and entry.expires_at is not None and credentials.expires_at is not None
+                and entry.expires_at > credentials.expires_at):
+            credentials = credentials.model_copy(update={
+                'access_token': entry.access_token,
+                'refresh_token': entry.refresh_token,
+                'expires_at': entry.expires_at
+            })
+
+        # Another process may have refreshed it since we last looked
+        if not force and credentials.expires_at is not None and credentials.expires_at - self.refresh_margin > now:
+            self.track(credentials)
+            return credentials.access_token
+
+        if not credentials.refresh_token:
+            self.track(credentials)
+            return self.get_access_token(founder_id)
+
+        if not await asyncio.to_thread(self._claim_refresh, founder_id, now):
+            return await self._wait_for_lease_holder(founder_id, credentials)
+
+        token_info = await self._request_refresh(credentials.refresh_token)
+        if not token_info or not token_info.get('access_token'):
+            self._refresh_failed(founder_id, now, credentials)
+            return self.get_access_token(founder_id)
+
+        refreshed = TwitterCredentials(
+            founder_id=founder_id,
+            access_token=token_info['access_token'],
+            refresh_token=token_info.get('refresh_token', credentials.refresh_token),
+            token_type=credentials.token_type,
+            expires_at=now + timedelta(seconds=token_info.get('expires_in', 7200)),
+            scope=token_info.get('scope', credentials.scope),
+            twitter_user_id=credentials.twitter_user_id,
+            twitter_username=credentials.twitter_username,
+            created_at=credentials.created_at,
+            updated_at=now
+        )
+        try:
+            saved = await asyncio.to_thread(self._save_credentials, refreshed)
+        except Exception as e:
+            logger.error(f"Failed to save Twitter credentials for {founder_id}: {e}")
+            saved = False
+        if not saved:
+            # The old refresh token is spent, so memory stays authoritative
+            # until the next refresh saves a newer token
+            logger.error(f"Refreshed Twitter token for {founder_id} could not be saved")
+
+        self.track(refreshed)
+        self.refresh_count += 1
+        logger.info(f"Refreshed Twitter token for {founder_id}, expires at {refreshed.expires_at}")
+        return refreshed.access_token
+
+    async def _wait_for_lease_holder(self, founder_id: str, credentials: TwitterCredentials) -> Optional[str]:
+        """Adopt the token saved by the process holding the refresh lease"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.refresh_lease_seconds
+        while loop.time() < deadline:
+            await asyncio.sleep(self.lease_poll_seconds)
+            try:
+                stored = await asyncio.to_thread(self._load_credentials, founder_id)
+            except Exception as e:
+                logger.error(f"Failed to load Twitter credentials for {founder_id}: {e}")
+                continue
+            if stored is not None and stored.access_token != credentials.access_token:
+                self.track(stored)
+                return stored.access_token
+
+        # The holder never saved; its lease has lapsed by the time the retry runs
+        logger.warning(f"Twitter token refresh for {founder_id} is held by another process, retrying later")
+        self._refresh_failed(founder_id, self._clock(), credentials)
+        return self.get_access_token(founder_id)
+
+    def _refresh_due(self, entry: _TokenEntry, now: datetime) -> bool:
+        if entry.expires_at is None:
+            return False
+        return entry.expires_at - self.refresh_margin <= now
+
+    def _refresh_failed(self, founder_id: str, now: datetime,
+                        credentials: Optional[TwitterCredentials] = None) -> None:
+        """Schedule a retry, or give up after max_refresh_attempts"""
+        self.refresh_failures += 1
+        entry = self._entries.get(founder_id)
+        failures = (entry.failures if entry is not None else 0) + 1
+
+        retry_at = now + self.retry_delay if failures < self.max_refresh_attempts else None
+        if credentials is not None:
+            retry_entry = _TokenEntry(credentials, retry_at)
+        elif entry is not None:
+            retry_entry = copy.copy(entry)
+            retry_entry.refresh_at = retry_at
+        else:
+            return
+        retry_entry.failures = failures
+        self._set_entry(founder_id, retry_entry)
+
+        if retry_at is None:
+            logger.error(f"Giving up refreshing Twitter token for {founder_id} after {failures} attempts")
+        else:
+            logger.warning(f"Twitter token refresh failed for {founder_id} (attempt {failures}), retrying at {retry_at}")
+
+    async def _request_refresh(self, refresh_token: str) -> Optional[Dict[str, Any]]:
+        try:
+            if inspect.iscoroutinefunction(self.auth.refresh_token):
+                return await self.auth.refresh_token(refresh_token)
+            # The blocking TwitterAuth must not stall the event loop
+            return await asyncio.to_thread(self.auth.refresh_token, refresh_token)
+        except Exception as e:
+            logger.error(f"Twitter token refresh request failed: {e}")
+            return None
+
+    def _load_credentials(self, founder_id: str) -> Optional[TwitterCredentials]:
+        with self.repository_factory() as repository:
+            return repository.get_twitter_credentials(founder_id)
+
+    def _claim_refresh(self, founder_id: str, now: datetime) -> bool:
+        try:
+            with self.repository_factory() as repository:
+                return repository.claim_twitter_token_refresh(founder_id, self.refresh_lease_seconds, now)
+        except Exception as e:
+            logger.error(f"Failed to claim Twitter token refresh for {founder_id}: {e}")
+            return False
+
+    def _save_credentials(self, credentials: TwitterCredentials) -> bool:
+        with self.repository_factory() as repository:
+            return repository.save_twitter_credentials(credentials.founder_id, credentials.model_dump())
+
+    # ==================== Lifecycle ====================
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    async def start(self) -> None:
+        """Start the refresh loop in the current event loop"""
+        if self._running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self._resync)
+        self._running = True
+        self._task = asyncio.create_task(self._run(), name="twitter-token-refresh")
+        logger.info("Twitter token manager started")
+
+    async def stop(self) -> None:
+        """Stop the refresh loop"""
+        if not self._running:
+            return
+
+        self._running = False
+        self._wakeup.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=30)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            self._task = None
+        logger.info("Twitter token manager stopped")
+
+    async def _run(self) -> None:
+        semaphore = asyncio.Semaphore(self.max_concurrent_refreshes)
+
+        async def refresh_one(founder_id: str) -> None:
+            async with semaphore:
+                await self.refresh(founder_id)
+
+        while self._running:
+            try:
+                now = self._clock()
+                if self._last_resync is None or now - self._last_resync >= self.resync_interval:
+                    await asyncio.to_thread(self._resync)
+
+                due = self._pop_due(now)
+                if due:
+                    await asyncio.gather(*(refresh_one(founder_id) for founder_id in due))
+                    continue
+
+                await self._sleep_until_next(now)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Twitter token refresh tick failed: {e}")
+                await asyncio.sleep(1)
+
+    async def _sleep_until_next(self, now: datetime) -> None:
+        """Sleep until the next refresh, the next resync or an earlier tracked token"""
+        timeout = self.resync_interval.total_seconds()
+        if self._last_resync is not None:
+            timeout -= (now - self._last_resync).total_seconds()
+        with self._state_lock:
+            next_refresh = self._next_refresh_at()
+        if next_refresh is not None:
+            timeout = min(timeout, (next_refresh - now).total_seconds())
+
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0.0))
+        except asyncio.TimeoutError:
+            pass
+
+    def _resync(self) -> None:
+        """Track every stored token that needs a refresh before the next resync"""
+        try:
+            horizon = self._clock() + self.refresh_margin + self.resync_interval
+            with self.repository_factory() as repository:
+                credentials = repository.get_refreshable_twitter_credentials(horizon)
+            for cred in credentials:
+                self.track(cred)
+            logger.debug(f"Twitter token manager resynced {len(credentials)} expiring tokens")
+        except Exception as e:
+            logger.error(f"Twitter token manager resync failed: {e}")
+        finally:
+            self._last_resync = self._clock()
+
+    def stats(self) -> Dict[str, Any]:
+        """Tracked tokens and refresh counters"""
+        with self._state_lock:
+            next_refresh = self._next_refresh_at()
+        return {
+            'tracked': len(self._entries),
+            'refreshes': self.refresh_count,
+            'refresh_failures': self.refresh_failures,
+            'next_refresh_at': next_refresh,
+            'running': self._running
+        }
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Publishing Rollup Backfill Script
+
+Rebuilds the publishing_daily_rollup table from existing content drafts.
+New status transitions update the rollup as they happen; run this once
+after creating the table (see migrate_publishing_schema.py), or again to
+repair a founder's counters:
+
+    python scripts/backfill_publishing_rollup.py
+
+Usage:
+    python scripts/backfill_publishing_rollup.py [--database-url URL] [--founder-id ID]
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import DataFlowManager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_publishing_rollup(database_url: str, founder_id: str = None) -> int:
+    """Rebuild rollup rows for one founder, or for every founder"""
+    engine = create_engine(database_url)
+    session = sessionmaker(bind=engine)()
+    try:
+        return DataFlowManager(session).backfill_publishing_rollup(founder_id)
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild publishing_daily_rollup from content drafts")
+    parser.add_argument(
+        '--database-url',
+        default=os.getenv('DATABASE_URL', 'sqlite:///./seo_tool.db'),
+        help="Database URL (defaults to DATABASE_URL)"
+    )
+    parser.add_argument(
+        '--founder-id',
+        default=None,
+        help="Only rebuild this founder's rows (default: all founders)"
+    )
+    args = parser.parse_args()
+
+    written = backfill_publishing_rollup(args.database_url, args.founder_id)
+    logger.info(f"✅ {written} rollup row(s) written")
+
+
+if __name__ == "__main__":
+    main()
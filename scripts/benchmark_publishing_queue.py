@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Publishing Queue Throughput Benchmark
+
+Seeds synthetic founders with due scheduled drafts, drains the queue through
+``SchedulingPostingService.process_publishing_queue`` (or the resident
+``PublishingDaemon``) against an in-process fake Twitter with tunable latency
+and 429 rate, and reports:
+
+- items/sec over the whole drain
+- p50/p95/p99 publish lag (posted_at - scheduled_post_time)
+- database queries per processed item
+
+Results are written as JSON tagged with the current git commit, so runs from
+different commits can be compared side by side. Without ``--database-url`` a
+temporary SQLite file is used and removed afterwards; a Postgres URL must point
+at a scratch database, since every due draft in it is published and the seeded
+rows are left in place.
+
+Usage:
+    python scripts/benchmark_publishing_queue.py [--founders N] [--drafts-per-founder N]
+        [--latency-ms MS] [--rate-limit-rate P] [--mode tick|daemon] [--async-twitter]
+        [--database-url URL] [--output PATH]
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import logging
+import tempfile
+import subprocess
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+from database import DataFlowManager
+from database.dataflow_manager import QUEUED_STATUSES
+from database.models import Base, Founder, GeneratedContentDraft
+from modules.scheduling_posting import SchedulingPostingService
+from modules.scheduling_posting.fair_scheduler import FairPublishScheduler, publishing_queue_metrics
+from modules.scheduling_posting.models import PublishingConfiguration
+from modules.scheduling_posting.queue_processor import PublishingDaemon
+from modules.scheduling_posting.retry_policy import RetryPolicy
+from modules.twitter_api import RateLimitError
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_CHUNK_SIZE = 5000
+
+
+@dataclass
+class BenchmarkConfig:
+    """Parameters of one benchmark run"""
+    founders: int = 10
+    drafts_per_founder: int = 10
+    latency_ms: float = 20.0
+    latency_jitter_ms: float = 0.0
+    rate_limit_rate: float = 0.0
+    mode: str = 'tick'
+    async_twitter: bool = False
+    database_url: Optional[str] = None
+    max_seconds: float = 600.0
+    seed: int = 42
+    publishing: Dict[str, Any] = field(default_factory=dict)
+
+
+class FakeTwitterClient:
+    """
+    In-process stand-in for TwitterAPIClient.create_tweet
+
+    Each call blocks for the configured latency, like the real synchronous
+    client, and fails with a 429 at the configured rate.
+    """
+
+    def __init__(self, latency_ms: float = 20.0, latency_jitter_ms: float = 0.0,
+                 rate_limit_rate: float = 0.0, rng: Optional[random.Random] = None):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = rng or random.Random()
+        self.calls = 0
+        self.rate_limited = 0
+
+    def _latency_seconds(self) -> float:
+        self.calls += 1
+        return (self.latency_ms + self._rng.uniform(0, self.latency_jitter_ms)) / 1000
+
+    def _respond(self, text: str) -> Dict[str, Any]:
+        if self._rng.random() < self.rate_limit_rate:
+            self.rate_limited += 1
+            raise RateLimitError(retry_after=0)
+        return {'data': {'id': str(self._rng.getrandbits(63)), 'text': text}}
+
+    def create_tweet(self, user_token: str, text: str, **kwargs) -> Dict[str, Any]:
+        latency = self._latency_seconds()
+        if latency > 0:
+            time.sleep(latency)
+        return self._respond(text)
+
+
+class FakeAsyncTwitterClient(FakeTwitterClient):
+    """Fake with AsyncTwitterAPIClient's coroutine create_tweet; latency does not block the loop"""
+
+    async def create_tweet(self, user_token: str, text: str, **kwargs) -> Dict[str, Any]:
+        latency = self._latency_seconds()
+        if latency > 0:
+            await asyncio.sleep(latency)
+        return self._respond(text)
+
+
+class FakeUserProfileService:
+    """Hands every founder a valid access token without touching the database"""
+
+    def get_twitter_access_token(self, founder_id: str) -> Optional[str]:
+        return f"bench_token_{founder_id}"
+
+    async def get_twitter_access_tokens(self, founder_ids: List[str]) -> Dict[str, Optional[str]]:
+        return {founder_id: f"bench_token_{founder_id}" for founder_id in founder_ids}
+
+
+class QueryCounter:
+    """Counts statements sent to the database while enabled"""
+
+    def __init__(self, engine):
+        self.count = 0
+        self.enabled = False
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled:
+            self.count += 1
+
+    @contextmanager
+    def paused(self):
+        enabled, self.enabled = self.enabled, False
+        try:
+            yield
+        finally:
+            self.enabled = enabled
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def seed_queue(session, founders: int, drafts_per_founder: int, run_id: str) -> List[str]:
+    """Bulk insert founders, each with drafts that are already due; returns founder ids"""
+    now = datetime.utcnow()
+    founder_ids = [str(uuid.uuid4()) for _ in range(founders)]
+
+    session.execute(Founder.__table__.insert(), [
+        {
+            'id': founder_id,
+            'email': f'bench-{run_id}-{i}@example.com',
+            'username': f'bench_{run_id}_{i}',
+            'hashed_password': 'bench',
+        }
+        for i, founder_id in enumerate(founder_ids)
+    ])
+
+    rows = []
+    for founder_index, founder_id in enumerate(founder_ids):
+        for i in range(drafts_per_founder):
+            rows.append({
+                'id': str(uuid.uuid4()),
+                'founder_id': founder_id,
+                'content_type': 'tweet',
+                'generated_text': f'benchmark post {founder_index}-{i}',
+                'status': 'scheduled',
+                'scheduled_post_time': now - timedelta(milliseconds=i),
+                'priority': (i % 10) + 1,
+            })
+            if len(rows) >= SEED_CHUNK_SIZE:
+                session.execute(GeneratedContentDraft.__table__.insert(), rows)
+                rows = []
+    if rows:
+        session.execute(GeneratedContentDraft.__table__.insert(), rows)
+
+    session.commit()
+    return founder_ids
+
+
+def count_queued(session, founder_ids: List[str]) -> int:
+    return session.query(func.count(GeneratedContentDraft.id)).filter(
+        GeneratedContentDraft.founder_id.in_(founder_ids),
+        GeneratedContentDraft.status.in_(QUEUED_STATUSES)
+    ).scalar() or 0
+
+
+def collect_outcome(session, founder_ids: List[str]) -> Dict[str, Any]:
+    """Status counts and publish lags (seconds) of the seeded drafts"""
+    drafts = GeneratedContentDraft.__table__
+    statuses = dict(session.execute(
+        drafts.select().with_only_columns(drafts.c.status, func.count())
+        .where(drafts.c.founder_id.in_(founder_ids))
+        .group_by(drafts.c.status)
+    ).all())
+
+    lags = [
+        (posted_at - scheduled_time).total_seconds()
+        for posted_at, scheduled_time in session.execute(
+            drafts.select().with_only_columns(drafts.c.posted_at, drafts.c.scheduled_post_time)
+            .where(drafts.c.founder_id.in_(founder_ids), drafts.c.status == 'posted')
+        ).all()
+    ]
+    return {'statuses': statuses, 'lags': lags}
+
+
+def _build_service(session, twitter_client, config: BenchmarkConfig,
+                   publisher: Optional[PublishingDaemon] = None) -> SchedulingPostingService:
+    service = SchedulingPostingService(
+        data_flow_manager=DataFlowManager(session),
+        twitter_client=twitter_client,
+        user_profile_service=FakeUserProfileService(),
+        publisher=publisher
+    )
+    # Retries come back within seconds instead of minutes so a run can drain
+    service.config = PublishingConfiguration(**{
+        'retry_base_delay_seconds': 1,
+        'retry_max_delay_seconds': 1,
+        **config.publishing
+    })
+    service.fair_scheduler = FairPublishScheduler(
+        max_concurrency=service.config.max_concurrent_publishes,
+        per_founder_limit=service.config.max_in_flight_per_founder,
+        metrics=publishing_queue_metrics
+    )
+    service.retry_policy = RetryPolicy(
+        base_delay_seconds=service.config.retry_base_delay_seconds,
+        max_delay_seconds=service.config.retry_max_delay_seconds
+    )
+    return service
+
+
+async def _drain_with_ticks(session_factory, twitter_client, config: BenchmarkConfig,
+                            counter: QueryCounter, founder_ids: List[str], deadline: float) -> int:
+    session = session_factory()
+    try:
+        service = _build_service(session, twitter_client, config)
+        processed = 0
+        while time.perf_counter() < deadline:
+            result = await service.process_publishing_queue()
+            processed += result.get('processed_count', 0) + result.get('needs_reauth_count', 0)
+
+            with counter.paused():
+                if count_queued(session, founder_ids) == 0:
+                    break
+            if not result.get('processed_count'):
+                # Only retries that are not due yet remain
+                await asyncio.sleep(0.1)
+        return processed
+    finally:
+        session.close()
+
+
+class _CountingService:
+    """Service proxy that tallies what the daemon's queue passes process"""
+
+    def __init__(self, service: SchedulingPostingService, tally: List[int]):
+        self._service = service
+        self._tally = tally
+
+    def __getattr__(self, name):
+        return getattr(self._service, name)
+
+    async def process_publishing_queue(self) -> Dict[str, Any]:
+        result = await self._service.process_publishing_queue()
+        self._tally[0] += result.get('processed_count', 0) + result.get('needs_reauth_count', 0)
+        return result
+
+
+async def _drain_with_daemon(session_factory, twitter_client, config: BenchmarkConfig,
+                             counter: QueryCounter, founder_ids: List[str], deadline: float) -> int:
+    tally = [0]
+    daemon = PublishingDaemon(
+        lambda: _daemon_service(session_factory, twitter_client, config, daemon, tally),
+        config=PublishingConfiguration(**{'queue_check_interval_seconds': 1, **config.publishing})
+    )
+
+    await daemon.start()
+    check_session = session_factory()
+    try:
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(0.1)
+            with counter.paused():
+                check_session.expire_all()
+                if count_queued(check_session, founder_ids) == 0:
+                    break
+    finally:
+        check_session.close()
+        await daemon.stop()
+    return tally[0]
+
+
+@contextmanager
+def _daemon_service(session_factory, twitter_client, config: BenchmarkConfig,
+                    daemon: PublishingDaemon, tally: List[int]):
+    session = session_factory()
+    try:
+        yield _CountingService(_build_service(session, twitter_client, config, publisher=daemon), tally)
+    finally:
+        session.close()
+
+
+async def run_benchmark(config: BenchmarkConfig) -> Dict[str, Any]:
+    """Seed, drain and measure one configuration; returns the JSON-ready report"""
+    if config.mode not in ('tick', 'daemon'):
+        raise ValueError(f"Unknown benchmark mode: {config.mode}")
+
+    temp_path = None
+    database_url = config.database_url
+    if not database_url:
+        temp_path = os.path.join(tempfile.gettempdir(), f"bench_queue_{uuid.uuid4().hex[:8]}.db")
+        database_url = f"sqlite:///{temp_path}"
+
+    engine = create_engine(database_url)
+    try:
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        counter = QueryCounter(engine)
+        client_class = FakeAsyncTwitterClient if config.async_twitter else FakeTwitterClient
+        twitter_client = client_class(
+            latency_ms=config.latency_ms,
+            latency_jitter_ms=config.latency_jitter_ms,
+            rate_limit_rate=config.rate_limit_rate,
+            rng=random.Random(config.seed)
+        )
+
+        session = session_factory()
+        try:
+            seed_started = time.perf_counter()
+            founder_ids = seed_queue(session, config.founders, config.drafts_per_founder,
+                                     run_id=uuid.uuid4().hex[:8])
+            seed_seconds = time.perf_counter() - seed_started
+        finally:
+            session.close()
+
+        drain = _drain_with_ticks if config.mode == 'tick' else _drain_with_daemon
+        started = time.perf_counter()
+        counter.enabled = True
+        processed = await drain(session_factory, twitter_client, config, counter, founder_ids,
+                                deadline=started + config.max_seconds)
+        counter.enabled = False
+        elapsed = time.perf_counter() - started
+
+        session = session_factory()
+        try:
+            outcome = collect_outcome(session, founder_ids)
+            remaining = count_queued(session, founder_ids)
+        finally:
+            session.close()
+    finally:
+        engine.dispose()
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    lags = outcome['lags']
+    posted = len(lags)
+    return {
+        'benchmark': 'publishing_queue',
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'database': engine.dialect.name,
+        'config': asdict(config),
+        'results': {
+            'seed_seconds': round(seed_seconds, 3),
+            'elapsed_seconds': round(elapsed, 3),
+            'drained': remaining == 0,
+            'remaining': remaining,
+            'processed_items': processed,
+            'posted_items': posted,
+            'statuses': outcome['statuses'],
+            'items_per_second': round(posted / elapsed, 2) if elapsed else None,
+            'publish_lag_seconds': {
+                'p50': percentile(lags, 50),
+                'p95': percentile(lags, 95),
+                'p99': percentile(lags, 99),
+                'max': max(lags) if lags else None,
+            },
+            'db_queries': counter.count,
+            'db_queries_per_item': round(counter.count / processed, 2) if processed else None,
+            'twitter_calls': twitter_client.calls,
+            'twitter_rate_limited': twitter_client.rate_limited,
+        },
+    }
+
+
+def write_report(report: Dict[str, Any], output: Optional[str]) -> str:
+    """Write the report as JSON; the default path is keyed by commit and time"""
+    if not output:
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        output = os.path.join(
+            PROJECT_ROOT, 'benchmark_results',
+            f"publishing_queue-{report.get('commit') or 'nocommit'}-{stamp}.json"
+        )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark publishing queue throughput against a fake Twitter")
+    parser.add_argument('--founders', type=int, default=100, help="Synthetic founders to seed")
+    parser.add_argument('--drafts-per-founder', type=int, default=20, help="Due drafts seeded per founder")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="Fake create_tweet latency")
+    parser.add_argument('--latency-jitter-ms', type=float, default=0.0, help="Extra uniform latency per call")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help="Fraction of create_tweet calls answered with a 429")
+    parser.add_argument('--mode', choices=['tick', 'daemon'], default='tick',
+                        help="Drain with repeated process_publishing_queue calls or the publishing daemon")
+    parser.add_argument('--async-twitter', action='store_true',
+                        help="Use a coroutine create_tweet, like AsyncTwitterAPIClient")
+    parser.add_argument('--database-url', default=None,
+                        help="Scratch database URL (defaults to a temporary SQLite file)")
+    parser.add_argument('--max-seconds', type=float, default=600.0, help="Give up draining after this long")
+    parser.add_argument('--batch-size', type=int, default=None, help="Override queue_batch_size")
+    parser.add_argument('--concurrency', type=int, default=None, help="Override max_concurrent_publishes")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for latency jitter and 429s")
+    parser.add_argument('--verbose', action='store_true', help="Keep per-item publishing logs")
+    parser.add_argument('--output', default=None,
+                        help="JSON report path (defaults to benchmark_results/publishing_queue-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if not args.verbose:
+        # Every injected 429 is otherwise logged as an error by the service
+        logging.getLogger('modules').setLevel(logging.CRITICAL)
+
+    publishing = {}
+    if args.batch_size:
+        publishing['queue_batch_size'] = args.batch_size
+    if args.concurrency:
+        publishing['max_concurrent_publishes'] = args.concurrency
+
+    config = BenchmarkConfig(
+        founders=args.founders,
+        drafts_per_founder=args.drafts_per_founder,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        rate_limit_rate=args.rate_limit_rate,
+        mode=args.mode,
+        async_twitter=args.async_twitter,
+        database_url=args.database_url,
+        max_seconds=args.max_seconds,
+        seed=args.seed,
+        publishing=publishing
+    )
+    report = asyncio.run(run_benchmark(config))
+    path = write_report(report, args.output)
+
+    results = report['results']
+    lag = results['publish_lag_seconds']
+    print(f"{results['posted_items']} posted in {results['elapsed_seconds']}s "
+          f"({results['items_per_second']} items/s), "
+          f"lag p50/p95/p99 = {lag['p50']}/{lag['p95']}/{lag['p99']}s, "
+          f"{results['db_queries_per_item']} queries/item")
+    print(f"Report written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Publishing Schema Migration Script
+
+Brings an existing database in line with the publishing queue schema in
+database/models.py. Tables created by ``Base.metadata.create_all`` before a
+schema change do not pick up new columns, indexes or data conventions, so
+each step here is idempotent and safe to re-run:
+
+- create publishing tables that do not exist yet
+- add nullable columns declared on generated_content_drafts and twitter_credentials that are missing
+- create indexes declared on generated_content_drafts and tracked_trends_raw that are missing
+- normalize stored scheduling timestamps to naive UTC
+- allow the 'dead_letter' and 'needs_reauth' draft statuses in the PostgreSQL status check
+
+Usage:
+    python scripts/migrate_publishing_schema.py [--database-url URL]
+"""
+
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Callable, List, Tuple
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine
+
+from database.models import (
+    GeneratedContentDraft, ContentSignature, PublishingDailyRollup, TwitterCredential, TrackedTrendRaw
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DRAFTS_TABLE = GeneratedContentDraft.__tablename__
+TIMESTAMP_COLUMNS = ('scheduled_post_time', 'posted_at')
+
+# Tables added after the initial schema; older databases do not have them yet
+PUBLISHING_TABLES = (ContentSignature.__table__, PublishingDailyRollup.__table__)
+
+# Existing tables that gained columns (the token refresh lease lives on twitter_credentials)
+COLUMN_TABLES = (GeneratedContentDraft.__table__, TwitterCredential.__table__)
+
+# Existing tables that gained indexes (trend snapshots seek on location and fetch time)
+INDEX_TABLES = (GeneratedContentDraft.__table__, TrackedTrendRaw.__table__)
+
+# Draft statuses accepted by the status CHECK constraint in schema.sql
+DRAFT_STATUSES = (
+    'pending_review', 'approved', 'rejected', 'scheduled', 'publishing',
+    'retry_pending', 'dead_letter', 'needs_reauth', 'posted', 'failed', 'cancelled', 'error'
+)
+STATUS_CHECK_CONSTRAINT = f"{DRAFTS_TABLE}_status_check"
+
+# Matches SQLAlchemy's SQLite DATETIME storage format
+SQLITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+def create_missing_tables(engine: Engine) -> int:
+    """Create publishing tables declared in database/models.py that do not exist yet"""
+    existing = set(inspect(engine).get_table_names())
+    created = 0
+
+    for table in PUBLISHING_TABLES:
+        if table.name in existing:
+            continue
+        table.create(bind=engine)
+        logger.info(f"Created table {table.name}")
+        created += 1
+
+    return created
+
+
+def add_missing_columns(engine: Engine) -> int:
+    """Add nullable columns declared on the migrated tables that do not exist yet"""
+    added = 0
+
+    with engine.begin() as conn:
+        for table in COLUMN_TABLES:
+            existing = {column['name'] for column in inspect(conn).get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    logger.warning(f"Skipping non-nullable column {table.name}.{column.name}; add it manually")
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                logger.info(f"Added column {table.name}.{column.name}")
+                added += 1
+
+    return added
+
+
+def create_missing_indexes(engine: Engine) -> int:
+    """Create indexes declared on the migrated tables that do not exist yet"""
+    created = 0
+
+    for table in INDEX_TABLES:
+        existing = {index['name'] for index in inspect(engine).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            index.create(bind=engine)
+            logger.info(f"Created index {index.name}")
+            created += 1
+
+    return created
+
+
+def _parse_stored_timestamp(raw: str) -> datetime:
+    """Parse a stored timestamp string, converting offsets to naive UTC"""
+    value = datetime.fromisoformat(raw.strip().replace('Z', '+00:00'))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def normalize_scheduling_timestamps(engine: Engine) -> int:
+    """
+    Store scheduled_post_time and posted_at as naive UTC.
+
+    PostgreSQL columns created from schema.sql are ``TIMESTAMP WITH TIME ZONE``
+    and are converted in place. SQLite stores text, so rows written with an
+    ISO ``T`` separator or a UTC offset are rewritten in the canonical format;
+    otherwise they compare incorrectly against the due-content query bound.
+    """
+    changed = 0
+
+    with engine.begin() as conn:
+        if engine.dialect.name == 'postgresql':
+            columns = {col['name']: col for col in inspect(conn).get_columns(DRAFTS_TABLE)}
+            for column in TIMESTAMP_COLUMNS:
+                if getattr(columns[column]['type'], 'timezone', False):
+                    conn.execute(text(
+                        f"ALTER TABLE {DRAFTS_TABLE} ALTER COLUMN {column} "
+                        f"TYPE TIMESTAMP WITHOUT TIME ZONE USING {column} AT TIME ZONE 'UTC'"
+                    ))
+                    logger.info(f"Converted {DRAFTS_TABLE}.{column} to naive UTC")
+                    changed += 1
+            return changed
+
+        for column in TIMESTAMP_COLUMNS:
+            rows = conn.execute(text(
+                f"SELECT id, CAST({column} AS TEXT) FROM {DRAFTS_TABLE} WHERE {column} IS NOT NULL"
+            )).fetchall()
+
+            for row_id, raw in rows:
+                try:
+                    normalized = _parse_stored_timestamp(raw).strftime(SQLITE_DATETIME_FORMAT)
+                except ValueError:
+                    logger.warning(f"Skipping unparseable {column} for draft {row_id}: {raw!r}")
+                    continue
+
+                if normalized != raw:
+                    conn.execute(
+                        text(f"UPDATE {DRAFTS_TABLE} SET {column} = :value WHERE id = :id"),
+                        {'value': normalized, 'id': row_id}
+                    )
+                    changed += 1
+
+    logger.info(f"Normalized {changed} stored timestamps to naive UTC")
+    return changed
+
+
+def update_status_check_constraint(engine: Engine) -> int:
+    """
+    Recreate the PostgreSQL status CHECK constraint with every draft status.
+
+    Databases created from an older schema.sql reject newer statuses such as
+    'dead_letter'. Tables created by SQLAlchemy have no such constraint.
+    """
+    if engine.dialect.name != 'postgresql':
+        return 0
+
+    with engine.begin() as conn:
+        checks = {check['name']: check['sqltext'] for check in inspect(conn).get_check_constraints(DRAFTS_TABLE)}
+        existing = checks.get(STATUS_CHECK_CONSTRAINT)
+        if existing is not None and all(f"'{value}'" in existing for value in DRAFT_STATUSES):
+            return 0
+
+        allowed = ", ".join(f"'{value}'" for value in DRAFT_STATUSES)
+        conn.execute(text(f"ALTER TABLE {DRAFTS_TABLE} DROP CONSTRAINT IF EXISTS {STATUS_CHECK_CONSTRAINT}"))
+        conn.execute(text(
+            f"ALTER TABLE {DRAFTS_TABLE} ADD CONSTRAINT {STATUS_CHECK_CONSTRAINT} CHECK (status IN ({allowed}))"
+        ))
+        logger.info(f"Updated {STATUS_CHECK_CONSTRAINT} to allow {len(DRAFT_STATUSES)} statuses")
+
+    return 1
+
+
+MIGRATION_STEPS: List[Tuple[str, Callable[[Engine], int]]] = [
+    ('create_missing_tables', create_missing_tables),
+    ('add_missing_columns', add_missing_columns),
+    ('create_missing_indexes', create_missing_indexes),
+    ('normalize_scheduling_timestamps', normalize_scheduling_timestamps),
+    ('update_status_check_constraint', update_status_check_constraint),
+]
+
+
+def run_migrations(engine: Engine) -> Dict[str, int]:
+    """Run all migration steps in order, returning the change count per step"""
+    results = {}
+    for name, step in MIGRATION_STEPS:
+        logger.info(f"Running migration step: {name}")
+        results[name] = step(engine)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the publishing queue schema")
+    parser.add_argument(
+        '--database-url',
+        default=os.getenv('DATABASE_URL', 'sqlite:///./seo_tool.db'),
+        help="Database URL (defaults to DATABASE_URL)"
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    try:
+        results = run_migrations(engine)
+    finally:
+        engine.dispose()
+
+    for name, count in results.items():
+        logger.info(f"✅ {name}: {count} change(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Nightly Auto-Scheduling Script
+
+Packs approved drafts into free publishing slots for every founder whose
+scheduling preferences have ``auto_schedule_enabled`` set. Each founder's
+drafts are assigned slots in one pass by the batch slot optimizer and
+written in one transaction. Intended to run from cron, e.g.:
+
+    0 2 * * * python scripts/run_auto_schedule.py
+
+Usage:
+    python scripts/run_auto_schedule.py [--database-url URL] [--limit-per-founder N]
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+import logging
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import DataFlowManager
+from modules.scheduling_posting import SchedulingPostingService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run_auto_schedule(database_url: str, limit_per_founder: int):
+    """Auto-schedule approved drafts for all opted-in founders"""
+    engine = create_engine(database_url)
+    session = sessionmaker(bind=engine)()
+    try:
+        # Slot assignment does not publish, so no Twitter client is needed
+        service = SchedulingPostingService(
+            data_flow_manager=DataFlowManager(session),
+            twitter_client=None,
+            user_profile_service=None
+        )
+        return await service.auto_schedule_all_founders(limit_per_founder=limit_per_founder)
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auto-schedule approved drafts for opted-in founders")
+    parser.add_argument(
+        '--database-url',
+        default=os.getenv('DATABASE_URL', 'sqlite:///./seo_tool.db'),
+        help="Database URL (defaults to DATABASE_URL)"
+    )
+    parser.add_argument(
+        '--limit-per-founder',
+        type=int,
+        default=50,
+        help="Maximum approved drafts scheduled per founder (batch limit is 50)"
+    )
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_auto_schedule(args.database_url, args.limit_per_founder))
+
+    for founder_id, count in summary.items():
+        logger.info(f"✅ {founder_id}: {count} draft(s) scheduled")
+
+
+if __name__ == "__main__":
+    main()
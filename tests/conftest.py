@@ -1,6 +1,7 @@
 """pytest配置文件"""
 import sys
 import os
+import uuid
 import pytest
 from unittest.mock import Mock
 from sqlalchemy import create_engine
@@ -14,6 +15,16 @@ sys.path.insert(0, project_root)
 from config.database import Base
 
 
+class FakeClock:
+    """可手动推进的时钟，``now`` 可以是秒数或datetime，直接加减即可"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
 @pytest.fixture
 def test_db():
     """测试数据库fixture"""
@@ -27,6 +38,71 @@ def test_db():
     session.close()
 
 
+@pytest.fixture
+def db_session():
+    """In-memory SQLite session for tests that exercise the real DataFlowManager"""
+    from database.models import Base as ModelsBase
+    
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    ModelsBase.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    
+    yield session
+    
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session_factory(tmp_path):
+    """File-backed SQLite sessionmaker for tests that need several connections or real query plans"""
+    from database.models import Base as ModelsBase
+    
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={'timeout': 30, 'check_same_thread': False}
+    )
+    ModelsBase.metadata.create_all(engine)
+    
+    yield sessionmaker(bind=engine)
+    
+    engine.dispose()
+
+
+@pytest.fixture
+def db_founder(db_session):
+    """Founder row in the test database"""
+    from database.models import Founder
+    
+    founder = Founder(email='scheduler@example.com', username='scheduler', hashed_password='hash')
+    db_session.add(founder)
+    db_session.commit()
+    return founder
+
+
+def create_db_drafts(db_session, founder, count=5, status='approved', **fields):
+    """Create content draft rows in the test database, returning their IDs
+    
+    Callable field values are called with the draft's index, for fields that vary per draft.
+    """
+    from database.models import GeneratedContentDraft
+    
+    draft_ids = []
+    for i in range(count):
+        draft = GeneratedContentDraft(
+            founder_id=founder.id,
+            content_type='tweet',
+            generated_text=f'Database test content {i+1} {uuid.uuid4().hex[:6]}',
+            status=status,
+            **{name: value(i) if callable(value) else value for name, value in fields.items()}
+        )
+        db_session.add(draft)
+        db_session.flush()
+        draft_ids.append(str(draft.id))
+    db_session.commit()
+    return draft_ids
+
+
 @pytest.fixture
 def mock_db_session():
     """模拟数据库会话fixture"""
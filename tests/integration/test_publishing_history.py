@@ -0,0 +1,70 @@
+"""
+Keyset-paginated publishing history.
+
+Walks a founder's posted drafts page by page with (posted_at, id) cursors and
+checks every post comes back exactly once, newest first, with its preview.
+"""
+import pytest
+import uuid
+from datetime import datetime, timedelta
+
+from database import DataFlowManager
+from database.dataflow_manager import encode_history_cursor
+from tests.conftest import create_db_drafts
+
+
+@pytest.fixture
+def founder_id(db_founder):
+    return str(db_founder.id)
+
+
+def _seed_posts(session, founder, count, posted_at=None, status='posted', **fields):
+    base_time = datetime.utcnow() - timedelta(days=1)
+    return create_db_drafts(
+        session, founder, count, status=status,
+        posted_at=posted_at or (lambda i: base_time + timedelta(minutes=i)),
+        scheduled_post_time=base_time,
+        **fields
+    )
+
+
+class TestPublishingHistory:
+
+    def test_cursor_walk_returns_each_post_once(self, db_session, db_founder, founder_id):
+        manager = DataFlowManager(db_session)
+        post_ids = _seed_posts(db_session, db_founder, 23)
+        # Posts sharing a posted_at are ordered by id
+        post_ids += _seed_posts(db_session, db_founder, 4, posted_at=datetime.utcnow() - timedelta(days=2))
+        _seed_posts(db_session, db_founder, 1, status='failed')
+
+        seen = []
+        cursor = None
+        while True:
+            page = manager.get_publishing_history(founder_id, limit=5, cursor=cursor)
+            seen.extend(item['content_id'] for item in page)
+            if len(page) < 5:
+                break
+            cursor = page[-1]['cursor']
+
+        assert sorted(seen) == sorted(post_ids)
+        assert len(seen) == len(set(seen))
+        assert seen[0] == post_ids[22]
+
+    def test_preview_is_cut_in_sql(self, db_session, db_founder, founder_id):
+        manager = DataFlowManager(db_session)
+        _seed_posts(db_session, db_founder, 1, edited_text='x' * 150)
+
+        item = manager.get_publishing_history(founder_id, limit=1)[0]
+
+        assert item['content_preview'] == 'x' * 100 + '...'
+
+    def test_cursor_past_the_end_returns_empty_page(self, db_session, db_founder, founder_id):
+        manager = DataFlowManager(db_session)
+        _seed_posts(db_session, db_founder, 3)
+        cursor = encode_history_cursor(datetime(2000, 1, 1), uuid.uuid4())
+
+        assert manager.get_publishing_history(founder_id, cursor=cursor) == []
+
+    def test_malformed_cursor_is_rejected(self, db_session, founder_id):
+        with pytest.raises(ValueError):
+            DataFlowManager(db_session).get_publishing_history(founder_id, cursor='not-a-cursor')
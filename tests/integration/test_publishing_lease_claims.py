@@ -0,0 +1,152 @@
+"""
+Lease-based claiming of due content by concurrent publisher workers.
+
+Runs several workers, each with its own connection, against one file-backed
+SQLite database and checks that every due draft is claimed exactly once.
+"""
+import pytest
+import threading
+from datetime import datetime, timedelta
+
+from database import DataFlowManager
+from database.models import Founder, GeneratedContentDraft
+from tests.conftest import create_db_drafts
+
+WORKERS = 6
+DUE_DRAFTS = 120
+CLAIM_BATCH = 7
+
+
+def _seed_drafts(session, count, status='scheduled', scheduled_post_time=None, **fields):
+    founder = session.query(Founder).first()
+    if not founder:
+        founder = Founder(email='claims@example.com', username='claims', hashed_password='hash')
+        session.add(founder)
+        session.commit()
+
+    return create_db_drafts(
+        session, founder, count, status=status,
+        scheduled_post_time=scheduled_post_time or (lambda i: datetime.utcnow() - timedelta(seconds=i + 1)),
+        priority=lambda i: (i % 10) + 1,
+        **fields
+    )
+
+
+class TestLeaseClaims:
+
+    def test_concurrent_workers_claim_each_item_once(self, db_session_factory):
+        """N workers draining the queue never claim the same draft twice"""
+        seed_session = db_session_factory()
+        due_ids = _seed_drafts(seed_session, DUE_DRAFTS)
+        _seed_drafts(seed_session, 10, scheduled_post_time=datetime.utcnow() + timedelta(hours=1))
+        seed_session.close()
+
+        claims = {}
+        errors = []
+        start = threading.Barrier(WORKERS)
+
+        def worker(index):
+            worker_id = f'worker-{index}'
+            session = db_session_factory()
+            data_flow = DataFlowManager(session)
+            claimed = []
+            try:
+                start.wait()
+                while True:
+                    items = data_flow.claim_due_content(worker_id, limit=CLAIM_BATCH, lease_seconds=60)
+                    if not items:
+                        break
+                    claimed.extend(item.content_draft_id for item in items)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                session.close()
+                claims[worker_id] = claimed
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        all_claims = [draft_id for claimed in claims.values() for draft_id in claimed]
+
+        assert errors == []
+        assert len(all_claims) == len(set(all_claims))
+        assert set(all_claims) == set(due_ids)
+
+        check_session = db_session_factory()
+        owners = {
+            str(row.id): row.lease_owner
+            for row in check_session.query(GeneratedContentDraft).filter(
+                GeneratedContentDraft.status == 'publishing'
+            )
+        }
+        check_session.close()
+        for worker_id, claimed in claims.items():
+            assert all(owners[draft_id] == worker_id for draft_id in claimed)
+
+    def test_expired_lease_is_reclaimed(self, db_session_factory):
+        """A draft left in 'publishing' by a dead worker is claimable once its lease expires"""
+        session = db_session_factory()
+        stale_ids = _seed_drafts(
+            session, 1, status='publishing',
+            lease_owner='dead-worker',
+            lease_expires_at=datetime.utcnow() - timedelta(seconds=1)
+        )
+        _seed_drafts(
+            session, 1, status='publishing',
+            lease_owner='live-worker',
+            lease_expires_at=datetime.utcnow() + timedelta(minutes=5)
+        )
+        data_flow = DataFlowManager(session)
+
+        items = data_flow.claim_due_content('new-worker', limit=10)
+
+        assert [item.content_draft_id for item in items] == stale_ids
+        assert items[0].lock_acquired_by == 'new-worker'
+        session.close()
+
+    def test_active_lease_blocks_second_claim(self, db_session_factory):
+        """Claimed drafts are invisible to other workers until the lease expires"""
+        session = db_session_factory()
+        _seed_drafts(session, 3)
+        data_flow = DataFlowManager(session)
+
+        first = data_flow.claim_due_content('worker-a', limit=10)
+        second = data_flow.claim_due_content('worker-b', limit=10)
+        later = data_flow.claim_due_content(
+            'worker-b', limit=10, now=datetime.utcnow() + timedelta(minutes=10)
+        )
+
+        assert len(first) == 3
+        assert second == []
+        assert {item.content_draft_id for item in later} == {item.content_draft_id for item in first}
+        session.close()
+
+    def test_per_founder_limit_spreads_claims(self, db_session_factory):
+        """A founder with a large backlog cannot fill the whole claim batch"""
+        session = db_session_factory()
+        busy_ids = _seed_drafts(session, 20)
+        quiet = Founder(email='quiet@example.com', username='quiet', hashed_password='hash')
+        session.add(quiet)
+        session.commit()
+        quiet_draft = GeneratedContentDraft(
+            founder_id=quiet.id,
+            content_type='tweet',
+            generated_text='quiet draft',
+            status='scheduled',
+            scheduled_post_time=datetime.utcnow() - timedelta(seconds=1),
+            priority=1
+        )
+        session.add(quiet_draft)
+        session.commit()
+        data_flow = DataFlowManager(session)
+
+        items = data_flow.claim_due_content('worker-a', limit=10, per_founder_limit=5)
+
+        claimed_ids = [item.content_draft_id for item in items]
+        assert len(claimed_ids) == 6
+        assert str(quiet_draft.id) in claimed_ids
+        assert len(set(claimed_ids) & set(busy_ids)) == 5
+        session.close()
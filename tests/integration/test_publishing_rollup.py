@@ -0,0 +1,125 @@
+"""
+Daily publishing rollups.
+
+Status transitions made through DataFlowManager update publishing_daily_rollup
+in the same commit, and backfill_publishing_rollup rebuilds the same counters
+from existing drafts.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from database import DataFlowManager
+from database.models import PublishingDailyRollup
+from tests.conftest import create_db_drafts
+
+
+@pytest.fixture
+def founder_id(db_founder):
+    return str(db_founder.id)
+
+
+def _counters(session, founder_id):
+    rows = session.query(PublishingDailyRollup).filter(
+        PublishingDailyRollup.founder_id == founder_id
+    ).all()
+    return {
+        column: sum(getattr(row, column) for row in rows)
+        for column in ('scheduled_count', 'posted_count', 'failed_count', 'retried_count', 'delay_count')
+    }
+
+
+class TestPublishingRollup:
+
+    def test_transitions_update_rollup(self, db_session, db_founder, founder_id):
+        """Scheduling, posting, retrying and failing each bump their counter once"""
+        manager = DataFlowManager(db_session)
+        draft_ids = create_db_drafts(db_session, db_founder, 4)
+        slot = datetime.utcnow() - timedelta(minutes=10)
+
+        for draft_id in draft_ids[:3]:
+            manager.create_scheduled_content({
+                'content_draft_id': draft_id, 'founder_id': founder_id, 'scheduled_time': slot
+            })
+        manager.bulk_schedule_content([
+            {'content_draft_id': draft_ids[3], 'founder_id': founder_id, 'scheduled_time': slot}
+        ])
+
+        manager.update_content_draft(draft_ids[0], {'status': 'posted', 'posted_at': datetime.utcnow()})
+        manager.update_content_draft(draft_ids[0], {'status': 'posted'})
+        manager.update_content_draft(draft_ids[1], {'status': 'retry_pending'})
+        manager.update_content_draft(draft_ids[1], {'status': 'dead_letter'})
+        manager.update_scheduled_content(draft_ids[2], {'status': 'cancelled'})
+
+        assert _counters(db_session, founder_id) == {
+            'scheduled_count': 3,
+            'posted_count': 1,
+            'failed_count': 1,
+            'retried_count': 1,
+            'delay_count': 1
+        }
+
+        analytics = manager.get_publishing_analytics(founder_id, days=7)
+        assert analytics['total_scheduled'] == 3
+        assert analytics['total_published'] == 1
+        assert analytics['delay_seconds_sum'] >= 600
+        assert analytics['platform_breakdown'] == {'twitter': 1}
+
+    def test_redrive_counts_as_retry(self, db_session, db_founder, founder_id):
+        manager = DataFlowManager(db_session)
+        create_db_drafts(db_session, db_founder, 3, status='dead_letter',
+                     scheduled_post_time=datetime.utcnow())
+
+        assert len(manager.redrive_dead_letter_content(founder_id)) == 3
+        assert _counters(db_session, founder_id)['retried_count'] == 3
+        assert _counters(db_session, founder_id)['scheduled_count'] == 0
+
+    def test_analytics_window_excludes_older_days(self, db_session, db_founder, founder_id):
+        manager = DataFlowManager(db_session)
+        old_slot = datetime.utcnow() - timedelta(days=40)
+        recent_slot = datetime.utcnow() - timedelta(hours=1)
+        create_db_drafts(db_session, db_founder, 2, status='posted',
+                     scheduled_post_time=old_slot, posted_at=old_slot)
+        create_db_drafts(db_session, db_founder, 1, status='posted',
+                     scheduled_post_time=recent_slot, posted_at=recent_slot + timedelta(minutes=3))
+
+        manager.backfill_publishing_rollup()
+
+        analytics = manager.get_publishing_analytics(founder_id, days=30)
+        assert analytics['total_scheduled'] == 1
+        assert analytics['total_published'] == 1
+        assert analytics['delay_seconds_sum'] == pytest.approx(180)
+        assert manager.get_publishing_analytics(founder_id, days=60)['total_published'] == 3
+
+    def test_backfill_matches_incremental_counters(self, db_session, db_founder, founder_id):
+        """Rebuilding from drafts yields the counters the transitions produced"""
+        manager = DataFlowManager(db_session)
+        draft_ids = create_db_drafts(db_session, db_founder, 5)
+        slot = datetime.utcnow() - timedelta(minutes=5)
+
+        manager.bulk_schedule_content([
+            {'content_draft_id': draft_id, 'founder_id': founder_id, 'scheduled_time': slot}
+            for draft_id in draft_ids
+        ])
+        manager.update_content_draft(draft_ids[0], {'status': 'posted', 'posted_at': datetime.utcnow()})
+        manager.update_content_draft(draft_ids[1], {'status': 'failed'})
+        incremental = _counters(db_session, founder_id)
+
+        manager.backfill_publishing_rollup(founder_id)
+
+        assert _counters(db_session, founder_id) == incremental
+
+    def test_queue_statistics_only_count_queued_drafts(self, db_session, db_founder, founder_id):
+        manager = DataFlowManager(db_session)
+        now = datetime.utcnow()
+        create_db_drafts(db_session, db_founder, 2, status='scheduled', scheduled_post_time=now + timedelta(hours=2))
+        create_db_drafts(db_session, db_founder, 1, status='retry_pending', scheduled_post_time=now - timedelta(hours=1))
+        create_db_drafts(db_session, db_founder, 4, status='posted', scheduled_post_time=now - timedelta(days=1))
+
+        stats = manager.get_queue_statistics(founder_id, now=now)
+
+        assert stats['pending_count'] == 3
+        assert stats['scheduled_count'] == 2
+        assert stats['retry_pending_count'] == 1
+        assert stats['upcoming_24h'] == 2
+        assert stats['overdue_count'] == 1
+        assert manager.get_next_scheduled_time(founder_id) == now - timedelta(hours=1)
@@ -0,0 +1,109 @@
+"""
+Publishing queue tick latency vs queue depth.
+
+Seeds a SQLite database with a growing backlog of future-scheduled drafts and a
+fixed number of due drafts, then times DataFlowManager.get_ready_for_publishing.
+With the due query pushed into SQL and served by idx_content_drafts_due, tick
+latency should track the number of due rows, not the queue depth.
+"""
+import pytest
+import time
+import sys
+import uuid
+import statistics
+from datetime import datetime, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+
+from database import DataFlowManager
+from database.models import Founder, GeneratedContentDraft
+
+QUEUE_DEPTHS = [1_000, 10_000, 50_000]
+DUE_ITEMS = 25
+TICK_LIMIT = 50
+TICK_SAMPLES = 15
+
+
+@pytest.mark.performance
+class TestPublishingQueueLoad:
+
+    def _seed_queue(self, session, founder_id: str, future_items: int, due_items: int):
+        """Bulk insert future-scheduled and due drafts"""
+        now = datetime.utcnow()
+        rows = []
+        for i in range(future_items):
+            rows.append({
+                'id': str(uuid.uuid4()),
+                'founder_id': founder_id,
+                'content_type': 'tweet',
+                'generated_text': f'future draft {i}',
+                'status': 'scheduled',
+                'scheduled_post_time': now + timedelta(minutes=10 + i),
+                'priority': (i % 10) + 1,
+            })
+        for i in range(due_items):
+            rows.append({
+                'id': str(uuid.uuid4()),
+                'founder_id': founder_id,
+                'content_type': 'tweet',
+                'generated_text': f'due draft {i}',
+                'status': 'scheduled' if i % 2 else 'retry_pending',
+                'scheduled_post_time': now - timedelta(seconds=i + 1),
+                'priority': (i % 10) + 1,
+            })
+        session.execute(GeneratedContentDraft.__table__.insert(), rows)
+        session.commit()
+
+    def _measure_tick(self, data_flow: DataFlowManager) -> float:
+        """Median latency of a publishing tick in milliseconds"""
+        samples = []
+        for _ in range(TICK_SAMPLES):
+            start = time.perf_counter()
+            ready = data_flow.get_ready_for_publishing(limit=TICK_LIMIT)
+            samples.append((time.perf_counter() - start) * 1000)
+            assert len(ready) == DUE_ITEMS
+        return statistics.median(samples)
+
+    def test_tick_latency_scales_with_due_items_not_queue_depth(self, db_session_factory):
+        """Tick latency stays flat as the future backlog grows"""
+        session = db_session_factory()
+        founder = Founder(email='load@example.com', username='load', hashed_password='hash')
+        session.add(founder)
+        session.commit()
+        founder_id = str(founder.id)
+
+        data_flow = DataFlowManager(session)
+        results = {}
+        seeded = 0
+
+        for depth in QUEUE_DEPTHS:
+            self._seed_queue(session, founder_id, depth - seeded, DUE_ITEMS if seeded == 0 else 0)
+            seeded = depth
+            session.execute(text("ANALYZE"))
+            results[depth] = self._measure_tick(data_flow)
+
+        print("\nPublishing tick latency vs queue depth")
+        print(f"{'queue depth':>12} | {'median tick (ms)':>16}")
+        for depth, latency in results.items():
+            print(f"{depth:>12} | {latency:>16.2f}")
+
+        session.close()
+
+        # A 50x deeper queue must not make the tick anywhere near 50x slower
+        assert results[QUEUE_DEPTHS[-1]] < max(results[QUEUE_DEPTHS[0]] * 5, 5.0)
+
+    def test_due_query_uses_composite_index(self, db_session_factory):
+        """The due-content query is planned against idx_content_drafts_due"""
+        session = db_session_factory()
+        plan = session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM generated_content_drafts "
+            "WHERE status IN ('scheduled', 'retry_pending') AND scheduled_post_time <= :now "
+            "ORDER BY priority DESC, scheduled_post_time LIMIT 50"
+        ), {'now': datetime.utcnow()}).fetchall()
+        session.close()
+
+        assert any('idx_content_drafts_due' in str(row) for row in plan)
@@ -0,0 +1,63 @@
+"""
+Publishing queue throughput benchmark (small configuration).
+
+Runs scripts/benchmark_publishing_queue.py end to end with a handful of
+founders so the harness itself stays working: both drain modes must publish
+every seeded draft despite injected 429s and produce a complete JSON report.
+Use the script directly for the large (e.g. 1k founders x 100 drafts) runs.
+"""
+import pytest
+import json
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.benchmark_publishing_queue import BenchmarkConfig, run_benchmark, write_report, percentile
+
+FOUNDERS = 10
+DRAFTS_PER_FOUNDER = 5
+
+
+@pytest.mark.performance
+class TestPublishingQueueThroughput:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["tick", "daemon"])
+    async def test_drains_seeded_queue(self, mode, tmp_path):
+        config = BenchmarkConfig(
+            founders=FOUNDERS,
+            drafts_per_founder=DRAFTS_PER_FOUNDER,
+            latency_ms=1,
+            rate_limit_rate=0.2,
+            mode=mode,
+            max_seconds=60
+        )
+
+        report = await run_benchmark(config)
+        results = report['results']
+
+        print(f"\n{mode}: {results['items_per_second']} items/s, "
+              f"lag p95 {results['publish_lag_seconds']['p95']}s, "
+              f"{results['db_queries_per_item']} queries/item")
+
+        assert results['drained']
+        assert results['posted_items'] == FOUNDERS * DRAFTS_PER_FOUNDER
+        assert results['statuses'] == {'posted': FOUNDERS * DRAFTS_PER_FOUNDER}
+        # Every 429 costs one extra Twitter call and one extra processed item
+        assert results['twitter_calls'] == results['posted_items'] + results['twitter_rate_limited']
+        assert results['processed_items'] == results['twitter_calls']
+        assert results['db_queries_per_item'] > 0
+
+        path = write_report(report, str(tmp_path / 'report.json'))
+        with open(path) as f:
+            assert json.load(f)['config']['mode'] == mode
+
+    def test_percentile_is_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 50) is None
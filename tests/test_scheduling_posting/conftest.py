@@ -21,12 +21,18 @@ class MockDataFlowManager:
         # Note: scheduled_content removed - now using content_drafts with scheduling fields
         self.user_preferences = {}
         self.analytics_data = {}
+        self.content_signatures = {}
         self.call_log = []
     
     def get_content_draft_by_id(self, content_id):
         self.call_log.append(('get_content_draft_by_id', content_id))
         return self.content_drafts.get(content_id)
     
+    def get_content_drafts_by_ids(self, content_ids):
+        self.call_log.append(('get_content_drafts_by_ids', list(content_ids)))
+        return {content_id: self.content_drafts[content_id]
+                for content_id in content_ids if content_id in self.content_drafts}
+    
     def get_content_drafts_by_status(self, user_id, status_filter, limit, offset):
         self.call_log.append(('get_content_drafts_by_status', user_id, status_filter))
         drafts = [draft for draft in self.content_drafts.values() 
@@ -52,6 +58,17 @@ class MockDataFlowManager:
             return content_draft_id
         return None
     
+    def bulk_schedule_content(self, entries):
+        self.call_log.append(('bulk_schedule_content', len(entries)))
+        scheduled_ids = []
+        for entry in entries:
+            draft = self.content_drafts.get(entry['content_draft_id'])
+            if draft and draft.status == 'approved':
+                draft.status = 'scheduled'
+                draft.scheduled_post_time = entry['scheduled_time']
+                scheduled_ids.append(entry['content_draft_id'])
+        return scheduled_ids
+    
     def get_scheduled_content_by_draft_id(self, draft_id):
         """DEPRECATED: Now returns content_draft directly since tables are unified"""
         self.call_log.append(('get_scheduled_content_by_draft_id', draft_id))
@@ -86,6 +103,10 @@ class MockDataFlowManager:
         self.call_log.append(('get_user_scheduling_rules', user_id))
         return []
     
+    def get_founder_settings(self, founder_id):
+        self.call_log.append(('get_founder_settings', founder_id))
+        return None
+    
     def get_daily_post_count(self, user_id, date):
         self.call_log.append(('get_daily_post_count', user_id, date))
         return 0
@@ -94,12 +115,32 @@ class MockDataFlowManager:
         self.call_log.append(('get_last_post_time', user_id))
         return None
     
+    def get_schedule_timestamps(self, user_id, start_time, end_time, exclude_content_id=None):
+        self.call_log.append(('get_schedule_timestamps', user_id, start_time, end_time))
+        return []
+    
+    def get_content_signatures(self, founder_id, since=None):
+        self.call_log.append(('get_content_signatures', founder_id))
+        return [(content_id, signature, reference_time)
+                for content_id, (owner_id, signature, reference_time) in self.content_signatures.items()
+                if owner_id == founder_id]
+    
+    def store_content_signatures(self, signatures):
+        self.call_log.append(('store_content_signatures', len(signatures)))
+        for content_id, founder_id, signature, reference_time in signatures:
+            self.content_signatures[content_id] = (founder_id, signature, reference_time)
+        return True
+    
+    def delete_content_signature(self, content_id):
+        self.call_log.append(('delete_content_signature', content_id))
+        return self.content_signatures.pop(content_id, None) is not None
+    
     def get_recent_posts(self, user_id, days):
         self.call_log.append(('get_recent_posts', user_id, days))
         return []
     
-    def get_publishing_history(self, user_id, limit, offset):
-        self.call_log.append(('get_publishing_history', user_id, limit, offset))
+    def get_publishing_history(self, user_id, limit, cursor=None):
+        self.call_log.append(('get_publishing_history', user_id, limit, cursor))
         return []
     
     def get_publishing_analytics(self, user_id, days):
@@ -108,9 +149,9 @@ class MockDataFlowManager:
             'total_scheduled': 0,
             'total_published': 0,
             'total_failed': 0,
-            'publish_delays': [],
-            'error_breakdown': {},
-            'time_distribution': {},
+            'total_retried': 0,
+            'delay_seconds_sum': 0.0,
+            'delay_count': 0,
             'platform_breakdown': {'twitter': 0}
         }
     
@@ -132,6 +173,10 @@ class MockDataFlowManager:
     def get_ready_for_publishing(self, limit):
         self.call_log.append(('get_ready_for_publishing', limit))
         return []
+    
+    def claim_due_content(self, worker_id, limit, lease_seconds=300, per_founder_limit=None):
+        self.call_log.append(('claim_due_content', worker_id, limit))
+        return self.get_ready_for_publishing(limit)
 
 class MockTwitterClient:
     """Mock Twitter client for testing"""
@@ -172,6 +217,10 @@ class MockUserProfileService:
         self.call_log.append(('get_twitter_access_token', user_id))
         return self.access_tokens.get(user_id, 'mock_token_' + user_id)
     
+    async def get_twitter_access_tokens(self, user_ids):
+        self.call_log.append(('get_twitter_access_tokens', list(user_ids)))
+        return {user_id: self.access_tokens.get(user_id, 'mock_token_' + user_id) for user_id in user_ids}
+    
     def set_access_token(self, user_id, token):
         self.access_tokens[user_id] = token
 
@@ -200,6 +249,10 @@ class MockContentDraft:
         self.created_at = datetime.utcnow()
         self.quality_score = 0.8
         self.tags = ['test']
+    
+    @property
+    def final_text(self):
+        return self.current_content or self.generated_text
 
 class MockScheduledContent:
     """Mock scheduled content object"""
@@ -237,6 +290,18 @@ class MockScheduledContent:
         return getattr(self, 'edited_text', None) or self.generated_text
 
 # Fixtures
+@pytest.fixture(autouse=True)
+def reset_similarity_index():
+    """Isolate the process-wide near-duplicate index and compiled rules cache between tests"""
+    from modules.scheduling_posting.similarity_index import similarity_index_registry
+    from modules.scheduling_posting.rules_engine import compiled_rules_cache
+    
+    similarity_index_registry.clear()
+    compiled_rules_cache.clear()
+    yield
+    similarity_index_registry.clear()
+    compiled_rules_cache.clear()
+
 @pytest.fixture
 def mock_data_flow_manager():
     """Create mock data flow manager"""
@@ -268,6 +333,17 @@ def scheduling_service(mock_data_flow_manager, mock_twitter_client,
         analytics_collector=mock_analytics_collector
     )
 
+@pytest.fixture
+def db_scheduling_service(db_session, mock_twitter_client, mock_user_profile_service):
+    """Scheduling service backed by a real DataFlowManager on SQLite"""
+    from database import DataFlowManager
+    
+    return SchedulingPostingService(
+        data_flow_manager=DataFlowManager(db_session),
+        twitter_client=mock_twitter_client,
+        user_profile_service=mock_user_profile_service
+    )
+
 @pytest.fixture
 def rules_engine(mock_data_flow_manager):
     """Create rules engine with mock data flow manager"""
@@ -0,0 +1,47 @@
+"""Publishing through a coroutine-based Twitter client"""
+import asyncio
+import time
+
+import pytest
+from datetime import datetime, timedelta
+
+from tests.conftest import create_db_drafts
+
+
+class AsyncMockTwitterClient:
+    """Mimics AsyncTwitterAPIClient.create_tweet with a fixed round-trip time"""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    async def create_tweet(self, user_token, text):
+        self.calls += 1
+        await asyncio.sleep(self.latency_seconds)
+        return {'data': {'id': str(1000 + self.calls), 'text': text}}
+
+
+class TestAsyncPublishing:
+    """异步 Twitter 客户端发布测试"""
+
+    @pytest.mark.asyncio
+    async def test_queue_publishes_overlap(self, db_scheduling_service, db_session, db_founder):
+        twitter_client = AsyncMockTwitterClient(latency_seconds=0.2)
+        db_scheduling_service.twitter_client = twitter_client
+        content_ids = create_db_drafts(
+            db_session, db_founder, 4, status='scheduled',
+            scheduled_post_time=datetime.utcnow() - timedelta(seconds=5)
+        )
+        db_scheduling_service.fair_scheduler.per_founder_limit = 4
+
+        started = time.perf_counter()
+        result = await db_scheduling_service.process_publishing_queue()
+        elapsed = time.perf_counter() - started
+
+        assert result['success_count'] == 4
+        assert twitter_client.calls == 4
+        # Four 200ms round-trips in flight together, not back to back
+        assert elapsed < 0.6
+        for content_id in content_ids:
+            draft = db_scheduling_service.data_flow_manager.get_content_draft_by_id(content_id)
+            assert draft.status == 'posted'
@@ -0,0 +1,86 @@
+"""Tests for non-blocking batch publish jobs"""
+import pytest
+import time
+from datetime import datetime, timedelta
+
+from modules.scheduling_posting.models import BatchPublishRequest, PublishStatus
+
+from tests.conftest import create_db_drafts
+
+
+class TestBatchPublishJobs:
+    """批量发布作业测试"""
+
+    @pytest.mark.asyncio
+    async def test_batch_publish_returns_job_without_waiting(self, db_scheduling_service, db_session, db_founder):
+        """Batch publish queues staggered entries and returns at once"""
+        content_ids = create_db_drafts(db_session, db_founder, 3)
+        start_time = datetime.utcnow()
+
+        started = time.perf_counter()
+        result = await db_scheduling_service.batch_publish_content(
+            str(db_founder.id),
+            BatchPublishRequest(content_ids=content_ids, force_publish=True, stagger_minutes=10)
+        )
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 1.0
+        assert result.job_id
+        assert result.successful_items == 3
+
+        times = [result.results[content_id].scheduled_time for content_id in content_ids]
+        assert times[0] >= start_time - timedelta(seconds=1)
+        assert times[1] - times[0] == timedelta(minutes=10)
+        assert times[2] - times[1] == timedelta(minutes=10)
+
+        draft = db_scheduling_service.data_flow_manager.get_content_draft_by_id(content_ids[2])
+        assert draft.status == 'scheduled'
+        assert draft.batch_job_id == result.job_id
+
+    @pytest.mark.asyncio
+    async def test_batch_job_status_reports_progress(self, db_scheduling_service, db_session, db_founder):
+        """The first (due) item is published by the queue while the rest stay scheduled"""
+        content_ids = create_db_drafts(db_session, db_founder, 3)
+        result = await db_scheduling_service.batch_publish_content(
+            str(db_founder.id),
+            BatchPublishRequest(content_ids=content_ids, force_publish=True, stagger_minutes=5)
+        )
+
+        await db_scheduling_service.process_publishing_queue()
+        job_status = await db_scheduling_service.get_batch_job_status(str(db_founder.id), result.job_id)
+
+        assert job_status.total_items == 3
+        assert job_status.status_counts == {PublishStatus.POSTED.value: 1, PublishStatus.SCHEDULED.value: 2}
+        assert job_status.completed is False
+        assert job_status.items[0].content_id == content_ids[0]
+        assert job_status.items[0].posted_tweet_id
+        assert job_status.next_publish_time == result.results[content_ids[1]].scheduled_time
+
+    @pytest.mark.asyncio
+    async def test_invalid_items_fail_without_blocking_batch(self, db_scheduling_service, db_session, db_founder):
+        """Drafts that are not approved are reported per item; valid ones are still queued"""
+        approved_ids = create_db_drafts(db_session, db_founder, 2)
+        pending_ids = create_db_drafts(db_session, db_founder, 1, status='pending_review')
+
+        result = await db_scheduling_service.batch_publish_content(
+            str(db_founder.id),
+            BatchPublishRequest(content_ids=approved_ids + pending_ids, force_publish=True)
+        )
+
+        assert result.successful_items == 2
+        assert result.failed_items == 1
+        assert result.results[pending_ids[0]].success is False
+
+    @pytest.mark.asyncio
+    async def test_batch_job_status_is_scoped_to_owner(self, db_scheduling_service, db_session, db_founder):
+        """Unknown jobs and other founders' jobs are not reported"""
+        content_ids = create_db_drafts(db_session, db_founder, 1)
+        result = await db_scheduling_service.batch_publish_content(
+            str(db_founder.id),
+            BatchPublishRequest(content_ids=content_ids, force_publish=True)
+        )
+
+        assert await db_scheduling_service.get_batch_job_status(str(db_founder.id), 'missing-job') is None
+        assert await db_scheduling_service.get_batch_job_status(
+            '00000000-0000-0000-0000-000000000000', result.job_id
+        ) is None
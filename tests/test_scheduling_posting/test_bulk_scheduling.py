@@ -0,0 +1,84 @@
+"""Tests for the single-transaction bulk scheduling path"""
+import pytest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from modules.scheduling_posting.models import BatchScheduleRequest
+
+from tests.conftest import create_db_drafts
+
+
+def _tomorrow_at(hour):
+    return (datetime.utcnow() + timedelta(days=1)).replace(hour=hour, minute=0, second=0, microsecond=0)
+
+
+class TestBulkScheduling:
+    """批量调度测试"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_schedule_uses_one_commit(self, db_scheduling_service, db_session, db_founder):
+        """All drafts are loaded, validated and written with a fixed number of statements"""
+        content_ids = create_db_drafts(db_session, db_founder, 5)
+        statements = []
+        commits = []
+        engine = db_session.get_bind()
+        event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+        event.listen(db_session, 'after_commit', lambda session: commits.append(session))
+
+        result = await db_scheduling_service.batch_schedule_content(
+            str(db_founder.id),
+            BatchScheduleRequest(content_ids=content_ids, schedule_time=_tomorrow_at(9), stagger_minutes=90)
+        )
+
+        assert result.successful_items == 5
+        assert len(commits) == 1
+        assert len(statements) < 10
+
+        for i, content_id in enumerate(content_ids):
+            draft = db_scheduling_service.data_flow_manager.get_content_draft_by_id(content_id)
+            assert draft.status == 'scheduled'
+            assert draft.scheduled_post_time == _tomorrow_at(9) + timedelta(minutes=90 * i)
+
+    @pytest.mark.asyncio
+    async def test_batch_items_count_against_min_interval(self, db_scheduling_service, db_session, db_founder):
+        """Items closer than the minimum interval to an accepted batch item are rejected"""
+        content_ids = create_db_drafts(db_session, db_founder, 4)
+
+        result = await db_scheduling_service.batch_schedule_content(
+            str(db_founder.id),
+            BatchScheduleRequest(content_ids=content_ids, schedule_time=_tomorrow_at(9), stagger_minutes=30)
+        )
+
+        assert [result.results[content_id].success for content_id in content_ids] == [True, False, True, False]
+        assert any('Minimum interval' in violation for violation in result.results[content_ids[1]].rule_violations)
+        assert db_scheduling_service.data_flow_manager.get_content_draft_by_id(content_ids[1]).status == 'approved'
+
+    @pytest.mark.asyncio
+    async def test_batch_items_count_against_daily_limit(self, db_scheduling_service, db_session, db_founder):
+        """Existing scheduled posts and earlier batch items share the daily limit"""
+        create_db_drafts(db_session, db_founder, 1, status='scheduled', scheduled_post_time=_tomorrow_at(8))
+        content_ids = create_db_drafts(db_session, db_founder, 5)
+
+        result = await db_scheduling_service.batch_schedule_content(
+            str(db_founder.id),
+            BatchScheduleRequest(content_ids=content_ids, schedule_time=_tomorrow_at(10), stagger_minutes=90)
+        )
+
+        assert result.successful_items == 4
+        rejected = result.results[content_ids[4]]
+        assert rejected.success is False
+        assert any('Daily posting limit' in violation for violation in rejected.rule_violations)
+
+    @pytest.mark.asyncio
+    async def test_skip_rules_check_schedules_everything(self, db_scheduling_service, db_session, db_founder):
+        """Rule validation can be skipped for the whole batch"""
+        content_ids = create_db_drafts(db_session, db_founder, 3)
+
+        result = await db_scheduling_service.batch_schedule_content(
+            str(db_founder.id),
+            BatchScheduleRequest(content_ids=content_ids, schedule_time=_tomorrow_at(9),
+                                 stagger_minutes=1, skip_rules_check=True)
+        )
+
+        assert result.successful_items == 3
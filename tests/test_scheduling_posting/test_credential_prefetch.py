@@ -0,0 +1,86 @@
+"""Tests for per-tick credential prefetch in the publishing queue"""
+import pytest
+from datetime import datetime, timedelta
+
+from database.models import Founder
+from modules.scheduling_posting.models import DeadLetterRedriveRequest, PublishStatus
+
+from tests.conftest import create_db_drafts
+
+
+def _seed_due(db_session, founder, count=1):
+    return create_db_drafts(
+        db_session, founder, count, status='scheduled',
+        scheduled_post_time=datetime.utcnow() - timedelta(seconds=5)
+    )
+
+
+class TestCredentialPrefetch:
+    """凭证批量预取测试"""
+
+    @pytest.mark.asyncio
+    async def test_tokens_are_loaded_once_per_tick(self, db_scheduling_service, db_session, db_founder,
+                                                   mock_user_profile_service, mock_twitter_client):
+        other = Founder(email='other@example.com', username='other', hashed_password='hash')
+        db_session.add(other)
+        db_session.commit()
+        _seed_due(db_session, db_founder, 3)
+        _seed_due(db_session, other, 2)
+
+        result = await db_scheduling_service.process_publishing_queue()
+
+        assert result['success_count'] == 5
+        lookups = [call for call in mock_user_profile_service.call_log
+                   if call[0].startswith('get_twitter_access_token')]
+        assert len(lookups) == 1
+        assert sorted(lookups[0][1]) == sorted([str(db_founder.id), str(other.id)])
+        assert {call[1] for call in mock_twitter_client.call_log} == {
+            'mock_token_' + str(db_founder.id), 'mock_token_' + str(other.id)
+        }
+
+    @pytest.mark.asyncio
+    async def test_expired_founder_is_parked_without_twitter_call(self, db_scheduling_service, db_session,
+                                                                  db_founder, mock_user_profile_service,
+                                                                  mock_twitter_client):
+        content_ids = _seed_due(db_session, db_founder, 2)
+        mock_user_profile_service.set_access_token(str(db_founder.id), None)
+
+        result = await db_scheduling_service.process_publishing_queue()
+
+        assert result['needs_reauth_count'] == 2
+        assert mock_twitter_client.call_log == []
+        for content_id in content_ids:
+            draft = db_scheduling_service.data_flow_manager.get_content_draft_by_id(content_id)
+            assert draft.status == PublishStatus.NEEDS_REAUTH.value
+            assert draft.retry_count == 0
+            assert draft.lease_owner is None
+
+        # Parked items are not claimed again until re-driven
+        assert db_scheduling_service.data_flow_manager.claim_due_content('worker', limit=10) == []
+
+        parked = await db_scheduling_service.get_dead_letter_content(str(db_founder.id))
+        assert {item.status for item in parked} == {PublishStatus.NEEDS_REAUTH}
+
+        mock_user_profile_service.set_access_token(str(db_founder.id), 'fresh_token')
+        await db_scheduling_service.redrive_dead_letter_content(str(db_founder.id), DeadLetterRedriveRequest())
+        result = await db_scheduling_service.process_publishing_queue()
+
+        assert result['success_count'] == 2
+
+    @pytest.mark.asyncio
+    async def test_fallback_lookup_without_token_is_parked(self, db_scheduling_service, db_session,
+                                                           db_founder, mock_user_profile_service,
+                                                           mock_twitter_client):
+        content_ids = _seed_due(db_session, db_founder, 1)
+        mock_user_profile_service.set_access_token(str(db_founder.id), None)
+
+        async def prefetch_fails(user_ids):
+            raise RuntimeError("credentials store unavailable")
+
+        mock_user_profile_service.get_twitter_access_tokens = prefetch_fails
+
+        await db_scheduling_service.process_publishing_queue()
+
+        draft = db_scheduling_service.data_flow_manager.get_content_draft_by_id(content_ids[0])
+        assert draft.status == PublishStatus.NEEDS_REAUTH.value
+        assert mock_twitter_client.call_log == []
@@ -0,0 +1,112 @@
+"""Tests for founder-fair publish scheduling"""
+import pytest
+import asyncio
+from datetime import datetime, timedelta
+
+from modules.scheduling_posting.models import ContentQueueItem
+from modules.scheduling_posting.fair_scheduler import FairPublishScheduler, PublishingQueueMetrics
+
+
+def make_items(founder_id, count):
+    return [
+        ContentQueueItem(
+            content_draft_id=f"{founder_id}-{i}",
+            founder_id=founder_id,
+            scheduled_time=datetime.utcnow() - timedelta(seconds=5),
+        )
+        for i in range(count)
+    ]
+
+
+class TestFairPublishScheduler:
+    """Round-robin dispatch with global and per-founder limits"""
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_founders(self):
+        """A founder with a large backlog takes turns with the others"""
+        items = make_items('a', 6) + make_items('b', 2) + make_items('c', 2)
+        scheduler = FairPublishScheduler(max_concurrency=1, per_founder_limit=1,
+                                         metrics=PublishingQueueMetrics())
+        order = []
+
+        async def handler(item):
+            order.append(item.founder_id)
+            return {'success': True}
+
+        results = await scheduler.run(items, handler)
+
+        assert order == ['a', 'b', 'c', 'a', 'b', 'c', 'a', 'a', 'a', 'a']
+        assert len(results) == len(items)
+
+    @pytest.mark.asyncio
+    async def test_global_and_per_founder_limits(self):
+        """Concurrency never exceeds the global limit or a founder's cap"""
+        items = make_items('a', 10) + make_items('b', 3) + make_items('c', 3)
+        scheduler = FairPublishScheduler(max_concurrency=4, per_founder_limit=2,
+                                         metrics=PublishingQueueMetrics())
+        active = {'total': 0}
+        peaks = {'total': 0}
+
+        async def handler(item):
+            active['total'] += 1
+            active[item.founder_id] = active.get(item.founder_id, 0) + 1
+            peaks['total'] = max(peaks['total'], active['total'])
+            peaks[item.founder_id] = max(peaks.get(item.founder_id, 0), active[item.founder_id])
+            await asyncio.sleep(0.01)
+            active['total'] -= 1
+            active[item.founder_id] -= 1
+            return {'success': True}
+
+        await scheduler.run(items, handler)
+
+        assert peaks['total'] == 4
+        assert all(peaks[founder_id] <= 2 for founder_id in ('a', 'b', 'c'))
+
+    @pytest.mark.asyncio
+    async def test_handler_exceptions_are_returned(self):
+        """A failing item does not stop the rest of the pass"""
+        scheduler = FairPublishScheduler(max_concurrency=2, per_founder_limit=1,
+                                         metrics=PublishingQueueMetrics())
+
+        async def handler(item):
+            if item.content_draft_id == 'a-0':
+                raise RuntimeError("boom")
+            return {'success': True}
+
+        results = await scheduler.run(make_items('a', 2) + make_items('b', 1), handler)
+
+        assert sum(isinstance(result, Exception) for result in results) == 1
+        assert len(results) == 3
+
+    @pytest.mark.asyncio
+    async def test_results_follow_dispatch_order(self):
+        """A slow early item does not move behind faster ones in the results"""
+        scheduler = FairPublishScheduler(max_concurrency=3, per_founder_limit=1,
+                                         metrics=PublishingQueueMetrics())
+
+        async def handler(item):
+            if item.founder_id == 'a':
+                await asyncio.sleep(0.05)
+            return item.content_draft_id
+
+        results = await scheduler.run(make_items('a', 1) + make_items('b', 1) + make_items('c', 1), handler)
+
+        assert results == ['a-0', 'b-0', 'c-0']
+
+    @pytest.mark.asyncio
+    async def test_metrics_track_depth_and_wait(self):
+        """Queue depth drains to zero and per-founder wait time is recorded"""
+        metrics = PublishingQueueMetrics()
+        scheduler = FairPublishScheduler(max_concurrency=2, per_founder_limit=1, metrics=metrics)
+
+        async def handler(item):
+            return {'success': True}
+
+        await scheduler.run(make_items('a', 3) + make_items('b', 1), handler)
+        snapshot = metrics.snapshot()
+
+        assert snapshot['queue_depth'] == 0
+        assert snapshot['in_flight'] == 0
+        assert snapshot['max_queue_depth'] == 4
+        assert snapshot['founders']['a']['dispatched'] == 3
+        assert snapshot['founders']['b']['avg_wait_seconds'] >= 5
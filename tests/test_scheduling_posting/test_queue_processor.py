@@ -0,0 +1,150 @@
+"""Tests for the resident publishing daemon"""
+import pytest
+import asyncio
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from modules.scheduling_posting.models import PublishingConfiguration
+from modules.scheduling_posting.queue_processor import PublishingDaemon
+
+
+class FakeQueueDataFlowManager:
+    """Serves upcoming publish times for daemon resyncs"""
+
+    def __init__(self, upcoming=None, delay=0.0):
+        self.upcoming = upcoming or []
+        self.delay = delay
+        self.resync_count = 0
+
+    def get_upcoming_publish_times(self, limit=500):
+        self.resync_count += 1
+        time.sleep(self.delay)
+        return sorted(self.upcoming, key=lambda item: item[1])[:limit]
+
+
+class FakeQueueService:
+    """Records when the daemon triggers a queue pass"""
+
+    def __init__(self, data_flow_manager, processed_at):
+        self.data_flow_manager = data_flow_manager
+        self.processed_at = processed_at
+
+    async def process_publishing_queue(self):
+        self.processed_at.append(datetime.utcnow())
+        return {'status': 'completed', 'processed_count': 1}
+
+
+@pytest.fixture
+def queue_data_flow_manager():
+    return FakeQueueDataFlowManager()
+
+
+@pytest.fixture
+def processed_at():
+    return []
+
+
+@pytest.fixture
+def daemon(queue_data_flow_manager, processed_at):
+    @contextmanager
+    def service_factory():
+        yield FakeQueueService(queue_data_flow_manager, processed_at)
+
+    return PublishingDaemon(
+        service_factory,
+        config=PublishingConfiguration(queue_check_interval_seconds=30)
+    )
+
+
+class TestPublishingDaemon:
+    """Publishing daemon timer-heap behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_publishes_notified_item_when_due(self, daemon, processed_at):
+        """An item scheduled while running is published within a second of its due time"""
+        await daemon.start()
+        try:
+            due_time = datetime.utcnow() + timedelta(milliseconds=300)
+            daemon.notify_scheduled('content-1', due_time)
+
+            await asyncio.sleep(0.8)
+        finally:
+            await daemon.stop()
+
+        assert len(processed_at) == 1
+        assert processed_at[0] >= due_time
+        assert (processed_at[0] - due_time).total_seconds() < 1.0
+
+    @pytest.mark.asyncio
+    async def test_loads_heap_from_database_on_start(self, daemon, queue_data_flow_manager, processed_at):
+        """Overdue items already in the database are published right after startup"""
+        queue_data_flow_manager.upcoming = [
+            ('content-1', datetime.utcnow() - timedelta(minutes=1)),
+            ('content-2', datetime.utcnow() + timedelta(hours=1)),
+        ]
+
+        await daemon.start()
+        try:
+            await asyncio.sleep(0.2)
+        finally:
+            await daemon.stop()
+
+        assert queue_data_flow_manager.resync_count == 1
+        assert len(processed_at) == 1
+        assert daemon.next_due_time() == queue_data_flow_manager.upcoming[1][1]
+
+    @pytest.mark.asyncio
+    async def test_removed_item_is_not_published(self, daemon, processed_at):
+        """Cancelling an item before its due time drops it from the heap"""
+        await daemon.start()
+        try:
+            daemon.notify_scheduled('content-1', datetime.utcnow() + timedelta(milliseconds=200))
+            daemon.notify_removed('content-1')
+
+            await asyncio.sleep(0.5)
+        finally:
+            await daemon.stop()
+
+        assert processed_at == []
+        assert daemon.next_due_time() is None
+
+    @pytest.mark.asyncio
+    async def test_rescheduling_replaces_previous_due_time(self, daemon):
+        """Only the latest due time for an item is kept live"""
+        later = datetime.utcnow() + timedelta(hours=2)
+        earlier = datetime.utcnow() + timedelta(hours=1)
+
+        daemon.notify_scheduled('content-1', later)
+        daemon.notify_scheduled('content-2', earlier)
+        daemon.notify_scheduled('content-2', later + timedelta(hours=1))
+
+        assert daemon.next_due_time() == later
+
+    @pytest.mark.asyncio
+    async def test_resync_does_not_block_the_event_loop(self, daemon, queue_data_flow_manager):
+        """The resync query runs off the loop and keeps notifications made while it runs"""
+        later = datetime.utcnow() + timedelta(hours=1)
+        queue_data_flow_manager.upcoming = [('content-1', later)]
+        queue_data_flow_manager.delay = 0.3
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker_task = asyncio.create_task(ticker())
+        start_task = asyncio.create_task(daemon.start())
+        await asyncio.sleep(0.1)
+        earlier = datetime.utcnow() + timedelta(minutes=30)
+        daemon.notify_scheduled('content-2', earlier)
+        try:
+            await start_task
+        finally:
+            await daemon.stop()
+            ticker_task.cancel()
+
+        assert ticks >= 10
+        assert daemon.next_due_time() == earlier
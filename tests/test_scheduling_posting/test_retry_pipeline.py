@@ -0,0 +1,126 @@
+"""Tests for publish retries, backoff and the dead-letter queue"""
+import pytest
+import random
+import time
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from modules.scheduling_posting.models import DeadLetterRedriveRequest, PublishStatus
+from modules.scheduling_posting.retry_policy import (
+    RetryPolicy, RATE_LIMITED, SERVER_ERROR, NETWORK_ERROR, TWITTER_API_ERROR
+)
+from modules.twitter_api import (
+    RateLimitError, TwitterAPIServerError, TwitterAPINetworkError, TwitterAPIBadRequestError
+)
+
+from tests.conftest import create_db_drafts
+
+
+class TestRetryPolicy:
+    """错误分类与退避测试"""
+
+    def test_classifies_retryable_and_terminal_errors(self):
+        policy = RetryPolicy()
+
+        assert policy.classify(RateLimitError(retry_after=30)) == (RATE_LIMITED, True, 30)
+        assert policy.classify(TwitterAPIServerError(status_code=503)) == (SERVER_ERROR, True, None)
+        assert policy.classify(TwitterAPINetworkError("Network error: timeout")) == (NETWORK_ERROR, True, None)
+        assert policy.classify(TwitterAPIBadRequestError("Duplicate content")) == (TWITTER_API_ERROR, False, None)
+
+    def test_rate_limit_reset_time_is_used_without_retry_after(self):
+        code, retryable, retry_after = RetryPolicy().classify(RateLimitError(reset_time=int(time.time()) + 120))
+
+        assert code == RATE_LIMITED and retryable
+        assert 115 <= retry_after <= 120
+
+    def test_backoff_grows_with_jitter_and_respects_cap(self):
+        policy = RetryPolicy(base_delay_seconds=60, max_delay_seconds=600, rng=random.Random(7))
+
+        for retry_count, (low, high) in enumerate([(30, 60), (60, 120), (120, 240), (240, 480), (300, 600)]):
+            delays = {policy.next_delay(retry_count) for _ in range(20)}
+            assert all(low <= delay <= high for delay in delays)
+            assert len(delays) > 1
+
+    def test_retry_after_is_a_floor(self):
+        policy = RetryPolicy(base_delay_seconds=60, rng=random.Random(7))
+
+        delays = [policy.next_delay(0, retry_after=900) for _ in range(20)]
+
+        assert all(900 <= delay <= 960 for delay in delays)
+
+
+class TestRetryPipeline:
+    """重试队列与死信测试"""
+
+    def _seed_due(self, db_session, db_founder, count=1, **fields):
+        return create_db_drafts(
+            db_session, db_founder, count, status='scheduled',
+            scheduled_post_time=datetime.utcnow() - timedelta(seconds=5), **fields
+        )
+
+    @pytest.mark.asyncio
+    async def test_retryable_failure_is_rescheduled_with_backoff(self, db_scheduling_service, db_session,
+                                                                 db_founder, mock_twitter_client):
+        content_id = self._seed_due(db_session, db_founder)[0]
+        mock_twitter_client.create_tweet = Mock(side_effect=RateLimitError(retry_after=600))
+
+        await db_scheduling_service.process_publishing_queue()
+
+        draft = db_scheduling_service.data_flow_manager.get_content_draft_by_id(content_id)
+        assert draft.status == PublishStatus.RETRY_PENDING.value
+        assert draft.retry_count == 1
+        assert draft.error_code == RATE_LIMITED
+        assert draft.scheduled_post_time >= datetime.utcnow() + timedelta(seconds=590)
+
+    @pytest.mark.asyncio
+    async def test_due_retry_is_published(self, db_scheduling_service, db_session, db_founder):
+        content_id = self._seed_due(db_session, db_founder, retry_count=1)[0]
+        db_scheduling_service.data_flow_manager.update_content_draft(content_id, {'status': 'retry_pending'})
+
+        await db_scheduling_service.process_publishing_queue()
+
+        draft = db_scheduling_service.data_flow_manager.get_content_draft_by_id(content_id)
+        assert draft.status == PublishStatus.POSTED.value
+
+    @pytest.mark.asyncio
+    async def test_terminal_failure_is_not_retried(self, db_scheduling_service, db_session,
+                                                   db_founder, mock_twitter_client):
+        content_id = self._seed_due(db_session, db_founder)[0]
+        mock_twitter_client.create_tweet = Mock(side_effect=TwitterAPIBadRequestError("Duplicate content"))
+
+        await db_scheduling_service.process_publishing_queue()
+
+        draft = db_scheduling_service.data_flow_manager.get_content_draft_by_id(content_id)
+        assert draft.status == PublishStatus.FAILED.value
+        assert draft.error_code == TWITTER_API_ERROR
+
+    @pytest.mark.asyncio
+    async def test_exhausted_retries_dead_letter_and_redrive(self, db_scheduling_service, db_session,
+                                                             db_founder, mock_twitter_client):
+        exhausted_ids = self._seed_due(db_session, db_founder, 2, retry_count=3, max_retries=3)
+        mock_twitter_client.create_tweet = Mock(side_effect=TwitterAPIServerError(status_code=503))
+
+        await db_scheduling_service.process_publishing_queue()
+
+        dead_letters = await db_scheduling_service.get_dead_letter_content(str(db_founder.id))
+        assert {item.content_id for item in dead_letters} == set(exhausted_ids)
+        assert all(item.error_code == SERVER_ERROR for item in dead_letters)
+
+        # Dead-lettered items are never claimed again on their own
+        assert db_scheduling_service.data_flow_manager.claim_due_content('worker', limit=10) == []
+
+        result = await db_scheduling_service.redrive_dead_letter_content(
+            str(db_founder.id), DeadLetterRedriveRequest(content_ids=[exhausted_ids[0]])
+        )
+        assert result.content_ids == [exhausted_ids[0]]
+
+        draft = db_scheduling_service.data_flow_manager.get_content_draft_by_id(exhausted_ids[0])
+        assert draft.status == PublishStatus.SCHEDULED.value
+        assert draft.retry_count == 0
+        assert draft.error_code is None
+
+        result = await db_scheduling_service.redrive_dead_letter_content(
+            str(db_founder.id), DeadLetterRedriveRequest()
+        )
+        assert result.content_ids == [exhausted_ids[1]]
+        assert await db_scheduling_service.get_dead_letter_content(str(db_founder.id)) == []
@@ -3,8 +3,9 @@ import pytest
 from datetime import datetime, timedelta, time
 from unittest.mock import Mock
 
+from database import DataFlowManager
 from modules.scheduling_posting.rules_engine import (
-    InternalRulesEngine, RuleSeverity, RuleViolation
+    InternalRulesEngine, RuleSeverity, RuleViolation, RuleCheckContext, ScheduleSnapshot
 )
 from modules.scheduling_posting.models import (
     SchedulingRule, PublishingRule, SchedulingPreferences, PublishStatus
@@ -33,8 +34,13 @@ class TestInternalRulesEngine:
     @pytest.mark.asyncio
     async def test_daily_limit_rule_violation(self, rules_engine, mock_data_flow_manager, test_user_id):
         """测试每日限制规则违反"""
-        # 设置用户已发布5篇，达到每日限制
-        mock_data_flow_manager.get_daily_post_count = Mock(return_value=5)
+        proposed_time = datetime.utcnow() + timedelta(hours=1)
+        
+        # 设置用户当天已有5篇，达到每日限制
+        day_start = datetime.combine(proposed_time.date(), time.min)
+        mock_data_flow_manager.get_schedule_timestamps = Mock(
+            return_value=[day_start + timedelta(minutes=i) for i in range(5)]
+        )
         
         # 设置用户偏好
         preferences = SchedulingPreferences(
@@ -43,8 +49,6 @@ class TestInternalRulesEngine:
         )
         mock_data_flow_manager.user_preferences[test_user_id] = preferences.dict()
         
-        proposed_time = datetime.utcnow() + timedelta(hours=1)
-        
         result = await rules_engine.validate_publishing_rules(
             test_user_id,
             proposed_time=proposed_time,
@@ -60,7 +64,7 @@ class TestInternalRulesEngine:
         """测试最小间隔规则违反"""
         # 设置最近发布时间为30分钟前
         last_post_time = datetime.utcnow() - timedelta(minutes=30)
-        mock_data_flow_manager.get_last_post_time = Mock(return_value=last_post_time)
+        mock_data_flow_manager.get_schedule_timestamps = Mock(return_value=[last_post_time])
         
         # 设置最小间隔为60分钟
         preferences = SchedulingPreferences(
@@ -175,14 +179,17 @@ class TestInternalRulesEngine:
         assert result is True
 
     @pytest.mark.asyncio
-    async def test_delete_rule(self, rules_engine, test_user_id):
+    async def test_delete_rule(self, db_session, test_user_id):
         """测试删除规则"""
-        rule_id = "test_rule_123"
+        rules_engine = InternalRulesEngine(DataFlowManager(db_session))
+        rule_id = "daily_limit"
+        version = rules_engine.rules_cache.version(test_user_id)
         
         result = await rules_engine.delete_rule(test_user_id, rule_id)
         
-        # Mock应该返回成功
-        assert result is True
+        # 规则尚无持久化存储，删除不能报告成功，也不应使已编译规则失效
+        assert result is False
+        assert rules_engine.rules_cache.version(test_user_id) == version
 
     @pytest.mark.asyncio
     async def test_generate_optimal_times(self, rules_engine, test_user_id):
@@ -258,12 +265,8 @@ class TestInternalRulesEngine:
         assert violation.blocking is True
         assert violation.suggestion == "Test suggestion"
 
-    @pytest.mark.asyncio
-    async def test_check_daily_limit_rule_no_violation(self, rules_engine, mock_data_flow_manager, test_user_id):
+    def test_check_daily_limit_rule_no_violation(self, rules_engine, test_user_id):
         """测试每日限制规则无违反"""
-        # 设置当前发布数为2，限制为5
-        mock_data_flow_manager.get_daily_post_count = Mock(return_value=2)
-        
         rule = SchedulingRule(
             name="Daily Limit",
             rule_type=PublishingRule.FREQUENCY_LIMIT,
@@ -273,19 +276,19 @@ class TestInternalRulesEngine:
         
         preferences = SchedulingPreferences(founder_id=test_user_id, max_posts_per_day=5)
         proposed_time = datetime.utcnow() + timedelta(hours=1)
+        # 当天已有2篇，限制为5
+        day_start = datetime.combine(proposed_time.date(), time.min)
+        snapshot = ScheduleSnapshot([day_start + timedelta(hours=1), day_start + timedelta(hours=3)])
         
-        violation = await rules_engine._check_daily_limit_rule(
-            rule, test_user_id, proposed_time, preferences
-        )
+        check = rules_engine._compile_daily_limit_rule(rule, preferences)
+        violation = check(RuleCheckContext(test_user_id, None, proposed_time, snapshot))
         
         assert violation is None
 
-    @pytest.mark.asyncio
-    async def test_check_min_interval_rule_no_violation(self, rules_engine, mock_data_flow_manager, test_user_id):
+    def test_check_min_interval_rule_no_violation(self, rules_engine, test_user_id):
         """测试最小间隔规则无违反"""
-        # 设置最后发布时间为2小时前
+        # 最后发布时间为2小时前
         last_post_time = datetime.utcnow() - timedelta(hours=2)
-        mock_data_flow_manager.get_last_post_time = Mock(return_value=last_post_time)
         
         rule = SchedulingRule(
             name="Min Interval",
@@ -297,14 +300,12 @@ class TestInternalRulesEngine:
         preferences = SchedulingPreferences(founder_id=test_user_id, min_interval_minutes=60)
         proposed_time = datetime.utcnow() + timedelta(minutes=5)
         
-        violation = await rules_engine._check_min_interval_rule(
-            rule, test_user_id, proposed_time, preferences
-        )
+        check = rules_engine._compile_min_interval_rule(rule, preferences)
+        violation = check(RuleCheckContext(test_user_id, None, proposed_time, ScheduleSnapshot([last_post_time])))
         
         assert violation is None
 
-    @pytest.mark.asyncio
-    async def test_check_time_window_rule_overnight_quiet_hours(self, rules_engine, test_user_id):
+    def test_check_time_window_rule_overnight_quiet_hours(self, rules_engine, test_user_id):
         """测试跨夜安静时间规则"""
         # 设置安静时间为22:00-08:00，测试凌晨2点
         proposed_time = datetime.utcnow().replace(hour=2, minute=0, second=0)
@@ -322,16 +323,14 @@ class TestInternalRulesEngine:
             quiet_hours_end="08:00"
         )
         
-        violation = await rules_engine._check_time_window_rule(
-            rule, test_user_id, proposed_time, preferences
-        )
+        check = rules_engine._compile_time_window_rule(rule, preferences)
+        violation = check(RuleCheckContext(test_user_id, None, proposed_time, ScheduleSnapshot([])))
         
         # 应该有违反（在安静时间内）
         assert violation is not None
         assert "quiet hours" in violation.message
 
-    @pytest.mark.asyncio
-    async def test_check_weekend_rule_weekday(self, rules_engine, test_user_id):
+    def test_check_weekend_rule_weekday(self, rules_engine, test_user_id):
         """测试周末规则在工作日"""
         # 确保是工作日
         weekday = datetime.utcnow()
@@ -347,9 +346,8 @@ class TestInternalRulesEngine:
         
         preferences = SchedulingPreferences(founder_id=test_user_id, avoid_weekends=True)
         
-        violation = await rules_engine._check_weekend_rule(
-            rule, test_user_id, weekday, preferences
-        )
+        check = rules_engine._compile_weekend_rule(rule, preferences)
+        violation = check(RuleCheckContext(test_user_id, None, weekday, ScheduleSnapshot([])))
         
         # 工作日不应该有违反
         assert violation is None
@@ -397,9 +395,6 @@ class TestInternalRulesEngine:
                                                                    mock_data_flow_manager, test_user_id):
         """测试多个规则违反的综合检查"""
         # 设置多个违反条件
-        mock_data_flow_manager.get_daily_post_count = Mock(return_value=5)  # 达到每日限制
-        mock_data_flow_manager.get_last_post_time = Mock(return_value=datetime.utcnow() - timedelta(minutes=30))  # 间隔太短
-        
         preferences = SchedulingPreferences(
             founder_id=test_user_id,
             max_posts_per_day=5,
@@ -411,6 +406,11 @@ class TestInternalRulesEngine:
         # 在安静时间发布
         quiet_time = datetime.utcnow().replace(hour=23, minute=0)
         
+        # 当天已有5篇（达到每日限制），最近一篇在30分钟前（间隔太短）
+        mock_data_flow_manager.get_schedule_timestamps = Mock(return_value=[
+            quiet_time.replace(hour=hour) for hour in range(18, 22)
+        ] + [quiet_time - timedelta(minutes=30)])
+        
         result = await rules_engine.validate_publishing_rules(
             test_user_id,
             proposed_time=quiet_time,
@@ -419,4 +419,73 @@ class TestInternalRulesEngine:
         
         # 应该有多个违反
         assert len(result.violations) > 1
-        assert result.can_publish is False 
\ No newline at end of file
+        assert result.can_publish is False 
+    @pytest.mark.asyncio
+    async def test_slot_search_uses_single_snapshot_query(self, mock_data_flow_manager, test_user_id):
+        """测试时段搜索只加载一次日程快照，并支持更长的搜索范围"""
+        engine = InternalRulesEngine(mock_data_flow_manager, slot_search_horizon_hours=24 * 14)
+        start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        # 未来7天每小时都已排满
+        busy = [start + timedelta(hours=i) for i in range(24 * 7)]
+        mock_data_flow_manager.get_schedule_timestamps = Mock(return_value=busy)
+        mock_data_flow_manager.get_daily_post_count = Mock(side_effect=AssertionError("unexpected query"))
+        mock_data_flow_manager.get_last_post_time = Mock(side_effect=AssertionError("unexpected query"))
+        
+        preferences = SchedulingPreferences(
+            founder_id=test_user_id,
+            max_posts_per_day=48,
+            min_interval_minutes=60,
+            quiet_hours_start=None,
+            quiet_hours_end=None
+        )
+        
+        next_slot = await engine._find_next_available_slot(test_user_id, preferences)
+        
+        assert next_slot == busy[-1] + timedelta(hours=1)
+        assert mock_data_flow_manager.get_schedule_timestamps.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_warm_rules_cache_skips_rule_and_preference_reads(self, rules_engine, mock_data_flow_manager,
+                                                                     test_user_id):
+        """测试编译后的规则缓存命中时不再读取规则和偏好设置"""
+        proposed_time = datetime.utcnow() + timedelta(days=1)
+        
+        await rules_engine.validate_publishing_rules(test_user_id, proposed_time=proposed_time)
+        mock_data_flow_manager.call_log.clear()
+        
+        result = await rules_engine.validate_publishing_rules(test_user_id, proposed_time=proposed_time)
+        
+        assert hasattr(result, 'can_publish')
+        called = {entry[0] for entry in mock_data_flow_manager.call_log}
+        assert 'get_user_scheduling_rules' not in called
+        assert 'get_founder_settings' not in called
+
+    @pytest.mark.asyncio
+    async def test_rule_update_invalidates_compiled_rules(self, rules_engine, mock_data_flow_manager, test_user_id):
+        """测试规则更新后重新编译该用户的规则"""
+        weekday = datetime.utcnow() + timedelta(days=1)
+        while weekday.weekday() >= 5:
+            weekday += timedelta(days=1)
+        weekday = weekday.replace(hour=12, minute=0)
+        
+        first = await rules_engine.validate_publishing_rules(test_user_id, proposed_time=weekday)
+        assert first.can_publish is True
+        
+        mock_data_flow_manager.get_user_scheduling_rules = Mock(return_value=[{
+            'id': 'midday_block',
+            'name': 'Midday Block',
+            'rule_type': 'time_window',
+            'conditions': {'type': 'time_window', 'start_time': '11:00', 'end_time': '13:00'},
+            'actions': {'type': 'block'}
+        }])
+        mock_data_flow_manager.update_user_scheduling_rule = Mock(return_value=True)
+        
+        # Still served from the cache until the rule change goes through the engine
+        cached = await rules_engine.validate_publishing_rules(test_user_id, proposed_time=weekday)
+        assert cached.can_publish is True
+        
+        assert await rules_engine.update_rule(test_user_id, 'midday_block', {'enabled': True})
+        updated = await rules_engine.validate_publishing_rules(test_user_id, proposed_time=weekday)
+        
+        assert updated.can_publish is False
+        assert any("quiet hours (11:00 - 13:00)" in violation for violation in updated.violations)
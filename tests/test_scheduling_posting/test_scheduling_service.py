@@ -125,7 +125,7 @@ class TestSchedulingService:
         batch_request = BatchScheduleRequest(
             content_ids=content_ids,
             schedule_time=datetime.utcnow() + timedelta(hours=1),
-            stagger_minutes=5
+            stagger_minutes=60
         )
         
         result = await scheduling_service.batch_schedule_content(test_user_id, batch_request)
@@ -145,7 +145,8 @@ class TestSchedulingService:
         
         batch_request = BatchScheduleRequest(
             content_ids=content_ids,
-            schedule_time=datetime.utcnow() + timedelta(hours=1)
+            schedule_time=datetime.utcnow() + timedelta(hours=1),
+            stagger_minutes=60
         )
         
         result = await scheduling_service.batch_schedule_content(test_user_id, batch_request)
@@ -0,0 +1,99 @@
+"""Tests for the MinHash/LSH near-duplicate content index"""
+import pytest
+from datetime import datetime, timedelta
+
+from modules.scheduling_posting.models import ScheduleRequest
+from modules.scheduling_posting.similarity_index import (
+    LSHIndex, MinHasher, SimilarityIndexRegistry, estimate_similarity,
+    pack_signature, unpack_signature
+)
+
+from tests.conftest import create_db_drafts
+
+BASE_TEXT = "Launching our new analytics dashboard today with realtime charts and team sharing"
+
+
+class TestMinHashLSH:
+    """MinHash签名与LSH索引测试"""
+
+    def test_signature_estimates_word_jaccard(self):
+        hasher = MinHasher()
+        text1 = "This is a test message about scheduling"
+        text2 = "This is another test message about scheduling"
+
+        assert estimate_similarity(hasher.signature(text1), hasher.signature(text1)) == 1.0
+        # Exact word-set Jaccard is 6/8
+        assert abs(estimate_similarity(hasher.signature(text1), hasher.signature(text2)) - 0.75) < 0.15
+        assert hasher.signature("   ") == ()
+
+    def test_signature_round_trips_through_storage(self):
+        signature = MinHasher().signature(BASE_TEXT)
+
+        assert unpack_signature(pack_signature(signature)) == signature
+
+    def test_query_finds_near_duplicates_only(self):
+        hasher = MinHasher()
+        index = LSHIndex()
+        now = datetime.utcnow()
+        index.add('dup', hasher.signature(BASE_TEXT + " now"), now)
+        index.add('other', hasher.signature("Weekly roundup of founder interviews and podcast episodes"), now)
+        for i in range(500):
+            index.add(f'noise-{i}', hasher.signature(f"unrelated post number {i} about topic {i * 7}"), now)
+
+        matches = index.query(hasher.signature(BASE_TEXT), threshold=0.8)
+
+        assert [content_id for content_id, _ in matches] == ['dup']
+
+    def test_remove_and_since_filter(self):
+        hasher = MinHasher()
+        index = LSHIndex()
+        signature = hasher.signature(BASE_TEXT)
+        index.add('old', signature, datetime.utcnow() - timedelta(days=10))
+        index.add('new', signature, datetime.utcnow())
+
+        assert [m[0] for m in index.query(signature, 0.8, since=datetime.utcnow() - timedelta(days=7))] == ['new']
+
+        index.remove('new')
+        assert index.query(signature, 0.8, since=datetime.utcnow() - timedelta(days=7)) == []
+        assert len(index) == 1
+
+
+class TestDuplicateContentRule:
+    """重复内容规则与持久化签名测试"""
+
+    @pytest.mark.asyncio
+    async def test_scheduled_content_flags_near_duplicate(self, db_scheduling_service, db_session, db_founder):
+        """A draft near-identical to scheduled content gets a duplicate warning until it is cancelled"""
+        first_id, second_id = create_db_drafts(db_session, db_founder, 2)
+        service = db_scheduling_service
+        service.data_flow_manager.update_content_draft(first_id, {'generated_text': BASE_TEXT})
+        service.data_flow_manager.update_content_draft(second_id, {'generated_text': BASE_TEXT + " now"})
+
+        scheduled = await service.schedule_content(str(db_founder.id), ScheduleRequest(
+            content_id=first_id, scheduled_time=datetime.utcnow() + timedelta(days=1), skip_rules_check=True
+        ))
+        assert scheduled.success
+
+        result = await service.check_publishing_rules(str(db_founder.id), second_id, datetime.utcnow() + timedelta(days=2))
+        assert any("Similar content" in violation for violation in result.violations)
+
+        await service.cancel_scheduled_content(db_founder.id, first_id)
+        result = await service.check_publishing_rules(str(db_founder.id), second_id, datetime.utcnow() + timedelta(days=2))
+        assert not any("Similar content" in violation for violation in result.violations)
+
+    @pytest.mark.asyncio
+    async def test_index_warms_from_persisted_signatures(self, db_scheduling_service, db_session, db_founder):
+        """A fresh registry rebuilds a founder's index from stored signatures"""
+        content_id = create_db_drafts(db_session, db_founder, 1)[0]
+        service = db_scheduling_service
+        service._index_content(str(db_founder.id), [(content_id, BASE_TEXT, datetime.utcnow())])
+
+        restarted = SimilarityIndexRegistry()
+        matches = restarted.find_similar(
+            str(db_founder.id), restarted.signature(BASE_TEXT), 0.8, service.data_flow_manager
+        )
+
+        assert [content_id for content_id, _ in matches] == [content_id]
+
+        service._unindex_content(str(db_founder.id), content_id)
+        assert service.data_flow_manager.get_content_signatures(str(db_founder.id)) == []
@@ -0,0 +1,127 @@
+"""Tests for one-pass batch slot assignment"""
+import pytest
+from datetime import datetime, timedelta, time
+
+from modules.scheduling_posting.models import BatchScheduleRequest, SchedulingPreferences
+from modules.scheduling_posting.rules_engine import ScheduleSnapshot
+from modules.scheduling_posting.slot_optimizer import SlotOptimizer
+from database.models import GeneratedContentDraft
+
+from tests.conftest import create_db_drafts
+
+# A Monday, so weekday handling is deterministic
+MONDAY = datetime(2026, 3, 2, 0, 0)
+
+
+def _preferences(**overrides):
+    values = dict(
+        founder_id='founder',
+        preferred_posting_times=['09:00', '13:00', '17:00'],
+        max_posts_per_day=3,
+        min_interval_minutes=60,
+        quiet_hours_start='22:00',
+        quiet_hours_end='08:00'
+    )
+    values.update(overrides)
+    return SchedulingPreferences(**values)
+
+
+class TestSlotOptimizer:
+    """批量时段分配测试"""
+
+    def test_preferred_times_are_filled_first(self):
+        optimizer = SlotOptimizer(_preferences())
+
+        slots = optimizer.assign([('a', 5), ('b', 5), ('c', 5)], ScheduleSnapshot([]), earliest=MONDAY)
+
+        assert sorted(slots.values()) == [MONDAY.replace(hour=h) for h in (9, 13, 17)]
+
+    def test_respects_daily_limit_interval_and_quiet_hours(self):
+        optimizer = SlotOptimizer(_preferences(preferred_posting_times=[]))
+        requests = [(f'c{i}', 5) for i in range(10)]
+
+        slots = sorted(optimizer.assign(requests, ScheduleSnapshot([]), earliest=MONDAY).values())
+
+        assert len(slots) == 10
+        for day in {slot.date() for slot in slots}:
+            assert sum(1 for slot in slots if slot.date() == day) <= optimizer.max_per_day
+        for earlier, later in zip(slots, slots[1:]):
+            assert later - earlier >= timedelta(minutes=60)
+        assert all(time(8, 0) < slot.time() < time(22, 0) for slot in slots)
+
+    def test_existing_schedule_is_avoided(self):
+        existing = [MONDAY.replace(hour=9), MONDAY.replace(hour=13, minute=30)]
+        optimizer = SlotOptimizer(_preferences())
+
+        slots = optimizer.assign([('a', 5), ('b', 5)], ScheduleSnapshot(existing), earliest=MONDAY)
+
+        assert list(slots.values()) == [MONDAY.replace(hour=17), (MONDAY + timedelta(days=1)).replace(hour=9)]
+
+    def test_weekends_are_skipped(self):
+        friday_night = MONDAY + timedelta(days=4, hours=21, minutes=50)
+        optimizer = SlotOptimizer(_preferences(avoid_weekends=True))
+
+        slots = optimizer.assign([('a', 5)], ScheduleSnapshot([]), earliest=friday_night)
+
+        assert slots['a'] == (MONDAY + timedelta(days=7)).replace(hour=9)
+
+    def test_higher_priority_gets_earlier_slot(self):
+        optimizer = SlotOptimizer(_preferences())
+        requests = [('low', 1), ('high', 9), ('mid', 5)]
+
+        weighted = optimizer.assign(requests, ScheduleSnapshot([]), earliest=MONDAY)
+        unweighted = optimizer.assign(requests, ScheduleSnapshot([]), earliest=MONDAY, weight_by_priority=False)
+
+        assert weighted['high'] < weighted['mid'] < weighted['low']
+        assert unweighted['low'] < unweighted['high'] < unweighted['mid']
+
+    def test_requests_beyond_horizon_are_omitted(self):
+        optimizer = SlotOptimizer(_preferences(max_posts_per_day=1), horizon_days=2)
+
+        slots = optimizer.assign([('a', 5), ('b', 5), ('c', 5)], ScheduleSnapshot([]), earliest=MONDAY)
+
+        assert set(slots) == {'a', 'b'}
+
+
+class TestBatchAutoScheduling:
+    """批量自动排期测试"""
+
+    def _enable_auto_schedule(self, db_session, founder, **preferences):
+        founder.settings = {'scheduling_preferences': {'auto_schedule_enabled': True, **preferences}}
+        db_session.commit()
+
+    @pytest.mark.asyncio
+    async def test_batch_without_time_assigns_distinct_valid_slots(self, db_scheduling_service, db_session, db_founder):
+        self._enable_auto_schedule(db_session, db_founder, max_posts_per_day=2, min_interval_minutes=90)
+        content_ids = create_db_drafts(db_session, db_founder, 6)
+
+        result = await db_scheduling_service.batch_schedule_content(
+            str(db_founder.id), BatchScheduleRequest(content_ids=content_ids)
+        )
+
+        assert result.successful_items == 6
+        times = sorted(
+            draft.scheduled_post_time
+            for draft in db_session.query(GeneratedContentDraft).filter(GeneratedContentDraft.status == 'scheduled')
+        )
+        assert len(times) == 6
+        assert all(later - earlier >= timedelta(minutes=90) for earlier, later in zip(times, times[1:]))
+        assert all(sum(1 for t in times if t.date() == day) <= 2 for day in {t.date() for t in times})
+
+    @pytest.mark.asyncio
+    async def test_auto_schedule_all_founders_only_schedules_opted_in(self, db_scheduling_service, db_session, db_founder):
+        from database.models import Founder
+
+        self._enable_auto_schedule(db_session, db_founder)
+        other = Founder(email='manual@example.com', username='manual', hashed_password='hash')
+        db_session.add(other)
+        db_session.commit()
+        opted_in = create_db_drafts(db_session, db_founder, 3)
+        manual = create_db_drafts(db_session, other, 2)
+
+        summary = await db_scheduling_service.auto_schedule_all_founders()
+
+        assert summary == {str(db_founder.id): 3}
+        statuses = {str(d.id): d.status for d in db_session.query(GeneratedContentDraft)}
+        assert all(statuses[content_id] == 'scheduled' for content_id in opted_in)
+        assert all(statuses[content_id] == 'approved' for content_id in manual)
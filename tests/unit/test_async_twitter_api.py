@@ -0,0 +1,206 @@
+"""Unit tests for AsyncTwitterAPIClient and AsyncTwitterAuth (httpx.MockTransport, no network)"""
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from modules.twitter_api import (
+    AsyncTwitterAPIClient, RateLimitError, TwitterAPIBadRequestError, TwitterAPINetworkError
+)
+
+
+def make_client(handler) -> AsyncTwitterAPIClient:
+    return AsyncTwitterAPIClient('client_id', 'client_secret', transport=httpx.MockTransport(handler))
+
+
+class TestAsyncTwitterAPIClient:
+
+    @pytest.mark.asyncio
+    async def test_create_tweet_success(self):
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen['method'] = request.method
+            seen['url'] = str(request.url)
+            seen['auth'] = request.headers['Authorization']
+            seen['body'] = json.loads(request.content)
+            return httpx.Response(201, json={'data': {'id': '123', 'text': 'hello'}},
+                                  headers={'x-rate-limit-limit': '300', 'x-rate-limit-remaining': '299',
+                                           'x-rate-limit-reset': '0'})
+
+        async with make_client(handler) as client:
+            result = await client.create_tweet('user_token', 'hello', reply_settings='followers')
+
+            assert result['data']['id'] == '123'
+            assert seen['method'] == 'POST'
+            assert seen['url'] == 'https://api.x.com/2/tweets'
+            assert seen['auth'] == 'Bearer user_token'
+            assert seen['body'] == {'text': 'hello', 'reply_settings': 'followers'}
+            assert client.get_rate_limit_status('user_token')['POST:/tweets']['remaining'] == 299
+
+    @pytest.mark.asyncio
+    async def test_invalid_tweet_is_rejected_before_request(self):
+        def handler(request):
+            raise AssertionError("no request expected")
+
+        async with make_client(handler) as client:
+            with pytest.raises(TwitterAPIBadRequestError):
+                await client.create_tweet('user_token', 'x' * 281)
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_error_carries_retry_after(self):
+        def handler(request):
+            return httpx.Response(429, json={'title': 'Too Many Requests'},
+                                  headers={'retry-after': '42', 'x-rate-limit-remaining': '0'})
+
+        async with make_client(handler) as client:
+            with pytest.raises(RateLimitError) as exc_info:
+                await client.search_tweets('user_token', 'python')
+
+        assert exc_info.value.retry_after == 42
+
+    @pytest.mark.asyncio
+    async def test_transport_error_becomes_network_error(self):
+        def handler(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        async with make_client(handler) as client:
+            with pytest.raises(TwitterAPINetworkError):
+                await client.get_me('user_token')
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_overlap(self):
+        """Ten 100ms round-trips complete in about one round-trip, not ten"""
+        async def handler(request):
+            await asyncio.sleep(0.1)
+            return httpx.Response(201, json={'data': {'id': '1', 'text': 'x'}})
+
+        async with make_client(handler) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(client.create_tweet(f'token_{i}', f'post {i}') for i in range(10)))
+            elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.5
+
+
+def search_pages(pages, delay=0.0, log=None):
+    """Mock recent-search handler serving ``pages`` (lists of tweet IDs) in order"""
+    async def handler(request):
+        token = request.url.params.get('next_token')
+        index = int(token) if token else 0
+        if log is not None:
+            log.append((index, int(request.url.params['max_results']), time.perf_counter()))
+        await asyncio.sleep(delay)
+        body = {'data': [{'id': tweet_id, 'text': f'tweet {tweet_id}'} for tweet_id in pages[index]],
+                'meta': {'result_count': len(pages[index])}}
+        if index + 1 < len(pages):
+            body['meta']['next_token'] = str(index + 1)
+        return httpx.Response(200, json=body)
+    return handler
+
+
+class TestIterSearch:
+
+    @pytest.mark.asyncio
+    async def test_follows_next_token_and_drops_repeats(self):
+        log = []
+        pages = [['1', '2', '3'], ['3', '4'], ['5', '1']]
+
+        async with make_client(search_pages(pages, log=log)) as client:
+            ids = [tweet['id'] async for tweet in client.iter_search('user_token', 'python')]
+
+        assert ids == ['1', '2', '3', '4', '5']
+        assert [entry[0] for entry in log] == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_stops_at_max_items_without_extra_page(self):
+        log = []
+        pages = [[str(i) for i in range(page * 10, page * 10 + 10)] for page in range(5)]
+
+        async with make_client(search_pages(pages, log=log)) as client:
+            ids = [tweet['id'] async for tweet in
+                   client.iter_search('user_token', 'python', max_items=15, page_size=10)]
+
+        assert ids == [str(i) for i in range(15)]
+        assert [entry[0] for entry in log] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_next_page_is_prefetched_while_consumer_works(self):
+        """Three 100ms pages consumed at 100ms each take ~0.4s, not ~0.6s"""
+        pages = [['1'], ['2'], ['3']]
+
+        async with make_client(search_pages(pages, delay=0.1)) as client:
+            started = time.perf_counter()
+            async for _ in client.iter_search('user_token', 'python'):
+                await asyncio.sleep(0.1)
+            elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.55
+
+    @pytest.mark.asyncio
+    async def test_closing_early_cancels_prefetch(self):
+        log = []
+        pages = [['1', '2'], ['3'], ['4']]
+
+        async with make_client(search_pages(pages, delay=0.05, log=log)) as client:
+            stream = client.iter_search('user_token', 'python')
+            assert (await stream.__anext__())['id'] == '1'
+            await asyncio.sleep(0.01)  # prefetch of page 1 is now in flight
+            await stream.aclose()
+            await asyncio.sleep(0.1)
+
+        assert [entry[0] for entry in log] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_pages_draw_from_rate_limiter(self):
+        pages = [['1'], ['2'], ['3']]
+
+        async with make_client(search_pages(pages)) as client:
+            client.rate_limit_max_wait = 0
+            client.rate_limiter.backend.sync(
+                client.rate_limiter._bucket_specs(
+                    'GET:/tweets/search/recent', client.endpoints.SEARCH_RECENT_TWEETS, 'user_token'
+                )[0],
+                limit=450, remaining=2, reset_time=int(time.time()) + 900, now=time.time()
+            )
+
+            ids = []
+            with pytest.raises(RateLimitError):
+                async for tweet in client.iter_search('user_token', 'python'):
+                    ids.append(tweet['id'])
+
+        assert ids == ['1', '2']
+
+
+class TestAsyncTwitterAuth:
+
+    @pytest.mark.asyncio
+    async def test_refresh_token_posts_form(self):
+        seen = {}
+
+        def handler(request):
+            seen['url'] = str(request.url)
+            seen['body'] = request.content.decode()
+            seen['basic'] = request.headers['Authorization'].startswith('Basic ')
+            return httpx.Response(200, json={'access_token': 'new', 'refresh_token': 'r2'})
+
+        async with make_client(handler) as client:
+            tokens = await client.auth.refresh_token('r1')
+
+        assert tokens['access_token'] == 'new'
+        assert seen['url'] == 'https://api.x.com/2/oauth2/token'
+        assert 'grant_type=refresh_token' in seen['body']
+        assert seen['basic']
+
+    @pytest.mark.asyncio
+    async def test_refresh_failure_returns_none(self):
+        async with make_client(lambda request: httpx.Response(400, json={'error': 'invalid_grant'})) as client:
+            assert await client.auth.refresh_token('bad') is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status_code,expected", [(200, True), (401, False), (429, True), (403, False)])
+    async def test_validate_user_token(self, status_code, expected):
+        async with make_client(lambda request: httpx.Response(status_code, json={})) as client:
+            assert await client.auth.validate_user_token('token') is expected
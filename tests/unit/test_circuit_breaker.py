@@ -0,0 +1,232 @@
+"""Unit tests for the circuit breaker, retry policy and their use in the request core (no network)"""
+import random
+import time
+
+import httpx
+import pytest
+
+from modules.twitter_api import (
+    AsyncTwitterAPIClient, CircuitBreaker, CircuitOpenError, RateLimitError, RetryPolicy,
+    TwitterAPINotFoundError, TwitterAPIServerError, TwitterAPINetworkError
+)
+from tests.conftest import FakeClock
+
+KEY = 'GET:/users/me'
+
+
+def make_breaker(clock, **kwargs):
+    kwargs.setdefault('window_size', 10)
+    kwargs.setdefault('minimum_calls', 4)
+    kwargs.setdefault('open_seconds', 30)
+    return CircuitBreaker(clock=clock, **kwargs)
+
+
+class TestCircuitBreaker:
+
+    def test_opens_when_failure_rate_reaches_threshold(self):
+        clock = FakeClock(1000.0)
+        breaker = make_breaker(clock)
+
+        for failed in (False, True, False, True):
+            breaker.before_request(KEY)
+            if failed:
+                breaker.record_failure(KEY, 0.1)
+            else:
+                breaker.record_success(KEY, 0.1)
+
+        assert breaker.state(KEY) == 'open'
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.before_request(KEY)
+        assert exc_info.value.retry_after == 30
+        assert breaker.status()['rejected'] == 1
+
+    def test_stays_closed_below_minimum_calls(self):
+        breaker = make_breaker(FakeClock(1000.0))
+
+        for _ in range(3):
+            breaker.before_request(KEY)
+            breaker.record_failure(KEY, 0.1)
+
+        assert breaker.state(KEY) == 'closed'
+
+    def test_slow_calls_open_the_circuit(self):
+        breaker = make_breaker(FakeClock(1000.0), slow_call_seconds=2, slow_call_rate_threshold=0.75)
+
+        for _ in range(4):
+            breaker.before_request(KEY)
+            breaker.record_success(KEY, 3.0)
+
+        assert breaker.state(KEY) == 'open'
+
+    def test_half_open_probe_success_closes(self):
+        clock = FakeClock(1000.0)
+        breaker = make_breaker(clock)
+        for _ in range(4):
+            breaker.record_failure(KEY, 0.1)
+
+        clock.now += 30
+        breaker.before_request(KEY)
+        assert breaker.state(KEY) == 'half_open'
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request(KEY)  # only one probe at a time
+
+        breaker.record_success(KEY, 0.1)
+        assert breaker.state(KEY) == 'closed'
+        breaker.before_request(KEY)
+
+    def test_failed_probe_reopens_for_longer(self):
+        clock = FakeClock(1000.0)
+        breaker = make_breaker(clock)
+        for _ in range(4):
+            breaker.record_failure(KEY, 0.1)
+
+        clock.now += 30
+        breaker.before_request(KEY)
+        breaker.record_failure(KEY, 0.1)
+
+        assert breaker.state(KEY) == 'open'
+        assert breaker.status()['endpoints'][KEY]['retry_in'] == 60
+
+    def test_retry_after_extends_open_time(self):
+        breaker = make_breaker(FakeClock(1000.0))
+        for _ in range(4):
+            breaker.record_failure(KEY, 0.1, retry_after=120)
+
+        assert breaker.status()['endpoints'][KEY]['retry_in'] == 120
+
+    def test_released_probe_slot_can_be_reused(self):
+        clock = FakeClock(1000.0)
+        breaker = make_breaker(clock)
+        for _ in range(4):
+            breaker.record_failure(KEY, 0.1)
+
+        clock.now += 30
+        breaker.before_request(KEY)
+        breaker.release(KEY)
+        breaker.before_request(KEY)
+
+
+class TestRetryPolicy:
+
+    def test_decorrelated_jitter_stays_within_bounds(self):
+        policy = RetryPolicy(max_attempts=100, base_delay=0.5, max_delay=5.0, rng=random.Random(1))
+        error = TwitterAPIServerError(status_code=503)
+
+        delay = None
+        for attempt in range(1, 50):
+            previous = delay or 0.5
+            delay = policy.next_delay(attempt, error, 'GET', delay)
+            assert 0.5 <= delay <= min(5.0, previous * 3)
+
+    def test_gives_up_after_max_attempts(self):
+        policy = RetryPolicy(max_attempts=3)
+        error = TwitterAPINetworkError()
+
+        assert policy.next_delay(2, error, 'GET') is not None
+        assert policy.next_delay(3, error, 'GET') is None
+
+    def test_retry_after_is_the_minimum_delay(self):
+        policy = RetryPolicy(base_delay=0.1, max_delay=5.0)
+
+        delay = policy.next_delay(1, TwitterAPIServerError(status_code=503, retry_after=3), 'GET')
+
+        assert 3 <= delay <= 3.1
+
+    def test_rate_limit_reset_is_honoured(self):
+        policy = RetryPolicy(base_delay=0.1, max_delay=5.0, clock=lambda: 1000.0)
+
+        delay = policy.next_delay(1, RateLimitError(reset_time=1002), 'POST')
+
+        assert 2 <= delay <= 2.1
+
+    def test_long_server_wait_is_not_retried(self):
+        policy = RetryPolicy(max_delay=5.0)
+
+        assert policy.next_delay(1, RateLimitError(retry_after=60), 'GET') is None
+        assert policy.next_delay(1, RateLimitError(), 'GET') is None  # no hint at all
+
+    def test_post_is_not_retried_after_server_error(self):
+        policy = RetryPolicy()
+
+        assert policy.next_delay(1, TwitterAPIServerError(status_code=503), 'POST') is None
+        assert policy.next_delay(1, TwitterAPINetworkError(), 'POST') is None
+
+    def test_client_errors_and_open_circuits_are_not_retried(self):
+        policy = RetryPolicy()
+
+        assert policy.next_delay(1, TwitterAPINotFoundError(), 'GET') is None
+        assert policy.next_delay(1, CircuitOpenError(KEY, retry_after=1), 'GET') is None
+
+
+class TestRequestCore:
+
+    @staticmethod
+    def make_client(handler, **kwargs):
+        kwargs.setdefault('retry_policy', RetryPolicy(base_delay=0.001, max_delay=0.01))
+        return AsyncTwitterAPIClient('client_id', 'client_secret', transport=httpx.MockTransport(handler), **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_transient_server_error_is_retried(self):
+        statuses = [503, 200]
+
+        def handler(request):
+            status_code = statuses.pop(0)
+            return httpx.Response(status_code, json={'data': {'id': '1'}} if status_code == 200 else {})
+
+        async with self.make_client(handler) as client:
+            result = await client.get_me('token')
+
+        assert result['data']['id'] == '1'
+        assert statuses == []
+
+    @pytest.mark.asyncio
+    async def test_create_tweet_is_not_retried_after_server_error(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503, json={'title': 'Service Unavailable'})
+
+        async with self.make_client(handler) as client:
+            with pytest.raises(TwitterAPIServerError):
+                await client.create_tweet('token', 'hello')
+
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast_without_requests(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503, json={'title': 'Service Unavailable'})
+
+        breaker = CircuitBreaker(window_size=10, minimum_calls=4, open_seconds=30)
+        async with self.make_client(handler, circuit_breaker=breaker,
+                                    retry_policy=RetryPolicy(max_attempts=1)) as client:
+            for _ in range(4):
+                with pytest.raises(TwitterAPIServerError):
+                    await client.get_me('token')
+
+            started = time.monotonic()
+            for _ in range(100):
+                with pytest.raises(CircuitOpenError):
+                    await client.get_me('token')
+            elapsed = time.monotonic() - started
+
+        assert len(calls) == 4
+        assert elapsed < 0.5
+        assert breaker.status()['endpoints'][KEY]['state'] == 'open'
+
+    @pytest.mark.asyncio
+    async def test_not_found_does_not_count_against_the_circuit(self):
+        def handler(request):
+            return httpx.Response(404, json={'title': 'Not Found Error', 'detail': 'Could not find user'})
+
+        breaker = CircuitBreaker(window_size=10, minimum_calls=4)
+        async with self.make_client(handler, circuit_breaker=breaker) as client:
+            for _ in range(10):
+                with pytest.raises(TwitterAPINotFoundError):
+                    await client.get_user_by_id('token', '1')
+
+        assert breaker.state('GET:/users/{user_id}') == 'closed'
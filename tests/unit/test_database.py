@@ -1,13 +1,13 @@
 import pytest
 from unittest.mock import Mock, patch
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 
 from database import DataFlowManager
-from database.models import Founder, Product, AnalyzedTrend
+from database.models import Founder, Product, AnalyzedTrend, GeneratedContentDraft
 from database.repositories import FounderRepository, ProductRepository
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from database.models import Base
 
@@ -132,4 +132,154 @@ class TestDataFlowManager:
         context = data_flow.get_founder_context_for_trend_analysis(founder_id)
         assert context is not None
         assert len(context['products']) == 1
-        assert 'AI' in context['all_keywords']
\ No newline at end of file
+        assert 'AI' in context['all_keywords']
+
+class TestPublishingQueueQueries:
+    @pytest.fixture
+    def db_session(self):
+        engine = create_engine('sqlite:///:memory:', echo=False)
+        Base.metadata.create_all(engine)
+        
+        Session = sessionmaker(bind=engine)
+        session = Session()
+        
+        yield session
+        
+        session.close()
+    
+    @pytest.fixture
+    def data_flow(self, db_session):
+        return DataFlowManager(db_session)
+    
+    @pytest.fixture
+    def founder(self, db_session):
+        founder = Founder(email='queue@example.com', username='queue', hashed_password='hash123')
+        db_session.add(founder)
+        db_session.commit()
+        return founder
+    
+    def _add_draft(self, db_session, founder, status, scheduled_post_time, priority=5):
+        draft = GeneratedContentDraft(
+            founder_id=founder.id,
+            content_type='tweet',
+            generated_text=f'{status} draft',
+            status=status,
+            scheduled_post_time=scheduled_post_time,
+            priority=priority
+        )
+        db_session.add(draft)
+        db_session.commit()
+        return str(draft.id)
+    
+    def test_get_ready_for_publishing_filters_due_items(self, db_session, data_flow, founder):
+        """Only due scheduled/retry_pending drafts are returned"""
+        now = datetime.utcnow()
+        due_id = self._add_draft(db_session, founder, 'scheduled', now - timedelta(minutes=5))
+        retry_id = self._add_draft(db_session, founder, 'retry_pending', now - timedelta(minutes=1))
+        self._add_draft(db_session, founder, 'scheduled', now + timedelta(hours=1))
+        self._add_draft(db_session, founder, 'posted', now - timedelta(hours=1))
+        
+        ready = data_flow.get_ready_for_publishing(limit=10)
+        
+        assert {item.content_draft_id for item in ready} == {due_id, retry_id}
+    
+    def test_get_ready_for_publishing_orders_and_limits(self, db_session, data_flow, founder):
+        """Higher priority first, then earliest scheduled time, capped by limit"""
+        now = datetime.utcnow()
+        late_low = self._add_draft(db_session, founder, 'scheduled', now - timedelta(minutes=1), priority=3)
+        early_low = self._add_draft(db_session, founder, 'scheduled', now - timedelta(minutes=10), priority=3)
+        high = self._add_draft(db_session, founder, 'scheduled', now - timedelta(minutes=1), priority=9)
+        
+        ready = data_flow.get_ready_for_publishing(limit=2)
+        
+        assert [item.content_draft_id for item in ready] == [high, early_low]
+        assert late_low not in [item.content_draft_id for item in ready]
+    
+    def test_aware_schedule_times_are_stored_as_naive_utc(self, db_session, data_flow, founder):
+        """Offset-aware times are converted to UTC before being written"""
+        draft_id = self._add_draft(db_session, founder, 'approved', None)
+        local_time = datetime(2030, 1, 1, 18, 0, tzinfo=timezone(timedelta(hours=8)))
+        
+        assert data_flow.update_content_draft(draft_id, {'scheduled_post_time': local_time})
+        
+        draft = data_flow.get_content_draft_by_id(draft_id)
+        assert draft.scheduled_post_time == datetime(2030, 1, 1, 10, 0)
+    
+    def test_get_schedule_timestamps_merges_posted_and_queued(self, db_session, data_flow, founder):
+        """Posted times and queued scheduled times in range come back sorted, minus the excluded draft"""
+        base = datetime(2030, 1, 1, 9, 0)
+        scheduled_id = self._add_draft(db_session, founder, 'scheduled', base + timedelta(hours=3))
+        excluded_id = self._add_draft(db_session, founder, 'retry_pending', base + timedelta(hours=2))
+        self._add_draft(db_session, founder, 'approved', base + timedelta(hours=1))
+        self._add_draft(db_session, founder, 'scheduled', base + timedelta(days=5))
+        posted = GeneratedContentDraft(
+            founder_id=founder.id, content_type='tweet', generated_text='posted draft',
+            status='posted', posted_at=base
+        )
+        db_session.add(posted)
+        db_session.commit()
+        
+        timestamps = data_flow.get_schedule_timestamps(
+            str(founder.id), base - timedelta(hours=1), base + timedelta(days=1),
+            exclude_content_id=excluded_id
+        )
+        
+        assert scheduled_id != excluded_id
+        assert timestamps == [base, base + timedelta(hours=3)]
+    
+    def test_migration_normalizes_stored_timestamps(self, db_session, founder):
+        """Legacy ISO/offset strings are rewritten in the canonical naive UTC format"""
+        from scripts.migrate_publishing_schema import run_migrations
+        
+        draft_id = self._add_draft(db_session, founder, 'scheduled', None)
+        db_session.execute(
+            text("UPDATE generated_content_drafts SET scheduled_post_time = :value WHERE id = :id"),
+            {'value': '2030-01-01T18:00:00+08:00', 'id': draft_id}
+        )
+        db_session.commit()
+        
+        results = run_migrations(db_session.get_bind())
+        
+        assert results['normalize_scheduling_timestamps'] == 1
+        db_session.expire_all()
+        draft = db_session.query(GeneratedContentDraft).first()
+        assert draft.scheduled_post_time == datetime(2030, 1, 1, 10, 0)
+
+
+class TestTwitterCredentialRefreshLease:
+    @pytest.fixture
+    def repository(self, monkeypatch):
+        from modules.user_profile.repository import UserProfileRepository
+        
+        monkeypatch.setenv('ENCRYPTION_KEY', 'test-encryption-key')
+        engine = create_engine('sqlite:///:memory:', echo=False)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        
+        founder = Founder(email='lease@example.com', username='lease', hashed_password='hash123')
+        session.add(founder)
+        session.commit()
+        repository = UserProfileRepository(session)
+        repository.save_twitter_credentials(founder.id, {'access_token': 'access', 'refresh_token': 'refresh'})
+        repository.founder_id = founder.id
+        
+        yield repository
+        
+        session.close()
+    
+    def test_refresh_lease_is_claimed_once_until_it_expires(self, repository):
+        """A second claim fails while the lease is held, and succeeds once it lapses"""
+        now = datetime(2030, 1, 1, 12, 0)
+        
+        assert repository.claim_twitter_token_refresh(repository.founder_id, 30, now)
+        assert not repository.claim_twitter_token_refresh(repository.founder_id, 30, now + timedelta(seconds=10))
+        assert repository.claim_twitter_token_refresh(repository.founder_id, 30, now + timedelta(seconds=31))
+    
+    def test_saving_refreshed_credentials_releases_the_lease(self, repository):
+        """The lease holder saving the new token lets the next refresh claim immediately"""
+        now = datetime(2030, 1, 1, 12, 0)
+        
+        assert repository.claim_twitter_token_refresh(repository.founder_id, 30, now)
+        repository.save_twitter_credentials(repository.founder_id, {'access_token': 'new', 'refresh_token': 'new'})
+        
+        assert repository.claim_twitter_token_refresh(repository.founder_id, 30, now + timedelta(seconds=1))
@@ -0,0 +1,154 @@
+"""Unit tests for the local fake Twitter API, driven through the real async client (no network)"""
+import httpx
+import pytest
+
+from modules.twitter_api import AsyncTwitterAPIClient, RetryPolicy, TwitterAPIServerError
+from modules.twitter_api.endpoints import _base_url_v1_1
+from modules.twitter_api.fake_server import FakeTwitterAPI
+
+
+def make_client(fake: FakeTwitterAPI, **kwargs) -> AsyncTwitterAPIClient:
+    kwargs.setdefault('retry_policy', RetryPolicy(base_delay=0.001, max_delay=0.01))
+    return AsyncTwitterAPIClient('client_id', 'client_secret',
+                                 transport=httpx.ASGITransport(app=fake.app), **kwargs)
+
+
+def user_id_for(fake: FakeTwitterAPI, token: str) -> str:
+    return fake._users_by_token[token]
+
+
+def raw_client(fake: FakeTwitterAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=fake.app), base_url='https://api.x.com')
+
+
+class TestFakeTwitterAPI:
+
+    @pytest.mark.asyncio
+    async def test_tweet_lifecycle(self):
+        fake = FakeTwitterAPI()
+
+        async with make_client(fake) as client:
+            created = await client.create_tweet('token', 'hello from the fake')
+            tweet_id = created['data']['id']
+
+            fetched = await client.fetch_tweet_by_id('token', tweet_id)
+            deleted = await client.delete_tweet('token', tweet_id)
+            batch = await client.fetch_tweets_by_ids('token', [tweet_id])
+
+        assert fetched['data']['text'] == 'hello from the fake'
+        assert fetched['data']['author_id'] == user_id_for(fake, 'token')
+        assert deleted == {'data': {'deleted': True}}
+        assert 'data' not in batch and batch['errors'][0]['resource_id'] == tweet_id
+
+    @pytest.mark.asyncio
+    async def test_duplicate_tweet_is_forbidden(self):
+        fake = FakeTwitterAPI()
+
+        async with raw_client(fake) as http:
+            headers = {'Authorization': 'Bearer token'}
+            first = await http.post('/2/tweets', json={'text': 'same'}, headers=headers)
+            second = await http.post('/2/tweets', json={'text': 'same'}, headers=headers)
+
+        assert first.status_code == 201
+        assert second.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_search_pages_through_seeded_tweets(self):
+        fake = FakeTwitterAPI(seed=1)
+        fake.seed_tweets(250, words=['python'])
+
+        async with make_client(fake) as client:
+            tweets = [tweet async for tweet in client.iter_search('token', 'python -is:retweet', page_size=100)]
+
+        assert len(tweets) == 250
+        assert len({tweet['id'] for tweet in tweets}) == 250
+        assert fake.requests['GET:/tweets/search/recent'] == 3
+
+    @pytest.mark.asyncio
+    async def test_likes_and_retweets_update_metrics(self):
+        fake = FakeTwitterAPI()
+        author = fake.add_user('author_token', username='author')
+        fan = fake.add_user('fan_token', username='fan')
+        tweet_id = fake.seed_tweets(1, author_id=author['id'])[0]
+
+        async with make_client(fake) as client:
+            await client.like_tweet('fan_token', fan['id'], tweet_id)
+            await client.like_tweet('fan_token', fan['id'], tweet_id)
+            await client.create_retweet('fan_token', fan['id'], tweet_id)
+            user = await client.get_user_by_username('fan_token', 'AUTHOR')
+
+        assert fake.tweets[tweet_id]['public_metrics']['like_count'] == 1
+        assert fake.tweets[tweet_id]['public_metrics']['retweet_count'] == 1
+        assert user['data']['id'] == author['id']
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_headers_and_enforcement(self):
+        fake = FakeTwitterAPI(clock=lambda: 1000.0)
+
+        async with raw_client(fake) as http:
+            headers = {'Authorization': 'Bearer token'}
+            responses = [await http.get('/2/users/me', headers=headers) for _ in range(76)]
+
+        assert responses[0].headers['x-rate-limit-limit'] == '75'
+        assert responses[0].headers['x-rate-limit-remaining'] == '74'
+        assert responses[0].headers['x-rate-limit-reset'] == '1900'
+        assert all(response.status_code == 200 for response in responses[:75])
+        assert responses[75].status_code == 429
+        assert responses[75].headers['x-rate-limit-remaining'] == '0'
+
+    @pytest.mark.asyncio
+    async def test_missing_token_is_unauthorized(self):
+        async with raw_client(FakeTwitterAPI()) as http:
+            response = await http.get('/2/users/me')
+
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_injected_errors_are_retried_by_the_client(self):
+        fake = FakeTwitterAPI()
+        fake.fail_next(2, status_code=503, path='/2/users/me')
+
+        async with make_client(fake) as client:
+            me = await client.get_me('token')
+
+        assert me['data']['username'].startswith('user')
+        assert fake.responses[503] == 2
+
+    @pytest.mark.asyncio
+    async def test_random_errors_follow_error_rate(self):
+        fake = FakeTwitterAPI(error_rate=1.0)
+
+        async with make_client(fake, retry_policy=RetryPolicy(max_attempts=1)) as client:
+            with pytest.raises(TwitterAPIServerError):
+                await client.get_me('token')
+
+    @pytest.mark.asyncio
+    async def test_trends_are_served_in_both_formats(self):
+        fake = FakeTwitterAPI(seed=1)
+        fake.seed_tweets(20)
+
+        async with make_client(fake) as client:
+            location = await client.get_trends_for_location('token', '1')
+            personalized = await client.get_personalized_trends('token', max_results=5)
+
+        assert location and all(trend['source'] == 'location_trends_v1.1' for trend in location)
+        assert len(personalized) == 5
+        assert all(trend['source'] == 'personalized_trends_v2' for trend in personalized)
+
+    @pytest.mark.asyncio
+    async def test_refresh_tokens_are_single_use(self):
+        fake = FakeTwitterAPI()
+
+        async with make_client(fake) as client:
+            issued = await client.auth.exchange_code_for_token('code', 'verifier', 'http://localhost/callback')
+            refreshed = await client.auth.refresh_token(issued['refresh_token'])
+            reused = await client.auth.refresh_token(issued['refresh_token'])
+            me = await client.get_me(refreshed['access_token'])
+
+        assert refreshed['access_token'] != issued['access_token']
+        assert reused is None
+        assert me['data']['id'] == user_id_for(fake, issued['access_token'])
+
+    def test_v1_1_base_url_follows_v2_override(self):
+        assert _base_url_v1_1('http://127.0.0.1:8081/2') == 'http://127.0.0.1:8081/1.1'
+        assert _base_url_v1_1('https://api.x.com/2') == 'https://api.x.com/1.1'
@@ -0,0 +1,142 @@
+"""Unit tests for batch lookups and LookupBatcher (httpx.MockTransport, no network)"""
+import asyncio
+
+import httpx
+import pytest
+
+from modules.twitter_api import (
+    AsyncTwitterAPIClient, LookupBatcher, TwitterAPIBadRequestError, TwitterAPINotFoundError,
+    TwitterAPIServerError
+)
+
+
+def lookup_handler(requests, missing=(), status_code=200):
+    """Mock /2/tweets and /2/users batch lookups; IDs in ``missing`` are reported as not found"""
+    async def handler(request):
+        ids = request.url.params['ids'].split(',')
+        requests.append({'path': request.url.path, 'ids': ids,
+                         'token': request.headers['Authorization']})
+        await asyncio.sleep(0.01)
+        if status_code != 200:
+            return httpx.Response(status_code, json={'title': 'Service Unavailable'})
+        body = {'data': [{'id': item_id, 'text': f'item {item_id}'} for item_id in ids if item_id not in missing]}
+        errors = [{'value': item_id, 'detail': f'Could not find tweet with ids: [{item_id}].',
+                   'title': 'Not Found Error', 'resource_id': item_id} for item_id in ids if item_id in missing]
+        if errors:
+            body['errors'] = errors
+        return httpx.Response(200, json=body)
+    return handler
+
+
+def make_client(handler) -> AsyncTwitterAPIClient:
+    return AsyncTwitterAPIClient('client_id', 'client_secret', transport=httpx.MockTransport(handler))
+
+
+class TestBatchLookups:
+
+    @pytest.mark.asyncio
+    async def test_fetch_tweets_by_ids_sends_one_request(self):
+        requests = []
+
+        async with make_client(lookup_handler(requests)) as client:
+            result = await client.fetch_tweets_by_ids('token', ['1', '2', '3'])
+
+        assert [tweet['id'] for tweet in result['data']] == ['1', '2', '3']
+        assert requests == [{'path': '/2/tweets', 'ids': ['1', '2', '3'], 'token': 'Bearer token'}]
+
+    @pytest.mark.asyncio
+    async def test_more_than_100_ids_are_rejected(self):
+        async with make_client(lookup_handler([])) as client:
+            with pytest.raises(TwitterAPIBadRequestError):
+                await client.get_users_by_ids('token', [str(i) for i in range(101)])
+
+
+class TestLookupBatcher:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_batches_of_100(self):
+        requests = []
+
+        async with make_client(lookup_handler(requests)) as client:
+            batcher = LookupBatcher(client)
+            results = await asyncio.gather(*(batcher.fetch_tweet('token', str(i)) for i in range(250)))
+
+        assert [result['data']['id'] for result in results] == [str(i) for i in range(250)]
+        assert sorted(len(request['ids']) for request in requests) == [50, 100, 100]
+        assert batcher.stats() == {'lookups': 250, 'requests': 3, 'pending': 0}
+
+    @pytest.mark.asyncio
+    async def test_batches_are_kept_per_token_and_kind(self):
+        requests = []
+
+        async with make_client(lookup_handler(requests)) as client:
+            batcher = LookupBatcher(client)
+            await asyncio.gather(
+                batcher.fetch_tweet('token_a', '1'),
+                batcher.fetch_tweet('token_a', '2'),
+                batcher.fetch_tweet('token_b', '3'),
+                batcher.get_user('token_a', '4'),
+            )
+
+        assert sorted((r['path'], r['token'], tuple(r['ids'])) for r in requests) == [
+            ('/2/tweets', 'Bearer token_a', ('1', '2')),
+            ('/2/tweets', 'Bearer token_b', ('3',)),
+            ('/2/users', 'Bearer token_a', ('4',)),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_missing_id_fails_only_its_caller(self):
+        requests = []
+
+        async with make_client(lookup_handler(requests, missing={'2'})) as client:
+            batcher = LookupBatcher(client)
+            results = await asyncio.gather(
+                batcher.fetch_tweet('token', '1'),
+                batcher.fetch_tweet('token', '2'),
+                batcher.fetch_tweet('token', '1'),
+                return_exceptions=True
+            )
+
+        assert results[0]['data']['id'] == '1'
+        assert isinstance(results[1], TwitterAPINotFoundError)
+        assert results[2]['data']['id'] == '1'
+        assert requests[0]['ids'] == ['1', '2']
+
+    @pytest.mark.asyncio
+    async def test_request_failure_reaches_every_caller(self):
+        async with make_client(lookup_handler([], status_code=503)) as client:
+            batcher = LookupBatcher(client)
+            results = await asyncio.gather(
+                *(batcher.get_user('token', str(i)) for i in range(3)),
+                return_exceptions=True
+            )
+
+        assert all(isinstance(result, TwitterAPIServerError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_invalid_id_is_rejected_without_poisoning_batch(self):
+        requests = []
+
+        async with make_client(lookup_handler(requests)) as client:
+            batcher = LookupBatcher(client)
+            results = await asyncio.gather(
+                batcher.fetch_tweet('token', '1'),
+                batcher.fetch_tweet('token', 'not-an-id'),
+                return_exceptions=True
+            )
+
+        assert results[0]['data']['id'] == '1'
+        assert isinstance(results[1], TwitterAPIBadRequestError)
+        assert requests[0]['ids'] == ['1']
+
+    @pytest.mark.asyncio
+    async def test_flush_sends_pending_lookups_immediately(self):
+        requests = []
+
+        async with make_client(lookup_handler(requests)) as client:
+            batcher = LookupBatcher(client, max_delay=60)
+            lookup = asyncio.ensure_future(batcher.fetch_tweet('token', '7'))
+            await asyncio.sleep(0)
+            await batcher.flush()
+
+            assert (await lookup)['data']['id'] == '7'
@@ -0,0 +1,187 @@
+"""Unit tests for shared rate limit backends (memory, SQLite, Redis via fakeredis)"""
+import asyncio
+import multiprocessing
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from modules.twitter_api import (
+    RateLimitError, TwitterRateLimiter, InMemoryRateLimitBackend, SQLiteRateLimitBackend, RedisRateLimitBackend,
+    rate_limit_backend_from_url
+)
+from modules.twitter_api.endpoints import APIEndpoint
+from modules.twitter_api.rate_limit_backends import BucketSpec
+
+BUDGET = 100
+ENDPOINT = APIEndpoint(path='/tweets', method='POST', rate_limit_requests=BUDGET, rate_limit_window=86400)
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return InMemoryRateLimitBackend()
+    if request.param == 'sqlite':
+        return SQLiteRateLimitBackend(str(tmp_path / 'ratelimit.db'))
+    fakeredis = pytest.importorskip('fakeredis')
+    return RedisRateLimitBackend(fakeredis.FakeRedis())
+
+
+class TestRateLimitBackends:
+    """Every backend implements the same bucket semantics"""
+
+    def test_seeded_budget_then_refill(self, backend):
+        spec = BucketSpec('token:a', 'GET:/test', 2, 60)
+
+        assert backend.acquire([spec], now=0.0) == 0
+        assert backend.acquire([spec], now=0.0) == 0
+        assert backend.acquire([spec], now=0.0) == pytest.approx(30)
+        assert backend.peek([spec], now=30.0) == 0
+        assert backend.acquire([spec], now=30.0) == 0
+
+    def test_header_sync_holds_until_reset(self, backend):
+        spec = BucketSpec('token:a', 'POST:/tweets', 300, 900)
+        backend.sync(spec, limit=300, remaining=0, reset_time=1060, now=1000.0)
+
+        assert backend.acquire([spec], now=1000.0) == pytest.approx(60)
+        # Another token is unaffected
+        assert backend.acquire([spec._replace(scope='token:b')], now=1000.0) == 0
+        assert backend.acquire([spec], now=1060.0) == 0
+
+    def test_out_of_order_headers_keep_lowest_count(self, backend):
+        spec = BucketSpec('token:a', 'POST:/tweets', 300, 900)
+        backend.sync(spec, limit=300, remaining=1, reset_time=1900, now=1000.0)
+        backend.sync(spec, limit=300, remaining=5, reset_time=1900, now=1001.0)
+
+        assert backend.acquire([spec], now=1002.0) == 0
+        assert backend.acquire([spec], now=1002.0) > 0
+
+    def test_acquire_is_all_or_nothing(self, backend):
+        user = BucketSpec('token:a', 'POST:/tweets', 10, 60)
+        app = BucketSpec('app', 'POST:/tweets', 1, 86400)
+
+        assert backend.acquire([user, app], now=0.0) == 0
+        assert backend.acquire([user, app], now=0.0) > 0
+        # The failed attempt took nothing from the user bucket
+        for _ in range(9):
+            assert backend.acquire([user], now=0.0) == 0
+        assert backend.acquire([user], now=0.0) > 0
+
+    def test_limiter_uses_backend(self, backend):
+        limiter = TwitterRateLimiter(backend=backend)
+        granted = sum(limiter.try_acquire('POST:/tweets', ENDPOINT, 'token') == 0 for _ in range(BUDGET + 5))
+
+        assert granted == BUDGET
+
+    @pytest.mark.asyncio
+    async def test_async_interface_shares_the_budget(self, backend):
+        limiter = TwitterRateLimiter(backend=backend)
+        spent = sum(limiter.try_acquire('POST:/tweets', ENDPOINT, 'token') == 0 for _ in range(BUDGET - 10))
+        granted = [await limiter.try_acquire_async('POST:/tweets', ENDPOINT, 'token') == 0 for _ in range(15)]
+
+        assert spent + sum(granted) == BUDGET
+
+
+def _spend_budget(db_path: str, attempts: int) -> int:
+    """Worker process: count requests granted from the shared SQLite budget"""
+    limiter = TwitterRateLimiter(backend=SQLiteRateLimitBackend(db_path))
+    return sum(limiter.try_acquire('POST:/tweets', ENDPOINT, 'founder_token') == 0 for _ in range(attempts))
+
+
+class TestSharedBudget:
+    """Budgets stay exact however many workers draw from them"""
+
+    def test_sqlite_budget_is_exact_across_processes(self, tmp_path):
+        db_path = str(tmp_path / 'ratelimit.db')
+        SQLiteRateLimitBackend(db_path)
+
+        # Spawned workers share no SQLite state with the test process, as with real workers
+        with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context('spawn')) as pool:
+            granted = sum(pool.map(_spend_budget, [db_path] * 4, [60] * 4))
+
+        assert granted == BUDGET
+
+    def test_redis_budget_is_exact_across_clients(self):
+        fakeredis = pytest.importorskip('fakeredis')
+        server = fakeredis.FakeServer()
+        granted = []
+
+        def worker():
+            # Each worker has its own connection, like a separate process would
+            limiter = TwitterRateLimiter(backend=RedisRateLimitBackend(fakeredis.FakeRedis(server=server)))
+            granted.append(sum(
+                limiter.try_acquire('POST:/tweets', ENDPOINT, 'founder_token') == 0 for _ in range(60)
+            ))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(granted) == BUDGET
+
+    @pytest.mark.asyncio
+    async def test_redis_asyncio_client_is_used_by_acquire(self):
+        fakeredis = pytest.importorskip('fakeredis')
+        from fakeredis import aioredis
+
+        server = fakeredis.FakeServer()
+        backend = RedisRateLimitBackend(fakeredis.FakeRedis(server=server),
+                                        async_redis_client=aioredis.FakeRedis(server=server))
+        backend.acquire = None  # the synchronous path must not be taken
+        limiter = TwitterRateLimiter(backend=backend)
+
+        for _ in range(BUDGET):
+            await limiter.acquire(ENDPOINT, 'founder_token')
+        await limiter.update_rate_limit_async('POST:/tweets', {
+            'x-rate-limit-limit': '100', 'x-rate-limit-remaining': '0',
+            'x-rate-limit-reset': str(int(time.time()) + 600)
+        }, 'founder_token')
+
+        with pytest.raises(RateLimitError):
+            await limiter.acquire(ENDPOINT, 'founder_token', max_wait=1)
+
+    @pytest.mark.asyncio
+    async def test_locked_sqlite_file_does_not_block_the_loop(self, tmp_path):
+        db_path = str(tmp_path / 'ratelimit.db')
+        limiter = TwitterRateLimiter(backend=SQLiteRateLimitBackend(db_path))
+
+        # Another worker holds the write lock for 0.3s
+        holder = sqlite3.connect(db_path, isolation_level=None)
+        holder.execute("BEGIN IMMEDIATE")
+        threading.Timer(0.3, lambda: holder.execute("COMMIT")).start()
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        await limiter.acquire(ENDPOINT, 'token')
+        task.cancel()
+        holder.close()
+
+        assert time.perf_counter() - started >= 0.25
+        assert ticks >= 10
+
+    def test_backend_failure_fails_open(self):
+        class BrokenBackend(InMemoryRateLimitBackend):
+            def acquire(self, specs, now):
+                raise ConnectionError("redis down")
+
+        limiter = TwitterRateLimiter(backend=BrokenBackend())
+
+        assert limiter.try_acquire('POST:/tweets', ENDPOINT, 'token') == 0
+
+    def test_backend_from_url(self, tmp_path):
+        assert isinstance(rate_limit_backend_from_url(None), InMemoryRateLimitBackend)
+        assert isinstance(rate_limit_backend_from_url(f"sqlite:///{tmp_path / 'rl.db'}"), SQLiteRateLimitBackend)
+        with pytest.raises(ValueError):
+            rate_limit_backend_from_url('memcached://localhost')
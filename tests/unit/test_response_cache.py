@@ -0,0 +1,200 @@
+"""Unit tests for the Twitter response cache (TTL, LRU, single-flight)"""
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from modules.twitter_api import (
+    AsyncTwitterAPIClient, ResponseCache, RetryPolicy, TwitterAPIError, TwitterAPIServerError
+)
+from tests.conftest import FakeClock
+
+USER_KEY = 'GET:/users/{user_id}'
+TRENDS_KEY = 'GET:/trends/place.json'
+
+
+class TestResponseCache:
+
+    def test_entries_expire_after_endpoint_ttl(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttls={USER_KEY: 10}, clock=clock)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return {'data': {'id': '1'}}
+
+        cache.get_or_fetch(USER_KEY, 'token', ('1',), fetch)
+        clock.now = 9
+        cache.get_or_fetch(USER_KEY, 'token', ('1',), fetch)
+        clock.now = 10
+        cache.get_or_fetch(USER_KEY, 'token', ('1',), fetch)
+
+        assert len(calls) == 2
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 2
+
+    def test_uncached_endpoint_always_fetches(self):
+        cache = ResponseCache(ttls={})
+        calls = []
+
+        for _ in range(3):
+            cache.get_or_fetch(USER_KEY, 'token', ('1',), lambda: calls.append(1))
+
+        assert len(calls) == 3
+        assert cache.stats()['misses'] == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(ttls={USER_KEY: 60}, max_entries=2)
+        calls = []
+
+        def lookup(user_id):
+            return cache.get_or_fetch(USER_KEY, 'token', (user_id,), lambda: calls.append(user_id) or user_id)
+
+        lookup('a')
+        lookup('b')
+        lookup('a')  # 'b' is now least recently used
+        lookup('c')
+        lookup('a')
+        lookup('b')
+
+        assert calls == ['a', 'b', 'c', 'b']
+        assert cache.stats()['evictions'] == 2
+
+    def test_entries_are_scoped_per_token_except_shared_endpoints(self):
+        cache = ResponseCache()
+        calls = []
+
+        for token in ('token_a', 'token_b'):
+            cache.get_or_fetch(USER_KEY, token, ('1',), lambda: calls.append(USER_KEY))
+            cache.get_or_fetch(TRENDS_KEY, token, ('1',), lambda: calls.append(TRENDS_KEY) or [])
+
+        assert calls == [USER_KEY, TRENDS_KEY, USER_KEY]
+
+    def test_callers_get_independent_copies(self):
+        cache = ResponseCache()
+
+        first = cache.get_or_fetch(TRENDS_KEY, 'token', ('1',), lambda: [{'name': '#AI'}])
+        first.append({'name': 'mutated'})
+
+        assert cache.get_or_fetch(TRENDS_KEY, 'token', ('1',), lambda: []) == [{'name': '#AI'}]
+
+    def test_concurrent_threads_share_one_fetch(self):
+        cache = ResponseCache()
+        calls = []
+        started = threading.Barrier(8)
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return ['trend']
+
+        def worker(results):
+            started.wait()
+            results.append(cache.get_or_fetch(TRENDS_KEY, 'token', ('1',), fetch))
+
+        results = []
+        threads = [threading.Thread(target=worker, args=(results,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [['trend']] * 8
+        assert cache.stats()['coalesced'] == 7
+
+    def test_errors_are_not_cached(self):
+        cache = ResponseCache()
+
+        def failing():
+            raise TwitterAPIServerError("Service Unavailable", 503)
+
+        with pytest.raises(TwitterAPIServerError):
+            cache.get_or_fetch(TRENDS_KEY, 'token', ('1',), failing)
+
+        assert cache.get_or_fetch(TRENDS_KEY, 'token', ('1',), lambda: ['trend']) == ['trend']
+
+
+def trends_handler(calls, delay=0.05, status_code=200):
+    async def handler(request):
+        calls.append(str(request.url))
+        await asyncio.sleep(delay)
+        if status_code != 200:
+            return httpx.Response(status_code, json={'title': 'Service Unavailable'})
+        return httpx.Response(200, json=[{'trends': [{'name': '#AI', 'tweet_volume': 1000}]}])
+    return handler
+
+
+class TestClientCaching:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_location_trend_requests_are_coalesced(self):
+        calls = []
+        client = AsyncTwitterAPIClient('client_id', 'client_secret',
+                                       transport=httpx.MockTransport(trends_handler(calls)))
+
+        async with client:
+            results = await asyncio.gather(*(
+                client.get_trends_for_location(f'founder_token_{i}', '1') for i in range(20)
+            ))
+            again = await client.get_trends_for_location('founder_token_0', '1')
+
+        assert len(calls) == 1
+        assert all(result == again for result in results)
+        assert client.response_cache.stats()['coalesced'] == 19
+        assert client.response_cache.stats()['hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_coalesced_callers_share_leader_error(self):
+        calls = []
+        client = AsyncTwitterAPIClient('client_id', 'client_secret', retry_policy=RetryPolicy(max_attempts=1),
+                                       transport=httpx.MockTransport(trends_handler(calls, status_code=503)))
+
+        async with client:
+            results = await asyncio.gather(
+                *(client.get_trends_for_location('token', '1') for _ in range(5)),
+                return_exceptions=True
+            )
+
+        assert len(calls) == 1
+        assert all(isinstance(result, TwitterAPIError) for result in results)
+        assert client.response_cache.stats()['entries'] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_fetch(self):
+        calls = []
+        client = AsyncTwitterAPIClient('client_id', 'client_secret',
+                                       transport=httpx.MockTransport(trends_handler(calls, delay=0.1)))
+
+        async with client:
+            leader = asyncio.ensure_future(client.get_trends_for_location('token', '1'))
+            await asyncio.sleep(0.01)
+            follower = asyncio.ensure_future(client.get_trends_for_location('token', '1'))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+
+            assert (await follower)[0]['name'] == '#AI'
+
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_tweet_invalidates_cached_lookup(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            if request.method == 'DELETE':
+                return httpx.Response(200, json={'data': {'deleted': True}})
+            return httpx.Response(200, json={'data': {'id': '42', 'text': 'hello'}})
+
+        async with AsyncTwitterAPIClient('client_id', 'client_secret',
+                                         transport=httpx.MockTransport(handler)) as client:
+            await client.fetch_tweet_by_id('token', '42')
+            await client.fetch_tweet_by_id('token', '42')
+            await client.delete_tweet('token', '42')
+            await client.fetch_tweet_by_id('token', '42')
+
+        assert calls == ['GET', 'DELETE', 'GET']
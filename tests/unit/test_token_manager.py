@@ -0,0 +1,276 @@
+"""Unit tests for the Twitter token manager (fake repository and auth, no network)"""
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from modules.user_profile import TwitterCredentials, TwitterTokenManager, UserProfileService, set_token_manager
+from tests.conftest import FakeClock
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class FakeRepository:
+    """Stands in for UserProfileRepository, counting reads"""
+
+    def __init__(self):
+        self.credentials = {}
+        self.leases = {}
+        self.reads = 0
+        self.saves = 0
+
+    def get_twitter_credentials(self, founder_id):
+        self.reads += 1
+        return self.credentials.get(founder_id)
+
+    def save_twitter_credentials(self, founder_id, credentials):
+        self.saves += 1
+        self.credentials[founder_id] = TwitterCredentials(**credentials)
+        self.leases.pop(founder_id, None)
+        return True
+
+    def claim_twitter_token_refresh(self, founder_id, lease_seconds=60, now=None):
+        lease = self.leases.get(founder_id)
+        if lease is not None and lease >= now:
+            return False
+        self.leases[founder_id] = now + timedelta(seconds=lease_seconds)
+        return True
+
+    def get_twitter_credentials_for_users(self, founder_ids):
+        self.reads += 1
+        return {founder_id: self.credentials[founder_id] for founder_id in founder_ids
+                if founder_id in self.credentials}
+
+    def get_refreshable_twitter_credentials(self, expires_before, limit=1000):
+        return [cred for cred in self.credentials.values()
+                if cred.refresh_token and cred.expires_at and cred.expires_at <= expires_before]
+
+    @contextmanager
+    def factory(self):
+        yield self
+
+
+class FakeAuth:
+    """Async auth that hands out numbered tokens, failing when told to"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def refresh_token(self, refresh_token):
+        self.calls.append(refresh_token)
+        await asyncio.sleep(0.01)
+        if self.fail:
+            return None
+        n = len(self.calls)
+        return {'access_token': f'access-{n}', 'refresh_token': f'refresh-{n}', 'expires_in': 7200}
+
+
+def credentials(founder_id='f1', access_token='access-0', refresh_token='refresh-0', expires_in=3600):
+    return TwitterCredentials(founder_id=founder_id, access_token=access_token, refresh_token=refresh_token,
+                              expires_at=NOW + timedelta(seconds=expires_in))
+
+
+def make_manager(repository, auth, **kwargs):
+    kwargs.setdefault('refresh_margin_seconds', 600)
+    kwargs.setdefault('clock', FakeClock(NOW))
+    return TwitterTokenManager(repository.factory, auth, **kwargs)
+
+
+class TestTwitterTokenManager:
+
+    def test_tracked_tokens_are_read_from_memory(self):
+        repository = FakeRepository()
+        manager = make_manager(repository, FakeAuth())
+        manager.track(credentials('f1', 'token-1'))
+        manager.track(credentials('f2', 'token-2'))
+
+        assert manager.get_access_token('f1') == 'token-1'
+        assert manager.get_access_tokens(['f1', 'f2', 'f3']) == {'f1': 'token-1', 'f2': 'token-2'}
+        assert repository.reads == 0
+
+    def test_expired_token_is_not_served(self):
+        clock = FakeClock(NOW)
+        manager = make_manager(FakeRepository(), FakeAuth(), clock=clock)
+        manager.track(credentials(expires_in=60))
+
+        clock.now = NOW + timedelta(seconds=60)
+
+        assert manager.get_access_token('f1') is None
+
+    def test_older_credentials_do_not_replace_newer_ones(self):
+        manager = make_manager(FakeRepository(), FakeAuth())
+        manager.track(credentials(access_token='new', expires_in=7200))
+        manager.track(credentials(access_token='stale', expires_in=3600))
+
+        assert manager.get_access_token('f1') == 'new'
+
+    @pytest.mark.asyncio
+    async def test_token_is_refreshed_only_within_margin(self):
+        repository = FakeRepository()
+        repository.credentials['f1'] = credentials(expires_in=3600)
+        auth = FakeAuth()
+        clock = FakeClock(NOW)
+        manager = make_manager(repository, auth, clock=clock)
+
+        assert await manager.refresh('f1') == 'access-0'
+        assert auth.calls == []
+
+        clock.now = NOW + timedelta(seconds=3000)
+        assert await manager.refresh('f1') == 'access-1'
+
+        assert auth.calls == ['refresh-0']
+        assert repository.credentials['f1'].refresh_token == 'refresh-1'
+        assert manager.get_access_token('f1') == 'access-1'
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_share_one_request(self):
+        repository = FakeRepository()
+        repository.credentials['f1'] = credentials(expires_in=60)
+        auth = FakeAuth()
+        manager = make_manager(repository, auth)
+
+        tokens = await asyncio.gather(*(manager.refresh('f1') for _ in range(10)))
+
+        assert auth.calls == ['refresh-0']
+        assert set(tokens) == {'access-1'}
+        assert repository.saves == 1
+        assert manager._refresh_locks == {}
+
+    @pytest.mark.asyncio
+    async def test_token_refreshed_by_another_process_is_adopted(self):
+        repository = FakeRepository()
+        auth = FakeAuth()
+        manager = make_manager(repository, auth)
+        manager.track(credentials(expires_in=60))
+        repository.credentials['f1'] = credentials(access_token='elsewhere', refresh_token='refresh-x',
+                                                   expires_in=7200)
+
+        assert await manager.refresh('f1') == 'elsewhere'
+        assert auth.calls == []
+
+    @pytest.mark.asyncio
+    async def test_only_the_lease_holder_spends_the_refresh_token(self):
+        repository = FakeRepository()
+        repository.credentials['f1'] = credentials(expires_in=60)
+        auth = FakeAuth()
+        # Two processes sharing the credentials table
+        first = make_manager(repository, auth, lease_poll_seconds=0.01)
+        second = make_manager(repository, auth, lease_poll_seconds=0.01)
+
+        tokens = await asyncio.gather(first.refresh('f1'), second.refresh('f1'))
+
+        assert auth.calls == ['refresh-0']
+        assert tokens == ['access-1', 'access-1']
+        assert repository.saves == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_is_retried_then_given_up(self):
+        repository = FakeRepository()
+        repository.credentials['f1'] = credentials(expires_in=60)
+        clock = FakeClock(NOW)
+        manager = make_manager(repository, FakeAuth(fail=True), clock=clock,
+                               retry_delay_seconds=30, refresh_lease_seconds=10, max_refresh_attempts=2)
+
+        assert await manager.refresh('f1') == 'access-0'
+        assert manager._pop_due(NOW + timedelta(seconds=29)) == []
+        assert manager._pop_due(NOW + timedelta(seconds=30)) == ['f1']
+
+        clock.now = NOW + timedelta(seconds=30)
+        await manager.refresh('f1')
+
+        assert manager._pop_due(NOW + timedelta(days=1)) == []
+        assert manager.stats()['refresh_failures'] == 2
+
+    @pytest.mark.asyncio
+    async def test_refresh_loop_refreshes_due_tokens(self):
+        repository = FakeRepository()
+        repository.credentials['f1'] = credentials(expires_in=60)
+        repository.credentials['f2'] = credentials('f2', 'other', 'refresh-other', expires_in=86400)
+        auth = FakeAuth()
+        manager = make_manager(repository, auth)
+
+        await manager.start()
+        try:
+            for _ in range(50):
+                if manager.get_access_token('f1') == 'access-1':
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await manager.stop()
+
+        assert auth.calls == ['refresh-0']
+        assert manager.get_access_token('f1') == 'access-1'
+        assert manager.get_access_token('f2') is None  # not due before the next resync, so not loaded
+
+    @pytest.mark.asyncio
+    async def test_prefetch_refreshes_expired_tokens_before_parking(self, monkeypatch):
+        monkeypatch.setenv('TWITTER_CLIENT_ID', 'client_id')
+        monkeypatch.setenv('TWITTER_CLIENT_SECRET', 'client_secret')
+        repository = FakeRepository()
+        repository.credentials['f1'] = credentials(expires_in=60)
+        repository.credentials['f2'] = credentials('f2', 'stale', None, expires_in=60)
+        auth = FakeAuth()
+        set_token_manager(make_manager(repository, auth))
+        try:
+            tokens = await UserProfileService(repository, None).get_twitter_access_tokens(['f1', 'f2', 'f3'])
+        finally:
+            set_token_manager(None)
+
+        # f1 is refreshed; f2 has no refresh token and f3 no credentials, so they need re-authorization
+        assert tokens == {'f1': 'access-1', 'f2': None, 'f3': None}
+        assert auth.calls == ['refresh-0']
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('auth_fails, expected_token, should_reauth', [
+        (False, 'access-1', False),
+        (True, None, True),
+    ])
+    async def test_request_path_refreshes_an_expired_token(self, monkeypatch, auth_fails,
+                                                           expected_token, should_reauth):
+        import jwt
+        from fastapi.security import HTTPAuthorizationCredentials
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+
+        from api import middleware
+        from database.models import Base, Founder
+        from modules.user_profile import UserProfileRepository
+
+        engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        monkeypatch.setattr(middleware, 'SessionLocal', Session)
+
+        session = Session()
+        founder = Founder(email='f@example.com', username='founder', hashed_password='hash')
+        session.add(founder)
+        session.commit()
+        founder_id = str(founder.id)
+        UserProfileRepository(session).save_twitter_credentials(
+            founder_id, credentials(founder_id, expires_in=-60).model_dump())
+        session.close()
+
+        @contextmanager
+        def repository_factory():
+            db = Session()
+            try:
+                yield UserProfileRepository(db)
+            finally:
+                db.close()
+
+        auth = FakeAuth(fail=auth_fails)
+        set_token_manager(TwitterTokenManager(repository_factory, auth, clock=datetime.utcnow))
+        try:
+            token = jwt.encode({'sub': founder_id}, middleware.SECRET_KEY, algorithm=middleware.ALGORITHM)
+            user = await middleware.get_current_user(HTTPAuthorizationCredentials(scheme='Bearer',
+                                                                                  credentials=token))
+        finally:
+            set_token_manager(None)
+            engine.dispose()
+
+        assert auth.calls == ['refresh-0']
+        assert user.access_token == expected_token
+        assert user.should_reauth is should_reauth
@@ -0,0 +1,298 @@
+"""Unit tests for shared trend ingestion, driven through the fake Twitter API (no network)"""
+import asyncio
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, TrackedTrendRaw
+from database.repositories.trend_repository import TrendRepository
+from modules.trend_analysis import TrendIngestionService, match_trends_by_keywords
+from modules.twitter_api import AsyncTwitterAPIClient, ResponseCache, RetryPolicy, TwitterAPIServerError
+from modules.twitter_api.fake_server import FakeTwitterAPI
+from modules.user_profile import set_token_manager
+from tests.conftest import FakeClock
+
+LOCATION_KEY = 'GET:/trends/place.json'
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'trends.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def factory():
+        session = Session()
+        try:
+            yield TrendRepository(session)
+        finally:
+            session.close()
+
+    yield factory
+    engine.dispose()
+
+
+class StubTokenManager:
+    """Hands out each founder's current token, counting lookups"""
+
+    def __init__(self):
+        self.tokens = {'founder': 'current-token'}
+        self.lookups = []
+
+    def get_access_token(self, founder_id):
+        self.lookups.append(founder_id)
+        return self.tokens.get(founder_id)
+
+    async def refresh(self, founder_id):
+        return self.tokens.get(founder_id)
+
+
+@pytest.fixture
+def token_manager():
+    manager = StubTokenManager()
+    set_token_manager(manager)
+    yield manager
+    set_token_manager(None)
+
+
+@pytest.fixture
+def fake():
+    fake = FakeTwitterAPI(seed=1)
+    fake.seed_tweets(20)
+    return fake
+
+
+def make_client(fake: FakeTwitterAPI) -> AsyncTwitterAPIClient:
+    # No response cache, so every fetch the service makes reaches the fake
+    return AsyncTwitterAPIClient('client_id', 'client_secret',
+                                 transport=httpx.ASGITransport(app=fake.app),
+                                 response_cache=ResponseCache(ttls={}),
+                                 retry_policy=RetryPolicy(max_attempts=1))
+
+
+class TestTrendIngestion:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_founders_share_one_fetch(self, fake, session_factory):
+        async with make_client(fake) as client:
+            service = TrendIngestionService(client, session_factory, clock=FakeClock(NOW))
+            snapshots = await asyncio.gather(
+                *(service.get_snapshot('1', f'founder_{i}', f'token_{i}') for i in range(500))
+            )
+
+        assert fake.requests[LOCATION_KEY] == 1
+        assert all(snapshot is snapshots[0] for snapshot in snapshots)
+        assert snapshots[0].trends
+        with session_factory() as repository:
+            rows = repository.get_latest_raw_trends('1')
+        assert len(rows) == len(snapshots[0].trends)
+
+    @pytest.mark.asyncio
+    async def test_refetches_only_after_the_window(self, fake, session_factory):
+        clock = FakeClock(NOW)
+        async with make_client(fake) as client:
+            service = TrendIngestionService(client, session_factory, window_seconds=300, clock=clock)
+            await service.get_snapshot('1', 'founder', 'token')
+            clock.now += timedelta(seconds=299)
+            await service.get_snapshot('1', 'founder', 'token')
+            assert fake.requests[LOCATION_KEY] == 1
+
+            clock.now += timedelta(seconds=1)
+            await service.get_snapshot('1', 'founder', 'token')
+            await service.get_snapshot('23424977', 'founder', 'token')
+
+        assert fake.requests[LOCATION_KEY] == 3
+        assert service.status()['fetches'] == 3
+
+    @pytest.mark.asyncio
+    async def test_other_process_reads_the_stored_snapshot(self, fake, session_factory):
+        clock = FakeClock(NOW)
+        async with make_client(fake) as client:
+            process_a = TrendIngestionService(client, session_factory, clock=clock)
+            process_b = TrendIngestionService(client, session_factory, clock=clock)
+            first = await process_a.get_snapshot('1', 'founder', 'token')
+            clock.now += timedelta(seconds=60)
+            second = await process_b.get_snapshot('1', 'founder', 'token')
+
+        assert fake.requests[LOCATION_KEY] == 1
+        assert second.fetched_at == first.fetched_at
+        assert [trend['name'] for trend in second.trends] == [trend['name'] for trend in first.trends]
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_serves_the_last_snapshot(self, fake, session_factory):
+        clock = FakeClock(NOW)
+        async with make_client(fake) as client:
+            service = TrendIngestionService(client, session_factory, clock=clock)
+            first = await service.get_snapshot('1', 'founder', 'token')
+
+            clock.now += timedelta(seconds=600)
+            fake.fail_next(1, status_code=503)
+            stale = await service.get_snapshot('1', 'founder', 'token')
+
+        assert stale is first
+        assert service.fetch_failures == 1
+
+    @pytest.mark.asyncio
+    async def test_first_fetch_failure_is_raised(self, fake, session_factory):
+        async with make_client(fake) as client:
+            service = TrendIngestionService(client, session_factory, clock=FakeClock(NOW))
+            fake.fail_next(1, status_code=503)
+            with pytest.raises(TwitterAPIServerError):
+                await service.get_snapshot('1', 'founder', 'token')
+
+    @pytest.mark.asyncio
+    async def test_personalized_trends_only_when_enabled(self, fake, session_factory):
+        async with make_client(fake) as client:
+            disabled = TrendIngestionService(client, session_factory, clock=FakeClock(NOW))
+            enabled = TrendIngestionService(client, session_factory, personalized_enabled=True, clock=FakeClock(NOW))
+
+            assert await disabled.get_personalized_trends('token', 5) == []
+            assert sum(fake.requests.values()) == 0
+
+            personalized = await enabled.get_personalized_trends('token', 5)
+
+        assert len(personalized) == 5
+        assert all(trend['source'] == 'personalized_trends_v2' for trend in personalized)
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_runs_ahead_of_expiry(self, fake, session_factory, token_manager):
+        clock = FakeClock(NOW)
+        async with make_client(fake) as client:
+            service = TrendIngestionService(client, session_factory, window_seconds=300,
+                                            refresh_ahead_seconds=30, track_seconds=3600, clock=clock)
+            await service.get_snapshot('1', 'founder', 'token')
+
+            clock.now += timedelta(seconds=200)
+            assert await service.refresh_tracked() == 0
+
+            clock.now += timedelta(seconds=70)
+            assert await service.refresh_tracked() == 1
+            assert fake.requests[LOCATION_KEY] == 2
+
+            clock.now += timedelta(seconds=20)
+            await service.get_snapshot('1', 'founder', 'token')  # still fresh thanks to the early refresh
+            assert fake.requests[LOCATION_KEY] == 2
+
+            clock.now += timedelta(seconds=7200)
+            assert await service.refresh_tracked() == 0  # no longer requested
+        assert service.status()['tracked_locations'] == 0
+
+    @pytest.mark.asyncio
+    async def test_refetch_prunes_fetches_past_retention(self, fake, session_factory):
+        clock = FakeClock(NOW)
+        async with make_client(fake) as client:
+            service = TrendIngestionService(client, session_factory, retention_seconds=600, clock=clock)
+            first = await service.get_snapshot('1', 'founder', 'token')
+            clock.now += timedelta(seconds=300)
+            await service.get_snapshot('1', 'founder', 'token')
+            clock.now += timedelta(seconds=400)
+            latest = await service.get_snapshot('1', 'founder', 'token')
+
+        with session_factory() as repository:
+            stored = repository.db_session.query(TrackedTrendRaw).count()
+        # The first fetch is older than the retention, the second is kept
+        assert latest.fetched_at - first.fetched_at > timedelta(seconds=600)
+        assert stored == 2 * len(latest.trends)
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_uses_the_founders_current_token(self, fake, session_factory,
+                                                                       token_manager):
+        clock = FakeClock(NOW)
+        async with make_client(fake) as client:
+            service = TrendIngestionService(client, session_factory, clock=clock)
+            await service.get_snapshot('1', 'founder', 'token-at-request-time')
+
+            used_tokens = []
+            fetch = client.get_trends_for_location
+
+            async def recording_fetch(user_token, location_id):
+                used_tokens.append(user_token)
+                return await fetch(user_token, location_id)
+
+            client.get_trends_for_location = recording_fetch
+            clock.now += timedelta(seconds=300)
+            assert await service.refresh_tracked() == 1
+
+            token_manager.tokens.clear()
+            clock.now += timedelta(seconds=300)
+            await service.refresh_tracked()  # no valid token, so nothing is fetched
+
+        assert used_tokens == ['current-token']
+        assert token_manager.lookups == ['founder', 'founder']
+
+    @pytest.mark.asyncio
+    async def test_repository_calls_do_not_block_the_event_loop(self, fake, session_factory):
+        @contextmanager
+        def slow_factory():
+            time.sleep(0.2)  # a slow database round-trip
+            with session_factory() as repository:
+                yield repository
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        async with make_client(fake) as client:
+            service = TrendIngestionService(client, slow_factory, clock=FakeClock(NOW))
+            task = asyncio.create_task(ticker())
+            await service.get_snapshot('1', 'founder', 'token')
+            task.cancel()
+
+        # The load and the store each took 0.2s on a worker thread while the loop kept running
+        assert ticks >= 20
+
+    def test_keyword_matching(self):
+        trends = [
+            {'name': '#AIStartups', 'url': 'http://twitter.com/search?q=%23AIStartups', 'tweet_volume': None},
+            {'name': 'Football', 'url': 'http://twitter.com/search?q=Football', 'tweet_volume': 1000},
+        ]
+
+        matched = match_trends_by_keywords(trends, ['AI', 'startup'], max_matches=5, location_id='1')
+
+        assert [topic['topic_name'] for topic in matched] == ['#AIStartups']
+        assert matched[0]['matching_keywords'] == ['AI', 'startup']
+        assert matched[0]['tweet_volume'] == 0
+
+
+class TestRawTrendRepository:
+
+    def test_latest_fetch_only(self, session_factory):
+        with session_factory() as repository:
+            repository.save_raw_trends('1', [{'name': 'old'}], NOW)
+            repository.save_raw_trends('1', [{'name': 'new', 'tweet_volume': 5}, {'name': ''}], NOW + timedelta(minutes=5))
+            repository.save_raw_trends('2', [{'name': 'elsewhere'}], NOW + timedelta(minutes=10))
+
+            latest = repository.get_latest_raw_trends('1')
+            assert [(row.name, row.volume) for row in latest] == [('new', 5)]
+            assert repository.get_latest_raw_trends('1', fetched_after=NOW + timedelta(minutes=5)) == []
+            assert repository.db_session.query(TrackedTrendRaw).count() == 3
+
+    def test_aware_and_naive_bounds_agree(self, session_factory):
+        with session_factory() as repository:
+            repository.save_raw_trends('1', [{'name': 'trend'}], NOW)
+
+            aware_now = NOW.replace(tzinfo=timezone.utc)
+            assert len(repository.get_latest_raw_trends('1', fetched_after=aware_now - timedelta(seconds=1))) == 1
+            assert repository.get_latest_raw_trends('1', fetched_after=aware_now) == []
+            assert repository.get_latest_raw_trends('1', fetched_after=NOW) == []
+
+    def test_prune_drops_only_old_fetches_of_the_location(self, session_factory):
+        with session_factory() as repository:
+            repository.save_raw_trends('1', [{'name': 'old'}], NOW - timedelta(days=8))
+            repository.save_raw_trends('1', [{'name': 'new'}], NOW)
+            repository.save_raw_trends('2', [{'name': 'elsewhere'}], NOW - timedelta(days=8))
+
+            assert repository.prune_raw_trends('1', NOW - timedelta(days=7)) == 1
+            remaining = repository.db_session.query(TrackedTrendRaw.name).order_by(TrackedTrendRaw.name).all()
+            assert [row.name for row in remaining] == ['elsewhere', 'new']
@@ -6,6 +6,7 @@ import pytest
 import json
 from unittest.mock import Mock, patch, MagicMock
 import requests
+import time
 from datetime import datetime
 
 from modules.twitter_api import (
@@ -92,6 +93,124 @@ class TestTwitterRateLimiter:
         assert status['limit'] == 300
         assert status['remaining'] == 250
 
+    def test_buckets_are_per_token(self):
+        """One founder exhausting their window does not hold up another"""
+        now = [1000.0]
+        limiter = TwitterRateLimiter(clock=lambda: now[0])
+        endpoint = TwitterAPIEndpoints.CREATE_TWEET
+        key = 'POST:/tweets'
+
+        limiter.update_rate_limit(key, {
+            'x-rate-limit-limit': '300',
+            'x-rate-limit-remaining': '0',
+            'x-rate-limit-reset': '1060'
+        }, user_token='token_a')
+
+        assert limiter.try_acquire(key, endpoint, 'token_a') == pytest.approx(60)
+        assert limiter.try_acquire(key, endpoint, 'token_b') == 0
+
+        # The window reset restores the full budget
+        now[0] = 1061.0
+        assert limiter.try_acquire(key, endpoint, 'token_a') == 0
+
+    def test_buckets_are_seeded_from_endpoint(self):
+        from modules.twitter_api.endpoints import APIEndpoint
+
+        now = [0.0]
+        limiter = TwitterRateLimiter(clock=lambda: now[0])
+        endpoint = APIEndpoint(path='/test', method='GET', rate_limit_requests=2, rate_limit_window=60)
+
+        assert limiter.try_acquire('GET:/test', endpoint, 'token') == 0
+        assert limiter.try_acquire('GET:/test', endpoint, 'token') == 0
+        # Refill is continuous: one request every 30 seconds
+        assert limiter.try_acquire('GET:/test', endpoint, 'token') == pytest.approx(30)
+        assert limiter.check_rate_limit('GET:/test', endpoint, 'token') == 30
+
+    def test_app_bucket_is_shared_by_tokens(self):
+        from modules.twitter_api.endpoints import APIEndpoint
+
+        limiter = TwitterRateLimiter(clock=lambda: 0.0)
+        endpoint = APIEndpoint(path='/test', method='POST', app_rate_limit_requests=1)
+
+        assert limiter.try_acquire('POST:/test', endpoint, 'token_a') == 0
+        assert limiter.try_acquire('POST:/test', endpoint, 'token_b') > 0
+
+    def test_search_app_cap_applies_across_tokens(self):
+        limiter = TwitterRateLimiter(clock=lambda: 0.0)
+        endpoint = TwitterAPIEndpoints.SEARCH_RECENT_TWEETS
+        key = 'GET:/tweets/search/recent'
+
+        for i in range(endpoint.app_rate_limit_requests):
+            assert limiter.try_acquire(key, endpoint, f'token_{i}') == 0
+
+        # A fresh token still has its own budget, but the app-wide one is spent
+        assert limiter.try_acquire(key, endpoint, 'token_new') > 0
+        assert TwitterAPIEndpoints.CREATE_TWEET.app_rate_limit_requests
+
+    def test_reported_statuses_are_bounded(self):
+        """Rotated tokens do not grow the status map without limit"""
+        limiter = TwitterRateLimiter(clock=lambda: 1000.0, max_buckets=3)
+        key = 'POST:/tweets'
+
+        def report(token, reset):
+            limiter.update_rate_limit(key, {
+                'x-rate-limit-limit': '300',
+                'x-rate-limit-remaining': '200',
+                'x-rate-limit-reset': str(reset)
+            }, user_token=token)
+
+        report('expired', 900)
+        report('token_a', 1900)
+        report('token_b', 1900)
+        report('token_c', 1900)  # full: the status whose window reset goes first
+        assert limiter.get_rate_limit_status(key, 'expired') is None
+
+        report('token_a', 1900)  # refreshed, so token_b is now the least recent
+        report('token_d', 1900)
+        assert limiter.get_rate_limit_status(key, 'token_b') is None
+        assert all(limiter.get_rate_limit_status(key, token) for token in ('token_a', 'token_c', 'token_d'))
+
+    @pytest.mark.asyncio
+    async def test_acquire_fails_fast_with_retry_after(self):
+        limiter = TwitterRateLimiter()
+        key = 'POST:/tweets'
+        limiter.update_rate_limit(key, {
+            'x-rate-limit-limit': '300',
+            'x-rate-limit-remaining': '0',
+            'x-rate-limit-reset': str(int(time.time()) + 600)
+        }, user_token='token')
+
+        with pytest.raises(RateLimitError) as exc_info:
+            await limiter.acquire(TwitterAPIEndpoints.CREATE_TWEET, 'token', max_wait=5)
+
+        assert 590 <= exc_info.value.retry_after <= 600
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_without_blocking_the_loop(self):
+        import asyncio
+        from modules.twitter_api.endpoints import APIEndpoint
+
+        limiter = TwitterRateLimiter()
+        endpoint = APIEndpoint(path='/test', method='GET', rate_limit_requests=10, rate_limit_window=1)
+        for _ in range(10):
+            await limiter.acquire(endpoint, 'token')
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        await limiter.acquire(endpoint, 'token')
+        task.cancel()
+
+        assert time.perf_counter() - started >= 0.05
+        assert ticks >= 3
+
 class TestTwitterAPIClient:
     """Test Twitter API client"""
     
@@ -259,4 +378,46 @@ class TestTwitterAPIEndpoints:
         endpoint = TwitterAPIEndpoints.GET_TRENDS
         url = TwitterAPIEndpoints.get_full_url(endpoint)
         
-        assert url == "https://api.twitter.com/1.1/trends/place.json"
\ No newline at end of file
+        assert url == "https://api.twitter.com/1.1/trends/place.json"
+
+class TestTwitterAPIRoutes:
+    """Test the /api/twitter routes against the process-wide client state"""
+    
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from api import middleware
+        from api.middleware import User, get_current_user
+        from api.routes.twitter_api import router
+        
+        monkeypatch.setenv('TWITTER_CLIENT_ID', 'test_client_id')
+        monkeypatch.setenv('TWITTER_CLIENT_SECRET', 'test_client_secret')
+        monkeypatch.setenv('TWITTER_RATE_LIMIT_BACKEND', 'memory')
+        for name in ('_twitter_rate_limiter', '_twitter_response_cache', '_twitter_circuit_breaker'):
+            monkeypatch.setattr(middleware, name, None)
+        
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_current_user] = lambda: User(
+            id='user_1', username='user', email='user@example.com', access_token='user_token'
+        )
+        return TestClient(app)
+    
+    def test_rate_limits_report_the_shared_state(self, client):
+        """Headers recorded by any client in the process show up in /rate-limits"""
+        from api.middleware import get_twitter_rate_limiter, get_twitter_response_cache
+        
+        get_twitter_rate_limiter().update_rate_limit('POST:/tweets', {
+            'x-rate-limit-limit': '200',
+            'x-rate-limit-remaining': '150',
+            'x-rate-limit-reset': str(int(time.time()) + 900)
+        }, 'user_token')
+        get_twitter_response_cache().get_or_fetch('GET:/tweets/{tweet_id}', 'user_token', ('1',), lambda: {'id': '1'})
+        
+        response = client.get('/api/twitter/rate-limits')
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body['limits']['POST:/tweets']['remaining'] == 150
+        assert body['cache']['misses'] == 1